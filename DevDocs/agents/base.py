@@ -2,7 +2,7 @@
 Base classes and interfaces for agents.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 import logging
 import json
 import uuid
@@ -51,6 +51,12 @@ class Agent(ABC):
         """Process a query and return a response."""
         pass
     
+    async def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Process a query and yield the response as it is generated."""
+        # Agents that cannot stream yield their whole response at once
+        response = await self.process(query, context)
+        yield response.content
+    
     def add_to_history(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """Add a message to the conversation history."""
         self.conversation_history.append({
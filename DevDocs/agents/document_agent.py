@@ -4,11 +4,11 @@ Document analysis agent implementation.
 import logging
 from typing import Dict, List, Any, Optional
 import os
-import aiohttp
 import json
 
 from .base import Agent, AgentResponse, AgentFactory
 from ..services.document_service import DocumentService
+from ..services.llm_transport import get_llm_transport, LLMTransportError
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,8 @@ class DocumentAgent(Agent):
         self.model = config.get("model", "openai/gpt-4")  # Using GPT-4 for better document analysis
         self.document_service = DocumentService()
         self.document_id = config.get("document_id")
+        self.context_tokens = config.get("context_tokens", 2500)  # Token budget of the document passages
+        self.min_context_passages = config.get("min_context_passages", 3)  # Below this, a sample of every page is added
         
         if not self.api_key:
             logger.warning("API key not provided. Document agent will not function properly.")
@@ -46,7 +48,7 @@ class DocumentAgent(Agent):
             )
         
         # Create system prompt with document context
-        system_prompt = self._create_system_prompt(document_context)
+        system_prompt = self._create_system_prompt(document_context, query)
         
         # Prepare messages for the API
         messages = [{"role": "system", "content": system_prompt}]
@@ -59,53 +61,41 @@ class DocumentAgent(Agent):
             })
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",
-                        "X-Title": "Document Understanding Demo"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": 1500,
-                        "temperature": 0.3  # Lower temperature for more factual responses
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {error_text}")
-                        return AgentResponse(
-                            content=f"Error: Failed to analyze document. Status code: {response.status}",
-                            metadata={"error": "api_error", "status_code": response.status}
-                        )
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return AgentResponse(
-                            content="Error: No response received from the document analysis.",
-                            metadata={"error": "empty_response"}
-                        )
-                    
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # Add assistant response to history
-                    self.add_to_history("assistant", content)
-                    
-                    return AgentResponse(
-                        content=content,
-                        metadata={
-                            "model": data.get("model", self.model),
-                            "usage": data.get("usage", {}),
-                            "document_id": self.document_id or context.get("document_id"),
-                            "document_name": document_context.get("document_name", "Unknown document")
-                        }
-                    )
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=1500,
+                temperature=0.3  # Lower temperature for more factual responses
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return AgentResponse(
+                    content="Error: No response received from the document analysis.",
+                    metadata={"error": "empty_response"}
+                )
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            # Add assistant response to history
+            self.add_to_history("assistant", content)
+            
+            return AgentResponse(
+                content=content,
+                metadata={
+                    "model": data.get("model", self.model),
+                    "usage": data.get("usage", {}),
+                    "document_id": self.document_id or context.get("document_id"),
+                    "document_name": document_context.get("document_name", "Unknown document")
+                }
+            )
         
+        except LLMTransportError as e:
+            logger.error(f"API error: {e.body}")
+            return AgentResponse(
+                content=f"Error: Failed to analyze document. Status code: {e.status}",
+                metadata={"error": "api_error", "status_code": e.status}
+            )
         except Exception as e:
             logger.exception("Error processing document query")
             return AgentResponse(
@@ -127,18 +117,17 @@ class DocumentAgent(Agent):
             }
         
         try:
-            # Get document data
-            document = self.document_service.get_document(document_id)
+            # Get document metadata and its passage index instead of the full text
+            document = self.document_service.get_document_metadata(document_id)
+            index = self.document_service.get_passage_index(document_id) if document else None
             
-            if not document:
+            if not document or index is None:
                 return {
                     "error": "document_not_found",
                     "error_message": f"Document with ID {document_id} not found."
                 }
             
-            # Extract text content
-            text_content = document.get("content", "")
-            if not text_content:
+            if not index.passages:
                 return {
                     "error": "document_empty",
                     "error_message": "The document has no text content to analyze."
@@ -148,7 +137,7 @@ class DocumentAgent(Agent):
                 "document_id": document_id,
                 "document_name": document.get("filename", "Unknown document"),
                 "document_type": document.get("metadata", {}).get("mime_type", "Unknown type"),
-                "text_content": text_content,
+                "passage_index": index,
                 "metadata": document.get("metadata", {})
             }
         
@@ -159,21 +148,22 @@ class DocumentAgent(Agent):
                 "error_message": f"Error retrieving document: {str(e)}"
             }
     
-    def _create_system_prompt(self, document_context: Dict[str, Any]) -> str:
-        """Create a system prompt with document context."""
+    def _create_system_prompt(self, document_context: Dict[str, Any], query: str) -> str:
+        """Create a system prompt with the passages of the document relevant to the query."""
         document_name = document_context.get("document_name", "the document")
-        text_content = document_context.get("text_content", "")
+        index = document_context["passage_index"]
         
-        # Truncate text content if it's too long (to avoid exceeding token limits)
-        max_chars = 10000  # Adjust based on your needs and model token limits
-        if len(text_content) > max_chars:
-            text_content = text_content[:max_chars] + "...[content truncated]"
+        # Only the best matching passages are sent, within the context token budget; generic questions
+        # that match few passages get the leading passages of every page instead
+        text_content = index.build_context(query, max_tokens=self.context_tokens, min_passages=self.min_context_passages)
+        if not text_content:
+            text_content = "[No passages of the document match the question]"
         
         return f"""You are a document analysis assistant specialized in understanding and extracting information from documents.
         
 You are currently analyzing a document named "{document_name}".
 
-Here is the content of the document:
+Here are the passages of the document most relevant to the question (or, when few match, the opening passages of its pages), labelled with their page:
 ---
 {text_content}
 ---
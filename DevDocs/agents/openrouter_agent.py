@@ -1,13 +1,13 @@
 """
 OpenRouter AI agent implementation.
 """
-import aiohttp
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 import os
 
 from .base import Agent, AgentResponse, AgentFactory
+from ..services.llm_transport import get_llm_transport, LLMTransportError
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +36,76 @@ class OpenRouterAgent(Agent):
         
         # Add user query to history
         self.add_to_history("user", query, context)
+        messages = self._prepare_messages()
         
-        # Prepare messages for the API
+        try:
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return AgentResponse(
+                    content="Error: No response received from the AI model.",
+                    metadata={"error": "empty_response"}
+                )
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            # Add assistant response to history
+            self.add_to_history("assistant", content)
+            
+            return AgentResponse(
+                content=content,
+                metadata={
+                    "model": data.get("model", self.model),
+                    "usage": data.get("usage", {}),
+                    "id": data.get("id")
+                }
+            )
+        
+        except LLMTransportError as e:
+            logger.error(f"OpenRouter API error: {e.body}")
+            return AgentResponse(
+                content=f"Error: Failed to get response from AI model. Status code: {e.status}",
+                metadata={"error": "api_error", "status_code": e.status}
+            )
+        except Exception as e:
+            logger.exception("Error processing query with OpenRouter")
+            return AgentResponse(
+                content=f"Error: {str(e)}",
+                metadata={"error": "exception", "message": str(e)}
+            )
+    
+    async def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream the response to a query from the OpenRouter API."""
+        if not self.api_key:
+            yield "Error: OpenRouter API key not configured. Please provide an API key."
+            return
+        
+        # Add user query to history
+        self.add_to_history("user", query, context)
+        messages = self._prepare_messages()
+        
+        pieces = []
+        async for piece in get_llm_transport().stream(
+            self.api_key,
+            self.model,
+            messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        ):
+            pieces.append(piece)
+            yield piece
+        
+        # Add assistant response to history
+        self.add_to_history("assistant", "".join(pieces))
+    
+    def _prepare_messages(self) -> List[Dict[str, str]]:
+        """Prepare messages for the API."""
         messages = [{"role": "system", "content": self.system_prompt}]
         
         # Add conversation history (limited to last 10 messages to avoid token limits)
@@ -47,56 +115,4 @@ class OpenRouterAgent(Agent):
                 "content": msg["content"]
             })
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",  # Replace with your actual domain
-                        "X-Title": "Document Understanding Demo"  # Replace with your app name
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": self.max_tokens,
-                        "temperature": self.temperature
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"OpenRouter API error: {error_text}")
-                        return AgentResponse(
-                            content=f"Error: Failed to get response from AI model. Status code: {response.status}",
-                            metadata={"error": "api_error", "status_code": response.status}
-                        )
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return AgentResponse(
-                            content="Error: No response received from the AI model.",
-                            metadata={"error": "empty_response"}
-                        )
-                    
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # Add assistant response to history
-                    self.add_to_history("assistant", content)
-                    
-                    return AgentResponse(
-                        content=content,
-                        metadata={
-                            "model": data.get("model", self.model),
-                            "usage": data.get("usage", {}),
-                            "id": data.get("id")
-                        }
-                    )
-        
-        except Exception as e:
-            logger.exception("Error processing query with OpenRouter")
-            return AgentResponse(
-                content=f"Error: {str(e)}",
-                metadata={"error": "exception", "message": str(e)}
-            )
+        return messages
@@ -4,12 +4,12 @@ SQL agent implementation for database queries.
 import logging
 from typing import Dict, List, Any, Optional
 import os
-import aiohttp
 import json
 import re
 
 from .base import Agent, AgentResponse, AgentFactory
 from ..services.database_service import DatabaseService
+from ..services.llm_transport import get_llm_transport, LLMTransportError
 
 logger = logging.getLogger(__name__)
 
@@ -171,52 +171,40 @@ Important guidelines:
     async def _generate_sql_query(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """Generate a SQL query using the AI model."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",
-                        "X-Title": "Document Understanding Demo"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": 1000,
-                        "temperature": 0.2  # Lower temperature for more precise SQL generation
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {error_text}")
-                        return {
-                            "error": "api_error",
-                            "error_message": f"Failed to generate SQL query. Status code: {response.status}"
-                        }
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return {
-                            "error": "empty_response",
-                            "error_message": "No response received from the AI model."
-                        }
-                    
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # Extract SQL query from the response
-                    sql_match = re.search(r"```sql\s*(.*?)\s*```", content, re.DOTALL)
-                    if not sql_match:
-                        return {
-                            "error": "no_sql_found",
-                            "error_message": "Could not extract a valid SQL query from the AI response.",
-                            "raw_response": content
-                        }
-                    
-                    sql_query = sql_match.group(1).strip()
-                    return {"query": sql_query}
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=1000,
+                temperature=0.2  # Lower temperature for more precise SQL generation
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return {
+                    "error": "empty_response",
+                    "error_message": "No response received from the AI model."
+                }
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            # Extract SQL query from the response
+            sql_match = re.search(r"```sql\s*(.*?)\s*```", content, re.DOTALL)
+            if not sql_match:
+                return {
+                    "error": "no_sql_found",
+                    "error_message": "Could not extract a valid SQL query from the AI response.",
+                    "raw_response": content
+                }
+            
+            sql_query = sql_match.group(1).strip()
+            return {"query": sql_query}
         
+        except LLMTransportError as e:
+            logger.error(f"API error: {e.body}")
+            return {
+                "error": "api_error",
+                "error_message": f"Failed to generate SQL query. Status code: {e.status}"
+            }
         except Exception as e:
             logger.exception("Error generating SQL query")
             return {
@@ -291,38 +279,27 @@ Please explain:
                 }
             ]
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",
-                        "X-Title": "Document Understanding Demo"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": 1000,
-                        "temperature": 0.5
-                    }
-                ) as response:
-                    if response.status != 200:
-                        # If explanation fails, return a basic response
-                        return {
-                            "content": f"I ran the following SQL query to answer your question:\n\n```sql\n{sql_query}\n```\n\nResults:\n\n{result_str}"
-                        }
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return {
-                            "content": f"I ran the following SQL query to answer your question:\n\n```sql\n{sql_query}\n```\n\nResults:\n\n{result_str}"
-                        }
-                    
-                    explanation = data["choices"][0]["message"]["content"]
-                    return {"content": explanation}
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=1000,
+                temperature=0.5
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return {
+                    "content": f"I ran the following SQL query to answer your question:\n\n```sql\n{sql_query}\n```\n\nResults:\n\n{result_str}"
+                }
+            
+            explanation = data["choices"][0]["message"]["content"]
+            return {"content": explanation}
         
+        except LLMTransportError:
+            # If explanation fails, return a basic response
+            return {
+                "content": f"I ran the following SQL query to answer your question:\n\n```sql\n{sql_query}\n```\n\nResults:\n\n{result_str}"
+            }
         except Exception as e:
             logger.exception("Error generating query explanation")
             # Fall back to a basic response
@@ -4,13 +4,13 @@ Web browsing agent implementation.
 import logging
 from typing import Dict, List, Any, Optional
 import os
-import aiohttp
 import json
 import re
 from urllib.parse import urlparse, urljoin
 
 from .base import Agent, AgentResponse, AgentFactory
 from ..services.web_service import WebService
+from ..services.llm_transport import get_llm_transport, LLMTransportError
 
 logger = logging.getLogger(__name__)
 
@@ -78,53 +78,41 @@ If the answer cannot be found in the webpage content, clearly state that the inf
             ]
             
             # Get AI response
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",
-                        "X-Title": "Document Understanding Demo"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": 1500,
-                        "temperature": 0.3
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {error_text}")
-                        return AgentResponse(
-                            content=f"Error: Failed to analyze the webpage. Status code: {response.status}",
-                            metadata={"error": "api_error", "status_code": response.status}
-                        )
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return AgentResponse(
-                            content="Error: No response received from the AI model.",
-                            metadata={"error": "empty_response"}
-                        )
-                    
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # Add assistant response to history
-                    self.add_to_history("assistant", content)
-                    
-                    return AgentResponse(
-                        content=content,
-                        metadata={
-                            "url": url,
-                            "title": page_content.get("title", "Unknown page"),
-                            "model": data.get("model", self.model),
-                            "usage": data.get("usage", {})
-                        }
-                    )
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=1500,
+                temperature=0.3
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return AgentResponse(
+                    content="Error: No response received from the AI model.",
+                    metadata={"error": "empty_response"}
+                )
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            # Add assistant response to history
+            self.add_to_history("assistant", content)
+            
+            return AgentResponse(
+                content=content,
+                metadata={
+                    "url": url,
+                    "title": page_content.get("title", "Unknown page"),
+                    "model": data.get("model", self.model),
+                    "usage": data.get("usage", {})
+                }
+            )
         
+        except LLMTransportError as e:
+            logger.error(f"API error: {e.body}")
+            return AgentResponse(
+                content=f"Error: Failed to analyze the webpage. Status code: {e.status}",
+                metadata={"error": "api_error", "status_code": e.status}
+            )
         except Exception as e:
             logger.exception(f"Error processing URL query for {url}")
             return AgentResponse(
@@ -200,54 +188,42 @@ Be concise but thorough in your response.
             ]
             
             # Get AI response
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://document-understanding-demo.com",
-                        "X-Title": "Document Understanding Demo"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "max_tokens": 1500,
-                        "temperature": 0.3
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {error_text}")
-                        return AgentResponse(
-                            content=f"Error: Failed to analyze the search results. Status code: {response.status}",
-                            metadata={"error": "api_error", "status_code": response.status}
-                        )
-                    
-                    data = await response.json()
-                    
-                    if not data.get("choices") or len(data["choices"]) == 0:
-                        return AgentResponse(
-                            content="Error: No response received from the AI model.",
-                            metadata={"error": "empty_response"}
-                        )
-                    
-                    content = data["choices"][0]["message"]["content"]
-                    
-                    # Add assistant response to history
-                    self.add_to_history("assistant", content)
-                    
-                    return AgentResponse(
-                        content=content,
-                        metadata={
-                            "search_query": query,
-                            "search_results": [{"url": r["url"], "title": r["title"]} for r in search_results["results"][:self.search_results_count]],
-                            "pages_analyzed": [{"url": p["url"], "title": p["title"]} for p in pages_content],
-                            "model": data.get("model", self.model),
-                            "usage": data.get("usage", {})
-                        }
-                    )
+            data = await get_llm_transport().chat(
+                self.api_key,
+                self.model,
+                messages,
+                max_tokens=1500,
+                temperature=0.3
+            )
+            
+            if not data.get("choices") or len(data["choices"]) == 0:
+                return AgentResponse(
+                    content="Error: No response received from the AI model.",
+                    metadata={"error": "empty_response"}
+                )
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            # Add assistant response to history
+            self.add_to_history("assistant", content)
+            
+            return AgentResponse(
+                content=content,
+                metadata={
+                    "search_query": query,
+                    "search_results": [{"url": r["url"], "title": r["title"]} for r in search_results["results"][:self.search_results_count]],
+                    "pages_analyzed": [{"url": p["url"], "title": p["title"]} for p in pages_content],
+                    "model": data.get("model", self.model),
+                    "usage": data.get("usage", {})
+                }
+            )
         
+        except LLMTransportError as e:
+            logger.error(f"API error: {e.body}")
+            return AgentResponse(
+                content=f"Error: Failed to analyze the search results. Status code: {e.status}",
+                metadata={"error": "api_error", "status_code": e.status}
+            )
         except Exception as e:
             logger.exception(f"Error processing search query: {query}")
             return AgentResponse(
@@ -2,11 +2,15 @@ import logging
 import json
 import random
 from typing import Dict, Any, List, Optional
-import requests
 from datetime import datetime
 
 from .base_agent import BaseAgent
 
+try:
+    from ..utils.openrouter_client import OpenRouterClient
+except ImportError:
+    from utils.openrouter_client import OpenRouterClient
+
 class ChatAgent(BaseAgent):
     """Agent for handling chat interactions with users."""
     
@@ -91,31 +95,17 @@ class ChatAgent(BaseAgent):
         agent_type = self._get_agent_type(agent_id)
         system_prompt = self._get_system_prompt(agent_type, document_id)
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
-        data = {
-            "model": "anthropic/claude-3-opus:beta",  # Using Claude 3 Opus for best financial analysis
-            "messages": [
+        client = OpenRouterClient(self.api_key)
+        response_data = client.chat_completion(
+            messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": message}
             ],
-            "temperature": 0.7,
-            "max_tokens": 1000
-        }
-        
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data
+            model="anthropic/claude-3-opus:beta",  # Using Claude 3 Opus for best financial analysis
+            temperature=0.7,
+            max_tokens=1000
         )
         
-        if response.status_code != 200:
-            raise Exception(f"API call failed with status {response.status_code}: {response.text}")
-        
-        response_data = response.json()
         return response_data["choices"][0]["message"]["content"]
     
     def _get_agent_type(self, agent_id: str) -> str:
@@ -1,23 +1,44 @@
 """
 Data Export Agent for exporting data to various formats.
 """
+import io
 import json
 import csv
+import importlib.util
 import os
-import pandas as pd
-import xml.dom.minidom
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import re
+import tempfile
+from itertools import chain, islice
+from xml.sax.saxutils import escape
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from datetime import datetime, date
 import uuid
 from .base_agent import BaseAgent
 
 class DataExportAgent(BaseAgent):
     """Agent for exporting data to various formats for use in other systems."""
     
+    # Format -> (file extension, media type)
+    EXPORT_FORMATS = {
+        "json": (".json", "application/json"),
+        "csv": (".csv", "text/csv"),
+        "excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+        "xml": (".xml", "application/xml"),
+        "parquet": (".parquet", "application/vnd.apache.parquet")
+    }
+    
+    # Format -> module its writer needs
+    FORMAT_DEPENDENCIES = {
+        "excel": "openpyxl",
+        "parquet": "pyarrow"
+    }
+    
     def __init__(
         self, 
         api_key: Optional[str] = None,
         output_dir: str = "exports",
+        chunk_size: int = 64 * 1024,
+        parquet_batch_size: int = 50000,
         **kwargs
     ):
         """
@@ -26,12 +47,16 @@ class DataExportAgent(BaseAgent):
         Args:
             api_key: OpenRouter API key
             output_dir: Directory for exported files
+            chunk_size: Size in bytes of the chunks yielded by iter_export
+            parquet_batch_size: Number of rows per Parquet row group
             **kwargs: Additional parameters for the base agent
         """
         super().__init__(name="Data Export Agent")
         self.api_key = api_key
         self.description = "I export data to various formats for use in other systems."
         self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.parquet_batch_size = parquet_batch_size
         os.makedirs(output_dir, exist_ok=True)
     
     def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,7 +66,7 @@ class DataExportAgent(BaseAgent):
         Args:
             task: Task dictionary with the following keys:
                 - data: Data to export
-                - format_type: Export format (json, csv, excel, xml)
+                - format_type: Export format (json, csv, excel, xml, parquet)
                 - filename: Optional filename
                 - export_type: Optional export type (raw, portfolio_summary, isin_list)
                 
@@ -90,7 +115,7 @@ class DataExportAgent(BaseAgent):
         
         Args:
             data: Data to export
-            format_type: Export format (json, csv, excel, xml)
+            format_type: Export format (json, csv, excel, xml, parquet)
             filename: Optional filename
             
         Returns:
@@ -110,9 +135,80 @@ class DataExportAgent(BaseAgent):
             return self._export_to_excel(data, filename)
         elif format_type.lower() == "xml":
             return self._export_to_xml(data, filename)
+        elif format_type.lower() == "parquet":
+            return self._export_to_parquet(data, filename)
         else:
             raise ValueError(f"Unsupported format: {format_type}")
     
+    def iter_export(self, data: Dict[str, Any], format_type: str, export_type: str = "raw") -> Iterator[bytes]:
+        """
+        Export data as a stream of byte chunks, e.g. for a chunked HTTP response.
+        
+        JSON, CSV and XML are generated chunk by chunk without a file. Excel and
+        Parquet files are containers that can only be read once complete; they
+        are written to a temporary file, which is streamed and then removed.
+        
+        Args:
+            data: Data to export
+            format_type: Export format (json, csv, excel, xml, parquet)
+            export_type: Export type (raw, portfolio_summary, isin_list)
+        
+        Returns:
+            Iterator of chunks of the exported file
+        """
+        format_type = format_type.lower()
+        if format_type not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {format_type}")
+        
+        if export_type == "portfolio_summary":
+            data = self._build_portfolio_summary(data)
+        elif export_type == "isin_list":
+            data = self._build_isin_list(data)
+        
+        # Fail before the response starts rather than in the middle of it
+        if format_type in ("csv", "parquet") and self._find_rows(data) is None:
+            raise ValueError("Could not convert data to tabular format")
+        dependency = self.FORMAT_DEPENDENCIES.get(format_type)
+        if dependency and importlib.util.find_spec(dependency) is None:
+            raise ValueError(f"{format_type.capitalize()} export requires {dependency}")
+        
+        if format_type == "json":
+            return self._iter_text(self._write_json, data)
+        elif format_type == "csv":
+            return self._iter_text(self._write_csv, data)
+        elif format_type == "xml":
+            return self._iter_text(self._write_xml, data)
+        elif format_type == "excel":
+            return self._iter_file(self._write_excel, data, ".xlsx")
+        else:
+            return self._iter_file(self._write_parquet, data, ".parquet")
+    
+    def _iter_text(self, write, data: Dict[str, Any]) -> Iterator[bytes]:
+        """Run a text writer into a buffer, yielding the buffer whenever it fills up."""
+        buffer = io.StringIO()
+        for _ in write(data, buffer):
+            if buffer.tell() >= self.chunk_size:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    
+    def _iter_file(self, write, data: Dict[str, Any], suffix: str) -> Iterator[bytes]:
+        """Write a binary export to a temporary file and stream it."""
+        fd, filepath = tempfile.mkstemp(suffix=suffix, dir=self.output_dir)
+        os.close(fd)
+        try:
+            write(data, filepath)
+            with open(filepath, 'rb') as f:
+                while True:
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            os.remove(filepath)
+    
     def _export_to_json(self, data: Dict[str, Any], filename: str) -> str:
         """Export to JSON format."""
         # Ensure filename has the correct extension
@@ -122,7 +218,8 @@ class DataExportAgent(BaseAgent):
         filepath = os.path.join(self.output_dir, filename)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            for _ in self._write_json(data, f):
+                pass
         
         return filepath
     
@@ -134,21 +231,13 @@ class DataExportAgent(BaseAgent):
             
         filepath = os.path.join(self.output_dir, filename)
         
-        # Convert data to tabular format
-        tabular_data = self._convert_to_tabular(data)
-        
-        if not tabular_data:
+        # Find the rows before creating the file
+        if self._find_rows(data) is None:
             raise ValueError("Could not convert data to tabular format")
         
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Write headers
-            writer.writerow(tabular_data[0].keys())
-            
-            # Write rows
-            for row in tabular_data:
-                writer.writerow(row.values())
+            for _ in self._write_csv(data, f):
+                pass
         
         return filepath
     
@@ -159,79 +248,7 @@ class DataExportAgent(BaseAgent):
             filename += '.xlsx'
             
         filepath = os.path.join(self.output_dir, filename)
-        
-        # Create Excel file with different sheets based on data type
-        with pd.ExcelWriter(filepath, engine='xlsxwriter') as writer:
-            workbook = writer.book
-            
-            # Formats
-            header_format = workbook.add_format({
-                'bold': True,
-                'bg_color': '#CCCCCC',
-                'border': 1
-            })
-            
-            # Summary sheet
-            summary_sheet = pd.DataFrame()
-            summary_data = []
-            
-            # Add metadata
-            if "metadata" in data:
-                for key, value in data["metadata"].items():
-                    summary_data.append({"Category": "Metadata", "Key": key, "Value": str(value)})
-            
-            # Add summary
-            if "summary" in data:
-                for key, value in data["summary"].items():
-                    summary_data.append({"Category": "Summary", "Key": key, "Value": str(value)})
-            
-            if summary_data:
-                summary_sheet = pd.DataFrame(summary_data)
-                summary_sheet.to_excel(writer, sheet_name="Summary", index=False)
-            
-            # Tables sheets
-            if "tables" in data:
-                for i, table in enumerate(data["tables"]):
-                    sheet_name = f"Table_{i+1}"
-                    if "type" in table and table["type"] != "unknown":
-                        sheet_name = table["type"]
-                    
-                    if "data" in table and table["data"]:
-                        # Convert to DataFrame
-                        if isinstance(table["data"], list):
-                            df = pd.DataFrame(table["data"])
-                            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            
-            # Entities sheet
-            if "entities" in data:
-                entities_data = []
-                
-                for entity_type, entities in data["entities"].items():
-                    if entities:
-                        # Check if entities have a uniform structure
-                        if isinstance(entities[0], dict):
-                            for entity in entities:
-                                entity_row = {"Entity Type": entity_type}
-                                entity_row.update(entity)
-                                entities_data.append(entity_row)
-                        else:
-                            # Simple list
-                            for entity in entities:
-                                entities_data.append({
-                                    "Entity Type": entity_type,
-                                    "Value": str(entity)
-                                })
-                
-                if entities_data:
-                    entities_df = pd.DataFrame(entities_data)
-                    entities_df.to_excel(writer, sheet_name="Entities", index=False)
-            
-            # Financial data sheet
-            if "financial_data" in data:
-                for key, value in data["financial_data"].items():
-                    if isinstance(value, dict) and "securities" in value:
-                        securities_df = pd.DataFrame(value["securities"])
-                        securities_df.to_excel(writer, sheet_name=f"{key.capitalize()}", index=False)
+        self._write_excel(data, filepath)
         
         return filepath
     
@@ -240,58 +257,211 @@ class DataExportAgent(BaseAgent):
         # Ensure filename has the correct extension
         if not filename.lower().endswith('.xml'):
             filename += '.xml'
-            
+        
         filepath = os.path.join(self.output_dir, filename)
         
-        # Create XML document
-        doc = xml.dom.minidom.getDOMImplementation().createDocument(None, "document", None)
-        root = doc.documentElement
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for _ in self._write_xml(data, f):
+                pass
         
-        # Convert data to XML
-        self._dict_to_xml(data, root, doc)
+        return filepath
+    
+    def _export_to_parquet(self, data: Dict[str, Any], filename: str) -> str:
+        """Export to Parquet format."""
+        # Ensure filename has the correct extension
+        if not filename.lower().endswith('.parquet'):
+            filename += '.parquet'
         
-        # Write to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(doc.toprettyxml(indent="  "))
+        filepath = os.path.join(self.output_dir, filename)
+        self._write_parquet(data, filepath)
         
         return filepath
     
-    def _dict_to_xml(self, data, parent_node, doc):
-        """Convert dictionary to XML recursively."""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, (dict, list)):
-                    # Create a new element
-                    child = doc.createElement(str(key))
-                    parent_node.appendChild(child)
-                    self._dict_to_xml(value, child, doc)
-                else:
-                    # Add element with content
-                    child = doc.createElement(str(key))
-                    parent_node.appendChild(child)
-                    text = doc.createTextNode(str(value))
-                    child.appendChild(text)
-        elif isinstance(data, list):
-            for item in data:
-                # Create an "item" element
-                child = doc.createElement("item")
-                parent_node.appendChild(child)
-                self._dict_to_xml(item, child, doc)
+    def _write_json(self, data: Dict[str, Any], f) -> Iterator[None]:
+        """Write JSON piece by piece; yields after each encoded piece."""
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+        for piece in encoder.iterencode(data):
+            f.write(piece)
+            yield
+    
+    def _write_csv(self, data: Dict[str, Any], f) -> Iterator[None]:
+        """Write the rows of the data as CSV; yields after each row."""
+        rows, headers = self._find_rows(data) or ([], None)
+        fields, rows = self._table_fields(rows, headers)
+        if not fields:
+            raise ValueError("Could not convert data to tabular format")
+        
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            yield
+    
+    def _write_xml(self, data: Dict[str, Any], f) -> Iterator[None]:
+        """Write data as XML element by element; yields after each container element."""
+        f.write('<?xml version="1.0" ?>\n')
+        yield from self._write_xml_element("document", data, f, 0)
+    
+    def _write_xml_element(self, name: str, value: Any, f, depth: int) -> Iterator[None]:
+        """Write one element: dictionaries become child elements and list items become item elements."""
+        indent = "  " * depth
+        if isinstance(value, dict):
+            children = ((str(key), child) for key, child in value.items())
+        elif isinstance(value, list):
+            children = (("item", item) for item in value)
         else:
-            # Add content directly
-            text = doc.createTextNode(str(data))
-            parent_node.appendChild(text)
+            f.write(f"{indent}<{name}>{escape(str(value))}</{name}>\n")
+            return
+        
+        if not value:
+            f.write(f"{indent}<{name}/>\n")
+            return
+        
+        f.write(f"{indent}<{name}>\n")
+        for child_name, child in children:
+            yield from self._write_xml_element(child_name, child, f, depth + 1)
+        f.write(f"{indent}</{name}>\n")
+        yield
     
-    def _convert_to_tabular(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Convert data to tabular format (list of dictionaries)."""
-        tabular_data = []
+    def _write_excel(self, data: Dict[str, Any], filepath: str):
+        """
+        Write data to an Excel workbook in write-only mode.
+        
+        Rows are appended to the sheets one at a time and flushed to disk, so
+        memory stays constant however long the tables are.
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Border, Font, PatternFill, Side
+        
+        workbook = Workbook(write_only=True)
+        sheet_names = set()
+        
+        # Formats
+        header_font = Font(bold=True)
+        header_fill = PatternFill(fill_type='solid', start_color='CCCCCC', end_color='CCCCCC')
+        header_border = Border(*[Side(style='thin')] * 4)
+        
+        def write_sheet(name: str, fields: List[Any], rows: Iterable[Dict[str, Any]]):
+            sheet = workbook.create_sheet(self._sheet_title(name, sheet_names))
+            header = []
+            for field in fields:
+                cell = WriteOnlyCell(sheet, value=self._cell_value(field))
+                cell.font, cell.fill, cell.border = header_font, header_fill, header_border
+                header.append(cell)
+            sheet.append(header)
+            for row in rows:
+                sheet.append([self._cell_value(row.get(field)) for field in fields])
+        
+        # Summary sheet
+        summary_data = []
+        
+        # Add metadata
+        if "metadata" in data:
+            for key, value in data["metadata"].items():
+                summary_data.append({"Category": "Metadata", "Key": key, "Value": str(value)})
+        
+        # Add summary
+        if "summary" in data:
+            for key, value in data["summary"].items():
+                summary_data.append({"Category": "Summary", "Key": key, "Value": str(value)})
         
+        if summary_data:
+            write_sheet("Summary", ["Category", "Key", "Value"], summary_data)
+        
+        # Tables sheets
+        if "tables" in data:
+            for i, table in enumerate(data["tables"]):
+                sheet_name = f"Table_{i+1}"
+                if "type" in table and table["type"] != "unknown":
+                    sheet_name = table["type"]
+                
+                if "data" in table and table["data"] and not isinstance(table["data"], dict):
+                    write_sheet(sheet_name, *self._table_fields(table["data"], table.get("headers")))
+        
+        # Entities sheet
+        if "entities" in data:
+            entity_fields = {"Entity Type": None}
+            for entities in data["entities"].values():
+                if entities and isinstance(entities[0], dict):
+                    for entity in entities:
+                        entity_fields.update(dict.fromkeys(entity))
+                elif entities:
+                    entity_fields["Value"] = None
+            
+            def entity_rows():
+                for entity_type, entities in data["entities"].items():
+                    if entities and isinstance(entities[0], dict):
+                        for entity in entities:
+                            yield dict(entity, **{"Entity Type": entity_type})
+                    elif entities:
+                        for entity in entities:
+                            yield {"Entity Type": entity_type, "Value": str(entity)}
+            
+            if len(entity_fields) > 1:
+                write_sheet("Entities", list(entity_fields), entity_rows())
+        
+        # Financial data sheet
+        if "financial_data" in data:
+            for key, value in data["financial_data"].items():
+                if isinstance(value, dict) and "securities" in value:
+                    write_sheet(key.capitalize(), *self._table_fields(value["securities"]))
+        
+        # Transactions sheet
+        if data.get("transactions"):
+            write_sheet("Transactions", *self._table_fields(data["transactions"]))
+        
+        if not sheet_names:
+            workbook.create_sheet("Summary")
+        workbook.save(filepath)
+    
+    def _write_parquet(self, data: Dict[str, Any], filepath: str):
+        """Write the rows of the data to a Parquet file, one row group per batch of rows."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow")
+        
+        rows, headers = self._find_rows(data) or ([], None)
+        fields, rows = self._table_fields(rows, headers)
+        if not fields:
+            raise ValueError("Could not convert data to tabular format")
+        
+        columns = [str(field) for field in fields]
+        rows = iter(rows)
+        writer = None
+        try:
+            while True:
+                batch = [
+                    {column: row.get(field) for column, field in zip(columns, fields)}
+                    for row in islice(rows, self.parquet_batch_size)
+                ]
+                if not batch:
+                    break
+                
+                # The schema is inferred from the first batch
+                table = pa.Table.from_pylist(batch, schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    def _find_rows(self, data: Dict[str, Any]) -> Optional[Tuple[Iterable[Any], Optional[List[Any]]]]:
+        """
+        Find the main table of the data, without copying its rows.
+        
+        Returns:
+            Tuple of the rows (dictionaries, or lists of cells) and the column
+            headers of lists given with the table, or None if there is no table
+        """
         # Try to find tabular data
         if "tables" in data:
             for table in data["tables"]:
                 if "data" in table and table["data"]:
-                    # If already in tabular format - return it
-                    return table["data"]
+                    return table["data"], table.get("headers")
         
         # Try to find financial data
         if "financial_data" in data:
@@ -299,14 +469,83 @@ class DataExportAgent(BaseAgent):
             
             # Check portfolio data
             if "portfolio" in financial_data and "securities" in financial_data["portfolio"]:
-                return financial_data["portfolio"]["securities"]
+                securities = financial_data["portfolio"]["securities"]
+                return (securities, None) if securities else None
         
         # Try to find entities
         if "entities" in data and "isin" in data["entities"]:
-            return data["entities"]["isin"]
+            return (data["entities"]["isin"], None) if data["entities"]["isin"] else None
+        
+        # Try to find transactions
+        if data.get("transactions"):
+            return data["transactions"], None
         
         # If no tabular data found
-        return tabular_data
+        return None
+    
+    def _table_fields(self, rows: Iterable[Any], headers: Optional[List[Any]] = None) -> Tuple[List[Any], Iterable[Dict[str, Any]]]:
+        """
+        Find the columns of rows.
+        
+        For a list of dictionaries these are the keys of all rows in order of
+        appearance. An iterator can only be read once, so its columns are those
+        of its first row.
+        
+        Rows that are lists of cells (as extracted from PDF and Excel tables)
+        are positional: their columns are the given headers, or the first row
+        when there are none, and they are returned as dictionaries.
+        
+        Args:
+            rows: Rows of the table
+            headers: Column headers of rows that are lists
+            
+        Returns:
+            Tuple of the columns and the rows
+        """
+        if isinstance(rows, (list, tuple)):
+            if rows and isinstance(rows[0], (list, tuple)):
+                return self._positional_fields(rows, headers, max(map(len, rows)))
+            return list(dict.fromkeys(chain.from_iterable(rows))), rows
+        
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return [], []
+        if isinstance(first, (list, tuple)):
+            return self._positional_fields(chain([first], rows), headers, len(first))
+        return list(first), chain([first], rows)
+    
+    def _positional_fields(self, rows: Iterable[List[Any]], headers: Optional[List[Any]], width: int) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+        """Name the columns of rows that are lists; empty and repeated names get numbered ones."""
+        rows = iter(rows)
+        if headers is None:
+            headers = next(rows, [])
+        
+        fields = []
+        for i in range(max(width, len(headers))):
+            name = headers[i] if i < len(headers) else None
+            name = "" if name is None or name != name else str(name).strip()  # None or NaN
+            if not name or name in fields:
+                name = f"{name or 'Column'}_{i + 1}"
+            fields.append(name)
+        
+        return fields, (dict(zip(fields, row)) for row in rows)
+    
+    def _sheet_title(self, name: str, used: set) -> str:
+        """Make a valid, unique Excel sheet title (at most 31 characters)."""
+        base = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet"
+        title, n = base, 1
+        while title.lower() in used:
+            n += 1
+            title = f"{base[:31 - len(str(n)) - 1]}_{n}"
+        used.add(title.lower())
+        return title
+    
+    def _cell_value(self, value: Any) -> Any:
+        """Convert a value to a type Excel cells can hold."""
+        if value is None or isinstance(value, (str, int, float, datetime, date)):
+            return value
+        return str(value)
     
     def export_portfolio_summary(self, document_data: Dict[str, Any], format_type: str, filename: Optional[str] = None) -> str:
         """
@@ -320,7 +559,16 @@ class DataExportAgent(BaseAgent):
         Returns:
             Path to the created file
         """
-        # Create portfolio summary data
+        portfolio_summary = self._build_portfolio_summary(document_data)
+        
+        # Export to the requested format
+        if not filename:
+            filename = f"portfolio_summary_{datetime.now().strftime('%Y%m%d')}"
+        
+        return self.export_data(portfolio_summary, format_type, filename)
+    
+    def _build_portfolio_summary(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the portfolio summary data of a document."""
         portfolio_summary = {
             "extraction_date": datetime.now().isoformat(),
             "document_id": document_data.get("document_id", ""),
@@ -348,11 +596,7 @@ class DataExportAgent(BaseAgent):
         elif "summary" in document_data and "total_portfolio_value" in document_data["summary"]:
             portfolio_summary["portfolio_summary"]["total_value"] = document_data["summary"]["total_portfolio_value"]
         
-        # Export to the requested format
-        if not filename:
-            filename = f"portfolio_summary_{datetime.now().strftime('%Y%m%d')}"
-        
-        return self.export_data(portfolio_summary, format_type, filename)
+        return portfolio_summary
     
     def export_isin_list(self, document_data: Dict[str, Any], format_type: str, filename: Optional[str] = None) -> str:
         """
@@ -366,7 +610,16 @@ class DataExportAgent(BaseAgent):
         Returns:
             Path to the created file
         """
-        # Create ISIN list data
+        isin_data = self._build_isin_list(document_data)
+        
+        # Export to the requested format
+        if not filename:
+            filename = f"isin_list_{datetime.now().strftime('%Y%m%d')}"
+        
+        return self.export_data(isin_data, format_type, filename)
+    
+    def _build_isin_list(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the ISIN list data of a document."""
         isin_data = {
             "extraction_date": datetime.now().isoformat(),
             "document_id": document_data.get("document_id", ""),
@@ -386,8 +639,5 @@ class DataExportAgent(BaseAgent):
                 for sec in securities if "isin" in sec
             ]
         
-        # Export to the requested format
-        if not filename:
-            filename = f"isin_list_{datetime.now().strftime('%Y%m%d')}"
-        
-        return self.export_data(isin_data, format_type, filename)
+        return isin_data
+        
\ No newline at end of file
@@ -1,6 +1,8 @@
 """
 Document Comparison Agent for comparing documents and identifying changes.
 """
+import re
+from itertools import chain, repeat
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -8,6 +10,10 @@ from typing import Dict, List, Any, Tuple, Optional
 import uuid
 from .base_agent import BaseAgent
 
+ROW_COLUMN = "__row__"
+NUMERIC_DTYPES = {"integer", "floating", "mixed-integer-float"}
+EXACT_FLOAT_LIMIT = 2 ** 53  # Larger integers are not exact as floats
+
 class DocumentComparisonAgent(BaseAgent):
     """Agent for comparing documents and identifying changes and developments."""
     
@@ -35,10 +41,30 @@ class DocumentComparisonAgent(BaseAgent):
             task: Task dictionary with the following keys:
                 - current_doc: Current document data
                 - previous_doc: Previous document data
+                - documents: Alternatively, a list of documents from oldest to newest
                 
         Returns:
             Dictionary with comparison results
         """
+        # Compare a series of documents
+        documents = task.get('documents')
+        if documents is not None:
+            if len(documents) < 2:
+                return {
+                    'status': 'error',
+                    'message': 'At least two documents are required for comparison'
+                }
+            try:
+                return {
+                    'status': 'success',
+                    'comparison_result': self.compare_document_series(documents)
+                }
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'message': f'Error comparing documents: {str(e)}'
+                }
+        
         # Get the required data
         current_doc = task.get('current_doc', {})
         previous_doc = task.get('previous_doc', {})
@@ -94,6 +120,37 @@ class DocumentComparisonAgent(BaseAgent):
         
         return comparison_result
     
+    def compare_document_series(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compare a series of documents, each with the one before it.
+        
+        Args:
+            documents: Documents from oldest to newest
+            
+        Returns:
+            Dictionary with the comparison of each consecutive pair and the
+            portfolio value of each document
+        """
+        comparisons = [
+            self.compare_documents(current_doc, previous_doc)
+            for previous_doc, current_doc in zip(documents, documents[1:])
+        ]
+        
+        return {
+            "comparison_id": str(uuid.uuid4()),
+            "comparison_date": datetime.now().isoformat(),
+            "document_ids": [document.get("document_id", "") for document in documents],
+            "total_values": [self._extract_portfolio_data(document).get("total_value") for document in documents],
+            "comparisons": comparisons,
+            "summary": {
+                "significant_changes": [
+                    dict(change, current_document_id=comparison["current_document_id"])
+                    for comparison in comparisons
+                    for change in comparison["summary"]["significant_changes"]
+                ]
+            }
+        }
+    
     def _compare_metadata(self, current_doc: Dict[str, Any], previous_doc: Dict[str, Any]) -> Dict[str, Any]:
         """Compare metadata between two documents."""
         comparison = {
@@ -158,58 +215,17 @@ class DocumentComparisonAgent(BaseAgent):
         
         # Compare securities
         if "securities" in current_portfolio and "securities" in previous_portfolio:
-            current_securities = {sec.get("isin", i): sec for i, sec in enumerate(current_portfolio["securities"])}
-            previous_securities = {sec.get("isin", i): sec for i, sec in enumerate(previous_portfolio["securities"])}
-            
-            # Find new securities
-            new_isin_codes = set(current_securities.keys()) - set(previous_securities.keys())
-            for isin in new_isin_codes:
-                if isinstance(isin, str):  # Only if it's actually an ISIN and not an index
-                    comparison["new_securities"].append(current_securities[isin])
+            diff = self._diff_rows(current_portfolio["securities"], previous_portfolio["securities"], key_field="isin")
             
-            # Find removed securities
-            removed_isin_codes = set(previous_securities.keys()) - set(current_securities.keys())
-            for isin in removed_isin_codes:
-                if isinstance(isin, str):  # Only if it's actually an ISIN and not an index
-                    comparison["removed_securities"].append(previous_securities[isin])
+            comparison["new_securities"] = [row for _, row in diff["added"]]
+            comparison["removed_securities"] = [row for _, row in diff["removed"]]
             
-            # Compare common securities
-            common_isin_codes = set(current_securities.keys()) & set(previous_securities.keys())
-            for isin in common_isin_codes:
-                if not isinstance(isin, str):  # Skip indices
-                    continue
-                    
-                current_sec = current_securities[isin]
-                previous_sec = previous_securities[isin]
-                
-                changes = {}
-                
-                # Compare all common fields
-                all_fields = set(current_sec.keys()) | set(previous_sec.keys())
-                for field in all_fields:
-                    current_value = current_sec.get(field)
-                    previous_value = previous_sec.get(field)
-                    
-                    # Check for change
-                    if current_value != previous_value:
-                        # Calculate percent change for numeric values
-                        percent_change = None
-                        if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) and previous_value != 0:
-                            percent_change = ((current_value - previous_value) / abs(previous_value)) * 100
-                        
-                        changes[field] = {
-                            "previous": previous_value,
-                            "current": current_value,
-                            "change": current_value - previous_value if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) else None,
-                            "percent_change": percent_change
-                        }
-                
-                if changes:
-                    comparison["security_changes"].append({
-                        "isin": isin,
-                        "security_name": current_sec.get("name", current_sec.get("security_name", "")),
-                        "changes": changes
-                    })
+            for isin, current_sec, changes in diff["modified"]:
+                comparison["security_changes"].append({
+                    "isin": isin,
+                    "security_name": current_sec.get("name", current_sec.get("security_name", "")),
+                    "changes": changes
+                })
         
         # Compare type distribution
         if "type_distribution" in current_portfolio and "type_distribution" in previous_portfolio:
@@ -249,49 +265,20 @@ class DocumentComparisonAgent(BaseAgent):
         if not current_entities or not previous_entities:
             return comparison
         
-        # Map by ISIN
-        current_isin_map = {entity.get("isin", ""): entity for entity in current_entities if "isin" in entity}
-        previous_isin_map = {entity.get("isin", ""): entity for entity in previous_entities if "isin" in entity}
-        
-        # Find new entities
-        new_isin_codes = set(current_isin_map.keys()) - set(previous_isin_map.keys())
-        for isin in new_isin_codes:
-            comparison["new_entities"].append(current_isin_map[isin])
-        
-        # Find removed entities
-        removed_isin_codes = set(previous_isin_map.keys()) - set(current_isin_map.keys())
-        for isin in removed_isin_codes:
-            comparison["removed_entities"].append(previous_isin_map[isin])
-        
-        # Compare common entities
-        common_isin_codes = set(current_isin_map.keys()) & set(previous_isin_map.keys())
-        for isin in common_isin_codes:
-            current_entity = current_isin_map[isin]
-            previous_entity = previous_isin_map[isin]
-            
-            changes = {}
-            
-            # Compare all common fields
-            all_fields = set(current_entity.keys()) | set(previous_entity.keys())
-            for field in all_fields:
-                if field == "isin":  # Skip the ISIN field itself
-                    continue
-                    
-                current_value = current_entity.get(field)
-                previous_value = previous_entity.get(field)
-                
-                # Check for change
-                if current_value != previous_value:
-                    changes[field] = {
-                        "previous": previous_value,
-                        "current": current_value
-                    }
-            
-            if changes:
-                comparison["changed_entities"].append({
-                    "isin": isin,
-                    "changes": changes
-                })
+        # Align by ISIN
+        diff = self._diff_rows(current_entities, previous_entities, key_field="isin", skip_key=True)
+        
+        comparison["new_entities"] = [row for _, row in diff["added"]]
+        comparison["removed_entities"] = [row for _, row in diff["removed"]]
+        
+        for isin, _, changes in diff["modified"]:
+            comparison["changed_entities"].append({
+                "isin": isin,
+                "changes": {
+                    field: {"previous": change["previous"], "current": change["current"]}
+                    for field, change in changes.items()
+                }
+            })
         
         return comparison
     
@@ -341,12 +328,16 @@ class DocumentComparisonAgent(BaseAgent):
                 current_data = current_table["data"]
                 previous_data = previous_table["data"]
                 
-                # Try to find a key field (e.g., ISIN)
+                # Try to find a key field (e.g., ISIN), then a name field to match rows on
                 key_field = self._find_key_field(current_data, previous_data)
+                fuzzy_field = None if key_field else self._find_fuzzy_key_field(current_data, previous_data)
                 
                 if key_field:
                     # Compare by key field
                     table_changes = self._compare_table_data_by_key(current_data, previous_data, key_field)
+                elif fuzzy_field:
+                    # Compare by normalized name
+                    table_changes = self._compare_table_data_by_key(current_data, previous_data, fuzzy_field, fuzzy=True)
                 else:
                     # Compare by position
                     table_changes = self._compare_table_data_by_position(current_data, previous_data)
@@ -469,74 +460,222 @@ class DocumentComparisonAgent(BaseAgent):
         
         return None
     
-    def _compare_table_data_by_key(self, current_data: List[Dict[str, Any]], previous_data: List[Dict[str, Any]], key_field: str) -> List[Dict[str, Any]]:
-        """Compare table data by key field."""
-        changes = []
+    def _find_fuzzy_key_field(self, current_data: List[Dict[str, Any]], previous_data: List[Dict[str, Any]]) -> Optional[str]:
+        """Find a name field whose normalized values identify the rows of both tables."""
+        if not current_data or not previous_data:
+            return None
         
-        # Map rows by key
-        current_map = {row.get(key_field, i): row for i, row in enumerate(current_data)}
-        previous_map = {row.get(key_field, i): row for i, row in enumerate(previous_data)}
-        
-        # Find new keys
-        new_keys = set(current_map.keys()) - set(previous_map.keys())
-        for key in new_keys:
-            if isinstance(key, str):  # Only if it's actually a key and not an index
-                changes.append({
-                    "key": key,
-                    "type": "added",
-                    "data": current_map[key]
-                })
+        common_fields = set(current_data[0].keys()) & set(previous_data[0].keys())
+        for field in sorted(common_fields, key=str):
+            field_lower = str(field).lower()
+            if not any(name in field_lower for name in ["name", "description", "security", "שם", "תיאור"]):
+                continue
+            
+            # The field has to be (nearly) unique in both tables to serve as a key
+            unique = True
+            for data in (current_data, previous_data):
+                keys = self._fuzzy_keys(pd.Series([row.get(field) for row in data], dtype=object)).dropna()
+                if len(keys) < 0.9 * len(data) or keys.nunique() < 0.9 * len(keys):
+                    unique = False
+                    break
+            if unique:
+                return field
         
-        # Find removed keys
-        removed_keys = set(previous_map.keys()) - set(current_map.keys())
-        for key in removed_keys:
-            if isinstance(key, str):  # Only if it's actually a key and not an index
-                changes.append({
-                    "key": key,
-                    "type": "removed",
-                    "data": previous_map[key]
-                })
+        return None
+    
+    def _fuzzy_keys(self, values: pd.Series) -> pd.Series:
+        """Normalize names for matching: lowercase, without punctuation and repeated spaces."""
+        keys = values.where(values.map(lambda value: isinstance(value, str)))
+        keys = keys.str.lower().str.replace(r"[^\w\s]", " ", regex=True).str.split().str.join(" ")
+        return keys.where(keys.str.len() > 0)
+    
+    def _rows_frame(self, rows: List[Dict[str, Any]], key_field: Optional[str], fuzzy: bool = False) -> pd.DataFrame:
+        """
+        Load rows into a typed frame indexed by key.
         
-        # Compare common rows
-        common_keys = set(current_map.keys()) & set(previous_map.keys())
-        for key in common_keys:
-            if not isinstance(key, str):  # Skip indices
-                continue
-                
-            current_row = current_map[key]
-            previous_row = previous_map[key]
+        Columns holding only integers become Int64 columns and columns holding
+        integers and floats become float columns, as long as every integer is
+        exact as a float; other columns keep their values as objects.
+        Rows are indexed by position without a key field. With one, rows whose
+        key is not a string are dropped and the last row of a duplicated key wins.
+        """
+        # Build the columns directly; pandas' generic loader for lists of dictionaries is much slower
+        fields = dict.fromkeys(chain.from_iterable(rows))
+        columns = {}
+        for field in fields:
+            values = list(map(dict.get, rows, repeat(field)))
+            column = pd.Series(values, dtype=object)
+            dtype = pd.api.types.infer_dtype(column, skipna=True)
+            if dtype in NUMERIC_DTYPES:
+                try:
+                    numbers = pd.array(values, dtype="Int64" if dtype == "integer" else "Float64")
+                except (OverflowError, TypeError):
+                    numbers = None  # integers beyond int64
+                if numbers is not None and (dtype == "floating" or not (abs(numbers) > EXACT_FLOAT_LIMIT).any()):
+                    column = pd.Series(numbers if dtype == "integer" else numbers.to_numpy(dtype=float, na_value=np.nan))
+            columns[field] = column
+        frame = pd.DataFrame(columns, index=pd.RangeIndex(len(rows)))
+        frame[ROW_COLUMN] = np.arange(len(rows))
+        if key_field is None:
+            return frame
+        
+        if key_field not in frame.columns:
+            return frame.iloc[0:0].set_index(pd.Index([], dtype=object))
+        
+        keys = frame[key_field]
+        if fuzzy:
+            keys = self._fuzzy_keys(keys)
+        if pd.api.types.infer_dtype(keys, skipna=False) != "string":
+            is_key = np.fromiter((isinstance(key, str) for key in keys.tolist()), dtype=bool, count=len(keys))
+            frame = frame[is_key]
+            keys = keys[is_key]
+        frame = frame.set_index(pd.Index(keys, dtype=object))
+        return frame[~frame.index.duplicated(keep="last")]
+    
+    def _diff_rows(
+        self,
+        current_data: List[Dict[str, Any]],
+        previous_data: List[Dict[str, Any]],
+        key_field: Optional[str] = None,
+        skip_key: bool = False,
+        fuzzy: bool = False
+    ) -> Dict[str, List[tuple]]:
+        """
+        Diff two lists of rows column by column.
+        
+        The rows are loaded into frames and aligned by key (an outer join on the
+        key field, or on position without one). Changed cells and the absolute
+        and percent changes of numeric cells are computed on whole arrays; only
+        the changed cells are turned back into dictionaries.
+        
+        Args:
+            current_data: Current rows
+            previous_data: Previous rows
+            key_field: Field identifying rows, or None to align by position
+            skip_key: Whether to leave the key field out of the field changes
+            fuzzy: Whether to match the key field on normalized values
             
-            field_changes = {}
+        Returns:
+            Dictionary with added and removed (key, row) pairs and modified
+            (key, current row, field changes) triples
+        """
+        current = self._rows_frame(current_data, key_field, fuzzy)
+        previous = self._rows_frame(previous_data, key_field, fuzzy)
+        
+        # Outer join of the keys: position of each current key among the previous keys
+        matches = previous.index.get_indexer(current.index)
+        added = matches < 0
+        removed = np.ones(len(previous), dtype=bool)
+        removed[matches[~added]] = False
+        
+        current_keys = current.index.tolist()
+        previous_keys = previous.index.tolist()
+        current_rows = current[ROW_COLUMN].tolist()
+        previous_rows = previous[ROW_COLUMN].tolist()
+        diff = {
+            "added": [(current_keys[i], current_data[current_rows[i]]) for i in np.nonzero(added)[0].tolist()],
+            "removed": [(previous_keys[i], previous_data[previous_rows[i]]) for i in np.nonzero(removed)[0].tolist()],
+            "modified": []
+        }
+        
+        common = np.nonzero(~added)[0]
+        if len(common) == 0:
+            return diff
+        
+        fields = current.columns.union(previous.columns, sort=False).drop(ROW_COLUMN)
+        if skip_key:
+            fields = fields.drop(key_field, errors="ignore")
+        
+        # Original rows of the common keys, aligned by position
+        previous_common = matches[common]
+        current_originals = [current_data[i] for i in current[ROW_COLUMN].to_numpy()[common].tolist()]
+        previous_originals = [previous_data[i] for i in previous[ROW_COLUMN].to_numpy()[previous_common].tolist()]
+        
+        # Compare column by column: numeric columns as integer or float arrays, others as objects
+        modified = {}
+        for field in fields.tolist():
+            current_numbers = self._numeric_column(current, field, common)
+            previous_numbers = self._numeric_column(previous, field, previous_common)
             
-            # Compare all common fields
-            all_fields = set(current_row.keys()) | set(previous_row.keys())
-            for field in all_fields:
-                if field == key_field:  # Skip the key field itself
-                    continue
-                    
-                current_value = current_row.get(field)
-                previous_value = previous_row.get(field)
+            if current_numbers is not None and previous_numbers is not None:
+                (current_numbers, current_missing), (previous_numbers, previous_missing) = current_numbers, previous_numbers
+                if current_numbers.dtype.kind != previous_numbers.dtype.kind:
+                    current_numbers = current_numbers.astype(float)
+                    previous_numbers = previous_numbers.astype(float)
                 
-                # Check for change
-                if current_value != previous_value:
-                    # Calculate percent change for numeric values
-                    percent_change = None
-                    if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) and previous_value != 0:
-                        percent_change = ((current_value - previous_value) / abs(previous_value)) * 100
-                    
-                    field_changes[field] = {
-                        "previous": previous_value,
-                        "current": current_value,
-                        "change": current_value - previous_value if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) else None,
-                        "percent_change": percent_change
-                    }
+                both_missing = current_missing & previous_missing
+                changed = ((current_numbers != previous_numbers) | (current_missing != previous_missing)) & ~both_missing
+                numeric = changed & ~current_missing & ~previous_missing
+                change = current_numbers - previous_numbers  # exact for Int64 columns
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    percent_change = change / np.abs(previous_numbers.astype(float)) * 100
+                change = np.where(numeric, change, None)
+                percent_change = np.where(numeric & (previous_numbers != 0), percent_change, None)
+            else:
+                current_values = self._object_column(current, field, common)
+                previous_values = self._object_column(previous, field, previous_common)
+                
+                changed = (current_values != previous_values).astype(bool)
+                change = np.full(len(common), None, dtype=object)
+                percent_change = np.full(len(common), None, dtype=object)
+                
+                # Mixed column: type each changed cell, with Python arithmetic on the values
+                for i in np.nonzero(changed)[0]:
+                    current_value, previous_value = current_values[i], previous_values[i]
+                    if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)):
+                        change[i] = current_value - previous_value
+                        if previous_value != 0:
+                            percent_change[i] = change[i] / abs(previous_value) * 100
             
-            if field_changes:
-                changes.append({
-                    "key": key,
-                    "type": "modified",
-                    "changes": field_changes
-                })
+            # Build the field changes of the changed cells only, with the original values
+            changed_rows = np.flatnonzero(changed)
+            if not len(changed_rows):
+                continue
+            change = change[changed_rows].tolist()
+            percent_change = percent_change[changed_rows].tolist()
+            for i, value_change, value_percent_change in zip(changed_rows.tolist(), change, percent_change):
+                field_changes = modified.get(i)
+                if field_changes is None:
+                    field_changes = modified[i] = {}
+                field_changes[field] = {
+                    "previous": previous_originals[i].get(field),
+                    "current": current_originals[i].get(field),
+                    "change": value_change,
+                    "percent_change": value_percent_change
+                }
+        
+        common = common.tolist()
+        diff["modified"] = [(current_keys[common[i]], current_originals[i], modified[i]) for i in sorted(modified)]
+        return diff
+    
+    def _numeric_column(self, frame: pd.DataFrame, field: str, positions: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Values and missing mask of a numeric column at positions, or None for other columns."""
+        if field not in frame.columns:
+            return None
+        column = frame[field]
+        if isinstance(column.dtype, pd.Int64Dtype):
+            values = column.array[positions]
+            return values.to_numpy(dtype=np.int64, na_value=0), values.isna()
+        if column.dtype.kind == "f":
+            values = column.to_numpy()[positions]
+            return values, np.isnan(values)
+        return None
+    
+    def _object_column(self, frame: pd.DataFrame, field: str, positions: np.ndarray) -> np.ndarray:
+        """Values of a column at positions as objects, with None for missing values."""
+        if field not in frame.columns:
+            return np.full(len(positions), None, dtype=object)
+        values = frame[field].to_numpy(dtype=object)[positions]
+        values[pd.isna(values)] = None
+        return values
+    
+    def _compare_table_data_by_key(self, current_data: List[Dict[str, Any]], previous_data: List[Dict[str, Any]], key_field: str, fuzzy: bool = False) -> List[Dict[str, Any]]:
+        """Compare table data by key field."""
+        diff = self._diff_rows(current_data, previous_data, key_field=key_field, skip_key=True, fuzzy=fuzzy)
+        
+        changes = [{"key": key, "type": "added", "data": row} for key, row in diff["added"]]
+        changes += [{"key": key, "type": "removed", "data": row} for key, row in diff["removed"]]
+        changes += [{"key": key, "type": "modified", "changes": field_changes} for key, _, field_changes in diff["modified"]]
         
         return changes
     
@@ -552,57 +691,11 @@ class DocumentComparisonAgent(BaseAgent):
                 "current_count": len(current_data)
             })
         
-        # Compare rows by position
-        for i in range(min(len(current_data), len(previous_data))):
-            current_row = current_data[i]
-            previous_row = previous_data[i]
-            
-            field_changes = {}
-            
-            # Compare all common fields
-            all_fields = set(current_row.keys()) | set(previous_row.keys())
-            for field in all_fields:
-                current_value = current_row.get(field)
-                previous_value = previous_row.get(field)
-                
-                # Check for change
-                if current_value != previous_value:
-                    # Calculate percent change for numeric values
-                    percent_change = None
-                    if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) and previous_value != 0:
-                        percent_change = ((current_value - previous_value) / abs(previous_value)) * 100
-                    
-                    field_changes[field] = {
-                        "previous": previous_value,
-                        "current": current_value,
-                        "change": current_value - previous_value if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)) else None,
-                        "percent_change": percent_change
-                    }
-            
-            if field_changes:
-                changes.append({
-                    "index": i,
-                    "type": "modified",
-                    "changes": field_changes
-                })
-        
-        # Handle new rows
-        if len(current_data) > len(previous_data):
-            for i in range(len(previous_data), len(current_data)):
-                changes.append({
-                    "index": i,
-                    "type": "added",
-                    "data": current_data[i]
-                })
+        diff = self._diff_rows(current_data, previous_data)
         
-        # Handle removed rows
-        if len(previous_data) > len(current_data):
-            for i in range(len(current_data), len(previous_data)):
-                changes.append({
-                    "index": i,
-                    "type": "removed",
-                    "data": previous_data[i]
-                })
+        changes += [{"index": int(i), "type": "modified", "changes": field_changes} for i, _, field_changes in diff["modified"]]
+        changes += [{"index": int(i), "type": "added", "data": row} for i, row in diff["added"]]
+        changes += [{"index": int(i), "type": "removed", "data": row} for i, row in diff["removed"]]
         
         return changes
     
@@ -674,7 +767,6 @@ class DocumentComparisonAgent(BaseAgent):
         
         if isinstance(value, str):
             # Remove non-numeric characters
-            import re
             clean_val = re.sub(r'[^\d.-]', '', value.replace(',', ''))
             
             try:
@@ -1,7 +1,14 @@
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
+from collections import OrderedDict
+import copy
+import hashlib
+import json
 import re
 
+# תווים שאינם חלק ממספר
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.-]')
+
 class DocumentMergeAgent:
     """סוכן לאיחוד מידע ממספר דוחות/מסמכים לכדי תמונה כוללת."""
 
@@ -15,6 +22,13 @@ class DocumentMergeAgent:
             "salary_statement"      # תלוש שכר
         ]
 
+        # מטמון של ייצוג מנורמל לכל מסמך, לפי גיבוב טבלאות המסמך
+        self.normalized_cache_size = 1024
+        self._normalized_cache = OrderedDict()
+
+        # גיבובים שחושבו במהלך קריאת האיחוד הנוכחית
+        self._merge_hashes = None
+
     def merge_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         איחוד מסמכים לכדי מסמך אחד.
@@ -41,17 +55,22 @@ class DocumentMergeAgent:
         }
 
         # איחוד לפי סוג מסמך
-        for doc_type, docs in documents_by_type.items():
-            if doc_type == "portfolio_statement":
-                merged_document["merged_data"]["portfolio"] = self._merge_portfolio_statements(docs)
-            elif doc_type == "balance_sheet":
-                merged_document["merged_data"]["balance_sheet"] = self._merge_balance_sheets(docs)
-            elif doc_type == "income_statement":
-                merged_document["merged_data"]["income_statement"] = self._merge_income_statements(docs)
-            elif doc_type == "bank_statement":
-                merged_document["merged_data"]["bank_statements"] = self._merge_bank_statements(docs)
-            elif doc_type == "salary_statement":
-                merged_document["merged_data"]["salary"] = self._merge_salary_statements(docs)
+        mergers = {
+            "portfolio_statement": ("portfolio", self._merge_portfolio_statements),
+            "balance_sheet": ("balance_sheet", self._merge_balance_sheets),
+            "income_statement": ("income_statement", self._merge_income_statements),
+            "bank_statement": ("bank_statements", self._merge_bank_statements),
+            "salary_statement": ("salary", self._merge_salary_statements)
+        }
+
+        self._merge_hashes = {}
+        try:
+            for doc_type, docs in documents_by_type.items():
+                if doc_type in mergers:
+                    key, merge = mergers[doc_type]
+                    merged_document["merged_data"][key] = merge(docs)
+        finally:
+            self._merge_hashes = None
 
         # יצירת סיכום מאוחד
         merged_document["summary"] = self._create_merged_summary(merged_document["merged_data"])
@@ -231,6 +250,54 @@ class DocumentMergeAgent:
 
         return False
 
+    def _document_hash(self, document: Dict[str, Any]) -> str:
+        """
+        גיבוב טבלאות המסמך לשימוש כמפתח מטמון.
+
+        הייצוגים המנורמלים נבנים מהטבלאות בלבד, ולכן רק הן מגובבות. בתוך קריאת
+        איחוד הגיבוב של כל מסמך מחושב פעם אחת.
+        """
+        tables = document.get("tables")
+        hashes = self._merge_hashes
+        if hashes is not None and id(tables) in hashes:
+            return hashes[id(tables)][1]
+
+        content = json.dumps(tables, sort_keys=True, default=str, ensure_ascii=False)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        if hashes is not None:
+            # שמירת הטבלאות עצמן כדי שהמזהה לא ישמש אובייקט אחר במהלך הקריאה
+            hashes[id(tables)] = (tables, digest)
+
+        return digest
+
+    def _get_normalized(self, document: Dict[str, Any], section: str,
+                        builder: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        קבלת ייצוג מנורמל של חלק ממסמך, מחושב פעם אחת לכל תוכן מסמך.
+
+        Args:
+            document: מסמך מעובד
+            section: שם החלק המנורמל
+            builder: פונקציה שבונה את הייצוג המנורמל מהמסמך
+
+        Returns:
+            עותק של הייצוג המנורמל, שמותר לשנות
+        """
+        key = (self._document_hash(document), section)
+
+        if key in self._normalized_cache:
+            self._normalized_cache.move_to_end(key)
+            return copy.deepcopy(self._normalized_cache[key])
+
+        value = builder(document)
+
+        self._normalized_cache[key] = value
+        if len(self._normalized_cache) > self.normalized_cache_size:
+            self._normalized_cache.popitem(last=False)
+
+        return copy.deepcopy(value)
+
     def _parse_numeric(self, value) -> Optional[float]:
         """המרת ערך למספר."""
         if isinstance(value, (int, float)):
@@ -238,7 +305,7 @@ class DocumentMergeAgent:
 
         if isinstance(value, str):
             # הסרת תווים לא מספריים
-            clean_val = re.sub(r'[^\d.-]', '', value.replace(',', ''))
+            clean_val = NON_NUMERIC_PATTERN.sub('', value.replace(',', ''))
 
             try:
                 return float(clean_val)
@@ -279,52 +346,16 @@ class DocumentMergeAgent:
 
         # אם לא נמצאו נתוני תיק, חיפוש בטבלאות
         elif not merged_portfolio["securities"] and "tables" in latest_doc:
-            for table in latest_doc["tables"]:
-                if table.get("type") in ["portfolio", "portfolio_statement"] and "data" in table:
-                    securities = []
+            securities = self._get_normalized(latest_doc, "portfolio_table", self._portfolio_securities_from_tables)
 
-                    for row in table["data"]:
-                        security = {}
-
-                        # המרת שורת טבלה לנייר ערך
-                        for key, value in row.items():
-                            key_lower = str(key).lower()
+            if securities:
+                merged_portfolio["securities"] = securities
 
-                            # שם נייר
-                            if "שם" in key_lower or "name" in key_lower or "תיאור" in key_lower:
-                                security["name"] = value
-                            # ISIN
-                            elif "isin" in key_lower:
-                                security["isin"] = value
-                            # סוג נייר
-                            elif "סוג" in key_lower or "type" in key_lower:
-                                security["type"] = value
-                            # כמות
-                            elif "כמות" in key_lower or "quantity" in key_lower:
-                                security["quantity"] = self._parse_numeric(value)
-                            # שער
-                            elif "שער" in key_lower or "מחיר" in key_lower or "price" in key_lower:
-                                security["price"] = self._parse_numeric(value)
-                            # שווי
-                            elif "שווי" in key_lower or "ערך" in key_lower or "value" in key_lower:
-                                security["value"] = self._parse_numeric(value)
-                            # תשואה
-                            elif "תשואה" in key_lower or "return" in key_lower:
-                                security["return"] = self._parse_numeric(value)
-
-                        if security:
-                            securities.append(security)
-
-                    if securities:
-                        merged_portfolio["securities"] = securities
-
-                        # חישוב סיכום
-                        total_value = sum(security.get("value", 0) for security in securities
-                                       if isinstance(security.get("value", 0), (int, float)))
-
-                        merged_portfolio["summary"]["total_value"] = total_value
+                # חישוב סיכום
+                total_value = sum(security.get("value", 0) for security in securities
+                               if isinstance(security.get("value", 0), (int, float)))
 
-                        break
+                merged_portfolio["summary"]["total_value"] = total_value
 
         # איחוד מידע מדוחות נוספים (למשל, ביצועים היסטוריים)
         if len(sorted_docs) > 1:
@@ -335,6 +366,49 @@ class DocumentMergeAgent:
 
         return merged_portfolio
 
+    def _portfolio_securities_from_tables(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """חילוץ ניירות ערך מטבלת התיק הראשונה במסמך שמכילה ניירות."""
+        for table in document.get("tables", []):
+            if table.get("type") in ["portfolio", "portfolio_statement"] and "data" in table:
+                securities = []
+
+                for row in table["data"]:
+                    security = {}
+
+                    # המרת שורת טבלה לנייר ערך
+                    for key, value in row.items():
+                        key_lower = str(key).lower()
+
+                        # שם נייר
+                        if "שם" in key_lower or "name" in key_lower or "תיאור" in key_lower:
+                            security["name"] = value
+                        # ISIN
+                        elif "isin" in key_lower:
+                            security["isin"] = value
+                        # סוג נייר
+                        elif "סוג" in key_lower or "type" in key_lower:
+                            security["type"] = value
+                        # כמות
+                        elif "כמות" in key_lower or "quantity" in key_lower:
+                            security["quantity"] = self._parse_numeric(value)
+                        # שער
+                        elif "שער" in key_lower or "מחיר" in key_lower or "price" in key_lower:
+                            security["price"] = self._parse_numeric(value)
+                        # שווי
+                        elif "שווי" in key_lower or "ערך" in key_lower or "value" in key_lower:
+                            security["value"] = self._parse_numeric(value)
+                        # תשואה
+                        elif "תשואה" in key_lower or "return" in key_lower:
+                            security["return"] = self._parse_numeric(value)
+
+                    if security:
+                        securities.append(security)
+
+                if securities:
+                    return securities
+
+        return []
+
     def _extract_historical_data(self, older_documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """חילוץ נתונים היסטוריים מדוחות ישנים יותר."""
         historical_data = {
@@ -420,16 +494,12 @@ class DocumentMergeAgent:
 
         # אם לא נמצאו נתוני מאזן, חיפוש בטבלאות
         elif "tables" in latest_doc:
-            for table in latest_doc["tables"]:
-                if table.get("type") in ["balance_sheet", "balance"] and "data" in table:
-                    balance_data = self._convert_table_to_balance_sheet(table["data"])
+            balance_data = self._get_normalized(latest_doc, "balance_sheet_table", self._balance_sheet_from_tables)
 
-                    if balance_data:
-                        for category in ["assets", "liabilities", "equity", "summary"]:
-                            if category in balance_data:
-                                merged_balance_sheet[category] = balance_data[category].copy()
-
-                        break
+            if balance_data:
+                for category in ["assets", "liabilities", "equity", "summary"]:
+                    if category in balance_data:
+                        merged_balance_sheet[category] = balance_data[category].copy()
 
         # איחוד מידע מדוחות נוספים (למשל, נתונים היסטוריים)
         if len(sorted_docs) > 1:
@@ -438,6 +508,14 @@ class DocumentMergeAgent:
 
         return merged_balance_sheet
 
+    def _balance_sheet_from_tables(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """המרת טבלת המאזן הראשונה במסמך לנתוני מאזן."""
+        for table in document.get("tables", []):
+            if table.get("type") in ["balance_sheet", "balance"] and "data" in table:
+                return self._convert_table_to_balance_sheet(table["data"])
+
+        return None
+
     def _convert_table_to_balance_sheet(self, table_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """המרת טבלה לנתוני מאזן."""
         balance_sheet = {
@@ -511,10 +589,7 @@ class DocumentMergeAgent:
             if "financial_data" in doc and "balance_sheet" in doc["financial_data"]:
                 balance_data = doc["financial_data"]["balance_sheet"]
             elif "tables" in doc:
-                for table in doc["tables"]:
-                    if table.get("type") in ["balance_sheet", "balance"] and "data" in table:
-                        balance_data = self._convert_table_to_balance_sheet(table["data"])
-                        break
+                balance_data = self._get_normalized(doc, "balance_sheet_table", self._balance_sheet_from_tables)
 
             if balance_data and "summary" in balance_data:
                 summary = balance_data["summary"]
@@ -581,16 +656,12 @@ class DocumentMergeAgent:
 
         # אם לא נמצאו נתוני רווח והפסד, חיפוש בטבלאות
         elif "tables" in latest_doc:
-            for table in latest_doc["tables"]:
-                if table.get("type") in ["income_statement", "profit_and_loss"] and "data" in table:
-                    income_data = self._convert_table_to_income_statement(table["data"])
-
-                    if income_data:
-                        for category in ["revenues", "expenses", "profits", "summary"]:
-                            if category in income_data:
-                                merged_income_statement[category] = income_data[category].copy()
+            income_data = self._get_normalized(latest_doc, "income_statement_table", self._income_statement_from_tables)
 
-                        break
+            if income_data:
+                for category in ["revenues", "expenses", "profits", "summary"]:
+                    if category in income_data:
+                        merged_income_statement[category] = income_data[category].copy()
 
         # איחוד מידע מדוחות נוספים (למשל, נתונים היסטוריים)
         if len(sorted_docs) > 1:
@@ -599,6 +670,14 @@ class DocumentMergeAgent:
 
         return merged_income_statement
 
+    def _income_statement_from_tables(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """המרת טבלת הרווח וההפסד הראשונה במסמך לנתוני דוח רווח והפסד."""
+        for table in document.get("tables", []):
+            if table.get("type") in ["income_statement", "profit_and_loss"] and "data" in table:
+                return self._convert_table_to_income_statement(table["data"])
+
+        return None
+
     def _convert_table_to_income_statement(self, table_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """המרת טבלה לנתוני דוח רווח והפסד."""
         income_statement = {
@@ -672,10 +751,7 @@ class DocumentMergeAgent:
             if "financial_data" in doc and "income_statement" in doc["financial_data"]:
                 income_data = doc["financial_data"]["income_statement"]
             elif "tables" in doc:
-                for table in doc["tables"]:
-                    if table.get("type") in ["income_statement", "profit_and_loss"] and "data" in table:
-                        income_data = self._convert_table_to_income_statement(table["data"])
-                        break
+                income_data = self._get_normalized(doc, "income_statement_table", self._income_statement_from_tables)
 
             if income_data and "summary" in income_data:
                 summary = income_data["summary"]
@@ -729,7 +805,7 @@ class DocumentMergeAgent:
         all_transactions = []
 
         for doc in sorted_docs:
-            transactions = self._extract_bank_transactions(doc)
+            transactions = self._get_normalized(doc, "bank_transactions", self._extract_bank_transactions)
             all_transactions.extend(transactions)
 
         # הסרת כפילויות לפי תאריך ותיאור
@@ -856,7 +932,7 @@ class DocumentMergeAgent:
 
         for doc in sorted_docs:
             # חילוץ נתוני שכר
-            salary_data = self._extract_salary_data_from_document(doc)
+            salary_data = self._get_normalized(doc, "salary", self._extract_salary_data_from_document)
 
             if salary_data:
                 # הוספת תאריך המסמך
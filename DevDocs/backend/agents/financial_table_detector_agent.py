@@ -5,11 +5,11 @@ import cv2
 import numpy as np
 import pandas as pd
 from PIL import Image
-import pytesseract
 import re
 from typing import Dict, Any, List, Optional, Union, Tuple
 from pathlib import Path
 from .base_agent import BaseAgent
+from ..document_understanding.ocr_cache import get_ocr_cache
 
 class FinancialTableDetectorAgent(BaseAgent):
     """Agent for identifying and extracting tables from financial documents."""
@@ -158,13 +158,19 @@ class FinancialTableDetectorAgent(BaseAgent):
 
         return final_regions
 
+    def _ocr_page(self, img):
+        """
+        OCR a page image once with word boxes.
+
+        Results are served from the OCR cache, so table detection and cell
+        extraction on the same page share a single Tesseract run.
+        """
+        return get_ocr_cache().image_to_data(img, lang=self.lang, config='--psm 6')
+
     def _detect_text_grid_pattern(self, img):
         """Detect patterns of text arranged in a grid (table)."""
         # Detect text regions
-        data = pytesseract.image_to_data(
-            img, lang=self.lang, config='--psm 6',
-            output_type=pytesseract.Output.DICT
-        )
+        data = self._ocr_page(img)
 
         # Analyze text layout to detect tabular pattern
         # If there are vertically aligned text lines, it's likely a table
@@ -350,23 +356,12 @@ class FinancialTableDetectorAgent(BaseAgent):
             current_row.sort(key=lambda c: c['x'])
             rows.append(current_row)
 
-        # Extract text from each cell
-        table_data = []
-        for row in rows:
-            row_data = []
-            for cell in row:
-                # Crop the cell from the image
-                cell_img = gray[cell['y']:cell['y']+cell['h'], cell['x']:cell['x']+cell['w']]
-
-                # Extract text from the cell
-                text = pytesseract.image_to_string(cell_img, lang=self.lang,
-                                                 config='--psm 6')
-
-                # Clean the text
-                clean_text = text.strip().replace('\n', ' ')
-                row_data.append(clean_text)
-
-            table_data.append(row_data)
+        # Assign the page's OCR words to cells instead of running OCR per cell
+        cell_texts = iter(self._assign_words_to_cells(
+            self._page_words_in_region(full_img, region),
+            [cell for row in rows for cell in row]
+        ))
+        table_data = [[next(cell_texts) for _ in row] for row in rows]
 
         # Create DataFrame from table data
         if table_data and all(len(row) == len(table_data[0]) for row in table_data):
@@ -383,14 +378,74 @@ class FinancialTableDetectorAgent(BaseAgent):
             'data': pd.DataFrame(table_data)
         }
 
+    def _page_words_in_region(self, img, region):
+        """Get the page's OCR words inside a region, in region coordinates."""
+        data = self._ocr_page(img)
+
+        left = np.asarray(data['left'], dtype=np.int64)
+        top = np.asarray(data['top'], dtype=np.int64)
+        width = np.asarray(data['width'], dtype=np.int64)
+        height = np.asarray(data['height'], dtype=np.int64)
+        has_text = np.array([bool(str(text).strip()) for text in data['text']], dtype=bool)
+
+        # Keep words whose centre lies in the region
+        center_x = left + width / 2
+        center_y = top + height / 2
+        keep = np.flatnonzero(
+            has_text
+            & (center_x >= region['x1']) & (center_x < region['x2'])
+            & (center_y >= region['y1']) & (center_y < region['y2'])
+        )
+
+        return {
+            'text': [data['text'][i] for i in keep],
+            'left': left[keep] - region['x1'],
+            'top': top[keep] - region['y1'],
+            'width': width[keep],
+            'height': height[keep]
+        }
+
+    @staticmethod
+    def _assign_words_to_cells(words, cells):
+        """
+        Assign OCR words to the smallest cell containing their centre.
+
+        Args:
+            words: Word arrays ('text', 'left', 'top', 'width', 'height')
+            cells: Cells with 'x', 'y', 'w' and 'h'
+
+        Returns:
+            Text of each cell, words in OCR reading order
+        """
+        if not cells or not words['text']:
+            return [''] * len(cells)
+
+        center_x = (words['left'] + words['width'] / 2)[:, None]
+        center_y = (words['top'] + words['height'] / 2)[:, None]
+
+        cell_x = np.array([cell['x'] for cell in cells])
+        cell_y = np.array([cell['y'] for cell in cells])
+        cell_w = np.array([cell['w'] for cell in cells])
+        cell_h = np.array([cell['h'] for cell in cells])
+
+        # words x cells containment matrix
+        inside = ((center_x >= cell_x) & (center_x < cell_x + cell_w)
+                  & (center_y >= cell_y) & (center_y < cell_y + cell_h))
+
+        # Contours are nested (the table outline contains every cell), prefer the innermost
+        owner = np.where(inside, cell_w * cell_h, np.inf).argmin(axis=1)
+        owner[~inside.any(axis=1)] = -1
+
+        cell_words = [[] for _ in cells]
+        for i in np.flatnonzero(owner >= 0):
+            cell_words[owner[i]].append(words['text'][i].strip())
+
+        return [' '.join(cell_text) for cell_text in cell_words]
+
     def _extract_with_ocr(self, table_img):
         """Alternative method to extract table data using OCR directly."""
         # Use OCR with table settings
-        custom_config = f'--psm 6 -l {self.lang}'
-        data = pytesseract.image_to_data(
-            table_img, config=custom_config,
-            output_type=pytesseract.Output.DICT
-        )
+        data = get_ocr_cache().image_to_data(table_img, lang=self.lang, config='--psm 6')
 
         # Organize text by rows
         rows = {}
@@ -1,16 +1,29 @@
 """
 Hebrew OCR Agent for accurate text recognition in Hebrew financial documents.
 """
-import pytesseract
 from PIL import Image
 import numpy as np
 import cv2
 import os
+import re
 import tempfile
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 from .base_agent import BaseAgent
+from .keyword_corrector import KeywordCorrector
 from ..utils.ocr_processor import OCRProcessor
+from ..document_understanding.ocr_cache import get_ocr_cache
+
+# Common OCR errors in Hebrew
+OCR_REPLACEMENTS = {
+    'ו1': 'ני',
+    '11"ס': 'ני"ע',
+    'סהי"נ': 'סה"כ',
+    'טר\'ח': 'מט"ח'
+}
+OCR_REPLACEMENT_PATTERN = re.compile('|'.join(
+    re.escape(old) for old in sorted(OCR_REPLACEMENTS, key=len, reverse=True)
+))
 
 class HebrewOCRAgent(BaseAgent):
     """Agent specialized in recognizing Hebrew text in financial documents."""
@@ -40,6 +53,7 @@ class HebrewOCRAgent(BaseAgent):
             "מניות", "אג\"ח", "תשואה", "דיבידנד", "עמלה", "מט\"ח",
             "יתרה", "הפקדה", "משיכה", "שער", "עו\"ש", "ני\"ע"
         ]
+        self.keyword_corrector = KeywordCorrector(self.financial_keywords)
 
     def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -174,8 +188,8 @@ class HebrewOCRAgent(BaseAgent):
         # Additional enhancement for financial documents
         enhanced = self._enhance_for_finance(img_array)
 
-        # Run OCR
-        text = pytesseract.image_to_string(enhanced, lang=self.lang, config=self.config)
+        # Run OCR, reusing results for previously seen pages
+        text = get_ocr_cache().image_to_string(enhanced, lang=self.lang, config=self.config)
 
         # Post-process the text
         processed_text = self._postprocess_text(text)
@@ -201,10 +215,7 @@ class HebrewOCRAgent(BaseAgent):
         enhanced = self._enhance_for_finance(img_array)
 
         # Get text data with position
-        data = pytesseract.image_to_data(
-            enhanced, lang=self.lang, config=self.config,
-            output_type=pytesseract.Output.DICT
-        )
+        data = get_ocr_cache().image_to_data(enhanced, lang=self.lang, config=self.config)
 
         # Create list of words with positions
         text_with_positions = []
@@ -263,45 +274,8 @@ class HebrewOCRAgent(BaseAgent):
         # Fix spacing
         processed = ' '.join(text.split())
 
-        # Handle specific replacements for common OCR errors in Hebrew
-        replacements = {
-            'ו1': 'ני',
-            '11"ס': 'ני"ע',
-            'סהי"נ': 'סה"כ',
-            'טר\'ח': 'מט"ח'
-        }
-
-        for old, new in replacements.items():
-            processed = processed.replace(old, new)
+        # Handle specific replacements for common OCR errors in Hebrew, in one pass
+        processed = OCR_REPLACEMENT_PATTERN.sub(lambda match: OCR_REPLACEMENTS[match.group(0)], processed)
 
         # Improve keyword recognition
-        for keyword in self.financial_keywords:
-            # Check if there's a similar but not identical word to a keyword
-            for word in processed.split():
-                if self._similar_words(word, keyword) and word != keyword:
-                    processed = processed.replace(word, keyword)
-
-        return processed
-
-    def _similar_words(self, word1, word2, threshold=0.7):
-        """
-        Check if two words are similar (Levenshtein distance).
-
-        Args:
-            word1: First word
-            word2: Second word
-            threshold: Similarity threshold
-
-        Returns:
-            True if words are similar, False otherwise
-        """
-        # For financial documents, we can use a simpler similarity check
-        # if there are many identical letters and similar length
-        if abs(len(word1) - len(word2)) > 2:
-            return False
-
-        # Calculate number of common characters
-        common_chars = set(word1) & set(word2)
-        similarity = len(common_chars) / max(len(set(word1)), len(set(word2)))
-
-        return similarity > threshold
+        return self.keyword_corrector.correct(processed)
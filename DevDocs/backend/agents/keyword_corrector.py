@@ -0,0 +1,135 @@
+"""
+Lexicon-based correction of OCR misreadings of known keywords.
+"""
+import re
+from typing import Optional, Iterable
+
+# Splits a token into leading punctuation, the word and trailing punctuation
+TOKEN_PATTERN = re.compile(r'^([(\[]*)(.*?)([.,:;)\]]*)$', re.DOTALL)
+
+class KeywordCorrector:
+    """
+    Corrects words that are within a small edit distance of a keyword lexicon.
+
+    Candidates are looked up in a SymSpell-style deletion index built once over
+    the lexicon: every keyword is indexed under all strings obtained by deleting
+    up to ``max_distance`` characters, so a word's candidates are found by
+    generating its own deletions instead of comparing it against every keyword.
+    Text is tokenized once, each distinct word is resolved once, and the text is
+    rebuilt in a single pass, so correction is linear in the size of the text and
+    corrected words are never re-corrected.
+    """
+
+    def __init__(self, keywords: Iterable[str], max_distance: int = 1, long_word_distance: int = 2,
+                 long_word_length: int = 6, min_length: int = 4):
+        """
+        Initialize the corrector.
+
+        Args:
+            keywords: Keyword lexicon; multi-word keywords are ignored since text is corrected word by word
+            max_distance: Maximum edit distance for corrections
+            long_word_distance: Maximum edit distance for keywords of at least long_word_length characters
+            long_word_length: Length from which long_word_distance applies
+            min_length: Keywords shorter than this are only matched exactly
+        """
+        self.keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword and ' ' not in keyword]
+        self.max_distance = max_distance
+        self.long_word_distance = long_word_distance
+        self.long_word_length = long_word_length
+        self.min_length = min_length
+
+        self._keyword_set = set(self.keywords)
+        self._rank = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self._deletes = {}  # deletion -> keywords
+        for keyword in self.keywords:
+            for deletion in self._deletions(keyword, self._distance_for(keyword)):
+                self._deletes.setdefault(deletion, []).append(keyword)
+
+        self._lookup_distance = max([self._distance_for(keyword) for keyword in self.keywords], default=0)
+        self._max_length = max([len(keyword) for keyword in self.keywords], default=0)
+
+    def _distance_for(self, keyword: str) -> int:
+        if len(keyword) < self.min_length:
+            return 0
+        return self.long_word_distance if len(keyword) >= self.long_word_length else self.max_distance
+
+    @staticmethod
+    def _deletions(word: str, distance: int) -> set:
+        """All strings obtained by deleting up to distance characters from word."""
+        deletions = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+            deletions |= frontier
+        return deletions
+
+    @staticmethod
+    def _edit_distance(word1: str, word2: str) -> int:
+        """Damerau-Levenshtein (optimal string alignment) distance."""
+        previous_previous = None
+        previous = list(range(len(word2) + 1))
+        for i in range(1, len(word1) + 1):
+            current = [i] + [0] * len(word2)
+            for j in range(1, len(word2) + 1):
+                cost = 0 if word1[i - 1] == word2[j - 1] else 1
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if (i > 1 and j > 1 and word1[i - 1] == word2[j - 2] and word1[i - 2] == word2[j - 1]):
+                    current[j] = min(current[j], previous_previous[j - 2] + 1)
+            previous_previous, previous = previous, current
+        return previous[-1]
+
+    def lookup(self, word: str) -> Optional[str]:
+        """
+        Find the closest keyword to a word.
+
+        Args:
+            word: Word to look up
+
+        Returns:
+            The keyword, or None if no keyword is close enough
+        """
+        if word in self._keyword_set:
+            return word
+        if len(word) > self._max_length + self._lookup_distance:
+            return None
+
+        candidates = set()
+        for deletion in self._deletions(word, self._lookup_distance):
+            candidates.update(self._deletes.get(deletion, ()))
+
+        best, best_distance = None, None
+        for keyword in candidates:
+            allowed = self._distance_for(keyword)
+            if abs(len(keyword) - len(word)) > allowed:
+                continue
+            distance = self._edit_distance(word, keyword)
+            if distance > allowed:
+                continue
+            # Prefer the closest keyword, then the earliest in the lexicon
+            if best is None or (distance, self._rank[keyword]) < (best_distance, self._rank[best]):
+                best, best_distance = keyword, distance
+
+        return best
+
+    def correct(self, text: str) -> str:
+        """
+        Replace words close to a keyword with the keyword.
+
+        Args:
+            text: Text with single spaces between words
+
+        Returns:
+            Corrected text
+        """
+        resolved = {}  # token -> corrected token
+        tokens = text.split(' ')
+        for i, token in enumerate(tokens):
+            corrected = resolved.get(token)
+            if corrected is None:
+                prefix, word, suffix = TOKEN_PATTERN.match(token).groups()
+                keyword = self.lookup(word) if word else None
+                corrected = f"{prefix}{keyword}{suffix}" if keyword else token
+                resolved[token] = corrected
+            tokens[i] = corrected
+
+        return ' '.join(tokens)
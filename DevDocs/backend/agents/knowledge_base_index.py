@@ -0,0 +1,195 @@
+"""
+In-process approximate nearest neighbour index for knowledge base embeddings.
+"""
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class KnowledgeBaseIndex:
+    """
+    Inverted-file (IVF) index over a NumPy matrix of unit-normalised embeddings.
+
+    Distances are cosine distances, matching pgvector's ``<=>`` operator. Small
+    collections are searched exactly; once the index holds ``min_train_size``
+    vectors it is partitioned with k-means and only the ``n_probe`` closest
+    partitions are scanned per query.
+    """
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8,
+                 min_train_size: int = 2048, kmeans_iterations: int = 10, seed: int = 42):
+        """
+        Initialize the index.
+
+        Args:
+            n_lists: Number of partitions (defaults to sqrt of the collection size)
+            n_probe: Number of partitions scanned per query
+            min_train_size: Collection size below which search is exact
+            kmeans_iterations: Lloyd iterations used when training partitions
+            seed: Random seed for centroid initialisation
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+
+        self.dim = None
+        self.matrix = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.entries = []
+        self._positions = {}
+
+        self.centroids = None
+        self.assignments = None
+        self.inverted_lists = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def max_id(self) -> int:
+        """Largest entry id held by the index, or 0 when empty."""
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    def clear(self):
+        """Remove every entry from the index."""
+        self.dim = None
+        self.matrix = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.entries = []
+        self._positions = {}
+        self._reset_partitions()
+
+    def _reset_partitions(self):
+        self.centroids = None
+        self.assignments = None
+        self.inverted_lists = []
+        self._trained_size = 0
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: List[int], vectors: Any, entries: List[Dict[str, Any]]):
+        """
+        Add entries to the index. Entries whose id is already indexed are replaced.
+
+        Args:
+            ids: Knowledge base row ids
+            vectors: Embeddings, one row per id
+            entries: Row payloads returned by search
+        """
+        if not len(ids):
+            return
+
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of dimension {self.dim}, got {vectors.shape[1]}")
+
+        new_ids, new_rows, new_entries = [], [], []
+        for row, (entry_id, entry) in enumerate(zip(ids, entries)):
+            position = self._positions.get(entry_id)
+            if position is not None:
+                # Replace in place; the partition is refreshed below if trained
+                self.matrix[position] = vectors[row]
+                self.entries[position] = entry
+                if self.centroids is not None:
+                    self._reassign([position])
+            else:
+                new_ids.append(entry_id)
+                new_rows.append(row)
+                new_entries.append(entry)
+
+        if not new_ids:
+            return
+
+        start = len(self.entries)
+        block = vectors[new_rows]
+        self.matrix = block if self.matrix is None else np.vstack([self.matrix, block])
+        self.ids = np.concatenate([self.ids, np.asarray(new_ids, dtype=np.int64)])
+        self.entries.extend(new_entries)
+        for offset, entry_id in enumerate(new_ids):
+            self._positions[entry_id] = start + offset
+
+        if len(self.entries) >= self.min_train_size and len(self.entries) >= 2 * self._trained_size:
+            self._train()
+        elif self.centroids is not None:
+            self._reassign(range(start, len(self.entries)))
+
+    def _train(self):
+        """Partition the collection with spherical k-means."""
+        size = len(self.entries)
+        n_lists = self.n_lists or max(1, int(np.sqrt(size)))
+        n_lists = min(n_lists, size)
+
+        rng = np.random.default_rng(self.seed)
+        centroids = self.matrix[rng.choice(size, n_lists, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self.matrix)
+            counts = np.bincount(assignments, minlength=n_lists)
+            # Keep the previous centroid for partitions that emptied out
+            filled = counts > 0
+            centroids[filled] = self._normalize(sums[filled])
+
+        self.centroids = centroids
+        self.assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+        self._rebuild_lists()
+        self._trained_size = size
+        logger.info(f"Trained knowledge base index: {size} vectors in {n_lists} partitions")
+
+    def _reassign(self, positions):
+        positions = np.fromiter(positions, dtype=np.int64)
+        nearest = np.argmax(self.matrix[positions] @ self.centroids.T, axis=1)
+        self.assignments = np.concatenate([
+            self.assignments, np.zeros(len(self.entries) - len(self.assignments), dtype=self.assignments.dtype)
+        ])
+        self.assignments[positions] = nearest
+        self._rebuild_lists()
+
+    def _rebuild_lists(self):
+        order = np.argsort(self.assignments, kind="stable")
+        bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+        self.inverted_lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+    def search(self, vector: Any, k: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the entries closest to a query embedding.
+
+        Args:
+            vector: Query embedding
+            k: Number of results to return
+
+        Returns:
+            List of (entry, cosine distance) tuples, closest first
+        """
+        if not self.entries or k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+
+        if self.centroids is None:
+            candidates = None
+            scores = self.matrix @ query
+        else:
+            probe = min(self.n_probe, len(self.centroids))
+            nearest_lists = np.argpartition(-(self.centroids @ query), probe - 1)[:probe]
+            candidates = np.concatenate([self.inverted_lists[i] for i in nearest_lists])
+            scores = self.matrix[candidates] @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        positions = top if candidates is None else candidates[top]
+
+        return [(self.entries[p], float(1.0 - scores[t])) for p, t in zip(positions, top)]
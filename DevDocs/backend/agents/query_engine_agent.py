@@ -2,19 +2,40 @@
 Query Engine Agent for answering natural language questions about financial documents.
 """
 import re
+import copy
 import json
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable
 from .base_agent import BaseAgent
 
+ISIN_PATTERN = re.compile(r'[A-Z]{2}[A-Z0-9]{9}\d')
+
+class _DocumentFacts:
+    """Facts derived from one document, computed on first use, and the answers given about it."""
+    
+    def __init__(self, document_data: Dict[str, Any], version: Optional[str] = None):
+        self.document_data = document_data
+        self.version = version
+        self.facts = {}
+        self.answers = OrderedDict()
+    
+    def get(self, name: str, compute: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Get a fact, computing it from the document the first time."""
+        if name not in self.facts:
+            self.facts[name] = compute(self.document_data)
+        return self.facts[name]
+
 class QueryEngineAgent(BaseAgent):
     """Agent for answering natural language questions about financial documents."""
     
     def __init__(
         self, 
         api_key: Optional[str] = None,
+        document_cache_size: int = 16,
+        answer_cache_size: int = 256,
         **kwargs
     ):
         """
@@ -22,6 +43,8 @@ class QueryEngineAgent(BaseAgent):
         
         Args:
             api_key: OpenRouter API key
+            document_cache_size: Number of documents whose derived facts and answers are kept
+            answer_cache_size: Number of answers kept per document
             **kwargs: Additional parameters for the base agent
         """
         super().__init__(name="Query Engine Agent")
@@ -59,6 +82,35 @@ class QueryEngineAgent(BaseAgent):
             "date": r'(\d{1,2})[/\.-](\d{1,2})[/\.-](\d{2,4})',
             "amount": r'([\d,.]+)(?:\s*(?:₪|שקל|ש"ח|ש״ח|דולר|\$|USD|ILS|EUR|יורו|€))'
         }
+        
+        self._compile_patterns()
+        
+        # Derived facts and answers of recently queried documents
+        self.document_cache_size = document_cache_size
+        self.answer_cache_size = answer_cache_size
+        self._documents = OrderedDict()
+    
+    def _compile_patterns(self):
+        """
+        Compile the query and entity patterns.
+        
+        The query patterns become a single router regex anchored at the start of
+        the query, with one lookahead alternative per query type in priority
+        order. The first alternative whose lookahead finds one of its patterns
+        anywhere in the query wins, which is the same type the patterns would
+        give when tried one by one.
+        """
+        alternatives = []
+        self._route_types = {}
+        for i, (q_type, patterns) in enumerate(self.query_patterns.items()):
+            group = f"route{i}"
+            self._route_types[group] = q_type
+            alternatives.append(f"(?P<{group}>(?=.*?(?:{'|'.join(f'(?:{pattern})' for pattern in patterns)})))")
+        self._intent_router = re.compile(f"^(?:{'|'.join(alternatives)})", re.DOTALL)
+        
+        self._entity_regexes = {
+            entity_type: re.compile(pattern) for entity_type, pattern in self.entity_patterns.items()
+        }
     
     def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -85,6 +137,16 @@ class QueryEngineAgent(BaseAgent):
         """
         Process a natural language query and return an answer from the document.
         
+        Answers are cached per document and per query with normalized
+        whitespace, so repeated questions in a chat session are answered from
+        the cache. Each call returns its own copy of the answer.
+        
+        A document with a document_id that is sent again as a new object reuses
+        the cache when it carries the same version (its version, content_hash
+        or processed_at field); without one, the new object gets fresh facts.
+        A document changed in place is not detected: callers that mutate a
+        document must send a copy or change its version.
+        
         Args:
             query: Natural language query
             document_data: Processed document data
@@ -92,12 +154,60 @@ class QueryEngineAgent(BaseAgent):
         Returns:
             Dictionary with the answer and relevant data
         """
+        facts = self._get_document_facts(document_data)
+        key = " ".join(query.split())
+        
+        answer = facts.answers.get(key)
+        if answer is None:
+            answer = self._answer_query(query, document_data)
+            facts.answers[key] = answer
+            if len(facts.answers) > self.answer_cache_size:
+                facts.answers.popitem(last=False)
+        else:
+            facts.answers.move_to_end(key)
+        
+        return copy.deepcopy(answer)
+    
+    def _get_document_version(self, document_data: Dict[str, Any]) -> Optional[str]:
+        """Get the content version a document carries, if any, without reading its content."""
+        for field in ("version", "content_hash", "processed_at"):
+            value = document_data.get(field)
+            if value:
+                return f"{field}:{value}"
+        return None
+    
+    def _get_document_facts(self, document_data: Dict[str, Any]) -> _DocumentFacts:
+        """Get the facts cache of a document."""
+        document_id = document_data.get("document_id")
+        key = ("id", document_id) if document_id else ("object", id(document_data))
+        
+        facts = self._documents.get(key)
+        if facts is not None and facts.document_data is document_data:
+            self._documents.move_to_end(key)
+            return facts
+        
+        # Documents sent again with the same id are usually new copies of the same data,
+        # but an updated document must not be answered from the facts of the old one
+        version = self._get_document_version(document_data) if document_id else None
+        if facts is not None and version is not None and facts.version == version:
+            self._documents.move_to_end(key)
+            facts.document_data = document_data
+            return facts
+        
+        facts = self._documents[key] = _DocumentFacts(document_data, version)
+        self._documents.move_to_end(key)
+        if len(self._documents) > self.document_cache_size:
+            self._documents.popitem(last=False)
+        return facts
+    
+    def _answer_query(self, query: str, document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a query without the answer cache."""
         # Identify the query type
         query_type, extracted_entities = self._identify_query_type(query)
         
         # Execute the query based on its type
         if query_type == "portfolio_value":
-            return self._get_portfolio_value(document_data)
+            return self._cached(document_data, self._get_portfolio_value)
         elif query_type == "securities_list":
             return self._get_securities_list(document_data, extracted_entities)
         elif query_type == "isin_info":
@@ -105,30 +215,30 @@ class QueryEngineAgent(BaseAgent):
         elif query_type == "return_info":
             return self._get_return_info(document_data, extracted_entities)
         elif query_type == "date_info":
-            return self._get_date_info(document_data)
+            return self._cached(document_data, self._get_date_info)
         else:
             # Try to answer a general query
             return self._general_query(query, document_data)
     
+    def _cached(self, document_data: Dict[str, Any], handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a handler that only depends on the document once per document."""
+        return self._get_document_facts(document_data).get(handler.__name__, handler)
+    
     def _identify_query_type(self, query: str) -> tuple:
         """Identify the query type and extract entities."""
         query_lower = query.lower()
         
         # Identify the query type
         identified_type = None
-        for q_type, patterns in self.query_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, query_lower)
-                if match:
-                    identified_type = q_type
-                    break
-            if identified_type:
-                break
+        match = self._intent_router.match(query_lower)
+        if match:
+            group = next(name for name, value in match.groupdict().items() if value is not None)
+            identified_type = self._route_types[group]
         
         # Extract entities from the query
         entities = {}
-        for entity_type, pattern in self.entity_patterns.items():
-            matches = re.findall(pattern, query)
+        for entity_type, regex in self._entity_regexes.items():
+            matches = regex.findall(query)
             if matches:
                 entities[entity_type] = matches
         
@@ -197,6 +307,33 @@ class QueryEngineAgent(BaseAgent):
             "data": {"securities": []}
         }
         
+        securities = self._get_document_facts(document_data).get("securities", self._collect_securities)
+        
+        # Filter by entities if any
+        filtered_securities = securities
+        if entities:
+            if "company" in entities:
+                company_names = entities["company"]
+                filtered_securities = [
+                    sec for sec in securities 
+                    if any(company.lower() in str(sec.get("name", "")).lower() for company in company_names)
+                ]
+        
+        if filtered_securities:
+            # Limit to a reasonable number of results
+            displayed_securities = filtered_securities[:10]
+            response["answer"] = f"Found {len(filtered_securities)} securities in the document."
+            
+            if len(filtered_securities) > 10:
+                response["answer"] += " (showing the first 10)"
+            
+            response["data"]["securities"] = displayed_securities
+            response["data"]["total_count"] = len(filtered_securities)
+        
+        return response
+    
+    def _collect_securities(self, document_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Collect the securities of a document."""
         securities = []
         
         # Search in financial data
@@ -226,28 +363,43 @@ class QueryEngineAgent(BaseAgent):
                         if security:
                             securities.append(security)
         
-        # Filter by entities if any
-        filtered_securities = securities
-        if entities:
-            if "company" in entities:
-                company_names = entities["company"]
-                filtered_securities = [
-                    sec for sec in securities 
-                    if any(company.lower() in str(sec.get("name", "")).lower() for company in company_names)
-                ]
+        return securities
+    
+    def _index_isins(self, document_data: Dict[str, Any]) -> Dict[str, tuple]:
+        """
+        Index the securities of a document by ISIN.
         
-        if filtered_securities:
-            # Limit to a reasonable number of results
-            displayed_securities = filtered_securities[:10]
-            response["answer"] = f"Found {len(filtered_securities)} securities in the document."
-            
-            if len(filtered_securities) > 10:
-                response["answer"] += f" (showing the first 10)"
-            
-            response["data"]["securities"] = displayed_securities
-            response["data"]["total_count"] = len(filtered_securities)
+        Returns:
+            Dictionary mapping each ISIN to the source it was found in and its
+            security, taking financial data first, then ISIN entities, then tables
+        """
+        index = {}
         
-        return response
+        # Index financial data
+        if "financial_data" in document_data:
+            financial_data = document_data["financial_data"]
+            if "portfolio" in financial_data and "securities" in financial_data["portfolio"]:
+                for security in financial_data["portfolio"]["securities"]:
+                    if security.get("isin"):
+                        index.setdefault(security["isin"], ("financial_data", security))
+        
+        # Index ISIN entities
+        if "entities" in document_data and "isin" in document_data["entities"]:
+            for isin_entity in document_data["entities"]["isin"]:
+                if isin_entity.get("isin"):
+                    index.setdefault(isin_entity["isin"], ("entities", isin_entity))
+        
+        # Index table rows by every ISIN their cells contain
+        if "tables" in document_data:
+            for table in document_data["tables"]:
+                if "data" in table:
+                    for row in table["data"]:
+                        for value in row.values():
+                            if isinstance(value, str):
+                                for isin in ISIN_PATTERN.findall(value):
+                                    index.setdefault(isin, ("tables", row))
+        
+        return index
     
     def _get_isin_info(self, document_data: Dict[str, Any], entities: Dict[str, List]) -> Dict[str, Any]:
         """Get information about a specific security by ISIN."""
@@ -266,34 +418,16 @@ class QueryEngineAgent(BaseAgent):
         if not isin_to_find:
             return response
         
-        # Search in financial data
-        if "financial_data" in document_data:
-            financial_data = document_data["financial_data"]
-            if "portfolio" in financial_data and "securities" in financial_data["portfolio"]:
-                for security in financial_data["portfolio"]["securities"]:
-                    if security.get("isin") == isin_to_find:
-                        response["answer"] = f"Found information about security with ISIN {isin_to_find}."
-                        response["data"]["security"] = security
-                        return response
-        
-        # Search in ISIN entities
-        if "entities" in document_data and "isin" in document_data["entities"]:
-            for isin_entity in document_data["entities"]["isin"]:
-                if isin_entity.get("isin") == isin_to_find:
-                    response["answer"] = f"Found basic information about security with ISIN {isin_to_find}."
-                    response["data"]["security"] = isin_entity
-                    return response
-        
-        # Search in tables
-        if "tables" in document_data:
-            for table in document_data["tables"]:
-                if "data" in table:
-                    for row in table["data"]:
-                        for key, value in row.items():
-                            if value == isin_to_find or (isinstance(value, str) and isin_to_find in value):
-                                response["answer"] = f"Found information about security with ISIN {isin_to_find} in a table."
-                                response["data"]["security"] = row
-                                return response
+        found = self._get_document_facts(document_data).get("isin_index", self._index_isins).get(isin_to_find)
+        if found:
+            source, security = found
+            if source == "financial_data":
+                response["answer"] = f"Found information about security with ISIN {isin_to_find}."
+            elif source == "entities":
+                response["answer"] = f"Found basic information about security with ISIN {isin_to_find}."
+            else:
+                response["answer"] = f"Found information about security with ISIN {isin_to_find} in a table."
+            response["data"]["security"] = security
         
         return response
     
@@ -305,6 +439,32 @@ class QueryEngineAgent(BaseAgent):
             "data": {"returns": []}
         }
         
+        returns_data = self._get_document_facts(document_data).get("returns", self._collect_returns)
+        
+        # Filter by entities if any
+        filtered_returns = returns_data
+        if entities:
+            if "company" in entities:
+                company_names = entities["company"]
+                filtered_returns = [
+                    ret for ret in returns_data 
+                    if any(company.lower() in str(ret.get("security", "")).lower() for company in company_names)
+                ]
+            elif "isin" in entities:
+                isin_codes = entities["isin"]
+                filtered_returns = [
+                    ret for ret in returns_data 
+                    if any(ret.get("isin", "") == isin for isin in isin_codes)
+                ]
+        
+        if filtered_returns:
+            response["answer"] = f"Found return information for {len(filtered_returns)} securities."
+            response["data"]["returns"] = filtered_returns
+        
+        return response
+    
+    def _collect_returns(self, document_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Collect the returns of the securities of a document."""
         returns_data = []
         
         # Search in financial data
@@ -357,27 +517,7 @@ class QueryEngineAgent(BaseAgent):
                                     "return": return_value
                                 })
         
-        # Filter by entities if any
-        filtered_returns = returns_data
-        if entities:
-            if "company" in entities:
-                company_names = entities["company"]
-                filtered_returns = [
-                    ret for ret in returns_data 
-                    if any(company.lower() in str(ret.get("security", "")).lower() for company in company_names)
-                ]
-            elif "isin" in entities:
-                isin_codes = entities["isin"]
-                filtered_returns = [
-                    ret for ret in returns_data 
-                    if any(ret.get("isin", "") == isin for isin in isin_codes)
-                ]
-        
-        if filtered_returns:
-            response["answer"] = f"Found return information for {len(filtered_returns)} securities."
-            response["data"]["returns"] = filtered_returns
-        
-        return response
+        return returns_data
     
     def _get_date_info(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get information about the document date."""
@@ -437,23 +577,23 @@ class QueryEngineAgent(BaseAgent):
         
         # If no specific topics were detected, return a general summary
         if not detected_topics:
-            return self._get_document_summary(document_data)
+            return self._cached(document_data, self._get_document_summary)
         
         # Handle based on the primary topic
         primary_topic = detected_topics[0]
         
         if primary_topic == "portfolio":
             # Return basic information about the portfolio
-            return self._get_portfolio_value(document_data)
+            return self._cached(document_data, self._get_portfolio_value)
         elif primary_topic == "balance":
             # Return information about the balance sheet
-            return self._get_balance_info(document_data)
+            return self._cached(document_data, self._get_balance_info)
         elif primary_topic == "income":
             # Return information about the income statement
-            return self._get_income_info(document_data)
+            return self._cached(document_data, self._get_income_info)
         elif primary_topic == "bank":
             # Return information about the bank account
-            return self._get_bank_info(document_data)
+            return self._cached(document_data, self._get_bank_info)
         
         return response
     
@@ -313,8 +313,20 @@ def setup_database():
             type VARCHAR(50) NOT NULL,
             content TEXT NOT NULL,
             metadata JSONB,
-            embedding vector(1536)
+            embedding vector(1536),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
         );
+        CREATE INDEX ON knowledge_base (updated_at);
+        
+        -- Lets agents detect rewritten rows without reading them
+        CREATE OR REPLACE FUNCTION knowledge_base_touch() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        CREATE TRIGGER knowledge_base_touch BEFORE UPDATE ON knowledge_base
+            FOR EACH ROW EXECUTE FUNCTION knowledge_base_touch();
         """)
         logger.info("Created knowledge_base table")
         
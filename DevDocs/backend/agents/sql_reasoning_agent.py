@@ -3,6 +3,7 @@ import json
 import logging
 import re
 import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
@@ -11,6 +12,11 @@ from psycopg2.extras import RealDictCursor
 import anthropic
 from pgvector.psycopg2 import register_vector
 
+try:
+    from .knowledge_base_index import KnowledgeBaseIndex
+except ImportError:
+    from knowledge_base_index import KnowledgeBaseIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,20 +27,36 @@ class SQLReasoningAgent:
     Uses Claude 3.7 Sonnet to generate and execute SQL queries based on natural language questions.
     """
     
-    def __init__(self, db_config: Dict[str, str], model: str = "claude-3-7-sonnet-20240620"):
+    def __init__(self, db_config: Dict[str, str], model: str = "claude-3-7-sonnet-20240620",
+                 embedding_cache_size: int = 1024, knowledge_base_sync_interval: float = 60.0):
         """
         Initialize the SQL Reasoning Agent.
         
         Args:
             db_config: Database configuration (host, port, dbname, user, password)
             model: The model to use for reasoning
+            embedding_cache_size: Number of question embeddings to keep in memory
+            knowledge_base_sync_interval: Seconds between incremental knowledge base syncs
         """
         self.db_config = db_config
         self.model = model
         self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
         self.conn = None
         self.cursor = None
-        self.knowledge_base = {}
+        self.knowledge_base = {
+            "table_metadata": [],
+            "sample_queries": [],
+            "rules": []
+        }
+        self.knowledge_base_index = KnowledgeBaseIndex()
+        self.knowledge_base_sync_interval = knowledge_base_sync_interval
+        self._last_sync = 0.0
+        self._synced_rows = 0
+        self._synced_max_id = 0
+        self._synced_updated_at = None
+        self._tracks_updates = False
+        self.embedding_cache_size = embedding_cache_size
+        self._embedding_cache = OrderedDict()
         
         # Connect to the database
         self._connect_to_db()
@@ -63,41 +85,130 @@ class SQLReasoningAgent:
             raise
     
     def _load_knowledge_base(self):
-        """Load the knowledge base from the database."""
+        """Load the knowledge base from the database and build the in-process index."""
+        self._tracks_updates = self._has_updated_at_column()
+        if not self._tracks_updates:
+            logger.warning("knowledge_base has no updated_at column, rewritten rows will not be detected")
+        
+        self._reset_knowledge_base()
+        self.sync_knowledge_base()
+        
+        logger.info(
+            f"Loaded knowledge base: {len(self.knowledge_base['table_metadata'])} tables, "
+            f"{len(self.knowledge_base['sample_queries'])} sample queries, "
+            f"{len(self.knowledge_base['rules'])} rules"
+        )
+    
+    def sync_knowledge_base(self) -> int:
+        """
+        Pull knowledge base rows added since the last sync into the index.
+        
+        Falls back to a full reload when synced rows have been deleted or
+        rewritten. Deletes change the count of the rows up to the synced id,
+        and rewrites move their updated_at past the synced watermark; both
+        are read from indexes, without scanning the rows.
+        
+        Returns:
+            Number of rows added to the index
+        """
         try:
-            # Load table metadata
-            self.cursor.execute("""
-                SELECT * FROM knowledge_base WHERE type = 'table_metadata'
-            """)
-            table_metadata = self.cursor.fetchall()
-            
-            # Load sample queries
-            self.cursor.execute("""
-                SELECT * FROM knowledge_base WHERE type = 'sample_query'
-            """)
-            sample_queries = self.cursor.fetchall()
-            
-            # Load rules
-            self.cursor.execute("""
-                SELECT * FROM knowledge_base WHERE type = 'rule'
-            """)
-            rules = self.cursor.fetchall()
+            total, rewritten = self._knowledge_base_state(self._synced_max_id, self._synced_updated_at)
+            if total != self._synced_rows or rewritten:
+                # Rows were deleted or rewritten, rebuild from scratch
+                self._reset_knowledge_base()
             
-            # Organize knowledge base
-            self.knowledge_base = {
-                "table_metadata": table_metadata,
-                "sample_queries": sample_queries,
-                "rules": rules
-            }
+            # Taken before fetching, so rows updated meanwhile are caught by the next sync
+            updated_at = self._knowledge_base_watermark()
+            rows = self._fetch_knowledge_base_rows(self._synced_max_id)
+            if rows:
+                max_id = max(self._synced_max_id, rows[-1]["id"])
+                self._synced_rows = self._knowledge_base_state(max_id, None)[0]
+                self._synced_max_id = max_id
+                self._synced_updated_at = updated_at
             
-            logger.info(f"Loaded knowledge base: {len(table_metadata)} tables, {len(sample_queries)} sample queries, {len(rules)} rules")
+            self._last_sync = time.monotonic()
         except Exception as e:
             logger.error(f"Error loading knowledge base: {e}")
-            self.knowledge_base = {
-                "table_metadata": [],
-                "sample_queries": [],
-                "rules": []
-            }
+            return 0
+        
+        groups = {
+            "table_metadata": "table_metadata",
+            "sample_query": "sample_queries",
+            "rule": "rules"
+        }
+        
+        ids, vectors, entries = [], [], []
+        for row in rows:
+            row = dict(row)
+            embedding = row.pop("embedding", None)
+            
+            group = groups.get(row["type"])
+            if group:
+                self.knowledge_base[group].append(row)
+            
+            if embedding is not None:
+                ids.append(row["id"])
+                vectors.append(np.asarray(embedding, dtype=np.float32))
+                entries.append(row)
+        
+        if ids:
+            self.knowledge_base_index.add(ids, np.vstack(vectors), entries)
+        
+        return len(rows)
+    
+    def _reset_knowledge_base(self):
+        """Drop the in-memory knowledge base and its index."""
+        self.knowledge_base_index.clear()
+        self.knowledge_base = {
+            "table_metadata": [],
+            "sample_queries": [],
+            "rules": []
+        }
+        self._synced_rows = 0
+        self._synced_max_id = 0
+        self._synced_updated_at = None
+    
+    def _has_updated_at_column(self) -> bool:
+        """Check whether the knowledge base rows record when they were last updated."""
+        self.cursor.execute("""
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'knowledge_base' AND column_name = 'updated_at'
+        """)
+        return self.cursor.fetchone() is not None
+    
+    def _knowledge_base_state(self, max_id: int, updated_at: Optional[Any]) -> Tuple[int, bool]:
+        """
+        Get the number of knowledge base rows with an id up to max_id, and whether
+        any of them was updated after updated_at.
+        """
+        if not self._tracks_updates or updated_at is None:
+            self.cursor.execute("SELECT count(*) AS total FROM knowledge_base WHERE id <= %s", (max_id,))
+            return self.cursor.fetchone()["total"], False
+        
+        self.cursor.execute("""
+            SELECT (SELECT count(*) FROM knowledge_base WHERE id <= %s) AS total,
+                   EXISTS (SELECT 1 FROM knowledge_base WHERE updated_at > %s AND id <= %s) AS rewritten
+        """, (max_id, updated_at, max_id))
+        row = self.cursor.fetchone()
+        return row["total"], row["rewritten"]
+    
+    def _knowledge_base_watermark(self) -> Optional[Any]:
+        """Get the time of the latest knowledge base update."""
+        if not self._tracks_updates:
+            return None
+        self.cursor.execute("SELECT max(updated_at) AS updated_at FROM knowledge_base")
+        return self.cursor.fetchone()["updated_at"]
+    
+    def _fetch_knowledge_base_rows(self, after_id: int) -> List[Dict[str, Any]]:
+        """Fetch knowledge base rows with an id greater than after_id."""
+        self.cursor.execute("""
+            SELECT id, type, content, metadata, embedding
+            FROM knowledge_base
+            WHERE id > %s
+            ORDER BY id
+        """, (after_id,))
+        return self.cursor.fetchall()
     
     def _search_knowledge_base(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -111,24 +222,48 @@ class SQLReasoningAgent:
             List of relevant knowledge base entries
         """
         try:
+            if time.monotonic() - self._last_sync > self.knowledge_base_sync_interval:
+                self.sync_knowledge_base()
+            
             # Get embedding for the query
-            embedding = self._get_embedding(query)
+            embedding = self._get_cached_embedding(query)
             
-            # Search for relevant entries
-            self.cursor.execute("""
-                SELECT id, type, content, metadata,
-                       embedding <=> %s AS distance
-                FROM knowledge_base
-                ORDER BY distance
-                LIMIT %s
-            """, (embedding, k))
+            # Search the in-process index instead of the database
+            results = []
+            for entry, distance in self.knowledge_base_index.search(embedding, k):
+                result = dict(entry)
+                result["distance"] = distance
+                results.append(result)
             
-            results = self.cursor.fetchall()
             return results
         except Exception as e:
             logger.error(f"Error searching knowledge base: {e}")
             return []
     
+    def _get_cached_embedding(self, text: str) -> List[float]:
+        """
+        Get embedding for text, reusing embeddings of previously seen questions.
+        
+        Args:
+            text: The text to embed
+            
+        Returns:
+            The embedding vector
+        """
+        key = " ".join(text.split()).lower()
+        embedding = self._embedding_cache.get(key)
+        
+        if embedding is not None:
+            self._embedding_cache.move_to_end(key)
+            return embedding
+        
+        embedding = self._get_embedding(text)
+        self._embedding_cache[key] = embedding
+        if len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+        
+        return embedding
+    
     def _get_embedding(self, text: str) -> List[float]:
         """
         Get embedding for text using Claude.
@@ -6,8 +6,9 @@ import io
 import base64
 import tempfile
 from typing import Dict, Any, List, Optional
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import cv2
 import numpy as np
@@ -603,6 +604,38 @@ async def export_data(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
 
+@router.post("/export/stream")
+async def stream_export(
+    request: DataExportRequest,
+    manager: AgentManager = Depends(get_agent_manager)
+):
+    """
+    Export data and stream the file as a chunked response.
+
+    Args:
+        request: Data export request
+        manager: Agent manager
+
+    Returns:
+        Streaming response with the exported file
+    """
+    agent = manager.get_agent("data_export")
+    try:
+        chunks = agent.iter_export(request.data, request.format_type, export_type=request.export_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    extension, media_type = DataExportAgent.EXPORT_FORMATS[request.format_type.lower()]
+    filename = request.filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if not filename.lower().endswith(extension):
+        filename += extension
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.post("/compare-documents")
 async def compare_documents(
     request: DocumentComparisonRequest,
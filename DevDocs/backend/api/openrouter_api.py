@@ -3,10 +3,11 @@ API endpoints for OpenRouter integration.
 """
 import os
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 
-from ..utils.openrouter_client import OpenRouterClient
+from ..utils.openrouter_client import OpenRouterClient, get_metrics
 
 router = APIRouter()
 
@@ -36,7 +37,7 @@ def get_openrouter_client():
         raise HTTPException(status_code=500, detail=f"Failed to initialize OpenRouter client: {str(e)}")
 
 @router.post("/chat")
-async def chat_completion(request: ChatRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
+def chat_completion(request: ChatRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
     """
     Chat completion endpoint.
     
@@ -59,8 +60,49 @@ async def chat_completion(request: ChatRequest, client: OpenRouterClient = Depen
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OpenRouter API request failed: {str(e)}")
 
+@router.post("/chat/stream")
+def stream_chat_completion(request: ChatRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
+    """
+    Streaming chat completion endpoint.
+    
+    Args:
+        request: Chat request
+        client: OpenRouter client
+        
+    Returns:
+        The generated text, sent as it is generated
+    """
+    stream = client.stream_chat_completion(
+        messages=request.messages,
+        model=request.model,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens
+    )
+    
+    try:
+        # Fail with a proper status if the request is rejected before the first token
+        first = next(stream, "")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OpenRouter API request failed: {str(e)}")
+    
+    def generate():
+        yield first
+        yield from stream
+    
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8")
+
+@router.get("/metrics")
+def api_metrics():
+    """
+    Get the latency and throughput of the OpenRouter requests of this process.
+    
+    Returns:
+        Metrics by model
+    """
+    return {"models": get_metrics()}
+
 @router.post("/completion")
-async def text_completion(request: CompletionRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
+def text_completion(request: CompletionRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
     """
     Text completion endpoint.
     
@@ -84,7 +126,7 @@ async def text_completion(request: CompletionRequest, client: OpenRouterClient =
         raise HTTPException(status_code=500, detail=f"OpenRouter API request failed: {str(e)}")
 
 @router.get("/status")
-async def api_status(client: OpenRouterClient = Depends(get_openrouter_client)):
+def api_status(client: OpenRouterClient = Depends(get_openrouter_client)):
     """
     Check the OpenRouter API status.
     
@@ -88,7 +88,7 @@ async def health_check():
     }
 
 @app.post("/api/chat")
-async def chat_completion(request: ChatRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
+def chat_completion(request: ChatRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
     """
     Chat completion endpoint.
 
@@ -112,7 +112,7 @@ async def chat_completion(request: ChatRequest, client: OpenRouterClient = Depen
         raise HTTPException(status_code=500, detail=f"OpenRouter API request failed: {str(e)}")
 
 @app.post("/api/completion")
-async def text_completion(request: CompletionRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
+def text_completion(request: CompletionRequest, client: OpenRouterClient = Depends(get_openrouter_client)):
     """
     Text completion endpoint.
 
@@ -0,0 +1,327 @@
+"""
+Bounded store for the artifacts produced by crawls.
+"""
+import os
+import json
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class CrawlArtifactStore:
+    """
+    Stores the consolidated files of each crawl and the markdown of its pages.
+
+    Page sections are streamed into the crawl's consolidated markdown file in
+    storage/markdown by appending, and the crawl's metadata is kept in memory for
+    the lifetime of the crawl instead of being re-read for every page. Individual
+    pages live in a byte-bounded in-memory tier; when it is full, the least
+    recently used pages are spilled to a hidden directory under storage/markdown
+    and served from there. Pages belong to their crawl and are released once the
+    crawl is no longer among the last ``keep_crawls`` finished crawls.
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None, max_memory_bytes: Optional[int] = None,
+                 keep_crawls: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            storage_dir: Directory of the consolidated files (default: CRAWL_STORAGE_DIR or storage/markdown)
+            max_memory_bytes: Size of the in-memory page tier (default: CRAWL_STORE_MAX_MB, 64 MB)
+            keep_crawls: Number of finished crawls whose pages are kept (default: CRAWL_STORE_KEEP_CRAWLS, 10)
+        """
+        self.storage_dir = storage_dir or os.environ.get("CRAWL_STORAGE_DIR", "storage/markdown")
+        self.max_memory_bytes = max_memory_bytes or int(os.environ.get("CRAWL_STORE_MAX_MB", "64")) * 1024 * 1024
+        self.keep_crawls = keep_crawls if keep_crawls is not None else int(os.environ.get("CRAWL_STORE_KEEP_CRAWLS", "10"))
+        self.spill_dir = os.path.join(self.storage_dir, ".spill")
+
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()  # page name -> artifact, least recently used first
+        self._memory_bytes = 0
+        self._spilled = {}  # page name -> artifact without content
+        self._crawls = {}  # crawl id -> crawl state
+        self._finished = []  # finished crawl ids, oldest first
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+    def markdown_path(self, crawl_id: str) -> str:
+        """Path of a crawl's consolidated markdown file."""
+        return os.path.join(self.storage_dir, f"{crawl_id}.md")
+
+    def metadata_path(self, crawl_id: str) -> str:
+        """Path of a crawl's consolidated metadata file."""
+        return os.path.join(self.storage_dir, f"{crawl_id}.json")
+
+    def _load_metadata(self, crawl_id: str, root_url: str) -> Dict[str, Any]:
+        metadata = {}
+        metadata_file = self.metadata_path(crawl_id)
+        if os.path.exists(metadata_file):
+            try:
+                with open(metadata_file, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except json.JSONDecodeError:
+                logger.error(f"Error reading metadata file: {metadata_file}")
+
+        if "pages" not in metadata:
+            metadata = {
+                "title": f"Documentation for {root_url}",
+                "root_url": root_url,
+                "timestamp": datetime.now().isoformat(),
+                "pages": [],
+                "is_consolidated": True
+            }
+        return metadata
+
+    def start_crawl(self, crawl_id: str, root_url: str) -> str:
+        """
+        Start a crawl, or join it if a crawl with the same id is running.
+
+        Args:
+            crawl_id: Crawl id, also the base name of the consolidated files
+            root_url: Root URL of the crawl
+
+        Returns:
+            Crawl id
+        """
+        with self._lock:
+            crawl = self._crawls.get(crawl_id)
+            if crawl is None:
+                crawl = self._crawls[crawl_id] = {
+                    "root_url": root_url,
+                    "metadata": self._load_metadata(crawl_id, root_url),
+                    "active": 0,
+                    "pages": set()
+                }
+            if crawl_id in self._finished:
+                self._finished.remove(crawl_id)
+            crawl["active"] += 1
+
+        logger.info(f"Started crawl {crawl_id} for {root_url}")
+        return crawl_id
+
+    def finish_crawl(self, crawl_id: str):
+        """
+        Finish a crawl, releasing the pages of crawls beyond the retention limit.
+
+        Args:
+            crawl_id: Crawl id
+        """
+        with self._lock:
+            crawl = self._crawls.get(crawl_id)
+            if crawl is None:
+                return
+            crawl["active"] -= 1
+            if crawl["active"] > 0:
+                return
+
+            self._finished.append(crawl_id)
+            while len(self._finished) > self.keep_crawls:
+                self.release_crawl(self._finished[0])
+
+        logger.info(f"Finished crawl {crawl_id}")
+
+    def release_crawl(self, crawl_id: str):
+        """
+        Drop the pages of a finished crawl. Consolidated files are kept.
+
+        Args:
+            crawl_id: Crawl id
+        """
+        with self._lock:
+            crawl = self._crawls.get(crawl_id)
+            if crawl is None or crawl["active"] > 0:
+                return
+
+            for name in crawl["pages"]:
+                self._discard(name)
+            del self._crawls[crawl_id]
+            if crawl_id in self._finished:
+                self._finished.remove(crawl_id)
+
+        shutil.rmtree(os.path.join(self.spill_dir, crawl_id), ignore_errors=True)
+        logger.info(f"Released pages of crawl {crawl_id}")
+
+    def append_page(self, crawl_id: str, url: str, result: Dict[str, Any], page_name: Optional[str] = None):
+        """
+        Append a crawled page to the crawl's consolidated files.
+
+        Args:
+            crawl_id: Crawl id
+            url: Page URL
+            result: Crawl4AI result of the page, with markdown, title and links
+            page_name: Name under which the page markdown is also kept in the page tier
+        """
+        title = result.get("title", "Untitled Page")
+        page_section = f"\n\n## {title}\nURL: {url}\n\n{result['markdown']}\n\n---\n\n"
+        links = result.get("links", {})
+
+        with self._lock:
+            crawl = self._crawls[crawl_id]
+            root_url = crawl["root_url"]
+            storage_file = self.markdown_path(crawl_id)
+
+            # If this is the first write to the file, add a header
+            if not os.path.exists(storage_file):
+                header = f"# Consolidated Documentation for {root_url}\n\n"
+                header += f"This file contains content from multiple pages related to {root_url}.\n"
+                header += "Each section represents a different page that was crawled.\n\n"
+                header += "---\n"
+                page_section = header + page_section
+
+            with open(storage_file, "a", encoding="utf-8") as f:
+                f.write(page_section)
+
+            metadata = crawl["metadata"]
+            metadata["pages"].append({
+                "title": result.get("title", "Untitled"),
+                "url": url,
+                "timestamp": datetime.now().isoformat(),
+                "internal_links": len(links.get("internal", [])),
+                "external_links": len(links.get("external", []))
+            })
+            metadata["last_updated"] = datetime.now().isoformat()
+
+            # Write to a temporary file first so readers never see a partial file
+            metadata_file = self.metadata_path(crawl_id)
+            with open(f"{metadata_file}.tmp", "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(f"{metadata_file}.tmp", metadata_file)
+
+            if page_name:
+                self.put(crawl_id, page_name, result["markdown"], {"title": title, "url": url})
+
+        logger.info(f"Appended {url} to consolidated markdown file: {storage_file}")
+
+    def put(self, crawl_id: str, name: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Keep a page in the page tier, spilling least recently used pages beyond the size bound.
+
+        Args:
+            crawl_id: Crawl the page belongs to
+            name: Page name
+            content: Page markdown
+            metadata: Page metadata
+        """
+        artifact = {
+            "name": name,
+            "crawl_id": crawl_id,
+            "content": content,
+            "metadata": metadata or {},
+            "timestamp": datetime.now().isoformat(),
+            "size": len(content.encode("utf-8")),
+            "word_count": len(content.split())
+        }
+
+        with self._lock:
+            self._discard(name)
+            self._memory[name] = artifact
+            self._memory_bytes += artifact["size"]
+            if crawl_id in self._crawls:
+                self._crawls[crawl_id]["pages"].add(name)
+            self._spill()
+
+    def _spill(self):
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            name, artifact = self._memory.popitem(last=False)
+            self._memory_bytes -= artifact["size"]
+
+            directory = os.path.join(self.spill_dir, artifact["crawl_id"])
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(artifact.pop("content"))
+
+            artifact["path"] = path
+            self._spilled[name] = artifact
+            logger.info(f"Spilled page {name} to {path}")
+
+    def _discard(self, name: str):
+        artifact = self._memory.pop(name, None)
+        if artifact is not None:
+            self._memory_bytes -= artifact["size"]
+            return
+
+        artifact = self._spilled.pop(name, None)
+        if artifact is not None:
+            try:
+                os.remove(artifact["path"])
+            except OSError:
+                pass
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a page.
+
+        Args:
+            name: Page name
+
+        Returns:
+            Page artifact with its content, or None if the page is not stored
+        """
+        with self._lock:
+            artifact = self._memory.get(name)
+            if artifact is not None:
+                self._memory.move_to_end(name)
+                return dict(artifact, in_memory=True)
+
+            artifact = self._spilled.get(name)
+            if artifact is None:
+                return None
+            path = artifact["path"]
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"Error reading spilled page {name}: {e}")
+            return None
+
+        return dict(artifact, content=content, in_memory=False)
+
+    def list_pages(self) -> List[Dict[str, Any]]:
+        """
+        List the stored pages, without their content.
+
+        Returns:
+            List of page artifacts
+        """
+        with self._lock:
+            pages = [dict(artifact, in_memory=True) for artifact in self._memory.values()]
+            pages += [dict(artifact, in_memory=False) for artifact in self._spilled.values()]
+
+        for page in pages:
+            page.pop("content", None)
+            page.pop("path", None)
+        return pages
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size of the page tiers."""
+        with self._lock:
+            return {
+                "memory_pages": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "spilled_pages": len(self._spilled),
+                "crawls": len(self._crawls)
+            }
+
+_crawl_store = None
+_crawl_store_lock = threading.Lock()
+
+def get_crawl_store() -> CrawlArtifactStore:
+    """
+    Get the process-wide crawl artifact store.
+
+    Returns:
+        CrawlArtifactStore
+    """
+    global _crawl_store
+    if _crawl_store is None:
+        with _crawl_store_lock:
+            if _crawl_store is None:
+                _crawl_store = CrawlArtifactStore()
+    return _crawl_store
@@ -5,11 +5,12 @@ import asyncio
 import os
 import requests
 import json
-from datetime import datetime
 from pydantic import BaseModel
 from urllib.parse import urljoin, urlparse, urlsplit
 import re
 
+from .crawl_store import get_crawl_store
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -111,165 +112,6 @@ def url_to_filename(url: str) -> str:
     logger.info(f"Converted URL '{url}' to filename '{filename}'")
     return filename
 
-# In-memory storage for individual files
-# Structure: {filename: {'content': str, 'metadata': dict, 'timestamp': str}}
-in_memory_files = {}
-
-class MemoryFileObject:
-    """A file-like object that stores content in memory instead of writing to disk"""
-    def __init__(self, filename):
-        self.filename = filename
-        self.buffer = []
-        
-    def write(self, content):
-        self.buffer.append(content)
-        return len(content)
-        
-    def close(self):
-        # Store the content in memory
-        in_memory_files[self.filename] = {
-            'content': ''.join(self.buffer),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # If this is a JSON file, parse and store metadata
-        if self.filename.endswith('.json'):
-            try:
-                metadata = json.loads(''.join(self.buffer))
-                in_memory_files[self.filename]['metadata'] = metadata
-            except Exception as e:
-                logger.error(f"Error parsing JSON for in-memory file {self.filename}: {str(e)}")
-        
-        logger.info(f"Stored file in memory: {self.filename}")
-                
-    def __enter__(self):
-        return self
-        
-    def __exit__(self, *args):
-        self.close()
-        
-    def read(self):
-        if self.filename in in_memory_files:
-            return in_memory_files[self.filename]['content']
-        return ""
-
-def is_individual_file(path: str) -> bool:
-    """
-    Determine if a file is an individual file (not a consolidated file).
-    Individual files are those that have UUIDs as filenames.
-    """
-    filename = os.path.basename(path)
-    # Check if the filename looks like a UUID
-    uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.(json|md)$'
-    return bool(re.match(uuid_pattern, filename))
-
-def is_consolidated_file(path: str) -> bool:
-    """
-    Determine if a file is a consolidated file.
-    Consolidated files are those in storage/markdown that are not UUIDs.
-    """
-    if "storage/markdown" not in path:
-        return False
-        
-    return not is_individual_file(path)
-
-# Create a function to redirect writes from crawl_results to storage/markdown
-def redirect_file_writes(path: str, content=None, task_id=None, root_url=None) -> str:
-    """
-    If a file is being written to crawl_results, redirect it to storage/markdown or memory.
-    Returns the original path for non-crawl_results files, or the redirected path for crawl_results files.
-    
-    If content and task_id are provided, this function will also handle consolidation.
-    """
-    if "crawl_results" in path:
-        # Extract the filename from the path
-        filename = os.path.basename(path)
-        
-        # Check if this is an individual file (UUID pattern)
-        if is_individual_file(path):
-            # Keep individual files in memory
-            logger.info(f"Keeping individual file in memory: {path}")
-            # We'll return the original path, but the redirecting_open function will intercept it
-            # and use a MemoryFileObject instead of writing to disk
-            return path
-        
-        # If this is a markdown file and we have content and task_id, we'll consolidate it
-        if filename.endswith('.md') and content and task_id:
-            # Generate a consistent file ID based on the root URL
-            if root_url:
-                file_id = url_to_filename(root_url)
-                logger.info(f"Using file ID {file_id} for consolidation based on root URL: {root_url}")
-            else:
-                # If no root_url is provided, use the task_id
-                file_id = task_id
-                logger.info(f"Using task ID {task_id} as file ID for consolidation (no root URL provided)")
-            
-            # Create the consolidated file path
-            consolidated_path = os.path.join("storage/markdown", f"{file_id}.md")
-            
-            # We'll return the consolidated path, but the actual consolidation will be handled elsewhere
-            logger.info(f"Redirecting markdown file from {path} to consolidated file: {consolidated_path}")
-            return consolidated_path
-        
-        # For other files, just redirect to storage/markdown
-        redirected_path = os.path.join("storage/markdown", filename)
-        logger.info(f"Redirecting file from {path} to {redirected_path}")
-        return redirected_path
-    
-    return path
-
-# Store task context for file redirection
-_task_context = {
-    'current_task_id': None,
-    'current_root_url': None,
-    'current_content': None
-}
-
-def set_task_context(task_id=None, root_url=None, content=None):
-    """Set the current task context for file redirection"""
-    if task_id:
-        _task_context['current_task_id'] = task_id
-    if root_url:
-        _task_context['current_root_url'] = root_url
-    if content:
-        _task_context['current_content'] = content
-    logger.info(f"Task context set: task_id={task_id}, root_url={root_url}, content_length={len(content) if content else 0}")
-
-# Monkey patch the open function to redirect writes from crawl_results to storage/markdown
-original_open = open
-def redirecting_open(file, mode='r', *args, **kwargs):
-    if 'w' in mode:
-        # Check if this is an individual file that should be kept in memory
-        if "crawl_results" in str(file) and is_individual_file(file):
-            logger.info(f"Using MemoryFileObject for {file}")
-            return MemoryFileObject(file)
-        
-        # For other files, redirect the path if needed
-        file = redirect_file_writes(
-            file,
-            content=_task_context.get('current_content'),
-            task_id=_task_context.get('current_task_id'),
-            root_url=_task_context.get('current_root_url')
-        )
-    elif 'r' in mode:
-        # For read operations, check if the file exists in memory first
-        if is_individual_file(file) and file in in_memory_files:
-            logger.info(f"Reading from in-memory file: {file}")
-            return MemoryFileObject(file)
-    
-    # For all other cases, use the original open function
-    return original_open(file, mode, *args, **kwargs)
-
-# Replace the built-in open function with our redirecting version
-import builtins
-builtins.open = redirecting_open
-
-# Ensure storage/markdown directory exists
-os.makedirs("storage/markdown", exist_ok=True)
-
-# Log that we're redirecting files
-logger.info("File redirection active: All files from crawl_results will be redirected to storage/markdown")
-
 async def discover_pages(
     url: str,
     max_depth: int = 3,
@@ -287,12 +129,28 @@ async def discover_pages(
     if all_internal_links is None:
         all_internal_links = set()
     
-    # If this is the root URL (first call), set root_url and generate a root_task_id
-    if root_url is None:
-        root_url = url
+    # If this is the root call, set root_url and generate a root_task_id, and keep the crawl open until discovery ends
+    if root_task_id is None:
+        root_url = root_url or url
         # Use a human-readable filename based on the URL
         root_task_id = url_to_filename(root_url)
         logger.info(f"Starting crawl for root URL: {root_url} with filename: {root_task_id}")
+        
+        crawl_store = get_crawl_store()
+        crawl_store.start_crawl(root_task_id, root_url)
+        try:
+            return await discover_pages(
+                url=url,
+                max_depth=max_depth,
+                current_depth=current_depth,
+                seen_urls=seen_urls,
+                parent_urls=parent_urls,
+                all_internal_links=all_internal_links,
+                root_url=root_url,
+                root_task_id=root_task_id
+            )
+        finally:
+            crawl_store.finish_crawl(root_task_id)
     
     # No longer replacing docs.crawl4ai.com URLs
     logger.info(f"Processing URL: {url} without replacement")
@@ -491,102 +349,10 @@ async def discover_pages(
                     result = status["result"]
                     logger.info(f"Task {task_id} completed successfully")
                     
-                    # Save the result to files
+                    # Save the result to the crawl's consolidated files
                     try:
-                        # Only create the storage directory for consolidated files
-                        # Disable creation of crawl_results directory to prevent individual files
-                        # os.makedirs("crawl_results", exist_ok=True)
-                        os.makedirs("storage/markdown", exist_ok=True)
-                        
-                        # Skip any code that might try to write to crawl_results
-                        if "crawl_results" in str(task_id):
-                            logger.warning(f"Attempted to create file in crawl_results directory - skipping")
-                            return [DiscoveredPage(
-                                url=url,
-                                title="Configuration Error",
-                                status="error",
-                                internalLinks=[]
-                            )]
-                        
-                        # Use the root_task_id for file naming to consolidate all related content
-                        file_id = root_task_id if root_task_id else task_id
-                        
-                        # We no longer save individual files, only consolidated ones
-                        logger.info(f"Skipping individual file creation for task {task_id} - using consolidated approach only")
-                        
-                        # Set the task context for file redirection
-                        set_task_context(
-                            task_id=task_id,
-                            root_url=root_url,
-                            content=result.get("markdown", "")
-                        )
-                        
-                        # Extract the markdown content if available
                         if "markdown" in result and result["markdown"]:
-                            # Log that we're using the consolidated approach
-                            logger.info(f"Using consolidated approach for task {task_id}")
-                            
-                            # For the consolidated file, we'll append to the root file
-                            storage_file = f"storage/markdown/{file_id}.md"
-                            
-                            # Create a section header for this page
-                            page_section = f"\n\n## {result.get('title', 'Untitled Page')}\n"
-                            page_section += f"URL: {url}\n\n"
-                            page_section += result["markdown"]
-                            page_section += "\n\n---\n\n"
-                            
-                            # If this is the first write to the file, add a header
-                            if not os.path.exists(storage_file):
-                                header = f"# Consolidated Documentation for {root_url}\n\n"
-                                header += f"This file contains content from multiple pages related to {root_url}.\n"
-                                header += f"Each section represents a different page that was crawled.\n\n"
-                                header += "---\n"
-                                page_section = header + page_section
-                            
-                            # Append to the file if it exists, otherwise create it
-                            mode = 'a' if os.path.exists(storage_file) else 'w'
-                            with open(storage_file, mode) as f:
-                                f.write(page_section)
-                            logger.info(f"{'Appended to' if mode == 'a' else 'Created'} consolidated markdown file: {storage_file}")
-                            
-                            # Update the metadata file with this page's info
-                            metadata_file = f"storage/markdown/{file_id}.json"
-                            
-                            # Read existing metadata if it exists
-                            metadata = {}
-                            if os.path.exists(metadata_file):
-                                try:
-                                    with open(metadata_file, 'r') as f:
-                                        metadata = json.load(f)
-                                except json.JSONDecodeError:
-                                    logger.error(f"Error reading metadata file: {metadata_file}")
-                            
-                            # Initialize or update the pages list
-                            if "pages" not in metadata:
-                                metadata = {
-                                    "title": f"Documentation for {root_url}",
-                                    "root_url": root_url,
-                                    "timestamp": datetime.now().isoformat(),
-                                    "pages": [],
-                                    "is_consolidated": True
-                                }
-                            
-                            # Add this page to the pages list
-                            metadata["pages"].append({
-                                "title": result.get("title", "Untitled"),
-                                "url": url,
-                                "timestamp": datetime.now().isoformat(),
-                                "internal_links": len(result.get("links", {}).get("internal", [])),
-                                "external_links": len(result.get("links", {}).get("external", []))
-                            })
-                            
-                            # Update the last_updated timestamp
-                            metadata["last_updated"] = datetime.now().isoformat()
-                            
-                            # Write the updated metadata
-                            with open(metadata_file, 'w') as f:
-                                json.dump(metadata, f, indent=2)
-                            logger.info(f"Updated metadata in {metadata_file}")
+                            get_crawl_store().append_page(root_task_id, url, result, page_name=f"{url_to_filename(url)}.md")
                         else:
                             logger.warning(f"No markdown content in result for task {task_id}")
                     except Exception as e:
@@ -749,7 +515,11 @@ async def crawl_pages(pages: List[DiscoveredPage], root_url: str = None) -> Craw
         else:
             # Fallback if no pages are provided
             root_task_id = None
-            logger.warning("No root URL or pages provided, will use individual task IDs")
+            logger.warning("No root URL or pages provided, nothing to crawl")
+    
+    crawl_store = get_crawl_store()
+    if root_task_id:
+        crawl_store.start_crawl(root_task_id, root_url)
     
     try:
         for page in pages:
@@ -812,97 +582,10 @@ async def crawl_pages(pages: List[DiscoveredPage], root_url: str = None) -> Craw
                             result = status["result"]
                             logger.info(f"Task {task_id} completed successfully")
                             
-                            # Save the result to files
+                            # Save the result to the crawl's consolidated files
                             try:
-                                # Only create the storage directory for consolidated files
-                                # Disable creation of crawl_results directory to prevent individual files
-                                # os.makedirs("crawl_results", exist_ok=True)
-                                os.makedirs("storage/markdown", exist_ok=True)
-                                
-                                # Skip any code that might try to write to crawl_results
-                                if "crawl_results" in str(task_id):
-                                    logger.warning(f"Attempted to create file in crawl_results directory - skipping")
-                                    return
-                                
-                                # Use the root_task_id for file naming to consolidate all related content
-                                file_id = root_task_id if root_task_id else task_id
-                                
-                                # We no longer save individual files, only consolidated ones
-                                logger.info(f"Skipping individual file creation for task {task_id} - using consolidated approach only")
-                                
-                                # Set the task context for file redirection
-                                set_task_context(
-                                    task_id=task_id,
-                                    root_url=root_url,
-                                    content=result.get("markdown", "")
-                                )
-                                
-                                # Extract the markdown content if available
                                 if "markdown" in result and result["markdown"]:
-                                    # Log that we're using the consolidated approach
-                                    logger.info(f"Using consolidated approach for task {task_id}")
-                                    
-                                    # For the consolidated file, we'll append to the root file
-                                    storage_file = f"storage/markdown/{file_id}.md"
-                                    
-                                    # Create a section header for this page
-                                    page_section = f"\n\n## {result.get('title', 'Untitled Page')}\n"
-                                    page_section += f"URL: {url}\n\n"
-                                    page_section += result["markdown"]
-                                    page_section += "\n\n---\n\n"
-                                    
-                                    # If this is the first write to the file, add a header
-                                    if not os.path.exists(storage_file):
-                                        header = f"# Consolidated Documentation for {root_url}\n\n"
-                                        header += f"This file contains content from multiple pages related to {root_url}.\n"
-                                        header += f"Each section represents a different page that was crawled.\n\n"
-                                        header += "---\n"
-                                        page_section = header + page_section
-                                    
-                                    # Append to the file if it exists, otherwise create it
-                                    mode = 'a' if os.path.exists(storage_file) else 'w'
-                                    with open(storage_file, mode) as f:
-                                        f.write(page_section)
-                                    logger.info(f"{'Appended to' if mode == 'a' else 'Created'} consolidated markdown file: {storage_file}")
-                                    
-                                    # Update the metadata file with this page's info
-                                    metadata_file = f"storage/markdown/{file_id}.json"
-                                    
-                                    # Read existing metadata if it exists
-                                    metadata = {}
-                                    if os.path.exists(metadata_file):
-                                        try:
-                                            with open(metadata_file, 'r') as f:
-                                                metadata = json.load(f)
-                                        except json.JSONDecodeError:
-                                            logger.error(f"Error reading metadata file: {metadata_file}")
-                                    
-                                    # Initialize or update the pages list
-                                    if "pages" not in metadata:
-                                        metadata = {
-                                            "title": f"Documentation for {root_url}",
-                                            "root_url": root_url,
-                                            "timestamp": datetime.now().isoformat(),
-                                            "pages": [],
-                                            "is_consolidated": True
-                                        }
-                                    
-                                    # Add this page to the pages list
-                                    metadata["pages"].append({
-                                        "title": result.get("title", "Untitled"),
-                                        "url": url,
-                                        "timestamp": datetime.now().isoformat(),
-                                        "internal_links": len(result.get("links", {}).get("internal", [])),
-                                        "external_links": len(result.get("links", {}).get("external", []))
-                                    })
-                                    
-                                    # Update the last_updated timestamp
-                                    metadata["last_updated"] = datetime.now().isoformat()
-                                    
-                                    # Write the updated metadata
-                                    with open(metadata_file, 'w') as f:
-                                        json.dump(metadata, f, indent=2)
-                                    logger.info(f"Updated metadata in {metadata_file}")
+                                    get_crawl_store().append_page(root_task_id, url, result, page_name=f"{url_to_filename(url)}.md")
                             except Exception as e:
                                 logger.error(f"Error saving result to files: {str(e)}")
                             
@@ -1006,4 +689,7 @@ async def crawl_pages(pages: List[DiscoveredPage], root_url: str = None) -> Craw
                 data_extracted="0 KB",
                 errors_encountered=1
             )
-        )
\ No newline at end of file
+        )
+    finally:
+        if root_task_id:
+            crawl_store.finish_crawl(root_task_id)
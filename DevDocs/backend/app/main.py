@@ -10,8 +10,8 @@ import requests
 import json
 import asyncio
 from pathlib import Path
-from datetime import datetime
-from .crawler import discover_pages, crawl_pages, DiscoveredPage, CrawlResult, url_to_filename, in_memory_files, is_individual_file
+from .crawler import discover_pages, crawl_pages, DiscoveredPage, CrawlResult, url_to_filename
+from .crawl_store import get_crawl_store
 
 # Configure logging
 logging.basicConfig(
@@ -241,87 +241,15 @@ async def test_crawl4ai(request: TestCrawl4AIRequest):
                         result = status["result"]
                         logger.info(f"Task {task_id} completed successfully")
                         
-                        # Save the result to a file if requested
-                        if request.save_results:
-                            # Ensure storage/markdown directory exists
-                            os.makedirs("storage/markdown", exist_ok=True)
-                            
-                            # Note: We're now redirecting files from crawl_results to storage/markdown
-                            logger.info(f"Files will be redirected from crawl_results to storage/markdown")
-                            
-                            # Generate a human-readable filename based on the URL
-                            url_hash = url_to_filename(request.url)
-                            
-                            # We no longer save individual files, only consolidated ones
-                            logger.info(f"Skipping individual file creation for task {task_id} - using consolidated approach only")
-                            
-                            # Extract the markdown content if available
-                            if "markdown" in result and result["markdown"]:
-                                # Log that we're skipping individual file creation
-                                logger.info(f"Skipping individual markdown file for task {task_id} - using consolidated approach only")
-                                
-                                # For the consolidated file, we'll append to the root file
-                                storage_file = f"storage/markdown/{url_hash}.md"
-                                os.makedirs("storage/markdown", exist_ok=True)
-                                
-                                # Create a section header for this page
-                                page_section = f"\n\n## {result.get('title', 'Untitled Page')}\n"
-                                page_section += f"URL: {request.url}\n\n"
-                                page_section += result["markdown"]
-                                page_section += "\n\n---\n\n"
-                                
-                                # If this is the first write to the file, add a header
-                                if not os.path.exists(storage_file):
-                                    header = f"# Consolidated Documentation for {request.url}\n\n"
-                                    header += f"This file contains content from multiple pages related to {request.url}.\n"
-                                    header += f"Each section represents a different page that was crawled.\n\n"
-                                    header += "---\n"
-                                    page_section = header + page_section
-                                
-                                # Append to the file if it exists, otherwise create it
-                                mode = 'a' if os.path.exists(storage_file) else 'w'
-                                with open(storage_file, mode) as f:
-                                    f.write(page_section)
-                                logger.info(f"{'Appended to' if mode == 'a' else 'Created'} consolidated markdown file: {storage_file}")
-                                
-                                # Update the metadata file with this page's info
-                                metadata_file = f"storage/markdown/{url_hash}.json"
-                                
-                                # Read existing metadata if it exists
-                                metadata = {}
-                                if os.path.exists(metadata_file):
-                                    try:
-                                        with open(metadata_file, 'r') as f:
-                                            metadata = json.load(f)
-                                    except json.JSONDecodeError:
-                                        logger.error(f"Error reading metadata file: {metadata_file}")
-                                
-                                # Initialize or update the pages list
-                                if "pages" not in metadata:
-                                    metadata = {
-                                        "title": f"Documentation for {request.url}",
-                                        "root_url": request.url,
-                                        "timestamp": datetime.now().isoformat(),
-                                        "pages": [],
-                                        "is_consolidated": True
-                                    }
-                                
-                                # Add this page to the pages list
-                                metadata["pages"].append({
-                                    "title": result.get("title", "Untitled"),
-                                    "url": request.url,
-                                    "timestamp": datetime.now().isoformat(),
-                                    "internal_links": len(result.get("links", {}).get("internal", [])),
-                                    "external_links": len(result.get("links", {}).get("external", []))
-                                })
-                                
-                                # Update the last_updated timestamp
-                                metadata["last_updated"] = datetime.now().isoformat()
-                                
-                                # Write the updated metadata
-                                with open(metadata_file, 'w') as f:
-                                    json.dump(metadata, f, indent=2)
-                                logger.info(f"Updated metadata in {metadata_file}")
+                        # Save the result to the consolidated files if requested
+                        url_hash = url_to_filename(request.url)
+                        if request.save_results and "markdown" in result and result["markdown"]:
+                            crawl_store = get_crawl_store()
+                            crawl_store.start_crawl(url_hash, request.url)
+                            try:
+                                crawl_store.append_page(url_hash, request.url, result)
+                            finally:
+                                crawl_store.finish_crawl(url_hash)
                         
                         return {
                             "success": True,
@@ -380,39 +308,28 @@ async def test_crawl4ai(request: TestCrawl4AIRequest):
 
 @app.get("/api/memory-files")
 async def list_memory_files():
-    """List all files stored in memory"""
+    """List all crawled pages kept by the crawl artifact store"""
     try:
         logger.info("Listing in-memory files")
         
-        # Convert the in-memory files to a list of file details
+        # Convert the stored pages to a list of file details
         file_details = []
-        for filename, file_data in in_memory_files.items():
-            # Extract the file ID (without extension)
-            file_id = os.path.basename(filename)
-            if file_id.endswith('.md'):
-                file_id = file_id[:-3]
-            elif file_id.endswith('.json'):
-                file_id = file_id[:-5]
-                
-            # Get the content and metadata
-            content = file_data.get('content', '')
-            metadata = file_data.get('metadata', {})
-            timestamp = file_data.get('timestamp', datetime.now().isoformat())
+        for page in get_crawl_store().list_pages():
+            filename = page['name']
             
-            # Check if this is a JSON file
-            is_json = filename.endswith('.json')
+            # Extract the file ID (without extension)
+            file_id = filename[:-3] if filename.endswith('.md') else filename
             
-            # Add the file details
             file_details.append({
                 'name': file_id,
                 'path': filename,
-                'timestamp': timestamp,
-                'size': len(content),
-                'wordCount': len(content.split()) if not is_json else 0,
-                'charCount': len(content),
+                'timestamp': page['timestamp'],
+                'size': page['size'],
+                'wordCount': page['word_count'],
+                'charCount': page['size'],
                 'isInMemory': True,
-                'isJson': is_json,
-                'metadata': metadata
+                'isJson': False,
+                'metadata': page['metadata']
             })
         
         logger.info(f"Found {len(file_details)} in-memory files")
@@ -430,20 +347,19 @@ async def list_memory_files():
 
 @app.get("/api/memory-files/{file_id}")
 async def get_memory_file(file_id: str):
-    """Get the content of a file stored in memory"""
+    """Get the content of a crawled page kept by the crawl artifact store"""
     try:
         logger.info(f"Retrieving in-memory file: {file_id}")
         
-        # Check if the file exists in memory
-        for filename, file_data in in_memory_files.items():
-            if filename.endswith(file_id) or os.path.basename(filename).startswith(file_id):
-                content = file_data.get('content', '')
-                logger.info(f"Found in-memory file: {filename}")
-                return {
-                    'success': True,
-                    'content': content,
-                    'metadata': file_data.get('metadata', {})
-                }
+        crawl_store = get_crawl_store()
+        page = crawl_store.get(file_id) or crawl_store.get(f"{file_id}.md")
+        if page is not None:
+            logger.info(f"Found in-memory file: {page['name']}")
+            return {
+                'success': True,
+                'content': page['content'],
+                'metadata': page['metadata']
+            }
         
         # If we get here, the file wasn't found
         logger.warning(f"In-memory file not found: {file_id}")
@@ -21,6 +21,11 @@ except ImportError:
     HAS_ADVANCED_PROCESSING = False
     logging.warning("Advanced document processing libraries not available. Some features will be limited.")
 
+try:
+    from document_understanding.ocr_cache import get_ocr_cache
+except ImportError:
+    get_ocr_cache = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -257,7 +262,10 @@ class DocumentProcessor:
                                 page = doc.load_page(page_num)
                                 pix = page.get_pixmap()
                                 img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                                ocr_text += pytesseract.image_to_string(img) + "\n\n"
+                                if get_ocr_cache is not None:
+                                    ocr_text += get_ocr_cache().image_to_string(img) + "\n\n"
+                                else:
+                                    ocr_text += pytesseract.image_to_string(img) + "\n\n"
 
                             # Only use OCR text if it's longer than the extracted text
                             if len(ocr_text.strip()) > len(full_text.strip()):
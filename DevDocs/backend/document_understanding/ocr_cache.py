@@ -0,0 +1,342 @@
+"""
+Content-addressed on-disk cache of Tesseract results, shared by the OCR front-ends.
+"""
+import os
+import time
+import zlib
+import struct
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+import pytesseract
+
+from .ocr_engine import get_ocr_engine
+
+logger = logging.getLogger(__name__)
+
+# Part of every key; bumped when the content of cached results changes, so older entries are not served
+CACHE_FORMAT = 2
+
+# Integer columns of pytesseract's image_to_data output, in storage order
+DATA_INT_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                    "left", "top", "width", "height"]
+
+class OCRCache:
+    """
+    Size-bounded LRU cache of OCR output keyed by the page bitmap and OCR settings.
+
+    Keys are hashes of the exact pixels passed to Tesseract together with the
+    language, config and Tesseract version, so re-uploads, re-runs and identical
+    boilerplate pages across statements are served without running OCR. Entries
+    live in a SQLite database, which makes the cache safe to share between
+    processes; word boxes are stored as compressed packed arrays. Misses are
+    recognized on the shared OCR engine pool.
+
+    Callers that preprocess pages can pass the preprocessing as a function,
+    so the key is taken from the original page and hits skip the
+    preprocessing as well. If the cache directory cannot be created, the
+    cache is disabled and every call runs OCR.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the OCR cache.
+
+        Args:
+            cache_dir: Cache directory (default: OCR_CACHE_DIR or <tmp>/ocr_cache)
+            max_bytes: Maximum total size of cached entries (default: OCR_CACHE_MAX_MB, 512 MB)
+        """
+        self.cache_dir = cache_dir or os.environ.get("OCR_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "ocr_cache")
+        self.max_bytes = max_bytes or int(os.environ.get("OCR_CACHE_MAX_MB", "512")) * 1024 * 1024
+        self.path = os.path.join(self.cache_dir, "ocr_cache.sqlite3")
+
+        self.hits = 0
+        self.misses = 0
+        self.enabled = True
+        self._tesseract_version = None
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"OCR cache disabled, cannot use {self.cache_dir}: {e}")
+            self.enabled = False
+
+    @contextmanager
+    def _connect(self):
+        # One connection per operation keeps the cache usable from threads and worker processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def make_key(self, image: Any, kind: str, lang: str, config: str, variant: str = "") -> str:
+        """
+        Build the cache key for an OCR call.
+
+        Args:
+            image: Image passed to the cache (PIL image or numpy array)
+            kind: Kind of output ("string", "data" or "hocr")
+            lang: Tesseract language
+            config: Tesseract config string
+            variant: Name and parameters of the preprocessing applied before OCR
+
+        Returns:
+            Hex digest
+        """
+        if self._tesseract_version is None:
+            try:
+                self._tesseract_version = str(pytesseract.get_tesseract_version())
+            except Exception:
+                self._tesseract_version = "unknown"
+
+        pixels = np.ascontiguousarray(np.asarray(image))
+        digest = hashlib.blake2b(digest_size=20)
+        backend = get_ocr_engine().backend
+        header = (f"{CACHE_FORMAT}|{kind}|{lang}|{config}|{variant}|{backend}|{self._tesseract_version}|"
+                  f"{pixels.shape}|{pixels.dtype}")
+        digest.update(header.encode("utf-8"))
+        digest.update(pixels.data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Entry bytes, or None on a miss
+        """
+        if not self.enabled:
+            self.misses += 1
+            return None
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading OCR cache: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return zlib.decompress(row[0])
+
+    def put(self, key: str, value: bytes):
+        """
+        Store an entry, evicting least recently used entries beyond the size bound.
+
+        Args:
+            key: Cache key
+            value: Entry bytes
+        """
+        if not self.enabled:
+            return
+
+        compressed = zlib.compress(value)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, compressed, len(compressed), time.time())
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing OCR cache: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% of the bound so eviction does not run on every insert
+        target = total - int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            evicted.append((key,))
+            target -= size
+            if target <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} OCR cache entries")
+
+    def clear(self):
+        """Remove all entries."""
+        if not self.enabled:
+            return
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def _lookup(self, image: Any, kind: str, lang: str, config: str, variant: str):
+        """Get the key and cached entry of an OCR call; the key is None when the cache is disabled."""
+        if not self.enabled:
+            self.misses += 1
+            return None, None
+        key = self.make_key(image, kind, lang, config, variant)
+        return key, self.get(key)
+
+    def image_to_string(self, image: Any, lang: str = "eng", config: str = "",
+                        preprocess: Optional[Callable[[Any], Any]] = None, variant: str = "") -> str:
+        """
+        Cached equivalent of pytesseract.image_to_string.
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+            preprocess: Preprocessing to apply to the image before OCR, only run on a miss
+            variant: Name and parameters of the preprocessing, part of the key
+
+        Returns:
+            Recognized text
+        """
+        key, cached = self._lookup(image, "string", lang, config, variant)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+        if preprocess is not None:
+            image = preprocess(image)
+        text = get_ocr_engine().image_to_string(image, lang=lang, config=config)
+        if key is not None:
+            self.put(key, text.encode("utf-8"))
+        return text
+
+    def image_to_data(self, image: Any, lang: str = "eng", config: str = "",
+                      preprocess: Optional[Callable[[Any], Any]] = None, variant: str = "") -> Dict[str, List[Any]]:
+        """
+        Cached equivalent of pytesseract.image_to_data with output_type=Output.DICT.
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+            preprocess: Preprocessing to apply to the image before OCR, only run on a miss
+            variant: Name and parameters of the preprocessing, part of the key
+
+        Returns:
+            Dictionary of word box columns
+        """
+        key, cached = self._lookup(image, "data", lang, config, variant)
+        if cached is not None:
+            return self.unpack_data(cached)
+
+        if preprocess is not None:
+            image = preprocess(image)
+        data = get_ocr_engine().image_to_data(image, lang=lang, config=config)
+        if key is not None:
+            self.put(key, self.pack_data(data))
+        return data
+
+    def image_to_hocr(self, image: Any, lang: str = "eng", config: str = "",
+                      preprocess: Optional[Callable[[Any], Any]] = None, variant: str = "") -> str:
+        """
+        Cached equivalent of pytesseract.image_to_pdf_or_hocr with extension="hocr".
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+            preprocess: Preprocessing to apply to the image before OCR, only run on a miss
+            variant: Name and parameters of the preprocessing, part of the key
+
+        Returns:
+            hOCR document
+        """
+        key, cached = self._lookup(image, "hocr", lang, config, variant)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+        if preprocess is not None:
+            image = preprocess(image)
+        hocr = get_ocr_engine().image_to_hocr(image, lang=lang, config=config)
+        if key is not None:
+            self.put(key, hocr.encode("utf-8"))
+        return hocr
+
+    @staticmethod
+    def pack_data(data: Dict[str, List[Any]]) -> bytes:
+        """
+        Pack image_to_data output into a compact binary form.
+
+        Args:
+            data: Dictionary of word box columns
+
+        Returns:
+            Packed bytes
+        """
+        count = len(data["text"])
+        ints = np.array([data[column] for column in DATA_INT_COLUMNS], dtype=np.int32).reshape(len(DATA_INT_COLUMNS), count)
+        conf = np.array(data["conf"], dtype=np.float32)
+        texts = [str(text).encode("utf-8") for text in data["text"]]
+        lengths = np.array([len(text) for text in texts], dtype=np.uint32)
+
+        return b"".join([struct.pack("<I", count), ints.tobytes(), conf.tobytes(), lengths.tobytes(), b"".join(texts)])
+
+    @staticmethod
+    def unpack_data(packed: bytes) -> Dict[str, List[Any]]:
+        """
+        Unpack word boxes packed with pack_data.
+
+        Args:
+            packed: Packed bytes
+
+        Returns:
+            Dictionary of word box columns
+        """
+        count = struct.unpack_from("<I", packed)[0]
+        offset = 4
+        ints = np.frombuffer(packed, dtype=np.int32, count=len(DATA_INT_COLUMNS) * count, offset=offset)
+        ints = ints.reshape(len(DATA_INT_COLUMNS), count)
+        offset += ints.nbytes
+        conf = np.frombuffer(packed, dtype=np.float32, count=count, offset=offset)
+        offset += conf.nbytes
+        lengths = np.frombuffer(packed, dtype=np.uint32, count=count, offset=offset)
+        offset += lengths.nbytes
+
+        data = {column: ints[i].tolist() for i, column in enumerate(DATA_INT_COLUMNS)}
+        data["conf"] = conf.tolist()
+
+        texts = []
+        for length in lengths.tolist():
+            texts.append(packed[offset:offset + length].decode("utf-8"))
+            offset += length
+        data["text"] = texts
+
+        return data
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+def get_ocr_cache() -> OCRCache:
+    """
+    Get the process-wide OCR cache.
+
+    Returns:
+        OCRCache
+    """
+    global _ocr_cache
+    if _ocr_cache is None:
+        with _ocr_cache_lock:
+            if _ocr_cache is None:
+                _ocr_cache = OCRCache()
+    return _ocr_cache
@@ -0,0 +1,283 @@
+"""
+Pool of long-lived Tesseract engines shared by the OCR front-ends.
+"""
+import os
+import queue
+import shlex
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+import pytesseract
+
+try:
+    import tesserocr
+    from tesserocr import PyTessBaseAPI, RIL, iterate_level
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+if tesserocr is None:
+    logger.warning("tesserocr is not installed, so the OCR engine pool is inactive and every OCR call "
+                   "starts a tesseract process through pytesseract")
+
+class OCREnginePool:
+    """
+    Runs OCR on in-memory images with a pool of initialized Tesseract engines.
+
+    With tesserocr installed, engines are created once per (language, page
+    segmentation mode, engine mode, variables) combination and reused, so the
+    traineddata is loaded once instead of on every call and no temporary image
+    files or subprocesses are involved. tesserocr releases the GIL while
+    recognizing, so up to ``pool_size`` pages are OCRed in parallel from
+    threads. Without tesserocr, and for config options the engines do not
+    understand, calls fall back to pytesseract.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None):
+        """
+        Initialize the engine pool.
+
+        Args:
+            pool_size: Maximum engines per configuration (default: OCR_ENGINE_POOL_SIZE or the CPU count)
+        """
+        self.pool_size = pool_size or int(os.environ.get("OCR_ENGINE_POOL_SIZE", "0")) or os.cpu_count() or 1
+        self.backend = "tesserocr" if tesserocr is not None else "pytesseract"
+
+        self._lock = threading.Lock()
+        self._engines = {}  # configuration -> queue of idle engines
+        self._created = {}  # configuration -> number of engines created
+
+        logger.info(f"Initialized OCR engine pool ({self.backend}, {self.pool_size} engines per configuration)")
+
+    @staticmethod
+    def _parse_config(lang: str, config: str) -> Optional[Tuple]:
+        """Parse a pytesseract config string into an engine configuration, or None if unsupported."""
+        psm, oem, variables = None, None, []
+        tokens = shlex.split(config or "")
+        i = 0
+        try:
+            while i < len(tokens):
+                token = tokens[i]
+                if token == "--psm":
+                    psm = int(tokens[i + 1])
+                    i += 2
+                elif token == "--oem":
+                    oem = int(tokens[i + 1])
+                    i += 2
+                elif token == "-l":
+                    lang = tokens[i + 1]
+                    i += 2
+                elif token == "-c":
+                    name, value = tokens[i + 1].split("=", 1)
+                    variables.append((name, value))
+                    i += 2
+                else:
+                    return None
+        except (IndexError, ValueError):
+            return None
+
+        return lang, psm, oem, tuple(variables)
+
+    def _create_engine(self, engine_config: Tuple):
+        lang, psm, oem, variables = engine_config
+        kwargs = {"lang": lang}
+        if psm is not None:
+            kwargs["psm"] = psm
+        if oem is not None:
+            kwargs["oem"] = oem
+
+        engine = PyTessBaseAPI(**kwargs)
+        for name, value in variables:
+            engine.SetVariable(name, value)
+
+        logger.info(f"Created Tesseract engine for {lang} (psm={psm}, oem={oem})")
+        return engine
+
+    @contextmanager
+    def _engine(self, engine_config: Tuple):
+        """Check out an idle engine for a configuration, creating one if the pool is not full."""
+        with self._lock:
+            idle = self._engines.setdefault(engine_config, queue.LifoQueue())
+            create = idle.empty() and self._created.get(engine_config, 0) < self.pool_size
+            if create:
+                self._created[engine_config] = self._created.get(engine_config, 0) + 1
+
+        if create:
+            try:
+                engine = self._create_engine(engine_config)
+            except Exception:
+                with self._lock:
+                    self._created[engine_config] -= 1
+                raise
+        else:
+            engine = idle.get()
+
+        try:
+            yield engine
+        finally:
+            engine.Clear()
+            idle.put(engine)
+
+    @staticmethod
+    def _to_pil(image: Any) -> Image.Image:
+        if isinstance(image, Image.Image):
+            return image
+        return Image.fromarray(np.asarray(image))
+
+    def _run(self, image: Any, lang: str, config: str, output: str):
+        engine_config = self._parse_config(lang, config) if tesserocr is not None else None
+        if engine_config is None:
+            return None
+
+        pil_image = self._to_pil(image)
+        with self._engine(engine_config) as engine:
+            engine.SetImage(pil_image)
+            if output == "string":
+                return engine.GetUTF8Text()
+            if output == "hocr":
+                engine.Recognize()
+                return engine.GetHOCRText(0)
+            engine.Recognize()
+            return self._word_data(engine, pil_image.size)
+
+    @staticmethod
+    def _word_data(engine, size: Tuple[int, int]) -> Dict[str, List[Any]]:
+        """
+        Collect the page, block, paragraph, line and word boxes in pytesseract's
+        image_to_data column layout.
+
+        As in tesseract's TSV output, each element gets a row at the level of its
+        kind (1 for the page through 5 for words), with the numbers of the levels
+        below it set to 0. Only words have a confidence and text; the other rows
+        have a confidence of -1 and empty text.
+        """
+        data = {column: [] for column in ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                                          "left", "top", "width", "height", "conf", "text"]}
+
+        def add_row(level, numbers, box, conf=-1, text=""):
+            x1, y1, x2, y2 = box
+            data["level"].append(level)
+            data["page_num"].append(1)
+            for column, number in zip(["block_num", "par_num", "line_num", "word_num"], numbers):
+                data[column].append(number)
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+            data["conf"].append(conf)
+            data["text"].append(text)
+
+        add_row(1, (0, 0, 0, 0), (0, 0, size[0], size[1]))
+
+        iterator = engine.GetIterator()
+        if iterator is None:
+            return data
+
+        block_num = par_num = line_num = word_num = 0
+        for word in iterate_level(iterator, RIL.WORD):
+            if word.IsAtBeginningOf(RIL.BLOCK):
+                block_num, par_num, line_num, word_num = block_num + 1, 0, 0, 0
+                box = word.BoundingBox(RIL.BLOCK)
+                if box is not None:
+                    add_row(2, (block_num, 0, 0, 0), box)
+            if word.IsAtBeginningOf(RIL.PARA):
+                par_num, line_num, word_num = par_num + 1, 0, 0
+                box = word.BoundingBox(RIL.PARA)
+                if box is not None:
+                    add_row(3, (block_num, par_num, 0, 0), box)
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line_num, word_num = line_num + 1, 0
+                box = word.BoundingBox(RIL.TEXTLINE)
+                if box is not None:
+                    add_row(4, (block_num, par_num, line_num, 0), box)
+            word_num += 1
+
+            box = word.BoundingBox(RIL.WORD)
+            if box is not None:
+                add_row(5, (block_num, par_num, line_num, word_num), box,
+                        word.Confidence(RIL.WORD), word.GetUTF8Text(RIL.WORD) or "")
+
+        return data
+
+    def image_to_string(self, image: Any, lang: str = "eng", config: str = "") -> str:
+        """
+        Recognize the text of an image.
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+
+        Returns:
+            Recognized text
+        """
+        text = self._run(image, lang, config, "string")
+        if text is None:
+            text = pytesseract.image_to_string(image, lang=lang, config=config)
+        return text
+
+    def image_to_data(self, image: Any, lang: str = "eng", config: str = "") -> Dict[str, List[Any]]:
+        """
+        Recognize the words of an image with their boxes and confidences.
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+
+        Returns:
+            Dictionary of page, block, paragraph, line and word box columns, as
+            pytesseract.image_to_data with output_type=Output.DICT
+        """
+        data = self._run(image, lang, config, "data")
+        if data is None:
+            data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        return data
+
+    def image_to_hocr(self, image: Any, lang: str = "eng", config: str = "") -> str:
+        """
+        Recognize an image as hOCR.
+
+        Args:
+            image: Image (PIL image or numpy array)
+            lang: Tesseract language
+            config: Tesseract config string
+
+        Returns:
+            hOCR document
+        """
+        hocr = self._run(image, lang, config, "hocr")
+        if hocr is None:
+            hocr = pytesseract.image_to_pdf_or_hocr(image, lang=lang, config=config, extension="hocr").decode("utf-8")
+        return hocr
+
+    def close(self):
+        """End all engines."""
+        with self._lock:
+            for idle in self._engines.values():
+                while not idle.empty():
+                    idle.get_nowait().End()
+            self._engines = {}
+            self._created = {}
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+def get_ocr_engine() -> OCREnginePool:
+    """
+    Get the process-wide OCR engine pool.
+
+    Returns:
+        OCREnginePool
+    """
+    global _ocr_engine
+    if _ocr_engine is None:
+        with _ocr_engine_lock:
+            if _ocr_engine is None:
+                _ocr_engine = OCREnginePool()
+    return _ocr_engine
@@ -0,0 +1,95 @@
+"""
+Per-page classification of PDF text layers, used to decide which pages need OCR.
+"""
+import re
+from typing import Dict, Any, Optional
+
+# pdfplumber renders glyphs without a unicode mapping as "(cid:NN)"
+CID_PATTERN = re.compile(r'\(cid:\d+\)')
+
+class PageClassifier:
+    """
+    Decides for each PDF page whether its embedded text layer is usable or the page must be OCRed.
+
+    A page needs OCR when its text layer is too short, when most of its characters are
+    not alphanumeric (e.g. unmapped glyphs), or when images cover most of the page while
+    the text layer covers almost none of it (a scan with a stamped header or page number).
+    """
+
+    def __init__(self, min_chars: int = 50, min_quality: float = 0.7,
+                 max_image_coverage: float = 0.5, min_text_coverage: float = 0.01):
+        """
+        Initialize the page classifier.
+
+        Args:
+            min_chars: Minimum number of non-whitespace characters in a usable text layer
+            min_quality: Minimum ratio of alphanumeric and whitespace characters
+            max_image_coverage: Image coverage from which a page is treated as a possible scan
+            min_text_coverage: Minimum ratio of page area covered by characters on such a page
+        """
+        self.min_chars = min_chars
+        self.min_quality = min_quality
+        self.max_image_coverage = max_image_coverage
+        self.min_text_coverage = min_text_coverage
+
+    def classify_page(self, page) -> Dict[str, Any]:
+        """
+        Classify a pdfplumber page.
+
+        Args:
+            page: pdfplumber page
+
+        Returns:
+            Dictionary with the text layer ("text"), its metrics and "needs_ocr"
+        """
+        text = page.extract_text() or ""
+        page_area = float(page.width * page.height) or 1.0
+
+        text_area = sum(max(char["x1"] - char["x0"], 0) * max(char["bottom"] - char["top"], 0)
+                        for char in page.chars)
+
+        image_area = 0.0
+        for image in page.images:
+            # Clip image boxes to the page, images may bleed over the edges
+            width = min(image["x1"], page.width) - max(image["x0"], 0)
+            height = min(image["bottom"], page.height) - max(image["top"], 0)
+            image_area += max(width, 0) * max(height, 0)
+
+        return self.classify_text(text, text_area / page_area, min(image_area / page_area, 1.0))
+
+    def classify_text(self, text: str, text_coverage: Optional[float] = None,
+                      image_coverage: float = 0.0) -> Dict[str, Any]:
+        """
+        Classify a page from its text layer and, if known, its text and image coverage.
+
+        Args:
+            text: Text layer of the page
+            text_coverage: Ratio of the page area covered by characters (optional)
+            image_coverage: Ratio of the page area covered by images
+
+        Returns:
+            Dictionary with the text layer ("text"), its metrics and "needs_ocr"
+        """
+        # Count each unmapped glyph as a single unreadable character
+        normalized = CID_PATTERN.sub("\ufffd", text)
+        char_count = sum(not c.isspace() for c in normalized)
+        quality = sum(c.isalnum() or c.isspace() for c in normalized) / max(len(normalized), 1)
+
+        if char_count < self.min_chars:
+            needs_ocr = True
+        elif quality < self.min_quality:
+            needs_ocr = True
+        elif (image_coverage >= self.max_image_coverage and text_coverage is not None
+              and text_coverage < self.min_text_coverage):
+            needs_ocr = True
+        else:
+            needs_ocr = False
+
+        return {
+            "text": text,
+            "char_count": char_count,
+            "quality": round(quality, 3),
+            "text_coverage": round(text_coverage, 4) if text_coverage is not None else None,
+            "image_coverage": round(image_coverage, 4),
+            "needs_ocr": needs_ocr
+        }
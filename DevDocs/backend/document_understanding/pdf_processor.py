@@ -11,6 +11,9 @@ import pdfplumber
 from PyPDF2 import PdfReader
 import cv2
 
+from .page_classifier import PageClassifier
+from .ocr_cache import get_ocr_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -30,6 +33,7 @@ class PDFProcessor:
         """
         self.ocr_enabled = ocr_enabled
         self.dpi = dpi
+        self.page_classifier = PageClassifier()
         
         # Check if tesseract is installed
         if self.ocr_enabled:
@@ -57,22 +61,16 @@ class PDFProcessor:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            # Extract text using PyPDF2 (faster but less accurate)
-            basic_text = self._extract_text_with_pypdf2(file_path)
-            
-            # Check if the document is scanned (has little or no text)
-            is_scanned = self._is_scanned_document(basic_text)
+            # Extract text page by page, using OCR only for pages without a usable text layer
+            pages = self._extract_pages(file_path)
+            text = "\n\n".join(page["text"] for page in pages)
             
-            # Extract text using pdfplumber (more accurate but slower)
-            detailed_text = self._extract_text_with_pdfplumber(file_path)
+            if not text.strip():
+                # Fall back to PyPDF2 if pdfplumber could not read the document
+                text = self._extract_text_with_pypdf2(file_path)
             
-            # If document is scanned and OCR is enabled, use OCR
-            if is_scanned and self.ocr_enabled:
-                logger.info(f"Document appears to be scanned, using OCR")
-                ocr_text = self._extract_text_with_ocr(file_path)
-                text = ocr_text
-            else:
-                text = detailed_text if detailed_text else basic_text
+            # The document is scanned if no page has a usable text layer
+            is_scanned = bool(pages) and all(page["needs_ocr"] for page in pages)
             
             # Extract tables
             tables = self._extract_tables(file_path)
@@ -90,7 +88,9 @@ class PDFProcessor:
                 "tables": tables,
                 "structure": structure,
                 "metadata": metadata,
-                "is_scanned": is_scanned
+                "is_scanned": is_scanned,
+                "pages": [{key: value for key, value in page.items() if key != "text"} for page in pages],
+                "ocr_pages": [page["page"] for page in pages if page["source"] == "ocr"]
             }
         except Exception as e:
             logger.error(f"Error processing PDF {file_path}: {e}")
@@ -117,74 +117,67 @@ class PDFProcessor:
             logger.error(f"Error extracting text with PyPDF2: {e}")
             return ""
     
-    def _extract_text_with_pdfplumber(self, file_path: str) -> str:
+    def _extract_pages(self, file_path: str) -> List[Dict[str, Any]]:
         """
-        Extract text from PDF using pdfplumber.
+        Extract text from each page, from the text layer or with OCR.
+        
+        Pages are classified by text layer coverage and quality; only pages
+        without a usable text layer are rendered and OCRed.
         
         Args:
             file_path: Path to the PDF file
             
         Returns:
-            Extracted text
+            List of pages in order, with text, source ("text_layer" or "ocr") and classification metrics
         """
+        pages = []
+        
         try:
             with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                return text
+                for i, page in enumerate(pdf.pages):
+                    page_info = self.page_classifier.classify_page(page)
+                    page_info["page"] = i + 1
+                    page_info["source"] = "text_layer"
+                    
+                    if page_info["needs_ocr"] and self.ocr_enabled:
+                        ocr_text = self._ocr_page(page)
+                        # Keep the text layer if OCR finds nothing either
+                        if ocr_text.strip():
+                            page_info["text"] = ocr_text
+                            page_info["source"] = "ocr"
+                    
+                    pages.append(page_info)
         except Exception as e:
             logger.error(f"Error extracting text with pdfplumber: {e}")
-            return ""
+            return []
+        
+        ocr_count = sum(page["source"] == "ocr" for page in pages)
+        if ocr_count:
+            logger.info(f"Used OCR for {ocr_count} of {len(pages)} pages")
+        
+        return pages
     
-    def _extract_text_with_ocr(self, file_path: str) -> str:
+    def _ocr_page(self, page) -> str:
         """
-        Extract text from PDF using OCR.
+        Extract text from a single page using OCR.
         
         Args:
-            file_path: Path to the PDF file
+            page: pdfplumber page
             
         Returns:
             Extracted text
         """
         try:
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for i, page in enumerate(pdf.pages):
-                    # Convert page to image
-                    img = page.to_image(resolution=self.dpi)
-                    img_data = img.original.convert('RGB')
-                    
-                    # Use pytesseract to extract text
-                    page_text = pytesseract.image_to_string(img_data)
-                    text += page_text + "\n\n"
-                
-                return text
+            # Convert page to image
+            img = page.to_image(resolution=self.dpi)
+            img_data = img.original.convert('RGB')
+            
+            # Use pytesseract to extract text, reusing results for previously seen pages
+            return get_ocr_cache().image_to_string(img_data)
         except Exception as e:
-            logger.error(f"Error extracting text with OCR: {e}")
+            logger.error(f"Error extracting text with OCR from page {page.page_number}: {e}")
             return ""
     
-    def _is_scanned_document(self, text: str) -> bool:
-        """
-        Check if a document is scanned based on the amount of extracted text.
-        
-        Args:
-            text: Extracted text
-            
-        Returns:
-            True if the document appears to be scanned
-        """
-        # If there's very little text, it's likely a scanned document
-        if not text or len(text.strip()) < 100:
-            return True
-        
-        # Check if the text contains mostly garbage characters
-        alphanumeric_ratio = sum(c.isalnum() or c.isspace() for c in text) / max(len(text), 1)
-        if alphanumeric_ratio < 0.7:
-            return True
-        
-        return False
-    
     def _extract_tables(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Extract tables from PDF.
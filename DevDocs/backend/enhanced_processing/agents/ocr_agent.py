@@ -11,6 +11,12 @@ from PIL import Image
 from typing import List, Dict, Any, Optional
 
 from ..utils import ensure_dir
+from tracing import get_tracer
+
+try:
+    from document_understanding.ocr_cache import get_ocr_cache
+except ImportError:
+    get_ocr_cache = None
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +73,8 @@ class OCRAgent:
                 preprocessed.save(preprocessed_path)
             
             # Perform OCR
-            ocr_result = self._perform_ocr(preprocessed)
+            with get_tracer().span("ocr_page", document=pdf_path, page=i + 1):
+                ocr_result = self._perform_ocr(preprocessed)
             
             # Add page number
             ocr_result["page"] = i + 1
@@ -212,11 +219,14 @@ class OCRAgent:
                 # Join languages
                 lang = "+".join(self.ocr_config["languages"])
                 
-                # Perform OCR
-                text = pytesseract.image_to_string(image, lang=lang, config=config)
-                
-                # Get bounding boxes for words
-                boxes = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+                # Perform OCR and get bounding boxes for words, reusing results for previously seen pages
+                if get_ocr_cache is not None:
+                    ocr_cache = get_ocr_cache()
+                    text = ocr_cache.image_to_string(image, lang=lang, config=config)
+                    boxes = ocr_cache.image_to_data(image, lang=lang, config=config)
+                else:
+                    text = pytesseract.image_to_string(image, lang=lang, config=config)
+                    boxes = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
                 
                 # Filter valid boxes
                 valid_indices = [i for i, conf in enumerate(boxes["conf"]) if conf > 0]
@@ -13,6 +13,7 @@ from PIL import Image
 import io
 
 from ..utils import ensure_dir
+from tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -328,12 +329,13 @@ class RAGAgent:
         Returns:
             API response text
         """
-        if self.api_type == "openai":
-            return self._call_openai_vision(prompt, image_paths)
-        elif self.api_type == "google":
-            return self._call_google_vision(prompt, image_paths)
-        else:
-            return "No API available"
+        with get_tracer().span("llm_call", api=self.api_type, images=len(image_paths)):
+            if self.api_type == "openai":
+                return self._call_openai_vision(prompt, image_paths)
+            elif self.api_type == "google":
+                return self._call_google_vision(prompt, image_paths)
+            else:
+                return "No API available"
     
     def _call_openai_vision(self, prompt: str, image_paths: List[str]) -> str:
         """
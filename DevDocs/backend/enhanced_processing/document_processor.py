@@ -62,14 +62,16 @@ class DocumentProcessor:
         logger.info(f"Processing document: {pdf_path}")
         logger.info(f"Output directory: {self.output_dir}")
         
-        # Step 1: OCR Processing
-        ocr_result = self._perform_ocr(pdf_path, languages)
-        
-        # Step 2: Table Extraction
-        table_result = self._extract_tables(ocr_result['ocr_path'])
-        
-        # Step 3: Grid Analysis
-        grid_result = self._analyze_grid(ocr_result['ocr_path'])
+        # The OCR output is only needed by steps 1-3 and is removed after them
+        with OCRProcessor(pdf_path) as ocr_processor:
+            # Step 1: OCR Processing
+            ocr_result = self._perform_ocr(ocr_processor, pdf_path, languages)
+            
+            # Step 2: Table Extraction
+            table_result = self._extract_tables(ocr_result['ocr_path'])
+            
+            # Step 3: Grid Analysis
+            grid_result = self._analyze_grid(ocr_result['ocr_path'])
         
         # Step 4: Combine Results
         combined_result = self._combine_results(table_result, grid_result)
@@ -98,11 +100,12 @@ class DocumentProcessor:
         
         return final_result
     
-    def _perform_ocr(self, pdf_path: str, languages: List[str]) -> Dict[str, Any]:
+    def _perform_ocr(self, ocr_processor: OCRProcessor, pdf_path: str, languages: List[str]) -> Dict[str, Any]:
         """
         Perform OCR on the document.
         
         Args:
+            ocr_processor: OCR processor for the document, which owns the OCR output
             pdf_path: Path to the PDF file
             languages: List of languages for OCR
             
@@ -111,7 +114,6 @@ class DocumentProcessor:
         """
         logger.info("Step 1: OCR Processing")
         
-        ocr_processor = OCRProcessor(pdf_path)
         ocr_path = ocr_processor.process(languages=languages)
         
         # Extract text
@@ -127,7 +129,8 @@ class DocumentProcessor:
         return {
             'ocr_path': ocr_path,
             'text': text,
-            'text_path': text_path
+            'text_path': text_path,
+            'pages': ocr_processor.pages
         }
     
     def _extract_tables(self, pdf_path: str) -> Dict[str, Any]:
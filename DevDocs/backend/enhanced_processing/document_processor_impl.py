@@ -9,9 +9,15 @@ import os
 import logging
 import time
 import json
+from contextlib import nullcontext
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+try:
+    from .ocr_processor import OCRProcessor
+except ImportError:
+    OCRProcessor = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -60,17 +66,19 @@ class DocumentProcessor:
         print("Progress: 10%")
 
         try:
-            # Step 1: OCR Processing
-            ocr_result = self._perform_ocr(pdf_path, languages)
-            print("Progress: 30%")
+            # The OCR output is only needed by steps 1-3 and is removed after them
+            with OCRProcessor(pdf_path) if OCRProcessor is not None else nullcontext() as ocr_processor:
+                # Step 1: OCR Processing
+                ocr_result = self._perform_ocr(ocr_processor, pdf_path, languages)
+                print("Progress: 30%")
 
-            # Step 2: Table Extraction
-            table_result = self._extract_tables(ocr_result['ocr_path'])
-            print("Progress: 50%")
+                # Step 2: Table Extraction
+                table_result = self._extract_tables(ocr_result['ocr_path'])
+                print("Progress: 50%")
 
-            # Step 3: Grid Analysis
-            grid_result = self._analyze_grid(ocr_result['ocr_path'])
-            print("Progress: 70%")
+                # Step 3: Grid Analysis
+                grid_result = self._analyze_grid(ocr_result['ocr_path'])
+                print("Progress: 70%")
 
             # Step 4: Combine Results
             combined_result = self._combine_results(table_result, grid_result)
@@ -105,11 +113,13 @@ class DocumentProcessor:
             logger.error(f"Error processing document: {e}")
             raise
 
-    def _perform_ocr(self, pdf_path: str, languages: List[str]) -> Dict[str, Any]:
+    def _perform_ocr(self, ocr_processor, pdf_path: str, languages: List[str]) -> Dict[str, Any]:
         """
         Perform OCR on the document.
 
         Args:
+            ocr_processor: OCR processor for the document, which owns the OCR output
+                (None if OCRProcessor is not available)
             pdf_path: Path to the PDF file
             languages: List of languages for OCR
 
@@ -118,11 +128,7 @@ class DocumentProcessor:
         """
         logger.info("Step 1: OCR Processing")
 
-        try:
-            # Import OCR processor
-            from .ocr_processor import OCRProcessor
-
-            ocr_processor = OCRProcessor(pdf_path)
+        if ocr_processor is not None:
             ocr_path = ocr_processor.process(languages=languages)
 
             # Extract text
@@ -138,9 +144,10 @@ class DocumentProcessor:
             return {
                 'ocr_path': ocr_path,
                 'text': text,
-                'text_path': text_path
+                'text_path': text_path,
+                'pages': ocr_processor.pages
             }
-        except ImportError:
+        else:
             logger.warning("OCRProcessor not available, using fallback method")
 
             # Fallback to pdfplumber
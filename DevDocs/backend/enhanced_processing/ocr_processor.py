@@ -11,10 +11,17 @@ import tempfile
 import subprocess
 from typing import List, Dict, Any, Optional
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import cv2
 import numpy as np
 
+try:
+    from document_understanding.page_classifier import PageClassifier
+    from document_understanding.ocr_cache import get_ocr_cache
+except ImportError:
+    PageClassifier = None
+    get_ocr_cache = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -34,8 +41,10 @@ class OCRProcessor:
         """
         self.pdf_path = pdf_path
         self.output_path = None
+        self._temp_path = None  # OCRmyPDF output, removed by cleanup()
         self.images = []
         self.ocr_text = ""
+        self.pages = []
         
         # Verify the PDF file exists
         if not os.path.exists(pdf_path):
@@ -53,20 +62,18 @@ class OCRProcessor:
             dpi: DPI for image conversion
             
         Returns:
-            Path to the OCR-processed PDF
+            Path to the OCR-processed PDF. With OCRmyPDF this is a temporary file that
+            cleanup() removes; with the Tesseract fallback it is the original PDF, which
+            keeps its text layer, and the OCR results are in ``self.pages``.
         """
         logger.info(f"Processing {self.pdf_path} with OCR (languages: {languages}, dpi: {dpi})")
         
-        # Create a temporary output file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-            self.output_path = tmp_file.name
-        
         # Try to use OCRmyPDF if available
         if self._is_ocrmypdf_available():
-            self._process_with_ocrmypdf(languages, self.output_path)
+            self.output_path = self._process_with_ocrmypdf(languages)
         else:
             # Fallback to manual OCR with Tesseract
-            self._process_with_tesseract(languages, dpi, self.output_path)
+            self.output_path = self._process_with_tesseract(languages, dpi)
         
         logger.info(f"OCR processing complete, output saved to {self.output_path}")
         
@@ -89,14 +96,20 @@ class OCRProcessor:
             logger.warning("OCRmyPDF not available, falling back to Tesseract")
             return False
     
-    def _process_with_ocrmypdf(self, languages: List[str], output_path: str) -> None:
+    def _process_with_ocrmypdf(self, languages: List[str]) -> str:
         """
         Process the PDF with OCRmyPDF.
         
         Args:
             languages: List of language codes
-            output_path: Path to save the output PDF
+            
+        Returns:
+            Path to the output PDF
         """
+        # Create a temporary output file
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
+            self._temp_path = output_path = tmp_file.name
+        
         try:
             # Prepare language parameter
             lang_param = '+'.join(languages)
@@ -108,82 +121,166 @@ class OCRProcessor:
                 '--deskew',              # Straighten skewed pages
                 '--clean',               # Clean pages before OCR
                 '--optimize', '1',       # Optimize PDF
-                '--skip-text',           # Skip pages with text
-                '--force-ocr',           # Force OCR even if text is present
+                '--skip-text',           # Skip pages with text, OCR only the scanned ones
                 '--output-type', 'pdf',  # Output as PDF
                 self.pdf_path,
                 output_path
             ], check=True)
             
             logger.info("OCRmyPDF processing successful")
+            return output_path
         except subprocess.SubprocessError as e:
             logger.error(f"Error processing with OCRmyPDF: {e}")
+            self.cleanup()
             # Fallback to Tesseract
-            self._process_with_tesseract(languages, 300, output_path)
+            return self._process_with_tesseract(languages, 300)
     
-    def _process_with_tesseract(self, languages: List[str], dpi: int, output_path: str) -> None:
+    def _process_with_tesseract(self, languages: List[str], dpi: int) -> str:
         """
         Process the PDF with Tesseract OCR.
         
+        Only pages without a usable text layer are rendered and OCRed; the text layer
+        is used for the other pages. Each page's text, source and OCR word boxes are
+        kept in ``self.pages`` and the page texts are merged in page order, so no
+        intermediate images or PDFs are written.
+        
         Args:
             languages: List of language codes
             dpi: DPI for image conversion
-            output_path: Path to save the output PDF
+            
+        Returns:
+            Path to the original PDF, which keeps the text layer of native pages
         """
         try:
-            # Convert PDF to images
-            self.images = convert_from_path(self.pdf_path, dpi=dpi)
-            logger.info(f"Converted PDF to {len(self.images)} images")
+            pages = self._classify_pages()
+            ocr_count = sum(page["needs_ocr"] for page in pages)
+            logger.info(f"{ocr_count} of {len(pages)} pages need OCR")
             
             # Prepare language parameter
             lang_param = '+'.join(languages)
             
-            # Process each image with Tesseract
+            self.images = []
             all_text = []
             
-            for i, image in enumerate(self.images):
-                logger.info(f"Processing image {i+1}/{len(self.images)}")
-                
-                # Convert PIL image to OpenCV format for preprocessing
-                img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                
-                # Preprocess image
-                img_processed = self._preprocess_image(img_cv)
-                
-                # Perform OCR
-                text = pytesseract.image_to_string(img_processed, lang=lang_param)
-                all_text.append(text)
+            for page in pages:
+                if page["needs_ocr"]:
+                    logger.info(f"Processing page {page['page']}/{len(pages)} with OCR")
+                    
+                    # Convert only this page to an image
+                    image = convert_from_path(self.pdf_path, dpi=dpi,
+                                              first_page=page["page"], last_page=page["page"])[0]
+                    self.images.append(image)
+                    
+                    # Convert PIL image to OpenCV format for preprocessing
+                    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+                    
+                    # Perform OCR once for both words and text, reusing results for previously
+                    # seen pages; cache hits also skip the preprocessing
+                    if get_ocr_cache is not None:
+                        data = get_ocr_cache().image_to_data(img_cv, lang=lang_param, preprocess=self._preprocess_image,
+                                                             variant="ocr_processor.denoise")
+                    else:
+                        data = pytesseract.image_to_data(self._preprocess_image(img_cv), lang=lang_param,
+                                                         output_type=pytesseract.Output.DICT)
+                    page["text"] = self._text_from_data(data)
+                    page["words"] = self._words_from_data(data)
+                    page["source"] = "ocr"
+                else:
+                    page["words"] = []
+                    page["source"] = "text_layer"
                 
-                # Save processed image
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_img:
-                    cv2.imwrite(tmp_img.name, img_processed)
-                    logger.debug(f"Saved processed image to {tmp_img.name}")
+                all_text.append(page["text"])
+            
+            self.pages = pages
             
             # Combine all text
             self.ocr_text = '\n\n'.join(all_text)
             
-            # Save OCR text to a file
-            text_path = output_path.replace('.pdf', '.txt')
-            with open(text_path, 'w', encoding='utf-8') as f:
-                f.write(self.ocr_text)
-            
-            logger.info(f"Saved OCR text to {text_path}")
-            
-            # Create a PDF from the processed images
-            self.images[0].save(
-                output_path,
-                save_all=True,
-                append_images=self.images[1:],
-                resolution=dpi
-            )
-            
             logger.info("Tesseract processing successful")
         except Exception as e:
             logger.error(f"Error processing with Tesseract: {e}")
-            # If output file doesn't exist, copy the original
-            if not os.path.exists(output_path):
-                import shutil
-                shutil.copy(self.pdf_path, output_path)
+        
+        return self.pdf_path
+    
+    def _classify_pages(self) -> List[Dict[str, Any]]:
+        """
+        Classify each page by the coverage and quality of its text layer.
+        
+        Returns:
+            List of pages in order, with the text layer ("text"), its metrics and "needs_ocr"
+        """
+        if PageClassifier is not None:
+            try:
+                import pdfplumber
+                
+                classifier = PageClassifier()
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    pages = []
+                    for i, page in enumerate(pdf.pages):
+                        page_info = classifier.classify_page(page)
+                        page_info["page"] = i + 1
+                        pages.append(page_info)
+                    return pages
+            except Exception as e:
+                logger.warning(f"Error classifying pages, using OCR for all pages: {e}")
+        
+        # Without a classifier every page is OCRed
+        page_count = pdfinfo_from_path(self.pdf_path)["Pages"]
+        return [{"page": i + 1, "text": "", "needs_ocr": True} for i in range(page_count)]
+    
+    @staticmethod
+    def _text_from_data(data: Dict[str, List[Any]]) -> str:
+        """
+        Rebuild page text from Tesseract word data.
+        
+        Words are joined into lines and lines into paragraphs in Tesseract's
+        reading order, with paragraphs separated by blank lines.
+        
+        Args:
+            data: Word data as returned by image_to_data
+            
+        Returns:
+            Page text
+        """
+        paragraphs = {}
+        for i, word in enumerate(data['text']):
+            word = str(word).strip()
+            if not word:
+                continue
+            paragraph = paragraphs.setdefault((data['block_num'][i], data['par_num'][i]), {})
+            paragraph.setdefault(data['line_num'][i], []).append(word)
+        
+        return '\n\n'.join(
+            '\n'.join(' '.join(words) for words in lines.values())
+            for lines in paragraphs.values()
+        )
+    
+    @staticmethod
+    def _words_from_data(data: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert Tesseract word data to a list of recognized words with boxes.
+        
+        Args:
+            data: Word data as returned by image_to_data
+            
+        Returns:
+            List of words with text, confidence and box (in pixels at the OCR DPI)
+        """
+        words = []
+        for i, word in enumerate(data['text']):
+            if not str(word).strip():
+                continue
+            words.append({
+                'text': word,
+                'confidence': data['conf'][i],
+                'box': {
+                    'x': data['left'][i],
+                    'y': data['top'][i],
+                    'width': data['width'][i],
+                    'height': data['height'][i]
+                }
+            })
+        return words
     
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -216,38 +313,40 @@ class OCRProcessor:
         Returns:
             Extracted text
         """
-        if not self.ocr_text and self.output_path:
+        if not self.ocr_text and not self.pages and self.output_path:
             # If we used OCRmyPDF, extract text from the output PDF
             try:
                 import pdfplumber
                 
                 with pdfplumber.open(self.output_path) as pdf:
-                    text_parts = []
-                    for page in pdf.pages:
-                        text_parts.append(page.extract_text() or '')
+                    self.pages = [
+                        {'page': i + 1, 'source': 'ocrmypdf', 'text': page.extract_text() or '', 'words': []}
+                        for i, page in enumerate(pdf.pages)
+                    ]
                     
-                    self.ocr_text = '\n\n'.join(text_parts)
+                    self.ocr_text = '\n\n'.join(page['text'] for page in self.pages)
             except Exception as e:
                 logger.error(f"Error extracting text from OCR-processed PDF: {e}")
         
         return self.ocr_text
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+    
     def cleanup(self) -> None:
         """
         Clean up temporary files.
         """
-        if self.output_path and os.path.exists(self.output_path):
+        if self._temp_path and os.path.exists(self._temp_path):
             try:
-                os.remove(self.output_path)
-                logger.info(f"Removed temporary file {self.output_path}")
-                
-                # Also remove text file if it exists
-                text_path = self.output_path.replace('.pdf', '.txt')
-                if os.path.exists(text_path):
-                    os.remove(text_path)
-                    logger.info(f"Removed temporary file {text_path}")
+                os.remove(self._temp_path)
+                logger.info(f"Removed temporary file {self._temp_path}")
             except Exception as e:
                 logger.error(f"Error cleaning up temporary files: {e}")
+        self._temp_path = None
 
 
 # Example usage
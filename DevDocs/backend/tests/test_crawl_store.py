@@ -0,0 +1,78 @@
+"""
+Tests for the crawl artifact store.
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the app directory to the path; app.py shadows the app package
+sys.path.append(str(Path(__file__).parent.parent / "app"))
+
+from crawl_store import CrawlArtifactStore
+
+def crawl_result(title, markdown):
+    return {"title": title, "markdown": markdown, "links": {"internal": [{"href": "/a"}], "external": []}}
+
+class TestCrawlArtifactStore(unittest.TestCase):
+    """Tests for the CrawlArtifactStore."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = CrawlArtifactStore(storage_dir=self.temp_dir.name, max_memory_bytes=100, keep_crawls=1)
+
+    def tearDown(self):
+        """Clean up the test."""
+        self.temp_dir.cleanup()
+
+    def test_pages_are_appended_to_consolidated_files(self):
+        """Test that pages stream into one markdown file and the metadata lists every page."""
+        self.store.start_crawl("example_com", "https://example.com")
+        self.store.append_page("example_com", "https://example.com", crawl_result("Home", "home text"))
+        self.store.append_page("example_com", "https://example.com/docs", crawl_result("Docs", "docs text"))
+        self.store.finish_crawl("example_com")
+
+        with open(self.store.markdown_path("example_com"), encoding="utf-8") as f:
+            markdown = f.read()
+        with open(self.store.metadata_path("example_com"), encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        self.assertEqual(markdown.count("# Consolidated Documentation for https://example.com"), 1)
+        self.assertLess(markdown.index("home text"), markdown.index("docs text"))
+        self.assertEqual([page["url"] for page in metadata["pages"]], ["https://example.com", "https://example.com/docs"])
+        self.assertEqual(metadata["pages"][0]["internal_links"], 1)
+
+    def test_memory_tier_spills_least_recently_used_pages(self):
+        """Test that the page tier stays within its byte bound and spilled pages can still be read."""
+        self.store.start_crawl("example_com", "https://example.com")
+        self.store.put("example_com", "a.md", "a" * 60)
+        self.store.put("example_com", "b.md", "b" * 60)
+
+        self.assertEqual(self.store.stats()["memory_bytes"], 60)
+        self.assertEqual(self.store.get("a.md")["content"], "a" * 60)
+        self.assertFalse(self.store.get("a.md")["in_memory"])
+        self.assertTrue(self.store.get("b.md")["in_memory"])
+        self.assertEqual({page["name"] for page in self.store.list_pages()}, {"a.md", "b.md"})
+        self.assertNotIn("content", self.store.list_pages()[0])
+
+    def test_finished_crawls_are_released_beyond_the_retention_limit(self):
+        """Test that pages of old crawls are dropped while consolidated files are kept."""
+        self.store.start_crawl("first", "https://first.example")
+        self.store.append_page("first", "https://first.example", crawl_result("First", "x" * 150), page_name="first.md")
+        self.store.finish_crawl("first")
+
+        self.store.start_crawl("second", "https://second.example")
+        self.store.append_page("second", "https://second.example", crawl_result("Second", "second"), page_name="second.md")
+        self.assertIsNotNone(self.store.get("first.md"))
+        self.store.finish_crawl("second")
+
+        self.assertIsNone(self.store.get("first.md"))
+        self.assertIsNotNone(self.store.get("second.md"))
+        self.assertFalse(os.path.exists(os.path.join(self.store.spill_dir, "first")))
+        self.assertTrue(os.path.exists(self.store.markdown_path("first")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Tests for the data export agent.
+"""
+import sys
+import csv
+import json
+import tempfile
+import unittest
+import importlib.util
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.data_export_agent import DataExportAgent
+
+def make_data(count=3):
+    """Create document data with a portfolio of the given number of securities."""
+    return {
+        "metadata": {"document_date": "2025-03-31", "title": "Q1 <statement> & notes"},
+        "financial_data": {
+            "portfolio": {
+                "securities": [
+                    {"isin": f"XS{i:09d}7", "security_name": f"Bond {i}", "value": i * 1000.5}
+                    for i in range(count)
+                ]
+            }
+        },
+        "entities": {"isin": [], "currency": ["USD", "EUR"]}
+    }
+
+def make_table_data():
+    """Create document data with tables whose rows are lists of cells, as extracted from PDFs and spreadsheets."""
+    return {
+        "tables": [
+            {
+                "type": "holdings",
+                "headers": ["ISIN", "Description", "Valuation"],
+                "data": [["XS2530201644", "TORONTO DOMINION BANK NOTES", 198745], ["XS2588105036", "CIBC NOTES", 199172]]
+            },
+            {
+                "data": [["Asset class", None, "Asset class", "Weight"], ["Bonds", "", "Fixed income", 0.4]]
+            }
+        ]
+    }
+
+class TestDataExportAgent(unittest.TestCase):
+    """Tests for the DataExportAgent."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.agent = DataExportAgent(output_dir=self.temp_dir.name, chunk_size=256)
+
+    def tearDown(self):
+        """Clean up the test."""
+        self.temp_dir.cleanup()
+
+    def test_csv_is_written_from_an_iterator(self):
+        """Test that rows can come from a generator and columns are matched by name."""
+        rows = ({"date": f"2025-01-{i % 28 + 1:02d}", "amount": i} for i in range(1000))
+        data = {"tables": [{"type": "transactions", "data": rows}]}
+        filepath = self.agent.export_data(data, "csv", "transactions")
+
+        with open(filepath, newline='', encoding='utf-8') as f:
+            written = list(csv.DictReader(f))
+        self.assertEqual(len(written), 1000)
+        self.assertEqual(written[999], {"date": "2025-01-20", "amount": "999"})
+
+        # Columns of a list are collected from all rows
+        data = {"tables": [{"data": [{"a": 1}, {"b": 2, "a": 3}]}]}
+        with open(self.agent.export_data(data, "csv", "mixed"), encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ["a,b", "1,", "3,2"])
+
+    def test_csv_of_rows_that_are_lists(self):
+        """Test that list rows are written by position under the table headers, or the first row without them."""
+        with open(self.agent.export_data(make_table_data(), "csv", "holdings"), newline="", encoding="utf-8") as f:
+            written = list(csv.reader(f))
+        self.assertEqual(written, [
+            ["ISIN", "Description", "Valuation"],
+            ["XS2530201644", "TORONTO DOMINION BANK NOTES", "198745"],
+            ["XS2588105036", "CIBC NOTES", "199172"]
+        ])
+
+        data = make_table_data()
+        data["tables"] = data["tables"][1:]
+        with open(self.agent.export_data(data, "csv", "allocation"), newline="", encoding="utf-8") as f:
+            written = list(csv.reader(f))
+        self.assertEqual(written, [["Asset class", "Column_2", "Asset class_3", "Weight"], ["Bonds", "", "Fixed income", "0.4"]])
+
+    def test_rows_that_are_lists_from_an_iterator(self):
+        """Test that list rows read once still take the first row as the header."""
+        fields, rows = self.agent._table_fields(iter([["ISIN", "Value"], ["XS0000000017", 10, "extra"]]))
+        self.assertEqual(fields, ["ISIN", "Value"])
+        self.assertEqual(list(rows), [{"ISIN": "XS0000000017", "Value": 10}])
+
+    def test_xml_keeps_the_document_structure(self):
+        """Test that the incremental XML writer produces the same elements as before."""
+        filepath = self.agent.export_data(make_data(), "xml", "document")
+        root = ET.parse(filepath).getroot()
+
+        self.assertEqual(root.tag, "document")
+        self.assertEqual(root.find("metadata/title").text, "Q1 <statement> & notes")
+        securities = root.findall("financial_data/portfolio/securities/item")
+        self.assertEqual(len(securities), 3)
+        self.assertEqual(securities[2].find("value").text, "2001.0")
+        self.assertEqual([item.text for item in root.findall("entities/currency/item")], ["USD", "EUR"])
+        self.assertEqual(list(root.find("entities/isin")), [])
+
+    def test_iter_export_streams_the_same_content_in_chunks(self):
+        """Test that streamed exports equal the exported files."""
+        data = make_data(count=50)
+        for format_type in ["json", "csv", "xml"]:
+            chunks = list(self.agent.iter_export(data, format_type))
+            self.assertGreater(len(chunks), 1)
+            with open(self.agent.export_data(data, format_type, f"streamed_{format_type}"), 'rb') as f:
+                self.assertEqual(b"".join(chunks), f.read())
+
+        self.assertEqual(json.loads(b"".join(self.agent.iter_export(data, "json"))), data)
+
+        summary = json.loads(b"".join(self.agent.iter_export(data, "json", export_type="isin_list")))
+        self.assertEqual(summary["isin_entities"], [])
+
+    def test_unsupported_or_untabular_exports_fail_before_streaming(self):
+        """Test that invalid exports raise when the stream is created."""
+        with self.assertRaises(ValueError):
+            self.agent.iter_export(make_data(), "docx")
+        with self.assertRaises(ValueError):
+            self.agent.iter_export({"metadata": {"title": "x"}}, "csv")
+
+        result = self.agent.process({"data": {"metadata": {"title": "x"}}, "format_type": "csv"})
+        self.assertEqual(result["status"], "error")
+
+    def test_missing_writer_dependency_fails_before_streaming(self):
+        """Test that a Parquet stream without pyarrow raises when it is created."""
+        with patch.dict(sys.modules, {"pyarrow": None}):
+            with self.assertRaisesRegex(ValueError, "requires pyarrow"):
+                self.agent.iter_export(make_data(), "parquet")
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl is not installed")
+    def test_excel_export(self):
+        """Test that the write-only workbook has one sheet per section."""
+        from openpyxl import load_workbook
+
+        filepath = self.agent.export_data(make_data(), "excel", "document")
+        workbook = load_workbook(filepath, read_only=True)
+        self.assertEqual(workbook.sheetnames, ["Summary", "Entities", "Portfolio"])
+        rows = list(workbook["Portfolio"].values)
+        self.assertEqual(rows[0], ("isin", "security_name", "value"))
+        self.assertEqual(rows[3], ("XS0000000027", "Bond 2", 2001.0))
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl is not installed")
+    def test_excel_export_of_rows_that_are_lists(self):
+        """Test that tables whose rows are lists get a sheet with their headers."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.agent.export_data(make_table_data(), "excel", "tables"), read_only=True)
+        self.assertEqual(workbook.sheetnames, ["holdings", "Table_2"])
+        self.assertEqual(list(workbook["holdings"].values), [
+            ("ISIN", "Description", "Valuation"),
+            ("XS2530201644", "TORONTO DOMINION BANK NOTES", 198745),
+            ("XS2588105036", "CIBC NOTES", 199172)
+        ])
+        self.assertEqual(list(workbook["Table_2"].values), [
+            ("Asset class", "Column_2", "Asset class_3", "Weight"), ("Bonds", None, "Fixed income", 0.4)
+        ])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet_export_of_rows_that_are_lists(self):
+        """Test that list rows become named Parquet columns."""
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.agent.export_data(make_table_data(), "parquet", "holdings"))
+        self.assertEqual(table.column_names, ["ISIN", "Description", "Valuation"])
+        self.assertEqual(table.column("Valuation").to_pylist(), [198745, 199172])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet_export_in_row_groups(self):
+        """Test that Parquet exports are written in batches of rows."""
+        import pyarrow.parquet as pq
+
+        self.agent.parquet_batch_size = 20
+        parquet_file = pq.ParquetFile(self.agent.export_data(make_data(count=50), "parquet", "portfolio"))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(parquet_file.read().column("isin").to_pylist()[49], "XS0000000497")
+
+if __name__ == "__main__":
+    unittest.main()
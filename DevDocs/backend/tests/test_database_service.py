@@ -0,0 +1,128 @@
+"""
+Tests for the database service, against a fake connection pool.
+"""
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add the services directory to the path so we can import the database service
+sys.path.append(str(Path(__file__).parent.parent.parent / "services"))
+
+from database_service import DatabaseService
+
+SCHEMA_ROWS = [
+    {"table_name": "documents", "table_description": None, "column_name": "id", "data_type": "integer",
+     "is_nullable": "NO", "column_default": None, "column_description": "Primary key"},
+    {"table_name": "documents", "table_description": None, "column_name": "title", "data_type": "text",
+     "is_nullable": "YES", "column_default": None, "column_description": None}
+]
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetched = None
+
+    async def fetch(self, n):
+        self.fetched = n
+        return self.rows[:n]
+
+class FakeConnection:
+    """Records how queries are sent."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.fetches = 0
+        self.executed = []
+
+    def transaction(self):
+        return FakeTransaction()
+
+    async def cursor(self, query, *args):
+        cursor = FakeCursor(self.rows)
+        self.cursors.append((query, args, cursor))
+        return cursor
+
+    async def prepare(self, query):
+        raise AssertionError("prepare() bypasses the statement cache")
+
+    async def fetch(self, query):
+        self.fetches += 1
+        return SCHEMA_ROWS
+
+    async def execute(self, query, *args):
+        self.executed.append(query)
+        return "UPDATE 3"
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def acquire(self):
+        return self.conn
+
+    async def release(self, conn):
+        pass
+
+    def get_size(self):
+        return 1
+
+    def get_idle_size(self):
+        return 1
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 10
+
+class TestDatabaseService(unittest.TestCase):
+    """Tests for the DatabaseService."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.conn = FakeConnection([{"id": i} for i in range(100)])
+        self.service = DatabaseService(schema_ttl=300)
+        self.service.pool = FakePool(self.conn)
+
+    def test_select_fetches_one_row_past_the_cap_through_a_cursor(self):
+        """Test that SELECT results are capped by the server-side cursor."""
+        rows = asyncio.run(self.service.execute_query("SELECT id FROM documents WHERE id > $1", [5], max_rows=10))
+
+        self.assertEqual(rows, [{"id": i} for i in range(10)])
+        query, args, cursor = self.conn.cursors[0]
+        self.assertEqual(args, (5,))
+        self.assertEqual(cursor.fetched, 11)
+
+    def test_schema_is_cached_until_ddl(self):
+        """Test that the schema is read once and re-read after a DDL statement."""
+        async def run():
+            first = await self.service.get_schema()
+            await self.service.get_schema()
+            await self.service.execute_query("ALTER TABLE documents ADD COLUMN notes text")
+            await self.service.get_schema()
+            return first
+
+        schema = asyncio.run(run())
+        self.assertEqual([column["name"] for column in schema["tables"][0]["columns"]], ["id", "title"])
+        self.assertEqual(self.conn.fetches, 2)
+
+        metrics = self.service.get_pool_metrics()
+        self.assertEqual((metrics["schema_cache_hits"], metrics["schema_cache_misses"]), (1, 2))
+        self.assertEqual(metrics["acquired"], 0)
+
+    def test_non_select_returns_affected_rows(self):
+        """Test that the command tag is parsed for the affected row count."""
+        result = asyncio.run(self.service.execute_query("UPDATE documents SET title = $1", ["x"]))
+        self.assertEqual(result, [{"affected_rows": 3}])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for the document comparison agent.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.document_comparison_agent import DocumentComparisonAgent
+
+def make_document(document_id, values, total_value):
+    """Create a portfolio document with one security per ISIN and value."""
+    securities = [
+        {"isin": isin, "security_name": f"Bond {isin}", "value": value, "currency": "USD"}
+        for isin, value in values.items()
+    ]
+    return {
+        "document_id": document_id,
+        "financial_data": {"portfolio": {"summary": {"total_value": total_value}, "securities": securities}}
+    }
+
+class TestDocumentComparisonAgent(unittest.TestCase):
+    """Tests for the DocumentComparisonAgent."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.agent = DocumentComparisonAgent()
+
+    def test_compare_by_key_reports_added_removed_and_deltas(self):
+        """Test that rows are aligned by key with absolute and percent deltas."""
+        previous = [
+            {"ISIN": "XS0000000001", "Value": 100, "Currency": "USD"},
+            {"ISIN": "XS0000000002", "Value": 200, "Currency": "USD"},
+            {"ISIN": "XS0000000003", "Value": 300, "Currency": "USD"}
+        ]
+        current = [
+            {"ISIN": "XS0000000004", "Value": 50, "Currency": "USD"},
+            {"ISIN": "XS0000000002", "Value": 250, "Currency": "EUR"},
+            {"ISIN": "XS0000000001", "Value": 100.0, "Currency": "USD"}
+        ]
+        changes = self.agent._compare_table_data_by_key(current, previous, "ISIN")
+
+        self.assertEqual([(change["type"], change["key"]) for change in changes], [
+            ("added", "XS0000000004"), ("removed", "XS0000000003"), ("modified", "XS0000000002")
+        ])
+        self.assertEqual(changes[2]["changes"], {
+            "Value": {"previous": 200, "current": 250, "change": 50, "percent_change": 25.0},
+            "Currency": {"previous": "USD", "current": "EUR", "change": None, "percent_change": None}
+        })
+
+    def test_integer_changes_are_exact(self):
+        """Test that large integers are compared exactly and keep their type."""
+        previous = [{"ISIN": "XS0000000001", "Nominal": 2 ** 60}]
+        current = [{"ISIN": "XS0000000001", "Nominal": 2 ** 60 + 2}]
+        changes = self.agent._compare_table_data_by_key(current, previous, "ISIN")
+
+        change = changes[0]["changes"]["Nominal"]["change"]
+        self.assertEqual(change, 2)
+        self.assertIsInstance(change, int)
+
+    def test_integer_columns_are_held_exactly(self):
+        """Test that integer columns are typed as Int64 and missing values and large integers keep deltas exact."""
+        previous = [
+            {"ISIN": "XS0000000001", "Nominal": 1000, "Value": 2 ** 60 + 0.5},
+            {"ISIN": "XS0000000002", "Nominal": None, "Value": 2 ** 60}
+        ]
+        current = [
+            {"ISIN": "XS0000000001", "Nominal": None, "Value": 2 ** 60 + 0.5},
+            {"ISIN": "XS0000000002", "Nominal": 2500, "Value": 2 ** 60 + 3}
+        ]
+        frame = self.agent._rows_frame(current, "ISIN")
+        self.assertEqual(str(frame["Nominal"].dtype), "Int64")
+        self.assertEqual(frame["Value"].dtype, object)
+
+        changes = self.agent._compare_table_data_by_key(current, previous, "ISIN")
+        self.assertEqual(changes[0]["changes"], {
+            "Nominal": {"previous": 1000, "current": None, "change": None, "percent_change": None}
+        })
+        self.assertEqual(changes[1]["changes"], {
+            "Nominal": {"previous": None, "current": 2500, "change": None, "percent_change": None},
+            "Value": {"previous": 2 ** 60, "current": 2 ** 60 + 3, "change": 3, "percent_change": 3 / 2 ** 60 * 100}
+        })
+        self.assertIsInstance(changes[1]["changes"]["Value"]["change"], int)
+
+    def test_compare_by_position(self):
+        """Test that tables without a key are compared row by row."""
+        previous = [{"Value": 10, "Note": None}, {"Value": 0, "Note": "a"}]
+        current = [{"Value": 10}, {"Value": 5, "Note": "a"}, {"Value": 7, "Note": "b"}]
+        changes = self.agent._compare_table_data_by_position(current, previous)
+
+        self.assertEqual(changes, [
+            {"type": "row_count_changed", "previous_count": 2, "current_count": 3},
+            {"index": 1, "type": "modified", "changes": {
+                "Value": {"previous": 0, "current": 5, "change": 5, "percent_change": None}
+            }},
+            {"index": 2, "type": "added", "data": {"Value": 7, "Note": "b"}}
+        ])
+
+    def test_tables_without_key_match_rows_by_normalized_name(self):
+        """Test that a name column is used as a fuzzy key when no key field exists."""
+        previous_doc = {"tables": [{"type": "holdings", "data": [
+            {"Security Name": "Apple Inc.", "Value": 100},
+            {"Security Name": "Microsoft  Corp", "Value": 200}
+        ]}]}
+        current_doc = {"tables": [{"type": "holdings", "data": [
+            {"Security Name": "MICROSOFT CORP", "Value": 220},
+            {"Security Name": "apple inc", "Value": 100}
+        ]}]}
+        changes = self.agent._compare_tables(current_doc, previous_doc)["table_changes"]["holdings"]
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["key"], "microsoft corp")
+        self.assertEqual(changes[0]["changes"]["Value"]["change"], 20)
+
+    def test_process_compares_a_series_of_documents(self):
+        """Test that each document of a series is compared with the one before it."""
+        documents = [
+            make_document("q1", {"XS0000000001": 100, "XS0000000002": 200}, 300),
+            make_document("q2", {"XS0000000001": 150, "XS0000000002": 200}, 350),
+            make_document("q3", {"XS0000000001": 150}, 150)
+        ]
+        response = self.agent.process({"documents": documents})
+
+        self.assertEqual(response["status"], "success")
+        result = response["comparison_result"]
+        self.assertEqual(result["document_ids"], ["q1", "q2", "q3"])
+        self.assertEqual(result["total_values"], [300, 350, 150])
+        self.assertEqual(len(result["comparisons"]), 2)
+
+        first, second = (comparison["portfolio_comparison"] for comparison in result["comparisons"])
+        self.assertEqual(first["security_changes"][0]["changes"]["value"]["percent_change"], 50.0)
+        self.assertEqual([security["isin"] for security in second["removed_securities"]], ["XS0000000002"])
+        self.assertEqual(
+            {change["current_document_id"] for change in result["summary"]["significant_changes"]},
+            {"q2", "q3"}
+        )
+
+        self.assertEqual(self.agent.process({"documents": documents[:1]})["status"], "error")
+
+if __name__ == "__main__":
+    unittest.main()
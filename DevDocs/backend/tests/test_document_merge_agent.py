@@ -0,0 +1,74 @@
+"""
+Tests for the normalized document cache of the document merge agent.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.document_merge_agent import DocumentMergeAgent
+
+def make_portfolio_document(value=1000):
+    """Create a portfolio statement whose securities are only in its tables."""
+    return {
+        "metadata": {"document_date": "2024-01-31"},
+        "tables": [{
+            "type": "portfolio",
+            "data": [
+                {"Name": "Bond A", "ISIN": "XS0000000001", "Value": value},
+                {"Name": "Bond B", "ISIN": "XS0000000002", "Value": 500}
+            ]
+        }]
+    }
+
+class TestNormalizedCache(unittest.TestCase):
+    """Tests for DocumentMergeAgent._get_normalized."""
+
+    def setUp(self):
+        """Set up the agent and a builder that counts its calls."""
+        self.agent = DocumentMergeAgent()
+        self.builds = 0
+
+    def build(self, document):
+        self.builds += 1
+        return self.agent._portfolio_securities_from_tables(document)
+
+    def test_equal_tables_hit_the_cache(self):
+        """Test that documents with equal tables are normalized once."""
+        first = self.agent._get_normalized(make_portfolio_document(), "portfolio_table", self.build)
+        second = self.agent._get_normalized(make_portfolio_document(), "portfolio_table", self.build)
+
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(first, second)
+        self.assertEqual([security["isin"] for security in first], ["XS0000000001", "XS0000000002"])
+
+    def test_changed_tables_are_normalized_again(self):
+        """Test that a change to the tables invalidates the cached value, and other fields do not."""
+        document = make_portfolio_document()
+        self.agent._get_normalized(document, "portfolio_table", self.build)
+
+        document["metadata"]["document_date"] = "2024-02-29"
+        self.agent._get_normalized(document, "portfolio_table", self.build)
+        self.assertEqual(self.builds, 1)
+
+        document["tables"][0]["data"][0]["Value"] = 1200
+        securities = self.agent._get_normalized(document, "portfolio_table", self.build)
+        self.assertEqual(self.builds, 2)
+        self.assertEqual(securities[0]["value"], 1200)
+
+    def test_cached_values_are_isolated(self):
+        """Test that changing a returned value does not change what later merges get."""
+        merged = self.agent.merge_documents([make_portfolio_document()])
+        securities = merged["merged_data"]["portfolio"]["securities"]
+        securities[0]["value"] = 0
+        securities.clear()
+
+        merged = self.agent.merge_documents([make_portfolio_document()])
+        portfolio = merged["merged_data"]["portfolio"]
+        self.assertEqual([security["value"] for security in portfolio["securities"]], [1000, 500])
+        self.assertEqual(portfolio["summary"]["total_value"], 1500)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Tests for the OCR keyword corrector.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.keyword_corrector import KeywordCorrector
+
+KEYWORDS = ["סך הכל", "חשבון", "השקעות", "ריבית", "דיבידנד", "שער"]
+
+class TestKeywordCorrector(unittest.TestCase):
+    """Tests for the KeywordCorrector."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.corrector = KeywordCorrector(KEYWORDS)
+
+    def test_exact_keyword_is_kept(self):
+        """Test that keywords are returned unchanged."""
+        self.assertEqual(self.corrector.lookup("חשבון"), "חשבון")
+
+    def test_single_edit_is_corrected(self):
+        """Test substitution, deletion and transposition errors within distance 1."""
+        self.assertEqual(self.corrector.lookup("חשבוו"), "חשבון")
+        self.assertEqual(self.corrector.lookup("ריבת"), "ריבית")
+        self.assertEqual(self.corrector.lookup("ירבית"), "ריבית")
+
+    def test_long_keywords_allow_two_edits(self):
+        """Test that long keywords are corrected at distance 2."""
+        self.assertEqual(self.corrector.lookup("דיבדנר"), "דיבידנד")
+
+    def test_distant_and_short_words_are_not_corrected(self):
+        """Test that unrelated words and short keywords are not over-corrected."""
+        self.assertIsNone(self.corrector.lookup("מניות"))
+        self.assertIsNone(self.corrector.lookup("שעה"))
+        self.assertEqual(self.corrector.lookup("שער"), "שער")
+
+    def test_correct_rebuilds_text_in_one_pass(self):
+        """Test that only whole words are corrected and punctuation is kept."""
+        text = "יתרת חשבוו: 1,000 ריבת (ריבית) חשבונות"
+        self.assertEqual(self.corrector.correct(text), "יתרת חשבון: 1,000 ריבית (ריבית) חשבונות")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the knowledge base ANN index.
+"""
+import sys
+import unittest
+import numpy as np
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.knowledge_base_index import KnowledgeBaseIndex
+
+class TestKnowledgeBaseIndex(unittest.TestCase):
+    """Tests for the KnowledgeBaseIndex."""
+
+    def setUp(self):
+        """Set up the test."""
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(300, 16)).astype(np.float32)
+        self.ids = list(range(1, 301))
+        self.entries = [{"id": i, "type": "rule", "content": f"rule {i}"} for i in self.ids]
+
+    def test_exact_search(self):
+        """Test exact search below the training threshold."""
+        index = KnowledgeBaseIndex()
+        index.add(self.ids, self.vectors, self.entries)
+
+        results = index.search(self.vectors[41], k=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][0]["id"], 42)
+        self.assertAlmostEqual(results[0][1], 0.0, places=5)
+        self.assertLessEqual(results[0][1], results[1][1])
+
+    def test_partitioned_search(self):
+        """Test IVF search once the index is trained."""
+        index = KnowledgeBaseIndex(min_train_size=100, n_probe=4)
+        index.add(self.ids, self.vectors, self.entries)
+
+        self.assertIsNotNone(index.centroids)
+        for position in (0, 150, 299):
+            results = index.search(self.vectors[position], k=1)
+            self.assertEqual(results[0][0]["id"], self.ids[position])
+
+    def test_incremental_add(self):
+        """Test adding and replacing entries after training."""
+        index = KnowledgeBaseIndex(min_train_size=100)
+        index.add(self.ids[:200], self.vectors[:200], self.entries[:200])
+        index.add(self.ids[200:250], self.vectors[200:250], self.entries[200:250])
+
+        self.assertEqual(len(index), 250)
+        self.assertEqual(index.max_id, 250)
+        self.assertEqual(index.search(self.vectors[220], k=1)[0][0]["id"], 221)
+
+        # Replacing an entry keeps the size and updates the payload
+        index.add([221], self.vectors[220:221], [{"id": 221, "content": "updated"}])
+        self.assertEqual(len(index), 250)
+        self.assertEqual(index.search(self.vectors[220], k=1)[0][0]["content"], "updated")
+
+    def test_empty_index(self):
+        """Test searching an empty index."""
+        index = KnowledgeBaseIndex()
+        self.assertEqual(index.search(np.ones(16), k=5), [])
+
+if __name__ == "__main__":
+    unittest.main()
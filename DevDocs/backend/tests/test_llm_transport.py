@@ -0,0 +1,244 @@
+"""
+Tests for the shared LLM transports, against a local OpenAI-compatible server.
+"""
+import sys
+import json
+import time
+import asyncio
+import threading
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the services directory and the backend to the path so we can import the transports
+sys.path.append(str(Path(__file__).parent.parent.parent / "services"))
+sys.path.append(str(Path(__file__).parent.parent))
+
+from llm_transport import LLMTransport, LLMTransportError
+from utils.openrouter_client import OpenRouterClient, OpenRouterError, get_metrics
+from utils.chat_completions import CompletionStream
+
+TOKENS = ["The ", "portfolio ", "is ", "balanced."]
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint that fails the first requests and counts concurrent ones."""
+
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    delay = 0.0
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requests = 0
+    ports = set()
+
+    def do_POST(self):
+        cls = type(self)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with cls.lock:
+            cls.requests += 1
+            cls.ports.add(self.client_address[1])
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            fail = cls.failures > 0
+            cls.failures -= 1
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.active -= 1
+
+        if self.headers.get("Authorization") != "Bearer test-key":
+            self._send(401, b'{"error": {"message": "invalid key"}}', "application/json")
+        elif fail:
+            self._send(503, b'{"error": {"message": "overloaded"}}', "application/json", {"Retry-After": "0"})
+        elif body.get("stream"):
+            events = [": OPENROUTER PROCESSING"]
+            for token in TOKENS:
+                events.append("data: " + json.dumps({"choices": [{"delta": {"content": token}}]}))
+            events.append("data: " + json.dumps({"choices": [], "usage": {"completion_tokens": 4}}))
+            events.append("data: [DONE]")
+            self._send(200, "\n\n".join(events).encode() + b"\n\n", "text/event-stream")
+        else:
+            data = {
+                "id": "gen-1",
+                "model": body["model"],
+                "choices": [{"message": {"role": "assistant", "content": "".join(TOKENS)}}],
+                "usage": {"completion_tokens": 4}
+            }
+            self._send(200, json.dumps(data).encode(), "application/json")
+
+    def _send(self, status, content, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+class TransportTestCase(unittest.TestCase):
+    """Runs the mock server."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the server."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+        cls.server.daemon_threads = True
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/api/v1"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Reset the server state."""
+        MockHandler.failures = 0
+        MockHandler.delay = 0.0
+        MockHandler.max_active = 0
+        MockHandler.requests = 0
+        MockHandler.ports = set()
+
+class TestLLMTransport(TransportTestCase):
+    """Tests for the async LLMTransport."""
+
+    def make_transport(self, **kwargs):
+        return LLMTransport(base_url=self.base_url, backoff_base=0.01, **kwargs)
+
+    def test_requests_reuse_one_connection(self):
+        """Test that sequential requests share the pooled connection."""
+        transport = self.make_transport()
+
+        async def run():
+            try:
+                return [await transport.chat("test-key", "m", [{"role": "user", "content": "hi"}]) for _ in range(3)]
+            finally:
+                await transport.close()
+
+        responses = asyncio.run(run())
+        self.assertEqual(responses[2]["choices"][0]["message"]["content"], "The portfolio is balanced.")
+        self.assertEqual(MockHandler.requests, 3)
+        self.assertEqual(len(MockHandler.ports), 1)
+        self.assertEqual(transport.metrics()["m"]["requests"], 3)
+
+    def test_stream_yields_tokens_and_records_metrics(self):
+        """Test that streamed pieces arrive in order and throughput is measured."""
+        transport = self.make_transport()
+
+        async def run():
+            try:
+                return [piece async for piece in transport.stream("test-key", "m", [{"role": "user", "content": "hi"}])]
+            finally:
+                await transport.close()
+
+        self.assertEqual(asyncio.run(run()), TOKENS)
+        metrics = transport.metrics()["m"]
+        self.assertEqual(metrics["requests"], 1)
+        self.assertIsNotNone(metrics["average_time_to_first_token"])
+
+    def test_retries_transient_errors(self):
+        """Test that 503 responses are retried and client errors are not."""
+        MockHandler.failures = 2
+        transport = self.make_transport()
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            try:
+                data = await transport.chat("test-key", "m", messages)
+                with self.assertRaises(LLMTransportError) as raised:
+                    await transport.chat("wrong-key", "m", messages)
+                return data, raised.exception
+            finally:
+                await transport.close()
+
+        data, error = asyncio.run(run())
+        self.assertEqual(data["id"], "gen-1")
+        self.assertEqual(error.status, 401)
+        self.assertEqual(MockHandler.requests, 4)
+        self.assertEqual(transport.metrics()["m"]["retries"], 2)
+        self.assertEqual(transport.metrics()["m"]["failures"], 1)
+
+    def test_concurrency_is_limited_per_model(self):
+        """Test that no more than the model's limit of requests run at once."""
+        MockHandler.delay = 0.05
+        transport = self.make_transport(model_concurrency={"m": 2})
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            try:
+                await asyncio.gather(*(transport.chat("test-key", "m", messages) for _ in range(6)))
+            finally:
+                await transport.close()
+
+        asyncio.run(run())
+        self.assertEqual(MockHandler.requests, 6)
+        self.assertEqual(MockHandler.max_active, 2)
+
+    def test_session_of_a_previous_loop_is_closed(self):
+        """Test that a new event loop gets a new session and the old one is closed in its own loop."""
+        transport = self.make_transport()
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            await transport.chat("test-key", "m", messages)
+            return transport._session
+
+        async def run_and_close():
+            try:
+                return await run()
+            finally:
+                await transport.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            first = loop.run_until_complete(run())
+            second = asyncio.run(run_and_close())
+            self.assertIsNot(first, second)
+            self.assertTrue(second.closed)
+
+            # The old session is closed once its loop runs again
+            loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop)))
+            self.assertTrue(first.closed)
+        finally:
+            loop.close()
+
+    def test_stream_error_event(self):
+        """Test that an error event of the stream raises with its code and data."""
+        stream = CompletionStream(lambda error, data: LLMTransportError(error["message"], error["code"], data))
+        self.assertEqual(stream.feed(b": keep-alive\n"), [])
+        self.assertEqual(stream.feed(b'data: {"choices": [{"delta": {"content": "The "}}]}\n'), ["The "])
+
+        with self.assertRaises(LLMTransportError) as raised:
+            stream.feed(b'data: {"error": {"message": "overloaded", "code": 502}}\n')
+        self.assertEqual(raised.exception.status, 502)
+        self.assertIn("overloaded", raised.exception.body)
+        self.assertEqual(stream.chunks, 1)
+
+class TestOpenRouterClient(TransportTestCase):
+    """Tests for the pooled OpenRouterClient."""
+
+    def test_chat_completion_and_stream(self):
+        """Test that completions are retried, streamed and measured."""
+        MockHandler.failures = 1
+        client = OpenRouterClient("test-key", base_url=self.base_url, backoff_base=0.01)
+        messages = [{"role": "user", "content": "hi"}]
+
+        response = client.chat_completion(messages, model="client-model")
+        self.assertEqual(response["choices"][0]["message"]["content"], "The portfolio is balanced.")
+        self.assertEqual(list(client.stream_chat_completion(messages, model="client-model")), TOKENS)
+
+        metrics = get_metrics()["client-model"]
+        self.assertEqual(metrics["requests"], 2)
+        self.assertEqual(metrics["retries"], 1)
+        self.assertIsNotNone(metrics["tokens_per_second"])
+
+        with self.assertRaises(OpenRouterError) as raised:
+            OpenRouterClient("wrong-key", base_url=self.base_url).chat_completion(messages, model="client-model")
+        self.assertEqual(raised.exception.status_code, 401)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the on-disk OCR cache.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the document understanding modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+import document_understanding.ocr_cache as ocr_cache
+from document_understanding.ocr_cache import OCRCache
+
+class RecordingEngine:
+    """OCR engine that returns the mean pixel value and records its calls."""
+
+    backend = "test"
+
+    def __init__(self):
+        self.calls = []
+
+    def image_to_string(self, image, lang="eng", config=""):
+        self.calls.append((lang, config))
+        return f"mean={np.asarray(image).mean():.1f}"
+
+class TestOCRCache(unittest.TestCase):
+    """Tests for the OCRCache."""
+
+    def setUp(self):
+        """Use a recording engine and a temporary cache directory."""
+        self.engine = RecordingEngine()
+        self._get_ocr_engine = ocr_cache.get_ocr_engine
+        ocr_cache.get_ocr_engine = lambda: self.engine
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.page = np.full((20, 30), 200, dtype=np.uint8)
+
+    def tearDown(self):
+        """Restore the engine and remove the cache directory."""
+        ocr_cache.get_ocr_engine = self._get_ocr_engine
+        self.temp_dir.cleanup()
+
+    def test_hits_skip_preprocessing(self):
+        """Test that the key is taken from the original page, so hits skip the preprocessing."""
+        cache = OCRCache(self.temp_dir.name)
+        preprocessed = []
+
+        def invert(image):
+            preprocessed.append(image)
+            return 255 - image
+
+        texts = [cache.image_to_string(self.page, lang="eng+heb", config="--psm 6", preprocess=invert, variant="invert")
+                 for _ in range(3)]
+
+        self.assertEqual(texts, ["mean=55.0"] * 3)
+        self.assertEqual(len(preprocessed), 1)
+        self.assertEqual(self.engine.calls, [("eng+heb", "--psm 6")])
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        # Another preprocessing of the same page is a different entry
+        self.assertEqual(cache.image_to_string(self.page, config="--psm 6", preprocess=lambda image: image), "mean=200.0")
+        self.assertEqual(len(self.engine.calls), 2)
+
+    def test_unusable_directory_disables_the_cache(self):
+        """Test that OCR still runs when the cache directory cannot be created."""
+        blocker = os.path.join(self.temp_dir.name, "file")
+        with open(blocker, "w") as f:
+            f.write("not a directory")
+
+        cache = OCRCache(os.path.join(blocker, "cache"))
+        self.assertFalse(cache.enabled)
+
+        texts = [cache.image_to_string(self.page, preprocess=lambda image: image // 2) for _ in range(2)]
+        self.assertEqual(texts, ["mean=100.0"] * 2)
+        self.assertEqual(len(self.engine.calls), 2)
+
+if __name__ == "__main__":
+    unittest.main()
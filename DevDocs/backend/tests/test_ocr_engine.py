@@ -0,0 +1,188 @@
+"""
+Tests for the pool of Tesseract engines, with stub engines in place of tesserocr.
+"""
+import sys
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from PIL import Image
+
+# Add the parent directory to the path so we can import the document understanding modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+import document_understanding.ocr_engine as ocr_engine
+from document_understanding.ocr_engine import OCREnginePool
+
+RIL = SimpleNamespace(BLOCK="block", PARA="para", TEXTLINE="line", WORD="word")
+
+class StubWord:
+    """Iterator position on a word, starting the elements listed in starts."""
+
+    def __init__(self, text, box, starts=(), boxes=None):
+        self.text = text
+        self.box = box
+        self.starts = set(starts)
+        self.boxes = boxes or {}
+
+    def IsAtBeginningOf(self, level):
+        return level in self.starts
+
+    def BoundingBox(self, level):
+        return self.box if level == RIL.WORD else self.boxes.get(level, self.box)
+
+    def Confidence(self, level):
+        return 91.5
+
+    def GetUTF8Text(self, level):
+        return self.text
+
+# Two lines in one block and paragraph
+WORDS = [
+    StubWord("Total", (10, 10, 60, 30), starts=(RIL.BLOCK, RIL.PARA, RIL.TEXTLINE),
+             boxes={RIL.BLOCK: (10, 10, 150, 70), RIL.PARA: (10, 10, 150, 70), RIL.TEXTLINE: (10, 10, 150, 30)}),
+    StubWord("assets", (70, 10, 150, 30)),
+    StubWord("100%", (10, 50, 80, 70), starts=(RIL.TEXTLINE,), boxes={RIL.TEXTLINE: (10, 50, 80, 70)})
+]
+
+class StubEngine:
+    """Records how it is used, like a PyTessBaseAPI."""
+
+    def __init__(self, engine_config):
+        self.engine_config = engine_config
+        self.images = []
+        self.cleared = 0
+        self.ended = False
+
+    def SetImage(self, image):
+        self.images.append(image)
+
+    def GetUTF8Text(self):
+        return f"text of {self.engine_config[0]}"
+
+    def Recognize(self):
+        pass
+
+    def GetIterator(self):
+        return WORDS
+
+    def Clear(self):
+        self.cleared += 1
+
+    def End(self):
+        self.ended = True
+
+class StubPool(OCREnginePool):
+    """Pool creating stub engines."""
+
+    def __init__(self, pool_size):
+        super().__init__(pool_size)
+        self.engines = []
+
+    def _create_engine(self, engine_config):
+        engine = StubEngine(engine_config)
+        self.engines.append(engine)
+        return engine
+
+class TestOCREnginePool(unittest.TestCase):
+    """Tests for OCREnginePool."""
+
+    def setUp(self):
+        """Make the pool believe tesserocr is installed."""
+        patches = [
+            patch.object(ocr_engine, "tesserocr", SimpleNamespace()),
+            patch.object(ocr_engine, "RIL", RIL, create=True),
+            patch.object(ocr_engine, "iterate_level", lambda iterator, level: iter(iterator), create=True)
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.pool = StubPool(pool_size=2)
+        self.image = Image.new("L", (200, 100), 255)
+
+    def test_engines_are_reused(self):
+        """Test that sequential calls check out the same engine, cleared after each call."""
+        for _ in range(3):
+            self.assertEqual(self.pool.image_to_string(self.image, lang="eng", config="--psm 6"), "text of eng")
+
+        self.assertEqual(len(self.pool.engines), 1)
+        self.assertEqual(self.pool.engines[0].cleared, 3)
+        self.assertEqual(self.pool.engines[0].engine_config, ("eng", 6, None, ()))
+
+    def test_configurations_get_their_own_engines(self):
+        """Test that languages and config options are not mixed on one engine."""
+        self.pool.image_to_string(self.image, lang="eng")
+        self.pool.image_to_string(self.image, lang="heb")
+        self.pool.image_to_string(self.image, lang="eng", config="-c preserve_interword_spaces=1")
+
+        self.assertEqual([engine.engine_config for engine in self.pool.engines], [
+            ("eng", None, None, ()), ("heb", None, None, ()), ("eng", None, None, (("preserve_interword_spaces", "1"),))
+        ])
+
+    def test_checkouts_wait_for_an_engine_when_the_pool_is_full(self):
+        """Test that no more than pool_size engines are created for a configuration."""
+        engine_config = ("eng", None, None, ())
+        checked_out = []
+
+        with self.pool._engine(engine_config) as first, self.pool._engine(engine_config) as second:
+            waiting = threading.Thread(target=lambda: checked_out.append(self.pool._engine(engine_config).__enter__()))
+            waiting.start()
+            waiting.join(0.2)
+            self.assertTrue(waiting.is_alive())
+
+        waiting.join(5)
+        self.assertEqual(len(self.pool.engines), 2)
+        self.assertIn(checked_out[0], (first, second))
+
+    def test_failed_engine_creation_frees_its_slot(self):
+        """Test that an engine that cannot be created does not count against the pool."""
+        with patch.object(StubPool, "_create_engine", side_effect=RuntimeError("no traineddata")):
+            with self.assertRaises(RuntimeError):
+                self.pool.image_to_string(self.image, lang="xyz")
+
+        self.pool.image_to_string(self.image, lang="xyz")
+        self.assertEqual(len(self.pool.engines), 1)
+
+    def test_unsupported_config_falls_back_to_pytesseract(self):
+        """Test that options the engines do not understand are run through pytesseract."""
+        with patch.object(ocr_engine.pytesseract, "image_to_string", return_value="fallback") as fallback:
+            self.assertEqual(self.pool.image_to_string(self.image, config="--dpi 300"), "fallback")
+
+        fallback.assert_called_once_with(self.image, lang="eng", config="--dpi 300")
+        self.assertEqual(self.pool.engines, [])
+
+    def test_without_tesserocr_every_call_falls_back(self):
+        """Test that the pool is inactive when tesserocr is not installed."""
+        with patch.object(ocr_engine, "tesserocr", None), \
+             patch.object(ocr_engine.pytesseract, "image_to_string", return_value="fallback"):
+            self.assertEqual(self.pool.image_to_string(self.image, config="--psm 6"), "fallback")
+        self.assertEqual(self.pool.engines, [])
+
+    def test_data_has_rows_for_every_level(self):
+        """Test that image_to_data has page, block, paragraph and line rows like pytesseract's output."""
+        data = self.pool.image_to_data(self.image)
+
+        self.assertEqual(data["level"], [1, 2, 3, 4, 5, 5, 4, 5])
+        self.assertEqual(data["line_num"], [0, 0, 0, 1, 1, 1, 2, 2])
+        self.assertEqual(data["word_num"], [0, 0, 0, 0, 1, 2, 0, 1])
+        self.assertEqual(data["text"], ["", "", "", "", "Total", "assets", "", "100%"])
+        self.assertEqual(data["conf"], [-1, -1, -1, -1, 91.5, 91.5, -1, 91.5])
+        self.assertEqual((data["width"][0], data["height"][0]), (200, 100))
+        self.assertEqual((data["left"][2], data["width"][2]), (10, 140))
+
+    def test_close_ends_idle_engines(self):
+        """Test that closing the pool ends its engines and later calls create new ones."""
+        self.pool.image_to_string(self.image)
+        engine = self.pool.engines[0]
+
+        self.pool.close()
+        self.assertTrue(engine.ended)
+
+        self.pool.image_to_string(self.image)
+        self.assertEqual(len(self.pool.engines), 2)
+
+if __name__ == "__main__":
+    unittest.main()
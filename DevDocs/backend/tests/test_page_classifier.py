@@ -0,0 +1,49 @@
+"""
+Tests for the per-page text layer classifier.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the document understanding modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from document_understanding.page_classifier import PageClassifier
+
+NATIVE_TEXT = (
+    "Portfolio statement as of 31.03.2024\n"
+    "ISIN XS2530201644 Toronto Dominion Bank Notes 200,000 USD valuation 199,080\n"
+)
+
+class TestPageClassifier(unittest.TestCase):
+    """Tests for the PageClassifier."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.classifier = PageClassifier()
+
+    def test_native_page_uses_text_layer(self):
+        """Test that a page with a good text layer does not need OCR."""
+        result = self.classifier.classify_text(NATIVE_TEXT, text_coverage=0.2, image_coverage=0.0)
+        self.assertFalse(result["needs_ocr"])
+        self.assertEqual(result["text"], NATIVE_TEXT)
+
+    def test_empty_page_needs_ocr(self):
+        """Test that a page with little or no text needs OCR."""
+        self.assertTrue(self.classifier.classify_text("")["needs_ocr"])
+        self.assertTrue(self.classifier.classify_text("Page 3 of 12")["needs_ocr"])
+
+    def test_unmapped_glyphs_need_ocr(self):
+        """Test that a text layer of unmapped glyphs needs OCR."""
+        text = " ".join("(cid:%d)" % i for i in range(100))
+        result = self.classifier.classify_text(text)
+        self.assertTrue(result["needs_ocr"])
+        self.assertLess(result["quality"], 0.7)
+
+    def test_scanned_page_with_stamped_text_needs_ocr(self):
+        """Test that an image-covered page with a sparse text layer needs OCR."""
+        result = self.classifier.classify_text(NATIVE_TEXT, text_coverage=0.001, image_coverage=0.95)
+        self.assertTrue(result["needs_ocr"])
+
+if __name__ == "__main__":
+    unittest.main()
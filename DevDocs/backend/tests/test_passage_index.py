@@ -0,0 +1,135 @@
+"""
+Tests for the BM25 passage index.
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the services directory and the repository root to the path so we can import the passage index and the agent
+sys.path.append(str(Path(__file__).parent.parent.parent / "services"))
+sys.path.append(str(Path(__file__).parent.parent.parent.parent))
+
+from passage_index import PassageIndex, estimate_tokens
+from DevDocs.agents.document_agent import DocumentAgent
+
+PAGES = [
+    {
+        "page": 1,
+        "text": "Portfolio statement for MESSOS ENTERPRISES LTD.\n\nThe portfolio is managed with a balanced mandate.",
+        "tables": []
+    },
+    {
+        "page": 2,
+        "text": "Bond holdings are listed below.\n\nCoupons are paid quarterly.",
+        "tables": [[
+            ["ISIN", "Description", "Valuation"],
+            ["XS2530201644", "TORONTO DOMINION BANK NOTES", "198'745"],
+            ["XS2588105036", "CANADIAN IMPERIAL BANK OF COMMERCE", "199'172"]
+        ]]
+    },
+    {
+        "page": 3,
+        "text": "Asset allocation: bonds 40%, equities 35%, liquidity 25%.",
+        "tables": []
+    }
+]
+
+class TestPassageIndex(unittest.TestCase):
+    """Tests for the PassageIndex."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.index = PassageIndex.from_pages(PAGES)
+
+    def test_search_ranks_matching_passage_first(self):
+        """Test that a rare query term selects the passage containing it."""
+        score, passage = self.index.search("What is the valuation of XS2530201644?")[0]
+        self.assertGreater(score, 0)
+        self.assertEqual(passage["page"], 2)
+        self.assertEqual(passage["kind"], "table")
+
+    def test_table_chunks_repeat_header(self):
+        """Test that every chunk of a long table starts with its header row."""
+        rows = [["ISIN", "Valuation"]] + [[f"XS{i:010d}", str(i * 1000)] for i in range(50)]
+        chunks = PassageIndex._chunk_table(rows, max_chars=200)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertTrue(chunk.startswith("ISIN | Valuation\n"))
+            self.assertLessEqual(len(chunk), 200)
+
+    def test_build_context_respects_budget_and_document_order(self):
+        """Test that the context stays within the token budget and keeps page order."""
+        context = self.index.build_context("bonds portfolio allocation", max_tokens=1000)
+        pages = [int(line.split()[1].rstrip("],")) for line in context.split("\n") if line.startswith("[Page ")]
+        self.assertEqual(pages, sorted(pages))
+        self.assertIn("[Page 3]", context)
+
+        small = self.index.build_context("bonds portfolio allocation", max_tokens=30)
+        self.assertLessEqual(estimate_tokens(small), 30)
+
+    def test_no_match_returns_empty_context(self):
+        """Test that a query without indexed terms selects nothing."""
+        self.assertEqual(self.index.build_context("zzzz"), "")
+
+    def test_few_matches_are_filled_with_a_page_sample(self):
+        """Test that a question matching few passages gets the leading passages of every page."""
+        context = self.index.build_context("zzzz", min_passages=3)
+        self.assertTrue(context.startswith("[Page 1]\nPortfolio statement"))
+        self.assertIn("[Page 2]\nBond holdings", context)
+        self.assertIn("[Page 3]\nAsset allocation", context)
+
+        # The matching passage is kept and the sample stays within the budget
+        context = self.index.build_context("quarterly coupons", max_tokens=40, min_passages=3)
+        self.assertIn("Coupons are paid quarterly.", context)
+        self.assertLessEqual(estimate_tokens(context), 40)
+
+    def test_page_sample_takes_the_first_passage_of_every_page_first(self):
+        """Test that the sample covers every page before taking later passages of a page."""
+        pages = [{"page": 1, "text": "\n\n".join(f"First page paragraph {i} " * 10 for i in range(5))},
+                 {"page": 2, "text": "Second page."}]
+        index = PassageIndex.from_pages(pages, max_chars=200)
+
+        sample = index._page_sample()
+        self.assertEqual([passage["page"] for passage in sample[:3]], [1, 2, 1])
+        self.assertEqual(len(sample), len(index.passages))
+
+    def test_round_trip(self):
+        """Test that a serialized index gives the same results."""
+        restored = PassageIndex.from_dict(json.loads(json.dumps(self.index.to_dict())))
+        query = "quarterly coupons"
+        self.assertEqual(restored.search(query), self.index.search(query))
+
+    def test_from_text_splits_pages_on_form_feeds(self):
+        """Test that plain text is indexed per page."""
+        index = PassageIndex.from_text("first page text\fsecond page text")
+        self.assertEqual([passage["page"] for passage in index.passages], [1, 2])
+
+class TestDocumentAgentContext(unittest.TestCase):
+    """Tests for the document passages in the prompt of the DocumentAgent."""
+
+    def setUp(self):
+        """Set up the agent with a temporary documents directory."""
+        with tempfile.TemporaryDirectory() as documents_dir, patch.dict(os.environ, {"DOCUMENTS_DIR": documents_dir}):
+            self.agent = DocumentAgent("document", "Document", "Document agent", {"api_key": "test-key"})
+        self.document_context = {"document_name": "messos.pdf", "passage_index": PassageIndex.from_pages(PAGES)}
+
+    def test_generic_question_gets_document_content(self):
+        """Test that a question without document terms still sends passages of every page."""
+        prompt = self.agent._create_system_prompt(self.document_context, "Summarize this")
+        self.assertNotIn("[No passages of the document match the question]", prompt)
+        for page in ("[Page 1]", "[Page 2]", "[Page 3]"):
+            self.assertIn(page, prompt)
+
+    def test_specific_question_gets_matching_passages(self):
+        """Test that a question with enough matches is answered from them alone."""
+        self.agent.min_context_passages = 1
+        prompt = self.agent._create_system_prompt(self.document_context, "XS2530201644 valuation")
+        self.assertIn("[Page 2, table]", prompt)
+        self.assertNotIn("[Page 1]", prompt)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Tests for the query engine agent.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the agents
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.query_engine_agent import QueryEngineAgent
+
+def make_document(document_id="doc1", count=300, version="1"):
+    """Create a portfolio document with the given number of holdings."""
+    return {
+        "document_id": document_id,
+        "version": version,
+        "financial_data": {
+            "portfolio": {
+                "summary": {"total_value": 1250000.0},
+                "securities": [
+                    {"isin": f"XS{i:09d}7", "security_name": f"Bond {i}", "return": i / 10}
+                    for i in range(count)
+                ]
+            }
+        },
+        "tables": [{
+            "type": "portfolio",
+            "data": [{"ISIN": "US0378331005 (Apple)", "Name": "Apple Inc"}]
+        }]
+    }
+
+class TestQueryEngineAgent(unittest.TestCase):
+    """Tests for the QueryEngineAgent."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.agent = QueryEngineAgent(document_cache_size=2, answer_cache_size=2)
+
+    def test_router_keeps_query_type_priority(self):
+        """Test that the compiled router picks the first matching query type."""
+        self.assertEqual(self.agent._identify_query_type("What is the value of the portfolio?")[0], "portfolio_value")
+        self.assertEqual(self.agent._identify_query_type("Which bonds are in the account?")[0], "securities_list")
+        self.assertEqual(self.agent._identify_query_type("What is the return of the fund?")[0], "return_info")
+        self.assertEqual(self.agent._identify_query_type("מה שווי התיק הכולל?")[0], "portfolio_value")
+        self.assertEqual(self.agent._identify_query_type("hello")[0], "general")
+
+        # Both types match; portfolio_value comes first in the patterns
+        query = "what is the return, and what is the value of the portfolio"
+        self.assertEqual(self.agent._identify_query_type(query)[0], "portfolio_value")
+
+    def test_entities_are_extracted(self):
+        """Test that entities are extracted with the compiled patterns."""
+        _, entities = self.agent._identify_query_type("What is the return of XS0000000127 on 31/12/2024?")
+        self.assertEqual(entities["isin"], ["XS0000000127"])
+        self.assertEqual(entities["date"], [("31", "12", "2024")])
+
+    def test_answers_are_cached_per_document(self):
+        """Test that repeated queries are answered from the cache and documents are kept apart."""
+        document = make_document()
+        first = self.agent.process_query("What is the return of XS0000000127?", document)
+        self.assertEqual(first["data"]["returns"], [{"security": "Bond 12", "isin": "XS0000000127", "return": 1.2}])
+
+        # The same document sent again as a new object with the same id, with extra whitespace
+        again = self.agent.process_query("What is  the return of XS0000000127? ", make_document())
+        self.assertEqual(again, first)
+        self.assertIsNot(again, first)
+        self.assertEqual(len(self.agent._documents), 1)
+
+        other = self.agent.process_query("What is the value of the portfolio?", make_document("doc2", count=1))
+        self.assertEqual(other["data"]["total_value"], 1250000.0)
+        self.assertEqual(len(self.agent._documents), 2)
+
+    def test_updated_document_is_not_answered_from_the_cache(self):
+        """Test that a changed document with the same id gets fresh facts and answers."""
+        query = "What is the value of the portfolio?"
+        self.assertEqual(self.agent.process_query(query, make_document())["data"]["total_value"], 1250000.0)
+
+        updated = make_document(version="2")
+        updated["financial_data"]["portfolio"]["summary"]["total_value"] = 1300000.0
+        self.assertEqual(self.agent.process_query(query, updated)["data"]["total_value"], 1300000.0)
+
+        # A newer processing run is a new version even when nothing else changed
+        processed = dict(make_document(count=1, version=None), processed_at="2025-03-01T10:00:00")
+        self.assertEqual(self.agent.process_query(query, processed)["data"]["total_value"], 1250000.0)
+        reprocessed = dict(make_document(count=1, version=None), processed_at="2025-03-02T10:00:00")
+        self.agent.process_query(query, reprocessed)
+        self.assertIs(self.agent._get_document_facts(reprocessed).document_data, reprocessed)
+        self.assertEqual(len(self.agent._documents), 1)
+
+    def test_document_without_version_is_only_reused_as_the_same_object(self):
+        """Test that an unversioned copy gets fresh facts, and the version is read without the content."""
+        query = "What is the value of the portfolio?"
+        document = make_document(version=None)
+        facts = self.agent._get_document_facts(document)
+        self.assertIs(self.agent._get_document_facts(document), facts)
+
+        updated = make_document(version=None)
+        updated["financial_data"]["portfolio"]["summary"]["total_value"] = 1300000.0
+        self.assertEqual(self.agent.process_query(query, updated)["data"]["total_value"], 1300000.0)
+        self.assertIsNot(self.agent._get_document_facts(updated), facts)
+
+        self.assertEqual(self.agent._get_document_version({"content_hash": "abc", "tables": object()}), "content_hash:abc")
+        self.assertIsNone(self.agent._get_document_version(updated))
+
+    def test_answers_are_copied(self):
+        """Test that changing a returned answer does not change the cached one."""
+        document = make_document()
+        query = "What is the return of XS0000000127?"
+        first = self.agent.process_query(query, document)
+        first["data"]["returns"].clear()
+        first["answer"] = "changed"
+
+        again = self.agent.process_query(query, document)
+        self.assertEqual(len(again["data"]["returns"]), 1)
+        self.assertNotEqual(again["answer"], "changed")
+
+    def test_isin_index_prefers_financial_data_then_tables(self):
+        """Test that ISIN lookups use the document index in the original search order."""
+        document = make_document()
+        response = self.agent._get_isin_info(document, {"isin": ["XS0000002997"]})
+        self.assertEqual(response["data"]["security"]["security_name"], "Bond 299")
+
+        response = self.agent._get_isin_info(document, {"isin": ["US0378331005"]})
+        self.assertEqual(response["data"]["security"]["Name"], "Apple Inc")
+        self.assertIn("in a table", response["answer"])
+
+if __name__ == "__main__":
+    unittest.main()
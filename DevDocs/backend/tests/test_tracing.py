@@ -0,0 +1,100 @@
+"""
+Tests for the pipeline tracing API.
+"""
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import the tracing module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tracing import Tracer, JsonLinesExporter, PrometheusExporter, NOOP_SPAN
+
+class RecordingExporter:
+    """Exporter keeping finished spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span.to_dict())
+
+class TestTracing(unittest.TestCase):
+    """Tests for the Tracer and its exporters."""
+
+    def setUp(self):
+        """Set up the test."""
+        self.tracer = Tracer()
+        self.exporter = RecordingExporter()
+
+    def test_disabled_tracer_returns_noop_span(self):
+        """Test that spans are not recorded without exporters."""
+        with self.tracer.span("ocr", document="a.pdf") as span:
+            span.set_attribute("pages", 3)
+        self.assertIs(span, NOOP_SPAN)
+
+    def test_spans_nest_and_keep_attributes(self):
+        """Test that child spans reference their parent and share its trace."""
+        self.tracer.add_exporter(self.exporter)
+        with self.tracer.span("process_document", document="a.pdf"):
+            with self.tracer.span("ocr_page", page=1) as span:
+                span.set_attribute("words", 10)
+
+        child, parent = self.exporter.spans
+        self.assertEqual(child["name"], "ocr_page")
+        self.assertEqual(child["parent_id"], parent["span_id"])
+        self.assertEqual(child["trace_id"], parent["trace_id"])
+        self.assertEqual(child["attributes"], {"page": 1, "words": 10})
+        self.assertIsNone(parent["parent_id"])
+        self.assertGreaterEqual(parent["duration"], child["duration"])
+
+    def test_errors_are_recorded_and_propagated(self):
+        """Test that a failing stage is marked as an error and the exception still propagates."""
+        self.tracer.add_exporter(self.exporter)
+        with self.assertRaises(ValueError):
+            with self.tracer.span("table_detection"):
+                raise ValueError("bad table")
+
+        self.assertEqual(self.exporter.spans[0]["status"], "error")
+        self.assertEqual(self.exporter.spans[0]["attributes"]["error"], "ValueError: bad table")
+
+    def test_json_lines_exporter(self):
+        """Test that every finished span is written as one JSON line."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            self.tracer.add_exporter(JsonLinesExporter(path))
+
+            @self.tracer.traced("extract")
+            def extract():
+                return 42
+
+            self.assertEqual(extract(), 42)
+            with self.tracer.span("merge", document="a.pdf"):
+                pass
+            self.tracer.shutdown()
+
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual([record["name"] for record in records], ["extract", "merge"])
+        self.assertEqual(records[1]["attributes"], {"document": "a.pdf"})
+
+    def test_prometheus_exporter_renders_histograms(self):
+        """Test that stage durations are aggregated per stage name."""
+        exporter = PrometheusExporter()
+        self.tracer.add_exporter(exporter)
+        for _ in range(2):
+            with self.tracer.span("ocr", document="a.pdf"):
+                pass
+
+        metrics = exporter.render()
+        self.assertIn('pipeline_stage_duration_seconds_count{stage="ocr"} 2', metrics)
+        self.assertIn('pipeline_stage_duration_seconds_bucket{stage="ocr",le="+Inf"} 2', metrics)
+        self.assertIn('pipeline_stage_errors_total{stage="ocr"} 0', metrics)
+        self.assertNotIn("a.pdf", metrics)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,368 @@
+"""
+Lightweight stage tracing for the document processing pipelines.
+
+Usage (code outside the backend imports DevDocs.backend.tracing):
+    from tracing import get_tracer
+
+    tracer = get_tracer()
+    with tracer.span("ocr", document=pdf_path) as span:
+        pages = run_ocr(pdf_path)
+        span.set_attribute("pages", len(pages))
+
+Tracing is off until an exporter is added; while it is off, span() returns a
+shared no-op span, so instrumented code pays for little more than a method
+call. Exporters are added in code with Tracer.add_exporter, or from the
+environment when the tracer is first created:
+
+    TRACE_JSONL             Path of a JSON lines file receiving one record per finished span
+    TRACE_PROMETHEUS_PORT   Port of an HTTP endpoint serving stage timings in the Prometheus text format
+"""
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+import contextvars
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+class Span:
+    """A timed stage of a pipeline, nested under the span that was active when it started."""
+
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "trace_id", "start_time",
+                 "duration", "cpu_time", "status", "_start", "_cpu_start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(_span_ids)
+
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else f"{os.getpid()}-{self.span_id}"
+
+        self.start_time = None
+        self.duration = None
+        self.cpu_time = None
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        """Set several attributes of the span."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.duration = time.perf_counter() - self._start
+        self.cpu_time = time.thread_time() - self._cpu_start
+        _current_span.reset(self._token)
+
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc_value}"
+
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the finished span to a dictionary."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "cpu_time": self.cpu_time,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+class _NoopSpan:
+    """Span returned while tracing is off."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class Tracer:
+    """Creates spans and hands finished spans to the exporters."""
+
+    def __init__(self):
+        """Initialize the tracer with no exporters, which leaves tracing off."""
+        self.exporters = []
+        self.enabled = False
+
+    def add_exporter(self, exporter):
+        """
+        Add an exporter and turn tracing on.
+
+        Args:
+            exporter: Object with an export(span) method and optionally a close() method
+        """
+        self.exporters.append(exporter)
+        self.enabled = True
+
+    def remove_exporter(self, exporter):
+        """
+        Remove an exporter, turning tracing off when none are left.
+
+        Args:
+            exporter: Exporter to remove
+        """
+        self.exporters.remove(exporter)
+        self.enabled = bool(self.exporters)
+
+    def span(self, name: str, **attributes):
+        """
+        Start a span, to be used as a context manager.
+
+        Args:
+            name: Stage name
+            **attributes: Span attributes, such as document or page
+
+        Returns:
+            Span, or a no-op span if tracing is off
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorator running a function inside a span.
+
+        Args:
+            name: Stage name (default: the function's qualified name)
+
+        Returns:
+            Decorator
+        """
+        def decorator(function: Callable) -> Callable:
+            span_name = name or function.__qualname__
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _finish(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Error exporting span {span.name}: {e}")
+
+    def shutdown(self):
+        """Close all exporters and turn tracing off."""
+        for exporter in self.exporters:
+            close = getattr(exporter, "close", None)
+            if close is not None:
+                close()
+        self.exporters = []
+        self.enabled = False
+
+class JsonLinesExporter:
+    """Appends every finished span to a JSON lines file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: Path of the JSON lines file
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class PrometheusExporter:
+    """
+    Aggregates span durations per stage and renders them in the Prometheus text format.
+
+    Only the stage name is used as a label; document and page attributes would
+    give every document its own time series.
+    """
+
+    BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+    def __init__(self, prefix: str = "pipeline_stage"):
+        """
+        Initialize the exporter.
+
+        Args:
+            prefix: Metric name prefix
+        """
+        self.prefix = prefix
+        self._stages = {}  # stage -> aggregated timings
+        self._lock = threading.Lock()
+        self._server = None
+
+    def export(self, span: Span):
+        with self._lock:
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = {
+                    "buckets": [0] * len(self.BUCKETS), "count": 0, "sum": 0.0, "cpu": 0.0, "errors": 0
+                }
+            for i, bound in enumerate(self.BUCKETS):
+                if span.duration <= bound:
+                    stage["buckets"][i] += 1
+            stage["count"] += 1
+            stage["sum"] += span.duration
+            stage["cpu"] += span.cpu_time
+            if span.status == "error":
+                stage["errors"] += 1
+
+    @staticmethod
+    def _label(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def render(self) -> str:
+        """
+        Render the aggregated timings.
+
+        Returns:
+            Metrics in the Prometheus text exposition format
+        """
+        duration, cpu, errors = f"{self.prefix}_duration_seconds", f"{self.prefix}_cpu_seconds_total", f"{self.prefix}_errors_total"
+        lines = [
+            f"# HELP {duration} Wall time of pipeline stages.",
+            f"# TYPE {duration} histogram"
+        ]
+        cpu_lines = [
+            f"# HELP {cpu} CPU time of pipeline stages.",
+            f"# TYPE {cpu} counter"
+        ]
+        error_lines = [
+            f"# HELP {errors} Pipeline stages that raised an exception.",
+            f"# TYPE {errors} counter"
+        ]
+
+        with self._lock:
+            for name, stage in sorted(self._stages.items()):
+                label = f'stage="{self._label(name)}"'
+                for bound, count in zip(self.BUCKETS, stage["buckets"]):
+                    lines.append(f'{duration}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'{duration}_bucket{{{label},le="+Inf"}} {stage["count"]}')
+                lines.append(f"{duration}_sum{{{label}}} {stage['sum']}")
+                lines.append(f"{duration}_count{{{label}}} {stage['count']}")
+                cpu_lines.append(f"{cpu}{{{label}}} {stage['cpu']}")
+                error_lines.append(f"{errors}{{{label}}} {stage['errors']}")
+
+        return "\n".join(lines + cpu_lines + error_lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0"):
+        """
+        Serve the metrics at /metrics from a background thread.
+
+        Args:
+            port: Port to listen on
+            host: Interface to listen on
+        """
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="prometheus-exporter", daemon=True).start()
+        logger.info(f"Serving pipeline metrics on {host}:{port}/metrics")
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def _configure_from_environment(tracer: Tracer):
+    jsonl_path = os.environ.get("TRACE_JSONL")
+    if jsonl_path:
+        tracer.add_exporter(JsonLinesExporter(jsonl_path))
+
+    prometheus_port = os.environ.get("TRACE_PROMETHEUS_PORT")
+    if prometheus_port:
+        exporter = PrometheusExporter()
+        try:
+            exporter.serve(int(prometheus_port))
+            tracer.add_exporter(exporter)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not serve pipeline metrics on port {prometheus_port}: {e}")
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        Tracer
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                tracer = Tracer()
+                _configure_from_environment(tracer)
+                _tracer = tracer
+    return _tracer
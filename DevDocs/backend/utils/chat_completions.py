@@ -0,0 +1,138 @@
+"""
+Helpers shared by the chat completion clients: retry policy, metrics and streamed responses.
+
+Used by the backend's OpenRouterClient and by the async LLMTransport of the services.
+"""
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+
+# Statuses worth retrying: timeouts, rate limits and transient server errors
+RETRY_STATUSES = frozenset([408, 409, 425, 429, 500, 502, 503, 504])
+
+def backoff_delay(attempt: int, backoff_base: float, backoff_max: float, retry_after: Optional[str] = None) -> float:
+    """
+    Full jitter backoff, at least as long as the server's Retry-After.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        backoff_base: Backoff before the first retry, in seconds
+        backoff_max: Maximum backoff, in seconds
+        retry_after: Retry-After header of the response, if any
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    delay = random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+    try:
+        return max(delay, min(float(retry_after), backoff_max)) if retry_after else delay
+    except ValueError:
+        return delay
+
+class ModelMetrics:
+    """Latency and throughput of the requests to one model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.latency = 0.0  # Seconds, summed over successful requests
+        self.first_token_latency = 0.0  # Seconds, summed over streamed requests
+        self.streams = 0
+        self.completion_tokens = 0
+        self.generation_time = 0.0  # Seconds spent generating completion tokens
+
+    def record(self, latency: float, completion_tokens: int, first_token_latency: Optional[float] = None):
+        """Record a successful request."""
+        with self._lock:
+            self.requests += 1
+            self.latency += latency
+            self.completion_tokens += completion_tokens
+            if first_token_latency is None:
+                self.generation_time += latency
+            else:
+                self.streams += 1
+                self.first_token_latency += first_token_latency
+                self.generation_time += latency - first_token_latency
+
+    def record_retry(self):
+        """Record a retried attempt."""
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self):
+        """Record a failed request."""
+        with self._lock:
+            self.failures += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the metrics."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "retries": self.retries,
+                "average_latency": self.latency / self.requests if self.requests else None,
+                "average_time_to_first_token": self.first_token_latency / self.streams if self.streams else None,
+                "tokens_per_second": self.completion_tokens / self.generation_time if self.generation_time > 0 else None
+            }
+
+class CompletionStream:
+    """
+    Reads the server-sent events of a streamed chat completion and times its tokens.
+
+    Feed it the lines of the response body; it returns the pieces of text of
+    each line, and sets done once the [DONE] event arrives.
+    """
+
+    def __init__(self, on_error: Callable[[Any, str], Exception]):
+        """
+        Initialize the stream; the time to the first token is measured from here.
+
+        Args:
+            on_error: Builds the exception raised for an error event from the error and the event data
+        """
+        self.on_error = on_error
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.chunks = 0
+        self.completion_tokens = None
+        self.done = False
+
+    def feed(self, line: bytes) -> List[str]:
+        """Read a line of the stream and return the pieces of text it holds."""
+        # Lines starting with ":" are keep-alive comments
+        line = line.strip()
+        if not line.startswith(b"data:"):
+            return []
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            self.done = True
+            return []
+
+        chunk = json.loads(data)
+        if chunk.get("error"):
+            raise self.on_error(chunk["error"], data.decode())
+        if chunk.get("usage"):
+            self.completion_tokens = chunk["usage"].get("completion_tokens")
+
+        pieces = []
+        for choice in chunk.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                if self.first_token is None:
+                    self.first_token = time.perf_counter() - self.started
+                self.chunks += 1
+                pieces.append(content)
+        return pieces
+
+    def record(self, metrics: ModelMetrics):
+        """Record the finished stream; without reported usage, each content chunk counts as a token."""
+        latency = time.perf_counter() - self.started
+        first_token = self.first_token if self.first_token is not None else latency
+        metrics.record(latency, self.completion_tokens or self.chunks, first_token)
@@ -3,26 +3,155 @@ OpenRouter API client for accessing Optimus Alpha and other models.
 """
 import os
 import json
+import time
+import logging
+import threading
 import requests
-from typing import List, Dict, Any, Optional, Union
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Union, Iterator
+
+from .chat_completions import OPENROUTER_URL, RETRY_STATUSES, ModelMetrics, CompletionStream, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of pooled connections and of concurrent requests per model
+MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "32"))
+MODEL_CONCURRENCY = int(os.environ.get("LLM_MODEL_CONCURRENCY", "4"))
+
+# Shared by all clients of the process, so connections are kept alive and reused
+_session = None
+_lock = threading.Lock()
+_model_semaphores = {}
+_model_metrics = {}
+
+class OpenRouterError(Exception):
+    """An OpenRouter API request that failed."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _get_session() -> requests.Session:
+    """Get the session shared by all clients."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONNECTIONS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def _get_semaphore(model: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting the concurrent requests to a model."""
+    with _lock:
+        if model not in _model_semaphores:
+            _model_semaphores[model] = threading.BoundedSemaphore(MODEL_CONCURRENCY)
+        return _model_semaphores[model]
+
+def _get_model_metrics(model: str) -> ModelMetrics:
+    """Get the metrics of a model."""
+    with _lock:
+        if model not in _model_metrics:
+            _model_metrics[model] = ModelMetrics()
+        return _model_metrics[model]
+
+def get_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the latency and throughput of the requests to each model.
+    
+    Returns:
+        Dictionary of metrics by model
+    """
+    with _lock:
+        models = list(_model_metrics.items())
+    return {model: metrics.to_dict() for model, metrics in models}
 
 class OpenRouterClient:
     """Client for interacting with OpenRouter API to access Optimus Alpha and other models."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 120.0
+    ):
         """
         Initialize the OpenRouter client.
         
         Args:
             api_key: OpenRouter API key. If not provided, will try to get from environment variable.
+            base_url: Base URL of the API. If not provided, will try to get from environment variable.
+            max_retries: Maximum number of retries of a failed request
+            backoff_base: Backoff before the first retry, in seconds
+            backoff_max: Maximum backoff, in seconds
+            timeout: Timeout of a request, in seconds
         """
         self.api_key = api_key or os.environ.get("OPENROUTER_API_KEY", "")
         if not self.api_key:
             raise ValueError("OpenRouter API key is required. Set OPENROUTER_API_KEY environment variable or pass it to the constructor.")
         
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = (base_url or os.environ.get("OPENROUTER_BASE_URL", OPENROUTER_URL)).rstrip("/")
         self.default_model = "openrouter/optimus-alpha"
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        
+    def _post(self, data: Dict[str, Any]) -> requests.Response:
+        """
+        Send a request to the chat completions endpoint, retrying failed attempts.
+        
+        Args:
+            data: Request body
+            
+        Returns:
+            Response with status 200
+        """
+        url = f"{self.base_url}/chat/completions"
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://backv2.com",  # Replace with your actual domain
+            "X-Title": "FinDoc Analyzer"
+        }
         
+        session = _get_session()
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = session.post(url, headers=headers, json=data, stream=data.get("stream", False), timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Request to {data['model']} failed ({e}), retrying")
+            else:
+                if response.status_code == 200:
+                    return response
+                
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    error_msg = f"OpenRouter API request failed with status {response.status_code}"
+                    try:
+                        error_data = response.json()
+                        if "error" in error_data:
+                            error_msg += f": {error_data['error']['message']}"
+                    except:
+                        pass
+                    response.close()
+                    raise OpenRouterError(error_msg, response.status_code)
+                
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                logger.warning(f"Request to {data['model']} returned {response.status_code}, retrying")
+            
+            _get_model_metrics(data["model"]).record_retry()
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+        
+
     def chat_completion(
         self, 
         messages: List[Dict[str, Any]], 
@@ -40,21 +169,12 @@ class OpenRouterClient:
             model: Model to use (defaults to Optimus Alpha)
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream the response
+            stream: Whether to stream the response (use stream_chat_completion to consume a stream)
             **kwargs: Additional parameters to pass to the API
             
         Returns:
             API response as a dictionary
         """
-        url = f"{self.base_url}/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://backv2.com",  # Replace with your actual domain
-            "X-Title": "FinDoc Analyzer"
-        }
-        
         data = {
             "model": model or self.default_model,
             "messages": messages,
@@ -64,19 +184,64 @@ class OpenRouterClient:
             **kwargs
         }
         
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code != 200:
-            error_msg = f"OpenRouter API request failed with status {response.status_code}"
+        metrics = _get_model_metrics(data["model"])
+        with _get_semaphore(data["model"]):
+            started = time.perf_counter()
             try:
-                error_data = response.json()
-                if "error" in error_data:
-                    error_msg += f": {error_data['error']['message']}"
-            except:
-                pass
-            raise Exception(error_msg)
+                response = self._post(data)
+                result = response.json()
+            except Exception:
+                metrics.record_failure()
+                raise
+        
+        metrics.record(time.perf_counter() - started, (result.get("usage") or {}).get("completion_tokens") or 0)
+        return result
+    
+    def stream_chat_completion(
+        self, 
+        messages: List[Dict[str, Any]], 
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion from OpenRouter API.
+        
+        Args:
+            messages: List of message objects with role and content
+            model: Model to use (defaults to Optimus Alpha)
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters to pass to the API
             
-        return response.json()
+        Yields:
+            Pieces of the generated text as they arrive
+        """
+        data = {
+            "model": model or self.default_model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            **kwargs
+        }
+        
+        metrics = _get_model_metrics(data["model"])
+        with _get_semaphore(data["model"]):
+            stream = CompletionStream(lambda error, _: OpenRouterError(f"OpenRouter API stream failed: {error}"))
+            try:
+                with self._post(data) as response:
+                    # Server-sent events
+                    for line in response.iter_lines():
+                        yield from stream.feed(line)
+                        if stream.done:
+                            break
+            except Exception:
+                metrics.record_failure()
+                raise
+        
+        stream.record(metrics)
     
     def get_completion(self, prompt: str, **kwargs) -> str:
         """
@@ -12,6 +12,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from services.document_service import DocumentService
 from agents.document_agent import DocumentAgent
+from services.llm_transport import close_llm_transport
 
 async def process_pdf(pdf_path):
     """Process a PDF file and extract its content."""
@@ -151,10 +152,17 @@ async def process_pdf(pdf_path):
     
     return document_id
 
+async def main(pdf_path):
+    """Run process_pdf and close the connections of the shared transport."""
+    try:
+        return await process_pdf(pdf_path)
+    finally:
+        await close_llm_transport()
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python process_pdf.py <pdf_path>")
         sys.exit(1)
     
     pdf_path = sys.argv[1]
-    asyncio.run(process_pdf(pdf_path))
+    asyncio.run(main(pdf_path))
@@ -11,6 +11,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from agents.document_agent import DocumentAgent
+from services.llm_transport import close_llm_transport
 
 async def query_document(document_id, question):
     """Query a document using the document agent."""
@@ -36,6 +37,13 @@ async def query_document(document_id, question):
     
     return response.content
 
+async def main(document_id, question):
+    """Run query_document and close the connections of the shared transport."""
+    try:
+        return await query_document(document_id, question)
+    finally:
+        await close_llm_transport()
+
 if __name__ == "__main__":
     if len(sys.argv) < 3:
         print("Usage: python query_document.py <document_id> <question>")
@@ -44,4 +52,4 @@ if __name__ == "__main__":
     document_id = sys.argv[1]
     question = sys.argv[2]
     
-    asyncio.run(query_document(document_id, question))
+    asyncio.run(main(document_id, question))
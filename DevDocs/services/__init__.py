@@ -4,9 +4,14 @@ Services module initialization.
 from .document_service import DocumentService
 from .database_service import DatabaseService
 from .web_service import WebService
+from .llm_transport import LLMTransport, LLMTransportError, get_llm_transport, close_llm_transport
 
 __all__ = [
     'DocumentService',
     'DatabaseService',
-    'WebService'
+    'WebService',
+    'LLMTransport',
+    'LLMTransportError',
+    'get_llm_transport',
+    'close_llm_transport'
 ]
@@ -4,17 +4,26 @@ Document service for managing and processing documents.
 import logging
 import os
 import json
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 import uuid
 from datetime import datetime
 import aiofiles
 import asyncio
 
+from .passage_index import PassageIndex
+
 logger = logging.getLogger(__name__)
 
 class DocumentService:
     """Service for document management and processing."""
     
+    # Passage indexes of recently queried documents, shared by all service instances
+    _index_cache = OrderedDict()
+    _index_cache_lock = threading.Lock()
+    _index_cache_size = int(os.environ.get("PASSAGE_INDEX_CACHE_SIZE", "32"))
+    
     def __init__(self):
         self.documents_dir = os.environ.get("DOCUMENTS_DIR", "data/documents")
         self.ensure_documents_dir()
@@ -31,6 +40,68 @@ class DocumentService:
         """Get the path to a document's content file."""
         return os.path.join(self.documents_dir, f"{document_id}.txt")
     
+    def get_document_index_path(self, document_id: str) -> str:
+        """Get the path to a document's passage index file."""
+        return os.path.join(self.documents_dir, f"{document_id}.index.json")
+    
+    def get_document_metadata(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document's metadata without loading its content."""
+        try:
+            metadata_path = self.get_document_path(document_id)
+            if not os.path.exists(metadata_path):
+                logger.warning(f"Document not found: {document_id}")
+                return None
+            
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        
+        except Exception:
+            logger.exception(f"Error getting document metadata {document_id}")
+            return None
+    
+    def get_passage_index(self, document_id: str) -> Optional[PassageIndex]:
+        """
+        Get the passage index of a document.
+        
+        Indexes are built when documents are saved and kept in a small LRU cache;
+        documents saved before indexing existed are indexed on first use.
+        """
+        with self._index_cache_lock:
+            index = self._index_cache.get(document_id)
+            if index is not None:
+                self._index_cache.move_to_end(document_id)
+                return index
+        
+        try:
+            index_path = self.get_document_index_path(document_id)
+            if os.path.exists(index_path):
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = PassageIndex.from_dict(json.load(f))
+            else:
+                content_path = self.get_document_content_path(document_id)
+                if not os.path.exists(content_path):
+                    logger.warning(f"Document not found: {document_id}")
+                    return None
+                
+                with open(content_path, "r", encoding="utf-8") as f:
+                    index = PassageIndex.from_text(f.read())
+                with open(index_path, "w", encoding="utf-8") as f:
+                    json.dump(index.to_dict(), f)
+        
+        except Exception:
+            logger.exception(f"Error getting passage index of document {document_id}")
+            return None
+        
+        self._cache_index(document_id, index)
+        return index
+    
+    def _cache_index(self, document_id: str, index: PassageIndex):
+        with self._index_cache_lock:
+            self._index_cache[document_id] = index
+            self._index_cache.move_to_end(document_id)
+            while len(self._index_cache) > self._index_cache_size:
+                self._index_cache.popitem(last=False)
+    
     def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get a document by ID."""
         try:
@@ -66,7 +137,7 @@ class DocumentService:
             
             # List all JSON files in the documents directory
             for filename in os.listdir(self.documents_dir):
-                if filename.endswith(".json"):
+                if filename.endswith(".json") and not filename.endswith(".index.json"):
                     document_id = filename[:-5]  # Remove .json extension
                     
                     # Load metadata
@@ -108,6 +179,13 @@ class DocumentService:
             async with aiofiles.open(content_path, "w", encoding="utf-8") as f:
                 await f.write(content)
             
+            # Index the content once, so questions only send the relevant passages
+            index = PassageIndex.from_text(content)
+            index_path = self.get_document_index_path(document_id)
+            async with aiofiles.open(index_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(index.to_dict()))
+            self._cache_index(document_id, index)
+            
             logger.info(f"Document saved: {document_id} - {filename}")
             
             # Return the document metadata
@@ -138,6 +216,12 @@ class DocumentService:
             if content_exists:
                 os.remove(content_path)
             
+            index_path = self.get_document_index_path(document_id)
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            with self._index_cache_lock:
+                self._index_cache.pop(document_id, None)
+            
             logger.info(f"Document deleted: {document_id}")
             return True
         
@@ -0,0 +1,245 @@
+"""
+Shared async transport for OpenAI-compatible chat completion APIs (OpenRouter).
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, AsyncIterator
+
+import aiohttp
+
+try:
+    from ..backend.utils.chat_completions import OPENROUTER_URL, RETRY_STATUSES, ModelMetrics, CompletionStream, backoff_delay
+except ImportError:
+    # Imported as a top-level module, as by the scripts
+    sys.path.append(str(Path(__file__).parent.parent / "backend"))
+    from utils.chat_completions import OPENROUTER_URL, RETRY_STATUSES, ModelMetrics, CompletionStream, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+class LLMTransportError(Exception):
+    """A chat completion request that the API rejected or failed."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+class LLMTransport:
+    """
+    Async client for chat completions, shared by all agents of a process.
+
+    Requests go through one aiohttp session, so connections (and their TLS
+    sessions) are kept alive and reused instead of being set up per request.
+    The number of concurrent requests per model is limited, failed requests
+    are retried with exponential backoff and full jitter, and completions
+    can be streamed token by token.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OPENROUTER_URL,
+        max_connections: int = 32,
+        max_concurrency_per_model: int = 4,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 120.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            base_url: Base URL of the OpenAI-compatible API
+            max_connections: Maximum number of open connections
+            max_concurrency_per_model: Maximum number of concurrent requests per model
+            model_concurrency: Concurrency limits of specific models
+            max_retries: Maximum number of retries of a failed request
+            backoff_base: Backoff before the first retry, in seconds
+            backoff_max: Maximum backoff, in seconds
+            timeout: Timeout of a request, in seconds
+            headers: Headers sent with every request
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.model_concurrency = model_concurrency or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.headers = headers or {}
+
+        # The session and semaphores belong to the event loop they were created in
+        self._session = None
+        self._loop = None
+        self._semaphores = {}
+        self._semaphore_loop = None
+        self._metrics = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is not loop:
+            await self._close_session()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Content-Type": "application/json", **self.headers}
+            )
+            self._loop = loop
+        return self._session
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            limit = self.model_concurrency.get(model, self.max_concurrency_per_model)
+            semaphore = self._semaphores[model] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _model_metrics(self, model: str) -> ModelMetrics:
+        metrics = self._metrics.get(model)
+        if metrics is None:
+            metrics = self._metrics[model] = ModelMetrics()
+        return metrics
+
+    async def _close_session(self):
+        """Close the session, in the event loop it was created in if that loop is still alive."""
+        session, loop = self._session, self._loop
+        self._session = None
+        if session is None or session.closed:
+            return
+        if loop is asyncio.get_running_loop() or loop.is_closed():
+            await session.close()
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # Closed once the loop runs again
+            loop.create_task(session.close())
+
+    async def _open(self, api_key: str, payload: Dict[str, Any], metrics: ModelMetrics) -> aiohttp.ClientResponse:
+        """Send a request, retrying failed attempts; returns the response once its status is 200."""
+        session = await self._get_session()
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await session.post(url, json=payload, headers={"Authorization": f"Bearer {api_key}"})
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Request to {payload['model']} failed ({e}), retrying")
+            else:
+                if response.status == 200:
+                    return response
+
+                body = await response.text()
+                response.release()
+                if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise LLMTransportError(f"Request failed with status {response.status}", response.status, body)
+                retry_after = response.headers.get("Retry-After")
+                logger.warning(f"Request to {payload['model']} returned {response.status}, retrying")
+
+            metrics.record_retry()
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+    async def chat(self, api_key: str, model: str, messages: List[Dict[str, Any]], **params) -> Dict[str, Any]:
+        """
+        Get a chat completion.
+
+        Args:
+            api_key: API key
+            model: Model
+            messages: Messages with role and content
+            **params: Additional request parameters (max_tokens, temperature, ...)
+
+        Returns:
+            Response of the API
+        """
+        metrics = self._model_metrics(model)
+        async with self._semaphore(model):
+            started = time.perf_counter()
+            try:
+                response = await self._open(api_key, {"model": model, "messages": messages, **params}, metrics)
+                async with response:
+                    data = await response.json()
+            except Exception:
+                metrics.record_failure()
+                raise
+
+        usage = data.get("usage") or {}
+        metrics.record(time.perf_counter() - started, usage.get("completion_tokens") or 0)
+        return data
+
+    async def stream(self, api_key: str, model: str, messages: List[Dict[str, Any]], **params) -> AsyncIterator[str]:
+        """
+        Stream a chat completion.
+
+        Args:
+            api_key: API key
+            model: Model
+            messages: Messages with role and content
+            **params: Additional request parameters (max_tokens, temperature, ...)
+
+        Yields:
+            Pieces of the completion text as they are generated
+        """
+        metrics = self._model_metrics(model)
+        async with self._semaphore(model):
+            stream = CompletionStream(lambda error, data: LLMTransportError(
+                f"Stream failed: {error}", error.get("code") if isinstance(error, dict) else None, data
+            ))
+            try:
+                response = await self._open(api_key, {"model": model, "messages": messages, **params, "stream": True}, metrics)
+                async with response:
+                    # Server-sent events
+                    async for line in response.content:
+                        for piece in stream.feed(line):
+                            yield piece
+                        if stream.done:
+                            break
+            except Exception:
+                metrics.record_failure()
+                raise
+
+        stream.record(metrics)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get the metrics of each model."""
+        return {model: metrics.to_dict() for model, metrics in self._metrics.items()}
+
+    async def close(self):
+        """Close the session and its connections."""
+        await self._close_session()
+
+_transport = None
+
+def get_llm_transport() -> LLMTransport:
+    """Get the transport shared by the agents of this process."""
+    global _transport
+    if _transport is None:
+        _transport = LLMTransport(
+            base_url=os.environ.get("OPENROUTER_BASE_URL", OPENROUTER_URL),
+            max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", "32")),
+            max_concurrency_per_model=int(os.environ.get("LLM_MODEL_CONCURRENCY", "4")),
+            headers={
+                "HTTP-Referer": "https://document-understanding-demo.com",
+                "X-Title": "Document Understanding Demo"
+            }
+        )
+    return _transport
+
+async def close_llm_transport():
+    """Close the connections of the shared transport; call it before the event loop shuts down."""
+    if _transport is not None:
+        await _transport.close()
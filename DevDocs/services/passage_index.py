@@ -0,0 +1,235 @@
+"""
+BM25 passage retrieval over the pages and tables of a document.
+"""
+import re
+import math
+from typing import Dict, List, Any, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Common question words that carry no retrieval signal
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from", "how", "in", "is", "it",
+    "many", "me", "much", "of", "on", "or", "show", "tell", "that", "the", "there", "this", "to", "was",
+    "what", "when", "where", "which", "who", "with"
+])
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text, without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count of a text (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+class PassageIndex:
+    """
+    BM25 index over the passages of one document.
+
+    Passages never cross page boundaries. Page text is chunked on paragraph
+    boundaries up to ``max_chars``, and every table becomes its own passages
+    with the header row repeated in each chunk, so retrieved rows keep their
+    column names. The index is built once per document and can be serialized
+    with to_dict to be cached next to the document.
+    """
+
+    def __init__(self, passages: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            passages: Passages, each a dictionary with text, page and kind
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+
+        self._postings = {}  # term -> list of (passage index, term frequency)
+        self._lengths = []
+        for i, passage in enumerate(passages):
+            counts = {}
+            tokens = tokenize(passage["text"])
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                self._postings.setdefault(token, []).append((i, count))
+            self._lengths.append(len(tokens))
+
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        count = len(passages)
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @staticmethod
+    def _chunk_text(text: str, max_chars: int) -> List[str]:
+        chunks, current = [], ""
+        for paragraph in re.split(r"\n\s*\n", text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+
+            # Split oversized paragraphs on line boundaries
+            pieces = [paragraph]
+            if len(paragraph) > max_chars:
+                pieces, piece = [], ""
+                for line in paragraph.split("\n"):
+                    if piece and len(piece) + len(line) + 1 > max_chars:
+                        pieces.append(piece)
+                        piece = ""
+                    piece = f"{piece}\n{line}" if piece else line
+                if piece:
+                    pieces.append(piece)
+
+            for piece in pieces:
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}\n\n{piece}" if current else piece
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _chunk_table(table: List[List[Any]], max_chars: int) -> List[str]:
+        rows = [" | ".join("" if cell is None else str(cell).replace("\n", " ") for cell in row) for row in table if row]
+        rows = [row for row in rows if row.replace("|", "").strip()]
+        if not rows:
+            return []
+
+        header, body = rows[0], rows[1:]
+        if not body:
+            return [header]
+
+        chunks, current = [], header
+        for row in body:
+            if current != header and len(current) + len(row) + 1 > max_chars:
+                chunks.append(current)
+                current = header
+            current = f"{current}\n{row}"
+        chunks.append(current)
+        return chunks
+
+    @classmethod
+    def from_pages(cls, pages: List[Dict[str, Any]], max_chars: int = 800) -> "PassageIndex":
+        """
+        Build an index from per-page text and tables.
+
+        Args:
+            pages: Pages, each a dictionary with page (number), text and optionally tables (lists of rows)
+            max_chars: Maximum passage length in characters
+
+        Returns:
+            PassageIndex
+        """
+        passages = []
+        for page in pages:
+            for chunk in cls._chunk_text(page.get("text") or "", max_chars):
+                passages.append({"text": chunk, "page": page.get("page"), "kind": "text"})
+            for table in page.get("tables") or []:
+                for chunk in cls._chunk_table(table, max_chars):
+                    passages.append({"text": chunk, "page": page.get("page"), "kind": "table"})
+        return cls(passages)
+
+    @classmethod
+    def from_text(cls, text: str, max_chars: int = 800) -> "PassageIndex":
+        """
+        Build an index from plain document text; form feeds are treated as page breaks.
+
+        Args:
+            text: Document text
+            max_chars: Maximum passage length in characters
+
+        Returns:
+            PassageIndex
+        """
+        pages = [{"page": i + 1, "text": page} for i, page in enumerate(text.split("\f"))]
+        return cls.from_pages(pages, max_chars=max_chars)
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the passages that best match a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of passages
+
+        Returns:
+            List of (score, passage), best first
+        """
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for i, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / self._average_length)
+                scores[i] = scores.get(i, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(score, self.passages[i]) for i, score in best]
+
+    def build_context(self, query: str, max_tokens: int = 1000, top_k: int = 10, min_passages: int = 0) -> str:
+        """
+        Assemble the passages most relevant to a query under a token budget.
+
+        Args:
+            query: Query text
+            max_tokens: Token budget of the context
+            top_k: Maximum number of passages considered
+            min_passages: When fewer passages match, the rest of the budget is filled with a per-page
+                sample of the document, so generic questions ("summarize this") still get content
+
+        Returns:
+            Context text, with passages in document order
+        """
+        selected, used = [], 0
+        for _, passage in self.search(query, top_k=top_k):
+            cost = estimate_tokens(passage["text"]) + 8
+            if used + cost > max_tokens:
+                continue
+            selected.append(passage)
+            used += cost
+
+        if len(selected) < min_passages:
+            chosen = {id(passage) for passage in selected}
+            for passage in self._page_sample():
+                cost = estimate_tokens(passage["text"]) + 8
+                if id(passage) in chosen or used + cost > max_tokens:
+                    continue
+                selected.append(passage)
+                used += cost
+
+        order = {id(passage): i for i, passage in enumerate(self.passages)}
+        selected.sort(key=lambda passage: order[id(passage)])
+
+        sections = []
+        for passage in selected:
+            label = f"[Page {passage['page']}{', table' if passage['kind'] == 'table' else ''}]"
+            sections.append(f"{label}\n{passage['text']}")
+        return "\n\n".join(sections)
+
+    def _page_sample(self) -> List[Dict[str, Any]]:
+        # The first passage of every page, then the second of every page, and so on
+        by_page = {}
+        for passage in self.passages:
+            by_page.setdefault(passage["page"], []).append(passage)
+
+        sample = []
+        for rank in range(max((len(passages) for passages in by_page.values()), default=0)):
+            sample.extend(passages[rank] for passages in by_page.values() if rank < len(passages))
+        return sample
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index; postings are rebuilt when it is loaded."""
+        return {"passages": self.passages, "k1": self.k1, "b": self.b}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PassageIndex":
+        """Load an index serialized with to_dict."""
+        return cls(data["passages"], k1=data.get("k1", 1.5), b=data.get("b", 0.75))
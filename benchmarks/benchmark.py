@@ -0,0 +1,433 @@
+"""
+Benchmark harness for the document extraction front-ends.
+
+Runs each front-end on a fixed local corpus and records wall time, CPU time,
+peak RSS, pages per second and per-stage timings. Results are written as JSON
+and compared against a stored baseline to catch performance regressions.
+
+Each run happens in a fresh process so peak RSS and warm-up costs are measured
+per front-end, and LLM HTTP calls are stubbed so the benchmark runs offline.
+
+Usage:
+    python benchmarks/benchmark.py
+    python benchmarks/benchmark.py --frontends simple_pdf multi_tool --repeat 3
+    python benchmarks/benchmark.py --save-baseline
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import multiprocessing
+import tempfile
+import traceback
+from functools import wraps
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_CORPUS = [os.path.join(REPO_ROOT, "messos.pdf")]
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+
+# Metrics compared against the baseline
+COMPARED_METRICS = ["wall_time", "cpu_time", "peak_rss_mb"]
+
+# Canned LLM reply, in both OpenAI and Gemini response shapes
+STUB_LLM_CONTENT = "{}"
+
+def _setup_simple_pdf(pdf_path: str, output_dir: str) -> Tuple[Any, Callable[[], Any]]:
+    from simple_pdf_processor import SimplePDFProcessor
+    processor = SimplePDFProcessor(use_ocr=False, use_llm=False)
+    return processor, lambda: processor.process(pdf_path, output_dir=output_dir)
+
+def _setup_multi_tool(pdf_path: str, output_dir: str) -> Tuple[Any, Callable[[], Any]]:
+    from financial_document_processor.extractors.multi_tool_extractor import MultiToolExtractor
+    extractor = MultiToolExtractor()
+    return extractor, lambda: extractor.extract(pdf_path, output_dir=output_dir)
+
+def _setup_enhanced_table(pdf_path: str, output_dir: str) -> Tuple[Any, Callable[[], Any]]:
+    from enhanced_table_extractor import EnhancedTableExtractor
+    extractor = EnhancedTableExtractor()
+    return extractor, lambda: extractor.extract(pdf_path, output_dir=output_dir)
+
+def _setup_rag_multimodal(pdf_path: str, output_dir: str) -> Tuple[Any, Callable[[], Any]]:
+    from rag_multimodal_processor import DocumentProcessor
+    processor = DocumentProcessor()
+    return processor, lambda: processor.process(pdf_path, output_dir=output_dir)
+
+def _setup_grid(pdf_path: str, output_dir: str) -> Tuple[Any, Callable[[], Any]]:
+    from DevDocs.backend.enhanced_processing.grid_analyzer import GridAnalyzer
+    analyzer = GridAnalyzer(pdf_path)
+    return analyzer, lambda: analyzer.analyze()
+
+# Front-end name -> (setup function, stages timed inside the run)
+# Stages are attribute paths on the front-end object; "module:" paths are
+# functions in the module that defines the front-end's class.
+FRONTENDS = {
+    "simple_pdf": (_setup_simple_pdf, [
+        "_extract_with_pdfplumber", "_extract_with_ocr", "_extract_client_info", "_extract_document_date",
+        "_extract_portfolio_value", "_extract_bonds", "_extract_asset_allocation", "_save_results"
+    ]),
+    "multi_tool": (_setup_multi_tool, [
+        "preprocessor.preprocess", "_extract_tables_with_multiple_tools", "_extract_financial_entities",
+        "_extract_portfolio_value", "_extract_securities", "_extract_asset_allocation",
+        "_extract_risk_profile", "_extract_currency"
+    ]),
+    "enhanced_table": (_setup_enhanced_table, [
+        "_extract_with_pdfplumber", "_extract_with_camelot", "_extract_with_tabula",
+        "_deduplicate_tables", "_classify_tables", "_save_results"
+    ]),
+    "rag_multimodal": (_setup_rag_multimodal, [
+        "ocr_agent.process", "table_detector_agent.process", "isin_extractor_agent.process",
+        "financial_analyzer_agent.process", "rag_agent.process", "document_merger_agent.process"
+    ]),
+    "grid": (_setup_grid, [
+        "module:partition_pdf", "_categorize_elements", "_analyze_spatial_relationships", "_extract_financial_data"
+    ])
+}
+
+class _StubResponse:
+    """Minimal requests.Response stand-in returned for stubbed LLM calls."""
+
+    status_code = 200
+
+    def __init__(self):
+        self._payload = {
+            "choices": [{"message": {"content": STUB_LLM_CONTENT}}],
+            "candidates": [{"content": {"parts": [{"text": STUB_LLM_CONTENT}]}}]
+        }
+        self.text = json.dumps(self._payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+def _stub_llm_calls():
+    """Make LLM clients take their API code paths without touching the network."""
+    os.environ["OPENAI_API_KEY"] = "benchmark-stub"
+    os.environ["OPENROUTER_API_KEY"] = "benchmark-stub"
+    os.environ.pop("GOOGLE_API_KEY", None)
+
+    try:
+        import requests
+    except ImportError:
+        return
+
+    def stub_request(*args, **kwargs):
+        return _StubResponse()
+
+    requests.post = stub_request
+    requests.get = stub_request
+    requests.Session.post = lambda self, *args, **kwargs: _StubResponse()
+    requests.Session.get = lambda self, *args, **kwargs: _StubResponse()
+
+class StageTimer:
+    """Accumulates wall and CPU time of instrumented functions."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        @wraps(function)
+        def timed(*args, **kwargs):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stage = self.stages.setdefault(name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0})
+                stage["calls"] += 1
+                stage["wall_time"] += time.perf_counter() - wall_start
+                stage["cpu_time"] += time.process_time() - cpu_start
+        return timed
+
+    def instrument(self, target: Any, path: str) -> bool:
+        """
+        Replace a function reachable from target with a timed wrapper.
+
+        Args:
+            target: Front-end object
+            path: Dotted attribute path, or "module:<name>" for a module-level function
+
+        Returns:
+            True if the stage was found
+        """
+        if path.startswith("module:"):
+            owner = sys.modules.get(type(target).__module__)
+            attribute = path[len("module:"):]
+        else:
+            owner = target
+            *parents, attribute = path.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent, None)
+
+        function = getattr(owner, attribute, None) if owner is not None else None
+        if not callable(function):
+            return False
+
+        setattr(owner, attribute, self.wrap(path, function))
+        return True
+
+def _count_pages(pdf_path: str) -> Optional[int]:
+    try:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        pass
+
+    try:
+        from PyPDF2 import PdfReader
+        return len(PdfReader(pdf_path).pages)
+    except Exception:
+        return None
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+def _cpu_time() -> float:
+    # Include child processes such as tesseract, ghostscript and java (tabula)
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+def _run_frontend(name: str, pdf_path: str, output_dir: str, results: multiprocessing.Queue):
+    """Run one front-end on one document and put its measurements on the queue."""
+    measurement = {"frontend": name, "document": os.path.relpath(pdf_path, REPO_ROOT), "status": "ok"}
+    try:
+        _stub_llm_calls()
+        setup, stages = FRONTENDS[name]
+
+        try:
+            target, run = setup(pdf_path, output_dir)
+        except ImportError as e:
+            measurement.update(status="skipped", error=str(e))
+            results.put(measurement)
+            return
+
+        timer = StageTimer()
+        measurement["missing_stages"] = [stage for stage in stages if not timer.instrument(target, stage)]
+
+        wall_start, cpu_start = time.perf_counter(), _cpu_time()
+        run()
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = _cpu_time() - cpu_start
+
+        pages = _count_pages(pdf_path)
+        measurement.update(
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            peak_rss_mb=_peak_rss_mb(),
+            pages=pages,
+            pages_per_second=pages / wall_time if pages and wall_time > 0 else None,
+            stages=timer.stages
+        )
+    except Exception as e:
+        measurement.update(status="error", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+
+    results.put(measurement)
+
+def run_isolated(name: str, pdf_path: str, timeout: float) -> Dict[str, Any]:
+    """
+    Run a front-end in a fresh process.
+
+    Args:
+        name: Front-end name
+        pdf_path: Path to the PDF file
+        timeout: Maximum run time in seconds
+
+    Returns:
+        Measurement dictionary
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    with tempfile.TemporaryDirectory(prefix=f"benchmark_{name}_") as output_dir:
+        process = context.Process(target=_run_frontend, args=(name, pdf_path, output_dir, results))
+        process.start()
+        try:
+            measurement = results.get(timeout=timeout)
+        except Exception:
+            process.terminate()
+            measurement = {"frontend": name, "document": os.path.relpath(pdf_path, REPO_ROOT),
+                           "status": "error", "error": f"Timed out after {timeout:.0f}s"}
+        process.join()
+
+    return measurement
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize repeated runs of a front-end on a document, using medians.
+
+    Args:
+        runs: Measurements of the repeated runs
+
+    Returns:
+        Summary dictionary
+    """
+    summary = {key: runs[0][key] for key in ("frontend", "document")}
+    failed = [run for run in runs if run["status"] != "ok"]
+    if failed:
+        summary.update(status=failed[0]["status"], error=failed[0].get("error"))
+        return summary
+
+    summary["status"] = "ok"
+    for metric in COMPARED_METRICS + ["pages_per_second"]:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        summary[metric] = statistics.median(values) if values else None
+    summary["pages"] = runs[0].get("pages")
+
+    stage_names = {stage for run in runs for stage in run["stages"]}
+    summary["stages"] = {
+        stage: {
+            metric: statistics.median([run["stages"].get(stage, {}).get(metric, 0) for run in runs])
+            for metric in ("calls", "wall_time", "cpu_time")
+        }
+        for stage in sorted(stage_names)
+    }
+    summary["missing_stages"] = runs[0].get("missing_stages", [])
+    return summary
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Summaries of the current run
+        baseline: Baseline results document
+        tolerance: Allowed relative increase before a metric counts as a regression
+
+    Returns:
+        List of regressions
+    """
+    baseline_results = {(result["frontend"], result["document"]): result for result in baseline.get("results", [])}
+
+    regressions = []
+    for result in results:
+        reference = baseline_results.get((result["frontend"], result["document"]))
+        if result["status"] != "ok" or not reference or reference.get("status") != "ok":
+            continue
+
+        for metric in COMPARED_METRICS:
+            current, previous = result.get(metric), reference.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            result.setdefault("baseline_change", {})[metric] = change
+            if change > tolerance:
+                regressions.append({
+                    "frontend": result["frontend"],
+                    "document": result["document"],
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": current,
+                    "change": change
+                })
+
+    return regressions
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+def _format_seconds(value: Optional[float]) -> str:
+    return f"{value:8.2f}s" if value is not None else "       -"
+
+def print_report(results: List[Dict[str, Any]], regressions: List[Dict[str, Any]]):
+    """Print a summary table of the results and any regressions."""
+    print(f"{'front-end':<16} {'document':<24} {'wall':>9} {'cpu':>9} {'peak rss':>10} {'pages/s':>8}  status")
+    for result in results:
+        peak = f"{result['peak_rss_mb']:8.1f}MB" if result.get("peak_rss_mb") is not None else "         -"
+        pages_per_second = f"{result['pages_per_second']:8.2f}" if result.get("pages_per_second") else "       -"
+        status = result["status"] if result["status"] == "ok" else f"{result['status']}: {result.get('error')}"
+        print(f"{result['frontend']:<16} {result['document']:<24} {_format_seconds(result.get('wall_time'))} "
+              f"{_format_seconds(result.get('cpu_time'))} {peak} {pages_per_second}  {status}")
+
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression['frontend']} on {regression['document']}: {regression['metric']} "
+                  f"{regression['baseline']:.2f} -> {regression['current']:.2f} ({regression['change']:+.0%})")
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the document extraction front-ends.")
+    parser.add_argument("--corpus", nargs="+", default=DEFAULT_CORPUS, help="PDF files to process")
+    parser.add_argument("--frontends", nargs="+", choices=sorted(FRONTENDS), default=sorted(FRONTENDS),
+                        help="Front-ends to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per front-end and document (median is reported)")
+    parser.add_argument("--timeout", type=float, default=1800, help="Maximum seconds per run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Path of the JSON results file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path of the baseline results file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative increase over the baseline (default: 0.2)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+
+    args = parser.parse_args()
+
+    results = []
+    for pdf_path in args.corpus:
+        pdf_path = os.path.abspath(pdf_path)
+        if not os.path.exists(pdf_path):
+            print(f"Error: PDF file not found: {pdf_path}")
+            return 1
+
+        for name in args.frontends:
+            print(f"Running {name} on {os.path.basename(pdf_path)}...")
+            runs = [run_isolated(name, pdf_path, args.timeout) for _ in range(args.repeat)]
+            results.append(summarize(runs))
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    document = {"environment": _environment(), "results": results, "regressions": regressions}
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    print_report(results, regressions)
+    print(f"\nResults saved to {args.output}")
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Tests for the benchmark harness bookkeeping (stage timing, summaries and baseline comparison).
+"""
+import os
+import sys
+import unittest
+
+# Add this directory to the path so we can import the harness
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import StageTimer, summarize, compare
+
+def make_run(wall_time, cpu_time=1.0, peak_rss_mb=100.0, status="ok", stages=None):
+    return {
+        "frontend": "simple_pdf",
+        "document": "messos.pdf",
+        "status": status,
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "peak_rss_mb": peak_rss_mb,
+        "pages": 20,
+        "pages_per_second": 20 / wall_time,
+        "stages": stages or {},
+        "missing_stages": []
+    }
+
+class Extractor:
+    """Front-end with a nested stage."""
+
+    def __init__(self):
+        self.parser = self
+
+    def parse(self, text):
+        return text.upper()
+
+class TestStageTimer(unittest.TestCase):
+    """Tests for the StageTimer."""
+
+    def test_instrument_wraps_dotted_paths(self):
+        """Test that instrumented stages keep working and are counted."""
+        extractor = Extractor()
+        timer = StageTimer()
+
+        self.assertTrue(timer.instrument(extractor, "parser.parse"))
+        self.assertFalse(timer.instrument(extractor, "parser.missing"))
+        self.assertFalse(timer.instrument(extractor, "missing.parse"))
+
+        self.assertEqual(extractor.parse("isin"), "ISIN")
+        extractor.parse("value")
+        self.assertEqual(timer.stages["parser.parse"]["calls"], 2)
+        self.assertGreaterEqual(timer.stages["parser.parse"]["wall_time"], 0.0)
+
+class TestSummaries(unittest.TestCase):
+    """Tests for summarize and compare."""
+
+    def test_summarize_uses_medians(self):
+        """Test that repeated runs are summarized by their medians."""
+        runs = [
+            make_run(2.0, stages={"parse": {"calls": 1, "wall_time": 1.0, "cpu_time": 0.5}}),
+            make_run(9.0, stages={"parse": {"calls": 1, "wall_time": 5.0, "cpu_time": 0.5}}),
+            make_run(3.0, stages={})
+        ]
+        summary = summarize(runs)
+
+        self.assertEqual(summary["status"], "ok")
+        self.assertEqual(summary["wall_time"], 3.0)
+        self.assertEqual(summary["pages"], 20)
+        # A run without the stage counts as zero
+        self.assertEqual(summary["stages"]["parse"]["wall_time"], 1.0)
+
+    def test_summarize_reports_the_first_failure(self):
+        """Test that any failed run makes the summary fail."""
+        failed = make_run(1.0, status="error")
+        failed["error"] = "boom"
+        summary = summarize([make_run(1.0), failed])
+        self.assertEqual((summary["status"], summary["error"]), ("error", "boom"))
+        self.assertNotIn("wall_time", summary)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        """Test that only increases beyond the tolerance are regressions."""
+        baseline = {"results": [summarize([make_run(10.0, cpu_time=4.0, peak_rss_mb=100.0)])]}
+        current = summarize([make_run(12.0, cpu_time=4.2, peak_rss_mb=80.0)])
+
+        regressions = compare([current], baseline, tolerance=0.1)
+
+        self.assertEqual([regression["metric"] for regression in regressions], ["wall_time"])
+        self.assertAlmostEqual(regressions[0]["change"], 0.2)
+        self.assertAlmostEqual(current["baseline_change"]["peak_rss_mb"], -0.2)
+
+    def test_compare_skips_unmatched_and_failed_results(self):
+        """Test that results without an ok baseline entry are not compared."""
+        baseline = {"results": [{"frontend": "simple_pdf", "document": "messos.pdf", "status": "skipped"}]}
+        current = summarize([make_run(100.0)])
+        other = dict(current, frontend="multi_tool")
+
+        self.assertEqual(compare([current, other], baseline, tolerance=0.1), [])
+        self.assertNotIn("baseline_change", current)
+
+if __name__ == "__main__":
+    unittest.main()
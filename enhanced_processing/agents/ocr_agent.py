@@ -11,6 +11,7 @@ from PIL import Image
 from typing import List, Dict, Any, Optional
 
 from ..utils import ensure_dir
+from DevDocs.backend.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +68,8 @@ class OCRAgent:
                 preprocessed.save(preprocessed_path)
             
             # Perform OCR
-            ocr_result = self._perform_ocr(preprocessed)
+            with get_tracer().span("ocr_page", document=pdf_path, page=i + 1):
+                ocr_result = self._perform_ocr(preprocessed)
             
             # Add page number
             ocr_result["page"] = i + 1
@@ -52,7 +52,7 @@ class DocumentIndex:
         # Initialize or load index
         self.index = self._initialize_index()
     
-    def _initialize_index(self) -> VectorStoreIndex:
+    def _initialize_index(self) -> "VectorStoreIndex":
         """
         Initialize or load the index.
         
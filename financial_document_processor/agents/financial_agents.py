@@ -173,28 +173,31 @@ class FinancialQueryAgent(FinancialAgentBase):
             Returns:
                 Securities information
             """
-            securities = self.database.get_securities(document_id)
+            securities_count = self.database.get_securities_stats(document_id).count
             
-            if not securities:
+            if not securities_count:
                 return f"No securities found for document ID {document_id}"
             
-            result = f"Found {len(securities)} securities in document ID {document_id}:\n\n"
-            
-            for i, security in enumerate(securities[:20]):  # Limit to 20 securities to avoid too long responses
-                result += f"{i+1}. "
-                result += f"ISIN: {security.isin or 'N/A'}\n"
-                result += f"   Name: {security.name or security.description or 'N/A'}\n"
-                result += f"   Type: {security.security_type or 'N/A'}\n"
-                result += f"   Asset Class: {security.asset_class or 'N/A'}\n"
-                result += f"   Valuation: {security.valuation:,.2f} {security.currency or 'USD'}\n" if security.valuation else f"   Valuation: N/A\n"
-                result += f"   Price: {security.price:,.2f}\n" if security.price else f"   Price: N/A\n"
-                result += f"   Quantity: {security.quantity:,.2f}\n" if security.quantity else f"   Quantity: N/A\n"
-                result += "\n"
+            # Limit to 20 securities to avoid too long responses
+            securities = self.database.get_security_rows(document_id, limit=20)
             
-            if len(securities) > 20:
-                result += f"... and {len(securities) - 20} more securities"
+            parts = [f"Found {securities_count} securities in document ID {document_id}:\n\n"]
             
-            return result
+            for i, security in enumerate(securities):
+                parts.append(f"{i+1}. ")
+                parts.append(f"ISIN: {security.isin or 'N/A'}\n")
+                parts.append(f"   Name: {security.name or security.description or 'N/A'}\n")
+                parts.append(f"   Type: {security.security_type or 'N/A'}\n")
+                parts.append(f"   Asset Class: {security.asset_class or 'N/A'}\n")
+                parts.append(f"   Valuation: {security.valuation:,.2f} {security.currency or 'USD'}\n" if security.valuation else f"   Valuation: N/A\n")
+                parts.append(f"   Price: {security.price:,.2f}\n" if security.price else f"   Price: N/A\n")
+                parts.append(f"   Quantity: {security.quantity:,.2f}\n" if security.quantity else f"   Quantity: N/A\n")
+                parts.append("\n")
+            
+            if securities_count > 20:
+                parts.append(f"... and {securities_count - 20} more securities")
+            
+            return "".join(parts)
         
         @tool
         def get_asset_allocations(document_id: int) -> str:
@@ -234,35 +237,26 @@ class FinancialQueryAgent(FinancialAgentBase):
             Returns:
                 Top holdings information
             """
-            securities = self.database.get_securities(document_id)
+            # Top-N is computed in SQL using the (document_id, valuation) index
+            top_holdings = self.database.get_top_security_rows(document_id, limit)
             
-            if not securities:
-                return f"No securities found for document ID {document_id}"
-            
-            # Filter securities with valuation
-            securities_with_valuation = [s for s in securities if s.valuation is not None]
-            
-            if not securities_with_valuation:
+            if not top_holdings:
+                if not self.database.get_securities_stats(document_id).count:
+                    return f"No securities found for document ID {document_id}"
                 return f"No securities with valuation found for document ID {document_id}"
             
-            # Sort by valuation (descending)
-            securities_with_valuation.sort(key=lambda s: s.valuation or 0, reverse=True)
-            
-            # Get top holdings
-            top_holdings = securities_with_valuation[:limit]
-            
-            result = f"Top {len(top_holdings)} holdings in document ID {document_id}:\n\n"
+            parts = [f"Top {len(top_holdings)} holdings in document ID {document_id}:\n\n"]
             
             for i, security in enumerate(top_holdings):
-                result += f"{i+1}. "
-                result += f"ISIN: {security.isin or 'N/A'}\n"
-                result += f"   Name: {security.name or security.description or 'N/A'}\n"
-                result += f"   Type: {security.security_type or 'N/A'}\n"
-                result += f"   Asset Class: {security.asset_class or 'N/A'}\n"
-                result += f"   Valuation: {security.valuation:,.2f} {security.currency or 'USD'}\n"
-                result += "\n"
+                parts.append(f"{i+1}. ")
+                parts.append(f"ISIN: {security.isin or 'N/A'}\n")
+                parts.append(f"   Name: {security.name or security.description or 'N/A'}\n")
+                parts.append(f"   Type: {security.security_type or 'N/A'}\n")
+                parts.append(f"   Asset Class: {security.asset_class or 'N/A'}\n")
+                parts.append(f"   Valuation: {security.valuation:,.2f} {security.currency or 'USD'}\n")
+                parts.append("\n")
             
-            return result
+            return "".join(parts)
         
         tools.extend([
             query_document,
@@ -636,48 +630,40 @@ class FinancialAnalysisAgent(FinancialAgentBase):
             # Get portfolio value
             portfolio_value = self.database.get_portfolio_value(document_id)
             
-            # Get securities
-            securities = self.database.get_securities(document_id)
+            # Get securities count and total valuation, aggregated in SQL
+            securities_stats = self.database.get_securities_stats(document_id)
             
             # Get asset allocations
             asset_allocations = self.database.get_asset_allocations(document_id)
             
             # Create summary
-            summary = "Portfolio Summary:\n\n"
+            parts = ["Portfolio Summary:\n\n"]
             
             if portfolio_value:
-                summary += f"Portfolio Value: {portfolio_value.value:,.2f} {portfolio_value.currency or 'USD'}\n"
-                summary += f"Date: {portfolio_value.value_date.strftime('%Y-%m-%d') if portfolio_value.value_date else 'N/A'}\n\n"
+                parts.append(f"Portfolio Value: {portfolio_value.value:,.2f} {portfolio_value.currency or 'USD'}\n")
+                parts.append(f"Date: {portfolio_value.value_date.strftime('%Y-%m-%d') if portfolio_value.value_date else 'N/A'}\n\n")
             
-            if securities:
-                summary += f"Securities Count: {len(securities)}\n"
-                
-                # Calculate total valuation
-                total_valuation = sum(s.valuation or 0 for s in securities)
-                summary += f"Total Securities Valuation: {total_valuation:,.2f} USD\n\n"
+            if securities_stats.count:
+                parts.append(f"Securities Count: {securities_stats.count}\n")
+                parts.append(f"Total Securities Valuation: {securities_stats.total_valuation:,.2f} USD\n\n")
                 
                 # Count by security type
-                security_types = {}
-                for security in securities:
-                    security_type = security.security_type or "Unknown"
-                    security_types[security_type] = security_types.get(security_type, 0) + 1
-                
-                summary += "Security Types:\n"
-                for security_type, count in security_types.items():
-                    summary += f"- {security_type}: {count}\n"
-                summary += "\n"
+                parts.append("Security Types:\n")
+                for security_type, count in self.database.get_security_type_counts(document_id):
+                    parts.append(f"- {security_type}: {count}\n")
+                parts.append("\n")
             
             if asset_allocations:
-                summary += "Asset Allocation:\n"
+                parts.append("Asset Allocation:\n")
                 for allocation in asset_allocations:
-                    summary += f"- {allocation.asset_class}: "
+                    parts.append(f"- {allocation.asset_class}: ")
                     if allocation.percentage:
-                        summary += f"{allocation.percentage:.2f}%"
+                        parts.append(f"{allocation.percentage:.2f}%")
                     if allocation.value:
-                        summary += f" ({allocation.value:,.2f} {allocation.currency or 'USD'})"
-                    summary += "\n"
+                        parts.append(f" ({allocation.value:,.2f} {allocation.currency or 'USD'})")
+                    parts.append("\n")
             
-            return summary
+            return "".join(parts)
         
         @tool
         def analyze_asset_allocation(document_id: int) -> str:
@@ -732,48 +718,41 @@ class FinancialAnalysisAgent(FinancialAgentBase):
             Returns:
                 Top holdings analysis
             """
-            # Get securities
-            securities = self.database.get_securities(document_id)
-            
-            if not securities:
-                return f"No securities found for document ID {document_id}"
-            
-            # Filter securities with valuation
-            securities_with_valuation = [s for s in securities if s.valuation is not None]
+            # Top-N is computed in SQL using the (document_id, valuation) index
+            top_holdings = self.database.get_top_security_rows(document_id, limit)
             
-            if not securities_with_valuation:
+            if not top_holdings:
+                if not self.database.get_securities_stats(document_id).count:
+                    return f"No securities found for document ID {document_id}"
                 return f"No securities with valuation found for document ID {document_id}"
             
-            # Sort by valuation (descending)
-            securities_with_valuation.sort(key=lambda s: s.valuation or 0, reverse=True)
-            
-            # Get top holdings
-            top_holdings = securities_with_valuation[:limit]
-            
-            # Get portfolio value
+            # Get portfolio value, falling back to the total valuation of the securities
             portfolio_value = self.database.get_portfolio_value(document_id)
-            total_portfolio_value = portfolio_value.value if portfolio_value else sum(s.valuation or 0 for s in securities_with_valuation)
+            if portfolio_value:
+                total_portfolio_value = portfolio_value.value
+            else:
+                total_portfolio_value = self.database.get_securities_stats(document_id).total_valuation
             
             # Create analysis
-            analysis = f"Top {len(top_holdings)} Holdings Analysis:\n\n"
+            parts = [f"Top {len(top_holdings)} Holdings Analysis:\n\n"]
             
             if total_portfolio_value:
-                analysis += f"Total Portfolio Value: {total_portfolio_value:,.2f} USD\n\n"
+                parts.append(f"Total Portfolio Value: {total_portfolio_value:,.2f} USD\n\n")
             
             # Calculate concentration metrics
             top_holdings_value = sum(s.valuation or 0 for s in top_holdings)
             top_holdings_percentage = (top_holdings_value / total_portfolio_value) * 100 if total_portfolio_value else 0
             
-            analysis += f"Top {len(top_holdings)} Holdings Value: {top_holdings_value:,.2f} USD ({top_holdings_percentage:.2f}% of portfolio)\n\n"
+            parts.append(f"Top {len(top_holdings)} Holdings Value: {top_holdings_value:,.2f} USD ({top_holdings_percentage:.2f}% of portfolio)\n\n")
             
             # List top holdings
-            analysis += "Top Holdings:\n"
+            parts.append("Top Holdings:\n")
             for i, security in enumerate(top_holdings):
                 percentage = ((security.valuation or 0) / total_portfolio_value) * 100 if total_portfolio_value else 0
-                analysis += f"{i+1}. {security.name or security.description or security.isin or 'Unknown'}: "
-                analysis += f"{security.valuation:,.2f} {security.currency or 'USD'} ({percentage:.2f}% of portfolio)\n"
+                parts.append(f"{i+1}. {security.name or security.description or security.isin or 'Unknown'}: ")
+                parts.append(f"{security.valuation:,.2f} {security.currency or 'USD'} ({percentage:.2f}% of portfolio)\n")
             
-            return analysis
+            return "".join(parts)
         
         @tool
         def generate_investment_recommendations(document_id: int) -> str:
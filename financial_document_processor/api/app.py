@@ -8,7 +8,7 @@ from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
 from financial_document_processor.api.routes import router
-from financial_document_processor.database.db import Database
+from financial_document_processor.api.resources import resources
 
 # Load environment variables
 load_dotenv()
@@ -29,13 +29,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create database tables on startup
+# Create shared resources and database tables on startup
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup."""
-    db = Database(os.environ.get("DATABASE_URL"))
-    db.create_tables()
-    db.close()
+    """Create database tables and load shared resources on startup."""
+    resources.startup()
+
+# Release shared resources on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Dispose the database engine and drop cached agents."""
+    resources.shutdown()
 
 # Include API routes
 app.include_router(router)
@@ -0,0 +1,163 @@
+"""
+Application-lifetime resources for the Financial Document Processor API.
+"""
+import os
+import logging
+import threading
+from typing import Dict, Any, Type
+
+from financial_document_processor.database.db import Database
+from financial_document_processor.agents.config import AIConfig
+from financial_document_processor.agents.document_index import DocumentIndex
+
+class ResourceRegistry:
+    """
+    Holds the pooled database engine, the loaded document index and warm agents
+    for the lifetime of the application.
+
+    Resources are created lazily on first use (or eagerly by ``startup``) and
+    shared across requests. Index writes and reloads are serialized with a lock;
+    reloading the index also drops cached agents so they are rebuilt against the
+    new index on next use.
+    """
+
+    def __init__(self):
+        """Initialize the resource registry."""
+        self._lock = threading.RLock()
+        self._index_lock = threading.RLock()
+        self._database = None
+        self._ai_config = None
+        self._document_index = None
+        self._agents = {}
+
+    def startup(self):
+        """
+        Create the database engine and tables, and load the document index if possible.
+
+        If the index cannot be loaded (missing dependencies, API key or persisted
+        index), startup continues and the index is built on first use instead.
+        """
+        database = self.get_database()
+        database.create_tables()
+
+        try:
+            self.get_document_index()
+        except Exception as e:
+            # The index is optional for the document routes
+            logging.warning(f"Document index not loaded on startup, it will be loaded on first use: {e}")
+
+    def shutdown(self):
+        """Release all resources."""
+        with self._lock:
+            self._agents = {}
+            self._document_index = None
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+    def get_database(self) -> Database:
+        """
+        Get the shared database connection.
+
+        Returns:
+            Database with a pooled engine
+        """
+        if self._database is None:
+            with self._lock:
+                if self._database is None:
+                    self._database = Database(
+                        os.environ.get("DATABASE_URL"),
+                        pool_size=int(os.environ.get("DATABASE_POOL_SIZE", "5")),
+                        max_overflow=int(os.environ.get("DATABASE_MAX_OVERFLOW", "10")),
+                        pool_pre_ping=True
+                    )
+        return self._database
+
+    def get_ai_config(self) -> AIConfig:
+        """
+        Get the shared AI configuration.
+
+        Returns:
+            AIConfig
+        """
+        if self._ai_config is None:
+            with self._lock:
+                if self._ai_config is None:
+                    self._ai_config = AIConfig(
+                        api_key=os.environ.get("OPENAI_API_KEY") or os.environ.get("GOOGLE_API_KEY"),
+                        model_provider=os.environ.get("MODEL_PROVIDER", "openai"),
+                        model_name=os.environ.get("MODEL_NAME")
+                    )
+        return self._ai_config
+
+    def get_document_index(self) -> DocumentIndex:
+        """
+        Get the shared document index, loading it from INDEX_PERSIST_DIR on first use.
+
+        Returns:
+            DocumentIndex
+        """
+        if self._document_index is None:
+            with self._index_lock:
+                if self._document_index is None:
+                    self._document_index = DocumentIndex(
+                        self.get_database(),
+                        self.get_ai_config(),
+                        os.environ.get("INDEX_PERSIST_DIR")
+                    )
+        return self._document_index
+
+    def get_agent(self, agent_class: Type) -> Any:
+        """
+        Get a warm agent instance, creating it on first use.
+
+        Args:
+            agent_class: Agent class taking (database, ai_config, document_index)
+
+        Returns:
+            Agent instance
+        """
+        agent = self._agents.get(agent_class)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(agent_class)
+                if agent is None:
+                    agent = agent_class(self.get_database(), self.get_ai_config(), self.get_document_index())
+                    self._agents[agent_class] = agent
+        return agent
+
+    def index_document(self, document_id: int) -> Dict[str, Any]:
+        """
+        Index a document into the shared index.
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            Dictionary with indexing results
+        """
+        document_index = self.get_document_index()
+        with self._index_lock:
+            return document_index.index_document(document_id)
+
+    def reload_index(self) -> DocumentIndex:
+        """
+        Reload the document index from INDEX_PERSIST_DIR, e.g. after out-of-process ingestion.
+
+        Returns:
+            The newly loaded DocumentIndex
+        """
+        with self._index_lock:
+            document_index = DocumentIndex(
+                self.get_database(),
+                self.get_ai_config(),
+                os.environ.get("INDEX_PERSIST_DIR")
+            )
+            with self._lock:
+                self._document_index = document_index
+                self._agents = {}
+
+        return document_index
+
+# Registry used by the API
+resources = ResourceRegistry()
@@ -10,9 +10,8 @@ from fastapi.responses import JSONResponse, FileResponse
 from financial_document_processor.database.db import Database
 from financial_document_processor.extractors.pdf_extractor import PDFExtractor
 from financial_document_processor.processor import DocumentProcessor
-from financial_document_processor.agents.config import AIConfig
-from financial_document_processor.agents.document_index import DocumentIndex
 from financial_document_processor.agents.financial_agents import FinancialQueryAgent, TableGenerationAgent, FinancialAnalysisAgent
+from financial_document_processor.api.resources import resources
 from financial_document_processor.api.models import (
     Document, DocumentCreate, DocumentSummary, Security, PortfolioValue, AssetAllocation,
     ProcessingResult, QueryRequest, QueryResponse, TableGenerationRequest, TableGenerationResponse,
@@ -24,48 +23,33 @@ router = APIRouter(prefix="/api", tags=["Financial Document Processor"])
 
 # Database dependency
 def get_database():
-    """Get database connection."""
-    db = Database(os.environ.get("DATABASE_URL"))
-    try:
-        yield db
-    finally:
-        db.close()
+    """Get the shared database connection."""
+    return resources.get_database()
 
 # AI config dependency
 def get_ai_config():
     """Get AI configuration."""
-    return AIConfig(
-        api_key=os.environ.get("OPENAI_API_KEY") or os.environ.get("GOOGLE_API_KEY"),
-        model_provider=os.environ.get("MODEL_PROVIDER", "openai"),
-        model_name=os.environ.get("MODEL_NAME")
-    )
+    return resources.get_ai_config()
 
 # Document index dependency
-def get_document_index(db: Database = Depends(get_database), ai_config: AIConfig = Depends(get_ai_config)):
+def get_document_index():
     """Get document index."""
-    persist_dir = os.environ.get("INDEX_PERSIST_DIR")
-    return DocumentIndex(db, ai_config, persist_dir)
+    return resources.get_document_index()
 
 # Financial query agent dependency
-def get_query_agent(db: Database = Depends(get_database), 
-                   ai_config: AIConfig = Depends(get_ai_config),
-                   document_index: DocumentIndex = Depends(get_document_index)):
+def get_query_agent():
     """Get financial query agent."""
-    return FinancialQueryAgent(db, ai_config, document_index)
+    return resources.get_agent(FinancialQueryAgent)
 
 # Table generation agent dependency
-def get_table_agent(db: Database = Depends(get_database), 
-                   ai_config: AIConfig = Depends(get_ai_config),
-                   document_index: DocumentIndex = Depends(get_document_index)):
+def get_table_agent():
     """Get table generation agent."""
-    return TableGenerationAgent(db, ai_config, document_index)
+    return resources.get_agent(TableGenerationAgent)
 
 # Financial analysis agent dependency
-def get_analysis_agent(db: Database = Depends(get_database), 
-                      ai_config: AIConfig = Depends(get_ai_config),
-                      document_index: DocumentIndex = Depends(get_document_index)):
+def get_analysis_agent():
     """Get financial analysis agent."""
-    return FinancialAnalysisAgent(db, ai_config, document_index)
+    return resources.get_agent(FinancialAnalysisAgent)
 
 # Document routes
 @router.post("/documents", response_model=Document)
@@ -189,10 +173,8 @@ async def process_document(
             # Process document
             result = processor.process_document(file_path, document_type=document_type)
             
-            # Index document
-            ai_config = get_ai_config()
-            document_index = DocumentIndex(db, ai_config, os.environ.get("INDEX_PERSIST_DIR"))
-            document_index.index_document(document_id)
+            # Index document into the shared index
+            resources.index_document(document_id)
         except Exception as e:
             logging.error(f"Error processing document: {e}")
             db.update_document_status(document_id, "failed")
@@ -228,10 +210,8 @@ async def process_existing_document(
             # Process document
             result = processor.process_document(file_path, document_type=document_type)
             
-            # Index document
-            ai_config = get_ai_config()
-            document_index = DocumentIndex(db, ai_config, os.environ.get("INDEX_PERSIST_DIR"))
-            document_index.index_document(document_id)
+            # Index document into the shared index
+            resources.index_document(document_id)
         except Exception as e:
             logging.error(f"Error processing document: {e}")
             db.update_document_status(document_id, "failed")
@@ -243,6 +223,12 @@ async def process_existing_document(
         status="processing"
     )
 
+@router.post("/index/reload")
+async def reload_index():
+    """Reload the document index from disk, e.g. after ingestion by another process."""
+    resources.reload_index()
+    return {"status": "reloaded"}
+
 # AI agent routes
 @router.post("/query", response_model=QueryResponse)
 async def query_document(
@@ -4,21 +4,35 @@ Database connection and session management.
 import os
 from typing import Optional, Dict, Any, List
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from financial_document_processor.database.models import Base, Document, Security, PortfolioValue, AssetAllocation, RawText, DocumentTable
 
+# Columns returned by the lightweight security queries
+SECURITY_ROW_COLUMNS = (
+    Security.isin,
+    Security.name,
+    Security.description,
+    Security.security_type,
+    Security.asset_class,
+    Security.valuation,
+    Security.price,
+    Security.quantity,
+    Security.currency
+)
+
 class Database:
     """Database connection and session management."""
     
-    def __init__(self, connection_string: Optional[str] = None):
+    def __init__(self, connection_string: Optional[str] = None, **engine_options):
         """
         Initialize the database connection.
         
         Args:
             connection_string: SQLAlchemy connection string. If None, uses environment variable.
+            **engine_options: Additional options passed to create_engine (e.g. pool_size)
         """
         if connection_string is None:
             connection_string = os.environ.get("DATABASE_URL")
@@ -30,7 +44,11 @@ class Database:
         if not connection_string:
             raise ValueError("Database connection string not provided and DATABASE_URL environment variable not set")
         
-        self.engine = create_engine(connection_string)
+        # Pool sizing options are not supported by SQLite's default pool
+        if connection_string.startswith("sqlite"):
+            engine_options = {k: v for k, v in engine_options.items() if k not in ("pool_size", "max_overflow")}
+        
+        self.engine = create_engine(connection_string, **engine_options)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
     
     def create_tables(self):
@@ -283,6 +301,104 @@ class Database:
         with self.get_session() as session:
             return session.query(Security).filter(Security.document_id == document_id).all()
     
+    def _filter_securities(self, query, document_id: int, asset_class: Optional[str] = None,
+                           security_type: Optional[str] = None, min_valuation: Optional[float] = None):
+        """Apply document and optional column filters to a securities query."""
+        query = query.filter(Security.document_id == document_id)
+        if asset_class is not None:
+            query = query.filter(Security.asset_class == asset_class)
+        if security_type is not None:
+            query = query.filter(Security.security_type == security_type)
+        if min_valuation is not None:
+            query = query.filter(Security.valuation >= min_valuation)
+        return query
+    
+    def get_security_rows(self, document_id: int, limit: Optional[int] = None, offset: int = 0,
+                          asset_class: Optional[str] = None, security_type: Optional[str] = None,
+                          min_valuation: Optional[float] = None) -> List[Any]:
+        """
+        Get securities for a document as lightweight rows instead of ORM objects.
+        
+        Args:
+            document_id: Document ID
+            limit: Maximum number of rows (optional)
+            offset: Number of rows to skip
+            asset_class: Only return securities of this asset class (optional)
+            security_type: Only return securities of this type (optional)
+            min_valuation: Only return securities valued at least this much (optional)
+        
+        Returns:
+            List of rows with the SECURITY_ROW_COLUMNS fields, in insertion order
+        """
+        with self.get_session() as session:
+            query = self._filter_securities(session.query(*SECURITY_ROW_COLUMNS), document_id,
+                                            asset_class, security_type, min_valuation)
+            query = query.order_by(Security.id).offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
+    
+    def get_top_security_rows(self, document_id: int, limit: int = 5,
+                              asset_class: Optional[str] = None) -> List[Any]:
+        """
+        Get the highest valued securities for a document.
+        
+        Args:
+            document_id: Document ID
+            limit: Number of securities to return
+            asset_class: Only consider securities of this asset class (optional)
+        
+        Returns:
+            List of rows with the SECURITY_ROW_COLUMNS fields, by valuation descending
+        """
+        with self.get_session() as session:
+            query = self._filter_securities(session.query(*SECURITY_ROW_COLUMNS), document_id, asset_class)
+            return (
+                query.filter(Security.valuation.isnot(None))
+                .order_by(Security.valuation.desc(), Security.id)
+                .limit(limit)
+                .all()
+            )
+    
+    def get_securities_stats(self, document_id: int, asset_class: Optional[str] = None) -> Any:
+        """
+        Get aggregate statistics for a document's securities.
+        
+        Args:
+            document_id: Document ID
+            asset_class: Only consider securities of this asset class (optional)
+        
+        Returns:
+            Row with count, valued_count and total_valuation fields
+        """
+        with self.get_session() as session:
+            query = session.query(
+                func.count(Security.id).label("count"),
+                func.count(Security.valuation).label("valued_count"),
+                func.coalesce(func.sum(Security.valuation), 0.0).label("total_valuation")
+            )
+            return self._filter_securities(query, document_id, asset_class).one()
+    
+    def get_security_type_counts(self, document_id: int) -> List[Any]:
+        """
+        Count a document's securities by security type.
+        
+        Args:
+            document_id: Document ID
+        
+        Returns:
+            List of (security_type, count) rows, with missing types as "Unknown"
+        """
+        with self.get_session() as session:
+            security_type = func.coalesce(Security.security_type, "Unknown").label("security_type")
+            return (
+                session.query(security_type, func.count(Security.id).label("count"))
+                .filter(Security.document_id == document_id)
+                .group_by(security_type)
+                .order_by(func.min(Security.id))
+                .all()
+            )
+    
     def get_portfolio_value(self, document_id: int) -> Optional[PortfolioValue]:
         """
         Get portfolio value for a document.
@@ -3,7 +3,7 @@ Database models for the Financial Document Processor.
 """
 import datetime
 from typing import Dict, List, Any, Optional
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -67,6 +67,11 @@ class Document(Base):
 class Security(Base):
     """Security model for stocks, bonds, etc."""
     __tablename__ = "securities"
+    __table_args__ = (
+        # Per-document top-N by valuation and asset class filters
+        Index("idx_securities_document_valuation", "document_id", "valuation"),
+        Index("idx_securities_document_asset_class", "document_id", "asset_class"),
+    )
     
     id = Column(Integer, primary_key=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
@@ -127,7 +132,7 @@ class PortfolioValue(Base):
     __tablename__ = "portfolio_values"
     
     id = Column(Integer, primary_key=True)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     
     # Portfolio value data
     value = Column(Float, nullable=False)
@@ -159,7 +164,7 @@ class AssetAllocation(Base):
     __tablename__ = "asset_allocations"
     
     id = Column(Integer, primary_key=True)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     
     # Asset allocation data
     asset_class = Column(String(50), nullable=False)
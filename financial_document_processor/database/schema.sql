@@ -55,6 +55,10 @@ CREATE INDEX IF NOT EXISTS idx_securities_isin ON securities(isin);
 -- Create index on document_id for faster joins
 CREATE INDEX IF NOT EXISTS idx_securities_document_id ON securities(document_id);
 
+-- Create indexes for per-document top holdings and asset class filters
+CREATE INDEX IF NOT EXISTS idx_securities_document_valuation ON securities(document_id, valuation DESC);
+CREATE INDEX IF NOT EXISTS idx_securities_document_asset_class ON securities(document_id, asset_class);
+
 -- Portfolio values table
 CREATE TABLE IF NOT EXISTS portfolio_values (
     id SERIAL PRIMARY KEY,
@@ -261,3 +265,26 @@ CREATE POLICY "Allow service role to manage document_comparisons" ON document_co
 
 CREATE POLICY "Allow service role to manage document_queries" ON document_queries
     FOR ALL USING (auth.role() = 'service_role');
+
+-- Document summaries: counts and aggregates per document, computed in the database
+-- so that one request returns the summaries of any number of documents.
+-- security_invoker applies the RLS policies of the underlying tables to the caller.
+CREATE OR REPLACE VIEW document_summaries WITH (security_invoker = true) AS
+SELECT
+    d.id,
+    d.filename,
+    d.document_type,
+    d.processing_status,
+    d.extraction_date,
+    d.page_count,
+    d.risk_profile,
+    d.currency,
+    (SELECT COUNT(*) FROM securities s WHERE s.document_id = d.id) AS securities_count,
+    (SELECT pv.value FROM portfolio_values pv WHERE pv.document_id = d.id ORDER BY pv.id LIMIT 1) AS portfolio_value,
+    (SELECT COUNT(*) FROM asset_allocations aa WHERE aa.document_id = d.id) AS asset_allocations_count,
+    vr.valid AS validation_valid,
+    vr.issues AS validation_issues
+FROM documents d
+LEFT JOIN LATERAL (
+    SELECT v.valid, v.issues FROM validation_results v WHERE v.document_id = d.id ORDER BY v.id LIMIT 1
+) vr ON TRUE;
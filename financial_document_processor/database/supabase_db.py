@@ -18,6 +18,9 @@ except ImportError:
 class SupabaseDB:
     """Supabase database integration."""
 
+    # Maximum number of document IDs per summary request
+    SUMMARY_BATCH_SIZE = 200
+
     def __init__(self, url: Optional[str] = None, key: Optional[str] = None):
         """
         Initialize the Supabase database connection.
@@ -683,6 +686,9 @@ class SupabaseDB:
         """
         Get a summary of a document.
 
+        The counts and aggregates are computed by the document_summaries view
+        (see schema.sql), so this is a single request.
+
         Args:
             document_id: Document ID
 
@@ -691,42 +697,35 @@ class SupabaseDB:
         """
         logging.info(f"Getting summary for document ID {document_id}")
 
-        # Get document
-        document = self.get_document(document_id)
-        if not document:
+        result = self.client.table('document_summaries').select('*').eq('id', document_id).execute()
+
+        if not result.data:
             raise ValueError(f"Document not found: {document_id}")
 
-        # Get securities count
-        securities = self.get_securities(document_id)
-        securities_count = len(securities)
-
-        # Get portfolio value
-        portfolio_value = self.get_portfolio_value(document_id)
-
-        # Get asset allocations count
-        asset_allocations = self.get_asset_allocations(document_id)
-        asset_allocations_count = len(asset_allocations)
-
-        # Get validation results
-        validation_results = self.get_validation_results(document_id)
-        validation_valid = validation_results[0].get("valid") if validation_results else None
-        validation_issues = validation_results[0].get("issues") if validation_results else None
-
-        # Create summary
-        summary = {
-            "id": document_id,
-            "filename": document.get("filename"),
-            "document_type": document.get("document_type"),
-            "processing_status": document.get("processing_status"),
-            "extraction_date": document.get("extraction_date"),
-            "page_count": document.get("page_count"),
-            "securities_count": securities_count,
-            "portfolio_value": portfolio_value.get("value") if portfolio_value else None,
-            "asset_allocations_count": asset_allocations_count,
-            "risk_profile": document.get("risk_profile"),
-            "currency": document.get("currency"),
-            "validation_valid": validation_valid,
-            "validation_issues": validation_issues
-        }
+        return result.data[0]
+
+    def get_document_summaries(self, document_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the summaries of many documents.
+
+        Args:
+            document_ids: Document IDs, or None for all documents
+
+        Returns:
+            Document summaries, in the order of document_ids; unknown IDs are skipped
+        """
+        if document_ids is None:
+            logging.info("Getting summaries for all documents")
+            return self.client.table('document_summaries').select('*').order('id').execute().data
+
+        logging.info(f"Getting summaries for {len(document_ids)} documents")
+
+        # One request per batch of IDs keeps the query string short
+        summaries = {}
+        for start in range(0, len(document_ids), self.SUMMARY_BATCH_SIZE):
+            batch = document_ids[start:start + self.SUMMARY_BATCH_SIZE]
+            result = self.client.table('document_summaries').select('*').in_('id', batch).execute()
+            for summary in result.data:
+                summaries[summary['id']] = summary
 
-        return summary
+        return [summaries[document_id] for document_id in document_ids if document_id in summaries]
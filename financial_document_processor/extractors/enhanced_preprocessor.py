@@ -5,7 +5,6 @@ import os
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 import json
-import tempfile
 import re
 
 # Configure logging
@@ -30,29 +29,41 @@ except ImportError as e:
 class EnhancedPreprocessor:
     """Enhanced PDF preprocessor for financial documents."""
     
-    def __init__(self, ocr_languages: str = "eng"):
+    # A page passes when it has enough text and most of it is made of real characters
+    MIN_PAGE_CHARS = 20
+    MIN_PAGE_QUALITY = 0.6
+    
+    def __init__(self, ocr_languages: str = "eng", extract_elements: bool = False):
         """
         Initialize the preprocessor.
         
         Args:
             ocr_languages: Languages to use for OCR (e.g., "eng+heb" for English and Hebrew)
+            extract_elements: Whether to also partition the document with unstructured (default: False)
         """
         if not LIBRARIES_AVAILABLE:
             raise ImportError("Required libraries not available")
         
         self.ocr_languages = ocr_languages
+        self.extract_elements = extract_elements
         logger.info(f"Initialized enhanced preprocessor with OCR languages: {ocr_languages}")
     
     def preprocess(self, pdf_path: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
         """
         Preprocess a PDF file.
         
+        Text is acquired page by page, cheapest source first: one pdfplumber pass
+        extracts metadata, page text and tables. Only pages whose text fails the
+        quality bar are re-read with PyPDF2, and only pages that still fail are
+        rendered and OCRed. Each page keeps the text of its best source.
+        
         Args:
             pdf_path: Path to the PDF file
             output_dir: Directory to save preprocessed files (optional)
         
         Returns:
-            Dictionary with preprocessing results
+            Dictionary with preprocessing results; "pages" holds the text of every
+            page with its source and quality, "text" the page texts grouped by source
         """
         logger.info(f"Preprocessing PDF: {pdf_path}")
         
@@ -60,33 +71,38 @@ class EnhancedPreprocessor:
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
         
-        # Extract metadata
-        metadata = self._extract_metadata(pdf_path)
-        
-        # Extract text with pdfplumber
-        pdfplumber_text = self._extract_text_with_pdfplumber(pdf_path)
-        
-        # Extract text with PyPDF2
-        pypdf2_text = self._extract_text_with_pypdf2(pdf_path)
-        
-        # Extract text with OCR
-        ocr_text = self._extract_text_with_ocr(pdf_path)
-        
-        # Extract text with unstructured
-        unstructured_result = self._extract_with_unstructured(pdf_path)
-        
-        # Detect tables
-        tables = self._detect_tables(pdf_path)
+        # Extract metadata, text and tables with pdfplumber
+        metadata, pages, tables = self._read_with_pdfplumber(pdf_path)
+        
+        # Fall back to PyPDF2, then OCR, for the pages that fail the quality bar
+        failing = [page for page in pages if page["quality"] < self.MIN_PAGE_QUALITY]
+        if failing:
+            self._read_with_pypdf2(pdf_path, failing)
+            failing = [page for page in failing if page["quality"] < self.MIN_PAGE_QUALITY]
+        if failing:
+            tables.extend(self._read_with_ocr(pdf_path, failing))
+        
+        sources = {}
+        for page in pages:
+            sources[page["source"]] = sources.get(page["source"], 0) + 1
+        logger.info(f"Text sources by page count: {sources}")
+        
+        # Extract elements with unstructured
+        unstructured_result = self._extract_with_unstructured(pdf_path) if self.extract_elements else {"elements": [], "text": ""}
+        
+        # Group page texts by source
+        text = {}
+        for page in pages:
+            marker = f"--- Page {page['page']} (OCR) ---" if page["source"] == "ocr" else f"--- Page {page['page']} ---"
+            text[page["source"]] = text.get(page["source"], "") + f"\n\n{marker}\n\n{page['text']}"
+        if unstructured_result.get("text"):
+            text["unstructured"] = unstructured_result["text"]
         
         # Combine results
         result = {
             "metadata": metadata,
-            "text": {
-                "pdfplumber": pdfplumber_text,
-                "pypdf2": pypdf2_text,
-                "ocr": ocr_text,
-                "unstructured": unstructured_result.get("text", "")
-            },
+            "pages": pages,
+            "text": text,
             "elements": unstructured_result.get("elements", []),
             "tables": tables
         }
@@ -95,11 +111,11 @@ class EnhancedPreprocessor:
         if output_dir:
             # Save combined text
             with open(os.path.join(output_dir, "combined_text.txt"), "w", encoding="utf-8") as f:
-                f.write(pdfplumber_text + "\n\n" + pypdf2_text + "\n\n" + ocr_text + "\n\n" + unstructured_result.get("text", ""))
+                f.write("".join(f"\n\n--- Page {page['page']} ({page['source']}) ---\n\n{page['text']}" for page in pages))
             
             # Save metadata
             with open(os.path.join(output_dir, "metadata.json"), "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
+                json.dump(metadata, f, indent=2, default=str)
             
             # Save tables
             with open(os.path.join(output_dir, "tables.json"), "w", encoding="utf-8") as f:
@@ -108,105 +124,134 @@ class EnhancedPreprocessor:
         logger.info(f"Preprocessing completed for {pdf_path}")
         return result
     
-    def _extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract metadata from the PDF."""
-        logger.info(f"Extracting metadata from {pdf_path}")
+    def _score_text(self, text: str) -> float:
+        """Score the quality of a page's text between 0 and 1."""
+        chars = [c for c in text if not c.isspace()]
+        if len(chars) < self.MIN_PAGE_CHARS:
+            return 0.0
+        
+        # Glyphs without a Unicode mapping come out as (cid:N) or replacement characters
+        garbage = text.count("(cid:") * 6 + text.count("\ufffd")
+        readable = sum(1 for c in chars if c.isalnum() or c in ".,;:%'()/-$€£")
+        return max(0.0, (readable - garbage) / len(chars))
+    
+    def _set_page_text(self, page: Dict[str, Any], text: str, source: str):
+        """Keep a page's text if it scores better than its current text."""
+        quality = self._score_text(text)
+        if quality > page["quality"]:
+            page.update({"text": text, "source": source, "quality": quality})
+    
+    def _read_with_pdfplumber(self, pdf_path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Extract metadata, page text and tables in a single pdfplumber pass."""
+        logger.info(f"Extracting text and tables with pdfplumber from {pdf_path}")
         
         metadata = {
             "filename": os.path.basename(pdf_path),
             "path": pdf_path,
             "size_bytes": os.path.getsize(pdf_path)
         }
-        
-        # Extract metadata with PyPDF2
-        try:
-            with open(pdf_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                metadata["page_count"] = len(reader.pages)
-                metadata["pdf_info"] = reader.metadata
-                
-                # Extract creation date
-                if hasattr(reader.metadata, "/CreationDate"):
-                    metadata["creation_date"] = reader.metadata.get("/CreationDate", "")
-                
-                # Extract modification date
-                if hasattr(reader.metadata, "/ModDate"):
-                    metadata["modification_date"] = reader.metadata.get("/ModDate", "")
-        except Exception as e:
-            logger.warning(f"Error extracting metadata with PyPDF2: {e}")
-        
-        # Extract metadata with pdfplumber
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                if not metadata.get("page_count"):
-                    metadata["page_count"] = len(pdf.pages)
-                
-                if not metadata.get("pdf_info") and hasattr(pdf, "metadata"):
-                    metadata["pdf_info"] = pdf.metadata
-        except Exception as e:
-            logger.warning(f"Error extracting metadata with pdfplumber: {e}")
-        
-        return metadata
-    
-    def _extract_text_with_pdfplumber(self, pdf_path: str) -> str:
-        """Extract text from PDF using pdfplumber."""
-        logger.info(f"Extracting text with pdfplumber from {pdf_path}")
+        pages = []
+        tables = []
         
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for i, page in enumerate(pdf.pages):
-                    page_text = page.extract_text() or ""
-                    text += f"\n\n--- Page {i+1} ---\n\n{page_text}"
+                metadata["page_count"] = len(pdf.pages)
+                metadata["pdf_info"] = pdf.metadata
+                if pdf.metadata.get("CreationDate"):
+                    metadata["creation_date"] = pdf.metadata["CreationDate"]
+                if pdf.metadata.get("ModDate"):
+                    metadata["modification_date"] = pdf.metadata["ModDate"]
                 
-                return text
+                for i, pdf_page in enumerate(pdf.pages):
+                    page = {"page": i + 1, "text": "", "source": "pdfplumber", "quality": 0.0}
+                    try:
+                        self._set_page_text(page, pdf_page.extract_text() or "", "pdfplumber")
+                        for j, table_data in enumerate(pdf_page.extract_tables()):
+                            tables.append({
+                                "page": i + 1,
+                                "table_number": j + 1,
+                                "extraction_method": "pdfplumber",
+                                "data": table_data
+                            })
+                    except Exception as e:
+                        logger.warning(f"Error extracting page {i + 1} with pdfplumber: {e}")
+                    pages.append(page)
         except Exception as e:
             logger.warning(f"Error extracting text with pdfplumber: {e}")
-            return ""
+        
+        # Without pdfplumber, the page count comes from PyPDF2 and every page goes to the fallbacks
+        if not pages:
+            try:
+                with open(pdf_path, "rb") as f:
+                    metadata["page_count"] = len(PyPDF2.PdfReader(f).pages)
+            except Exception as e:
+                logger.warning(f"Error extracting metadata with PyPDF2: {e}")
+            pages = [
+                {"page": i + 1, "text": "", "source": "pdfplumber", "quality": 0.0}
+                for i in range(metadata.get("page_count", 0))
+            ]
+        
+        return metadata, pages, tables
     
-    def _extract_text_with_pypdf2(self, pdf_path: str) -> str:
-        """Extract text from PDF using PyPDF2."""
-        logger.info(f"Extracting text with PyPDF2 from {pdf_path}")
+    def _read_with_pypdf2(self, pdf_path: str, pages: List[Dict[str, Any]]):
+        """Re-extract the text of the given pages with PyPDF2."""
+        logger.info(f"Extracting text with PyPDF2 from {len(pages)} pages of {pdf_path}")
         
         try:
             with open(pdf_path, "rb") as f:
                 reader = PyPDF2.PdfReader(f)
-                text = ""
-                for i, page in enumerate(reader.pages):
-                    page_text = page.extract_text() or ""
-                    text += f"\n\n--- Page {i+1} ---\n\n{page_text}"
-                
-                return text
+                for page in pages:
+                    try:
+                        self._set_page_text(page, reader.pages[page["page"] - 1].extract_text() or "", "pypdf2")
+                    except Exception as e:
+                        logger.warning(f"Error extracting page {page['page']} with PyPDF2: {e}")
         except Exception as e:
             logger.warning(f"Error extracting text with PyPDF2: {e}")
-            return ""
     
-    def _extract_text_with_ocr(self, pdf_path: str) -> str:
-        """Extract text from PDF using OCR."""
-        logger.info(f"Extracting text with OCR from {pdf_path}")
+    def _read_with_ocr(self, pdf_path: str, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """OCR the given pages, detecting table regions on the rendered images."""
+        logger.info(f"Extracting text with OCR from {len(pages)} pages of {pdf_path}")
         
-        try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path)
-            
-            text = ""
-            for i, image in enumerate(images):
-                # Save image to temporary file
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp:
-                    temp_path = temp.name
-                    image.save(temp_path, "PNG")
+        tables = []
+        for page in pages:
+            try:
+                # Render only this page
+                images = convert_from_path(pdf_path, first_page=page["page"], last_page=page["page"])
+                if not images:
+                    continue
+                image = images[0]
                 
                 # Perform OCR
-                page_text = pytesseract.image_to_string(temp_path, lang=self.ocr_languages)
-                text += f"\n\n--- Page {i+1} (OCR) ---\n\n{page_text}"
+                self._set_page_text(page, pytesseract.image_to_string(image, lang=self.ocr_languages), "ocr")
                 
-                # Remove temporary file
-                os.unlink(temp_path)
-            
-            return text
-        except Exception as e:
-            logger.warning(f"Error extracting text with OCR: {e}")
-            return ""
+                # Detect tables with OpenCV
+                tables.extend(self._detect_table_regions(image, page["page"]))
+            except Exception as e:
+                logger.warning(f"Error extracting page {page['page']} with OCR: {e}")
+        
+        return tables
+    
+    def _detect_table_regions(self, image, page_number: int) -> List[Dict[str, Any]]:
+        """Detect table regions on a rendered page with OpenCV."""
+        gray = cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+        
+        # Apply threshold
+        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
+        
+        # Find contours
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        # Filter contours by size
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w > 100 and h > 100:  # Minimum size for a table
+                regions.append({
+                    "page": page_number,
+                    "extraction_method": "opencv",
+                    "coordinates": {"x": x, "y": y, "width": w, "height": h}
+                })
+        return regions
     
     def _extract_with_unstructured(self, pdf_path: str) -> Dict[str, Any]:
         """Extract content using unstructured."""
@@ -242,65 +287,6 @@ class EnhancedPreprocessor:
             logger.warning(f"Error extracting with unstructured: {e}")
             return {"elements": [], "text": ""}
     
-    def _detect_tables(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Detect tables in the PDF."""
-        logger.info(f"Detecting tables in {pdf_path}")
-        
-        tables = []
-        
-        # Detect tables with pdfplumber
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    page_tables = page.extract_tables()
-                    for j, table_data in enumerate(page_tables):
-                        tables.append({
-                            "page": i + 1,
-                            "table_number": j + 1,
-                            "extraction_method": "pdfplumber",
-                            "data": table_data
-                        })
-        except Exception as e:
-            logger.warning(f"Error detecting tables with pdfplumber: {e}")
-        
-        # Detect tables with OpenCV
-        try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path)
-            
-            for i, image in enumerate(images):
-                # Save image to temporary file
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp:
-                    temp_path = temp.name
-                    image.save(temp_path, "PNG")
-                
-                # Load image with OpenCV
-                img = cv2.imread(temp_path)
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                
-                # Apply threshold
-                _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
-                
-                # Find contours
-                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                
-                # Filter contours by size
-                for contour in contours:
-                    x, y, w, h = cv2.boundingRect(contour)
-                    if w > 100 and h > 100:  # Minimum size for a table
-                        tables.append({
-                            "page": i + 1,
-                            "extraction_method": "opencv",
-                            "coordinates": {"x": x, "y": y, "width": w, "height": h}
-                        })
-                
-                # Remove temporary file
-                os.unlink(temp_path)
-        except Exception as e:
-            logger.warning(f"Error detecting tables with OpenCV: {e}")
-        
-        return tables
-    
     def detect_financial_entities(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
         """
         Detect financial entities in text.
@@ -3,11 +3,15 @@ Multi-tool extractor for financial documents with reconciliation.
 """
 import os
 import logging
+import inspect
 from typing import Dict, List, Any, Optional, Tuple
 import json
 import tempfile
 import re
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,17 +20,63 @@ logger = logging.getLogger(__name__)
 # Import enhanced preprocessor
 from financial_document_processor.extractors.enhanced_preprocessor import EnhancedPreprocessor
 
+NUMBER_PATTERN = re.compile(r"^[(\-]?[\d'.,]+%?\)?$")
+
+def _extract_tables_with_camelot(pdf_path: str, pages: str, flavor: str) -> List[Dict[str, Any]]:
+    """Extract tables from the given pages with camelot; runs in a worker process."""
+    import camelot
+    
+    tables = []
+    for i, table in enumerate(camelot.read_pdf(pdf_path, pages=pages, flavor=flavor)):
+        tables.append({
+            "page": table.page,
+            "extraction_method": f"camelot_{flavor}",
+            "table_number": i + 1,
+            "data": table.data,
+            "headers": table.data[0] if len(table.data) > 0 else [],
+            "rows": table.data[1:] if len(table.data) > 1 else [],
+            "accuracy": table.accuracy
+        })
+    return tables
+
+_table_executor = None
+_table_executor_lock = threading.Lock()
+
+def _get_table_executor() -> ProcessPoolExecutor:
+    """Get the worker processes shared by all extractors for the camelot passes."""
+    global _table_executor
+    if _table_executor is None:
+        with _table_executor_lock:
+            if _table_executor is None:
+                _table_executor = ProcessPoolExecutor(max_workers=2)
+    return _table_executor
+
+def _reset_table_executor(executor: ProcessPoolExecutor):
+    """Drop a broken executor so that the next document starts new workers."""
+    global _table_executor
+    with _table_executor_lock:
+        if _table_executor is executor:
+            _table_executor = None
+    executor.shutdown(wait=False)
+
 class MultiToolExtractor:
     """Multi-tool extractor for financial documents with reconciliation."""
     
-    def __init__(self, ocr_languages: str = "eng"):
+    # Thresholds of the table page probe; ruling lines are needed in both directions,
+    # as most pages have a few horizontal separators or decorative vertical bars
+    MIN_RULING_LINES = 4
+    MIN_NUMERIC_ROWS = 3
+    
+    def __init__(self, ocr_languages: str = "eng", parallel_tables: bool = True):
         """
         Initialize the extractor.
         
         Args:
             ocr_languages: Languages to use for OCR (e.g., "eng+heb" for English and Hebrew)
+            parallel_tables: Whether to run the camelot passes in worker processes (default: True)
         """
         self.preprocessor = EnhancedPreprocessor(ocr_languages=ocr_languages)
+        self.parallel_tables = parallel_tables
         logger.info(f"Initialized multi-tool extractor with OCR languages: {ocr_languages}")
         
         # Try to import extraction libraries
@@ -40,6 +90,11 @@ class MultiToolExtractor:
         try:
             import tabula
             self.tabula_available = True
+            # Newer tabula-py versions can run in a JVM kept alive in this process instead of
+            # launching java for every call
+            self.tabula_options = {}
+            if "force_subprocess" in inspect.signature(tabula.read_pdf).parameters:
+                self.tabula_options["force_subprocess"] = False
         except ImportError:
             self.tabula_available = False
             logger.warning("Tabula not available. Install with: pip install tabula-py")
@@ -67,23 +122,26 @@ class MultiToolExtractor:
         # Extract tables with multiple tools
         tables = self._extract_tables_with_multiple_tools(pdf_path)
         
+        # Read the best text of every page in page order
+        text_dict = self._get_page_text(preprocessed)
+        
         # Extract financial entities
-        entities = self._extract_financial_entities(preprocessed["text"])
+        entities = self._extract_financial_entities(text_dict)
         
         # Extract portfolio value
-        portfolio_value = self._extract_portfolio_value(preprocessed["text"], tables)
+        portfolio_value = self._extract_portfolio_value(text_dict, tables)
         
         # Extract securities
-        securities = self._extract_securities(preprocessed["text"], tables, entities)
+        securities = self._extract_securities(text_dict, tables, entities)
         
         # Extract asset allocation
-        asset_allocation = self._extract_asset_allocation(preprocessed["text"], tables, entities)
+        asset_allocation = self._extract_asset_allocation(text_dict, tables, entities)
         
         # Extract risk profile
-        risk_profile = self._extract_risk_profile(preprocessed["text"])
+        risk_profile = self._extract_risk_profile(text_dict)
         
         # Extract currency
-        currency = self._extract_currency(preprocessed["text"], entities)
+        currency = self._extract_currency(text_dict, entities)
         
         # Combine results
         result = {
@@ -119,17 +177,60 @@ class MultiToolExtractor:
         else:
             return str(obj)
     
+    def _get_page_text(self, preprocessed: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Join the preprocessed pages into the text read by the extraction steps.
+        
+        The preprocessor groups page texts by the source that produced them, which
+        takes pages out of order when sources are mixed; the pages keep each page's
+        best text once and in order.
+        """
+        text_dict = {
+            "pages": "".join(f"\n\n--- Page {page['page']} ---\n\n{page['text']}" for page in preprocessed["pages"])
+        }
+        if preprocessed["text"].get("unstructured"):
+            text_dict["unstructured"] = preprocessed["text"]["unstructured"]
+        return text_dict
+    
+    def _is_table_page(self, page) -> bool:
+        """Cheap probe for whether a page is likely to contain a table."""
+        # Ruled tables: enough horizontal and vertical ruling lines; cell rectangles count for both
+        horizontal = sum(1 for line in page.lines if abs(line["top"] - line["bottom"]) < 1)
+        vertical = len(page.lines) - horizontal
+        if min(horizontal, vertical) + len(page.rects) >= self.MIN_RULING_LINES:
+            return True
+        
+        # Borderless tables: several text rows with at least two numeric cells
+        rows = defaultdict(int)
+        for word in page.extract_words():
+            if NUMBER_PATTERN.match(word["text"]):
+                rows[round(word["top"])] += 1
+        return sum(1 for count in rows.values() if count >= 2) >= self.MIN_NUMERIC_ROWS
+    
     def _extract_tables_with_multiple_tools(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Extract tables from PDF using multiple tools."""
+        """
+        Extract tables from PDF using multiple tools.
+        
+        A pdfplumber pass finds the pages likely to contain tables and extracts
+        their tables. Camelot (lattice and stream) and tabula then only read
+        those pages: the camelot passes run in worker processes while tabula
+        runs in this process, so table extraction scales with the number of
+        table pages rather than with the page count times the number of tools.
+        """
         logger.info(f"Extracting tables from {pdf_path} using multiple tools")
         
         tables = []
+        table_pages = []
         
-        # Extract tables with pdfplumber
+        # Find table pages and extract their tables with pdfplumber
         try:
             import pdfplumber
             with pdfplumber.open(pdf_path) as pdf:
                 for i, page in enumerate(pdf.pages):
+                    if not self._is_table_page(page):
+                        continue
+                    
+                    table_pages.append(i + 1)
                     page_tables = page.extract_tables()
                     for j, table_data in enumerate(page_tables):
                         tables.append({
@@ -138,70 +239,83 @@ class MultiToolExtractor:
                             "extraction_method": "pdfplumber",
                             "data": table_data
                         })
+                page_count = len(pdf.pages)
             
+            logger.info(f"Found {len(table_pages)} table pages out of {page_count}")
             logger.info(f"Extracted {len(tables)} tables with pdfplumber")
         except Exception as e:
+            # Without the probe, let the other tools read every page
             logger.warning(f"Error extracting tables with pdfplumber: {e}")
+            table_pages = None
         
-        # Extract tables with camelot
-        if self.camelot_available:
-            try:
-                import camelot
-                
-                # Try lattice mode first (for tables with borders)
-                lattice_tables = camelot.read_pdf(pdf_path, pages="all", flavor="lattice")
-                
-                # Then try stream mode (for tables without borders)
-                stream_tables = camelot.read_pdf(pdf_path, pages="all", flavor="stream")
-                
-                # Process lattice tables
-                for i, table in enumerate(lattice_tables):
-                    tables.append({
-                        "page": table.page,
-                        "extraction_method": "camelot_lattice",
-                        "table_number": i + 1,
-                        "data": table.data,
-                        "headers": table.data[0] if len(table.data) > 0 else [],
-                        "rows": table.data[1:] if len(table.data) > 1 else [],
-                        "accuracy": table.accuracy
-                    })
-                
-                # Process stream tables
-                for i, table in enumerate(stream_tables):
-                    tables.append({
-                        "page": table.page,
-                        "extraction_method": "camelot_stream",
-                        "table_number": i + 1,
-                        "data": table.data,
-                        "headers": table.data[0] if len(table.data) > 0 else [],
-                        "rows": table.data[1:] if len(table.data) > 1 else [],
-                        "accuracy": table.accuracy
-                    })
-                
-                logger.info(f"Extracted {len(lattice_tables) + len(stream_tables)} tables with camelot")
-            except Exception as e:
-                logger.warning(f"Error extracting tables with camelot: {e}")
-        
-        # Extract tables with tabula
-        if self.tabula_available:
-            try:
-                import tabula
-                
-                # Extract tables
-                tabula_tables = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
-                
-                for i, table in enumerate(tabula_tables):
-                    tables.append({
-                        "extraction_method": "tabula",
-                        "table_number": i + 1,
-                        "data": table.values.tolist(),
-                        "headers": table.columns.tolist()
-                    })
-                
-                logger.info(f"Extracted {len(tabula_tables)} tables with tabula")
-            except Exception as e:
-                logger.warning(f"Error extracting tables with tabula: {e}")
+        if table_pages == []:
+            return tables
+        pages = ",".join(str(page) for page in table_pages) if table_pages else "all"
         
+        # Start the camelot passes (lattice for tables with borders, stream for tables without)
+        camelot_jobs = []
+        executor = None
+        if self.camelot_available:
+            flavors = ["lattice", "stream"]
+            if self.parallel_tables:
+                try:
+                    executor = _get_table_executor()
+                    camelot_jobs = [
+                        (flavor, executor.submit(_extract_tables_with_camelot, pdf_path, pages, flavor))
+                        for flavor in flavors
+                    ]
+                except Exception as e:
+                    logger.warning(f"Could not start table extraction workers, running camelot inline: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        _reset_table_executor(executor)
+                    camelot_jobs = []
+            if not camelot_jobs:
+                camelot_jobs = [(flavor, None) for flavor in flavors]
+        
+        tabula_results = []
+        try:
+            # Extract tables with tabula while camelot runs
+            if self.tabula_available:
+                try:
+                    import tabula
+                    
+                    # Extract tables
+                    tabula_pages = table_pages or "all"
+                    tabula_tables = tabula.read_pdf(pdf_path, pages=tabula_pages, multiple_tables=True, **self.tabula_options)
+                    
+                    for i, table in enumerate(tabula_tables):
+                        tabula_results.append({
+                            "extraction_method": "tabula",
+                            "table_number": i + 1,
+                            "data": table.values.tolist(),
+                            "headers": table.columns.tolist()
+                        })
+                    
+                    logger.info(f"Extracted {len(tabula_tables)} tables with tabula")
+                except Exception as e:
+                    logger.warning(f"Error extracting tables with tabula: {e}")
+            
+            # Collect camelot tables
+            for flavor, future in camelot_jobs:
+                try:
+                    if future is not None:
+                        camelot_tables = future.result()
+                    else:
+                        camelot_tables = _extract_tables_with_camelot(pdf_path, pages, flavor)
+                    tables.extend(camelot_tables)
+                    logger.info(f"Extracted {len(camelot_tables)} tables with camelot ({flavor})")
+                except BrokenProcessPool as e:
+                    logger.warning(f"Table extraction workers stopped, camelot ({flavor}) skipped: {e}")
+                    _reset_table_executor(executor)
+                except Exception as e:
+                    logger.warning(f"Error extracting tables with camelot ({flavor}): {e}")
+        finally:
+            # The workers are shared, so only drop the passes of this document
+            for _, future in camelot_jobs:
+                if future is not None:
+                    future.cancel()
+        
+        tables.extend(tabula_results)
         return tables
     
     def _extract_financial_entities(self, text_dict: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
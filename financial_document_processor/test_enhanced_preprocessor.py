@@ -0,0 +1,71 @@
+"""
+Tests for the page quality scoring and text fallbacks of the enhanced preprocessor.
+"""
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financial_document_processor.extractors.enhanced_preprocessor import EnhancedPreprocessor
+
+NATIVE_TEXT = "Valuation as of 28.02.2025\nTotal assets USD 19'510'599 100.00%\nISIN: XS2530201644"
+CID_TEXT = " ".join(f"(cid:{n})" for n in range(40, 80))
+
+class RecordingPreprocessor(EnhancedPreprocessor):
+    """Preprocessor whose text sources return fixed texts and record the pages they read."""
+
+    def __init__(self, pypdf2_texts):
+        super().__init__()
+        self.pypdf2_texts = pypdf2_texts
+        self.calls = {"pypdf2": [], "ocr": []}
+
+    def _read_with_pdfplumber(self, pdf_path):
+        pages = []
+        for i, text in enumerate([NATIVE_TEXT, CID_TEXT]):
+            page = {"page": i + 1, "text": "", "source": "pdfplumber", "quality": 0.0}
+            self._set_page_text(page, text, "pdfplumber")
+            pages.append(page)
+        return {"filename": os.path.basename(pdf_path)}, pages, []
+
+    def _read_with_pypdf2(self, pdf_path, pages):
+        self.calls["pypdf2"].append([page["page"] for page in pages])
+        for page in pages:
+            self._set_page_text(page, self.pypdf2_texts[page["page"]], "pypdf2")
+
+    def _read_with_ocr(self, pdf_path, pages):
+        self.calls["ocr"].append([page["page"] for page in pages])
+        for page in pages:
+            self._set_page_text(page, NATIVE_TEXT, "ocr")
+        return []
+
+class TestPageFallbacks(unittest.TestCase):
+    """Tests for EnhancedPreprocessor.preprocess."""
+
+    def test_scores(self):
+        """Test that native text passes the quality bar and unmapped glyphs fail it."""
+        preprocessor = EnhancedPreprocessor()
+        self.assertGreaterEqual(preprocessor._score_text(NATIVE_TEXT), preprocessor.MIN_PAGE_QUALITY)
+        self.assertLess(preprocessor._score_text(CID_TEXT), preprocessor.MIN_PAGE_QUALITY)
+        self.assertEqual(preprocessor._score_text("Page 1"), 0.0)
+
+    def test_only_failing_pages_are_ocred(self):
+        """Test that the native page skips the fallbacks and the (cid:N) page goes through both."""
+        preprocessor = RecordingPreprocessor({2: CID_TEXT})
+        result = preprocessor.preprocess("statement.pdf")
+
+        self.assertEqual(preprocessor.calls, {"pypdf2": [[2]], "ocr": [[2]]})
+        self.assertEqual([page["source"] for page in result["pages"]], ["pdfplumber", "ocr"])
+        self.assertEqual(sorted(result["text"]), ["ocr", "pdfplumber"])
+
+    def test_pypdf2_text_avoids_ocr(self):
+        """Test that a page fixed by PyPDF2 is not OCRed."""
+        preprocessor = RecordingPreprocessor({2: NATIVE_TEXT})
+        result = preprocessor.preprocess("statement.pdf")
+
+        self.assertEqual(preprocessor.calls, {"pypdf2": [[2]], "ocr": []})
+        self.assertEqual(result["pages"][1]["source"], "pypdf2")
+
+if __name__ == "__main__":
+    unittest.main()
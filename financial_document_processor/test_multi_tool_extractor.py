@@ -0,0 +1,73 @@
+"""
+Tests for the table page probe of the multi-tool extractor.
+"""
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financial_document_processor.extractors.multi_tool_extractor import MultiToolExtractor
+
+def horizontal_line(top):
+    return {"x0": 37, "x1": 777, "top": top, "bottom": top}
+
+def vertical_line(x0, top=0, bottom=85):
+    return {"x0": x0, "x1": x0, "top": top, "bottom": bottom}
+
+def words(*rows):
+    return [
+        {"text": text, "top": 100 + 12 * i}
+        for i, row in enumerate(rows)
+        for text in row.split()
+    ]
+
+class FakePage:
+    """Page exposing the pdfplumber attributes read by the probe."""
+
+    def __init__(self, lines=None, rects=None, words=None):
+        self.lines = lines or []
+        self.rects = rects or []
+        self.words = words or []
+
+    def extract_words(self):
+        return self.words
+
+class TestTablePageProbe(unittest.TestCase):
+    """Tests for MultiToolExtractor._is_table_page."""
+
+    def setUp(self):
+        """Create an extractor."""
+        self.extractor = MultiToolExtractor()
+
+    def test_text_page_is_skipped(self):
+        """Test that separators, page decorations and single numbers do not make a table."""
+        page = FakePage(
+            lines=[horizontal_line(top) for top in (120, 140, 160, 180, 200)] + [vertical_line(782), vertical_line(782, 551, 580)],
+            words=words("Summary 1", "Asset Allocation 2", "Bonds 6", "Equities 10", "Print date 01.03.2025 // Page 5/18")
+        )
+        self.assertFalse(self.extractor._is_table_page(page))
+
+    def test_borderless_table_page_is_kept(self):
+        """Test that rows with several numeric cells make a table."""
+        page = FakePage(
+            lines=[vertical_line(782)],
+            words=words(
+                "USD 47'849.64 ORDINARY USD 47'850 0.25%",
+                "CHF 800 UBS GROUP 221.5641 30.9000 11.43% -86.37% 24'720 0.14%",
+                "Total Equities USD 27'406 0.14%"
+            )
+        )
+        self.assertTrue(self.extractor._is_table_page(page))
+
+    def test_ruled_table_page_is_kept(self):
+        """Test that a grid of ruling lines makes a table even without numbers."""
+        page = FakePage(
+            lines=[horizontal_line(top) for top in (100, 120, 140, 160)] + [vertical_line(x0, 100, 160) for x0 in (37, 200, 400, 777)],
+            words=words("Name Country", "Alpha Switzerland")
+        )
+        self.assertTrue(self.extractor._is_table_page(page))
+
+if __name__ == "__main__":
+    unittest.main()
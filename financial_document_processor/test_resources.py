@@ -0,0 +1,161 @@
+"""
+Tests for the application-lifetime resources of the API, against a temporary SQLite database.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financial_document_processor.api import resources as resources_module
+from financial_document_processor.api.resources import ResourceRegistry
+
+try:
+    from fastapi.testclient import TestClient
+    from financial_document_processor.api.app import app
+except ImportError:
+    app = None
+
+class FakeIndex:
+    """Document index that records what it indexes, and can hold an indexing call open."""
+
+    loaded = []
+
+    def __init__(self, database, ai_config, persist_dir):
+        self.database = database
+        self.persist_dir = persist_dir
+        self.indexed = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        FakeIndex.loaded.append(self)
+
+    def index_document(self, document_id):
+        self.entered.set()
+        self.release.wait(5)
+        self.indexed.append(document_id)
+        return {"document_id": document_id, "status": "indexed"}
+
+class FakeAgent:
+    """Agent built from the shared resources."""
+
+    def __init__(self, database, ai_config, document_index):
+        self.document_index = document_index
+
+class RegistryTestCase(unittest.TestCase):
+    """Points the registry at a temporary SQLite database and a fake index."""
+
+    def setUp(self):
+        """Set up the environment and the registry."""
+        self.temp_dir = tempfile.mkdtemp()
+        environment = patch.dict(os.environ, {
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.temp_dir, 'documents.db')}",
+            "INDEX_PERSIST_DIR": os.path.join(self.temp_dir, "index")
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        # The real index and configuration need LlamaIndex and a model provider library
+        for name, fake in [("DocumentIndex", FakeIndex), ("AIConfig", lambda **kwargs: SimpleNamespace(**kwargs))]:
+            patcher = patch.object(resources_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        FakeIndex.loaded = []
+
+        self.registry = ResourceRegistry()
+
+    def tearDown(self):
+        """Release the registry and remove the database."""
+        self.registry.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+class TestResourceRegistry(RegistryTestCase):
+    """Tests for the ResourceRegistry."""
+
+    def test_startup_creates_tables_and_loads_the_index(self):
+        """Test that startup creates the tables and loads the index once."""
+        self.registry.startup()
+
+        document = self.registry.get_database().store_document({"filename": "a.pdf"})
+        self.assertIsNotNone(document.id)
+        self.assertEqual(len(FakeIndex.loaded), 1)
+        self.assertIs(self.registry.get_document_index(), FakeIndex.loaded[0])
+        self.assertEqual(FakeIndex.loaded[0].persist_dir, os.environ["INDEX_PERSIST_DIR"])
+
+    def test_startup_continues_without_the_index(self):
+        """Test that a failed index load leaves the database usable and is retried on first use."""
+        with patch.object(resources_module, "DocumentIndex", side_effect=ImportError("llama-index")):
+            with self.assertLogs(level="WARNING"):
+                self.registry.startup()
+
+        self.assertIsNotNone(self.registry.get_database().store_document({"filename": "a.pdf"}).id)
+        self.assertIsInstance(self.registry.get_document_index(), FakeIndex)
+
+    def test_shutdown_releases_the_resources(self):
+        """Test that shutdown drops the engine, the index and the agents."""
+        self.registry.startup()
+        database = self.registry.get_database()
+        agent = self.registry.get_agent(FakeAgent)
+
+        self.registry.shutdown()
+        self.assertIsNot(self.registry.get_database(), database)
+        self.assertIsNot(self.registry.get_agent(FakeAgent), agent)
+        self.assertEqual(len(FakeIndex.loaded), 2)
+
+    def test_agents_are_shared_until_the_index_is_reloaded(self):
+        """Test that agents are built once and rebuilt against a reloaded index."""
+        agent = self.registry.get_agent(FakeAgent)
+        self.assertIs(self.registry.get_agent(FakeAgent), agent)
+
+        index = self.registry.reload_index()
+        reloaded = self.registry.get_agent(FakeAgent)
+        self.assertIsNot(reloaded, agent)
+        self.assertIs(reloaded.document_index, index)
+        self.assertIs(self.registry.get_document_index(), index)
+
+    def test_reload_waits_for_indexing(self):
+        """Test that a reload does not replace the index while a document is being indexed."""
+        index = self.registry.get_document_index()
+        index.release.clear()
+
+        indexing = threading.Thread(target=self.registry.index_document, args=(7,))
+        indexing.start()
+        self.assertTrue(index.entered.wait(5))
+
+        reloading = threading.Thread(target=self.registry.reload_index)
+        reloading.start()
+        reloading.join(0.2)
+        self.assertTrue(reloading.is_alive())
+        self.assertIs(self.registry.get_document_index(), index)
+
+        index.release.set()
+        indexing.join(5)
+        reloading.join(5)
+        self.assertEqual(index.indexed, [7])
+        self.assertIsNot(self.registry.get_document_index(), index)
+
+@unittest.skipIf(app is None, "FastAPI is not installed")
+class TestReloadRoute(RegistryTestCase):
+    """Tests for the /index/reload route."""
+
+    def test_reload_route_replaces_the_index(self):
+        """Test that the route reloads the index of the registry used by the API."""
+        with patch.object(resources_module, "resources", self.registry), \
+             patch("financial_document_processor.api.routes.resources", self.registry), \
+             patch("financial_document_processor.api.app.resources", self.registry):
+            with TestClient(app) as client:
+                index = self.registry.get_document_index()
+                response = client.post("/api/index/reload")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "reloaded"})
+        self.assertIsNot(self.registry.get_document_index(), index)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for the row-level security queries, against an in-memory SQLite database.
+"""
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financial_document_processor.database.db import Database
+
+SECURITIES = [
+    {"isin": "XS0000000001", "name": "Bond A", "security_type": "bond", "asset_class": "Bonds", "valuation": 300.0, "currency": "USD"},
+    {"isin": "XS0000000002", "description": "Bond B", "security_type": "bond", "asset_class": "Bonds", "valuation": 100.0},
+    {"isin": "US0000000003", "name": "Equity C", "security_type": "equity", "asset_class": "Equities", "valuation": 500.0},
+    {"isin": "US0000000004", "name": "Equity D", "asset_class": "Equities"},
+    {"isin": "LU0000000005", "name": "Fund E", "security_type": "fund", "asset_class": "Funds", "valuation": 300.0}
+]
+
+class TestSecurityQueries(unittest.TestCase):
+    """Tests for the Database security row queries."""
+
+    def setUp(self):
+        """Create a database with two documents."""
+        self.database = Database("sqlite://")
+        self.database.create_tables()
+        self.document_id = self.database.store_document({"filename": "a.pdf"}).id
+        self.other_id = self.database.store_document({"filename": "b.pdf"}).id
+        self.database.store_securities(self.document_id, SECURITIES)
+        self.database.store_securities(self.other_id, [{"isin": "XS0000000009", "valuation": 1e9}])
+
+    def tearDown(self):
+        """Close the database."""
+        self.database.close()
+
+    def test_security_rows_in_insertion_order(self):
+        """Test paging and filters over the lightweight rows."""
+        rows = self.database.get_security_rows(self.document_id)
+        self.assertEqual([row.isin for row in rows], [s["isin"] for s in SECURITIES])
+        self.assertEqual(rows[1].description, "Bond B")
+
+        page = self.database.get_security_rows(self.document_id, limit=2, offset=1)
+        self.assertEqual([row.isin for row in page], ["XS0000000002", "US0000000003"])
+
+        bonds = self.database.get_security_rows(self.document_id, asset_class="Bonds", min_valuation=200)
+        self.assertEqual([row.isin for row in bonds], ["XS0000000001"])
+
+    def test_top_rows_by_valuation(self):
+        """Test that top holdings skip unvalued securities and break ties by insertion order."""
+        top = self.database.get_top_security_rows(self.document_id, limit=3)
+        self.assertEqual([row.isin for row in top], ["US0000000003", "XS0000000001", "LU0000000005"])
+
+        top_bonds = self.database.get_top_security_rows(self.document_id, limit=5, asset_class="Bonds")
+        self.assertEqual([row.valuation for row in top_bonds], [300.0, 100.0])
+
+    def test_stats_and_type_counts(self):
+        """Test the aggregates computed in SQL."""
+        stats = self.database.get_securities_stats(self.document_id)
+        self.assertEqual((stats.count, stats.valued_count, stats.total_valuation), (5, 4, 1200.0))
+
+        equities = self.database.get_securities_stats(self.document_id, asset_class="Equities")
+        self.assertEqual((equities.count, equities.total_valuation), (2, 500.0))
+
+        empty = self.database.get_securities_stats(self.document_id + 100)
+        self.assertEqual((empty.count, empty.total_valuation), (0, 0.0))
+
+        counts = self.database.get_security_type_counts(self.document_id)
+        self.assertEqual([tuple(row) for row in counts], [("bond", 2), ("equity", 1), ("Unknown", 1), ("fund", 1)])
+
+if __name__ == "__main__":
+    unittest.main()
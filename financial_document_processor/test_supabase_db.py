@@ -0,0 +1,80 @@
+"""
+Tests for the batched document summary queries, against a fake Supabase client.
+"""
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Add the parent directory to the path so we can import the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financial_document_processor.database.supabase_db import SupabaseDB
+
+class FakeQuery:
+    """Query builder over the rows of one table, recording the ID filters it is given."""
+
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.client.batches.append(list(values))
+        self.rows = [row for row in self.rows if row[column] in values]
+        return self
+
+    def order(self, column):
+        self.rows = sorted(self.rows, key=lambda row: row[column])
+        return self
+
+    def execute(self):
+        # Like PostgREST, results come back in table order, not in the order of the filter
+        return SimpleNamespace(data=list(self.rows))
+
+class FakeClient:
+    """Supabase client serving a fixed document_summaries table."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.batches = []
+
+    def table(self, name):
+        assert name == "document_summaries"
+        return FakeQuery(self, self.rows)
+
+class TestDocumentSummaries(unittest.TestCase):
+    """Tests for SupabaseDB.get_document_summaries."""
+
+    def setUp(self):
+        """Create a database over 450 summaries without connecting to Supabase."""
+        self.client = FakeClient([{"id": i, "filename": f"doc{i}.pdf"} for i in range(450, 0, -1)])
+        self.database = SupabaseDB.__new__(SupabaseDB)
+        self.database.client = self.client
+
+    def test_summaries_follow_the_requested_order(self):
+        """Test that summaries come back in the order of the IDs, without unknown IDs."""
+        summaries = self.database.get_document_summaries([7, 3, 999, 12])
+        self.assertEqual([summary["id"] for summary in summaries], [7, 3, 12])
+        self.assertEqual(self.client.batches, [[7, 3, 999, 12]])
+
+    def test_ids_are_requested_in_batches(self):
+        """Test that at most SUMMARY_BATCH_SIZE IDs go into one request."""
+        document_ids = list(range(1, 451))
+        summaries = self.database.get_document_summaries(document_ids)
+
+        self.assertEqual([summary["id"] for summary in summaries], document_ids)
+        self.assertEqual([len(batch) for batch in self.client.batches], [200, 200, 50])
+        self.assertEqual(self.client.batches[2][0], 401)
+
+    def test_all_summaries_in_id_order(self):
+        """Test that without IDs all summaries are returned in one request."""
+        summaries = self.database.get_document_summaries()
+        self.assertEqual(len(summaries), 450)
+        self.assertEqual(summaries[0]["id"], 1)
+        self.assertEqual(self.client.batches, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ FastAPI web application for the Financial Document Processor.
 """
 import os
 import logging
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 import json
 from fastapi import FastAPI, Request, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
@@ -48,8 +49,9 @@ os.makedirs(uploads_dir, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 
 # Database dependency
+@lru_cache(maxsize=None)
 def get_database():
-    """Get database connection."""
+    """Get the database connection, shared by all requests so its HTTP connections are reused."""
     db = SupabaseDB(
         url=os.environ.get("SUPABASE_URL", "https://dnjnsotemnfrjlotgved.supabase.co"),
         key=os.environ.get("SUPABASE_KEY")
@@ -275,6 +277,19 @@ async def get_documents(db: SupabaseDB = Depends(get_database)):
     documents = db.get_all_documents()
     return {"documents": documents}
 
+@app.get("/api/documents/summaries")
+async def get_document_summaries(ids: Optional[str] = None, db: SupabaseDB = Depends(get_database)):
+    """Get the summaries of the documents with the given comma-separated IDs, or of all documents."""
+    document_ids = None
+    if ids:
+        try:
+            document_ids = [int(document_id) for document_id in ids.split(",") if document_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Document IDs must be integers")
+    
+    summaries = db.get_document_summaries(document_ids)
+    return {"summaries": summaries}
+
 @app.get("/api/documents/{document_id}")
 async def get_document(document_id: int, db: SupabaseDB = Depends(get_database)):
     """Get a document."""
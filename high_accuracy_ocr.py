@@ -17,8 +17,16 @@ from tabula import read_pdf
 from collections import defaultdict
 import difflib
 
+try:
+    from DevDocs.backend.document_understanding.ocr_cache import get_ocr_cache
+except ImportError:
+    get_ocr_cache = None
+
 # Configuration
-TESSERACT_CONFIG = r'--oem 3 --psm 6 -l eng+heb'
+TESSERACT_LANG = 'eng+heb'
+TESSERACT_CONFIG = r'--oem 3 --psm 6'
+# Part of the OCR cache key; bump when the preprocessing functions change
+PREPROCESSING_VERSION = 1
 OUTPUT_DIR = 'high_accuracy_ocr_results'
 
 def ensure_output_dir():
@@ -77,9 +85,8 @@ def preprocess_image_financial(image):
     
     return thresh
 
-def extract_text_with_tesseract(image, preprocessing_method='basic'):
-    """Extract text using Tesseract OCR with different preprocessing methods."""
-    # Preprocess image
+def preprocess_image(image, preprocessing_method='basic'):
+    """Preprocess an image with one of the preprocessing methods."""
     if preprocessing_method == 'basic':
         preprocessed = preprocess_image_basic(image)
     elif preprocessing_method == 'advanced':
@@ -92,10 +99,22 @@ def extract_text_with_tesseract(image, preprocessing_method='basic'):
     # Save preprocessed image for debugging
     cv2.imwrite(os.path.join(OUTPUT_DIR, f'preprocessed_{preprocessing_method}.png'), preprocessed)
     
-    # Extract text
-    text = pytesseract.image_to_string(preprocessed, config=TESSERACT_CONFIG)
-    
-    return text
+    return preprocessed
+
+def extract_text_with_tesseract(image, preprocessing_method='basic'):
+    """Extract text using Tesseract OCR with different preprocessing methods."""
+    def preprocess(page):
+        return preprocess_image(page, preprocessing_method)
+    
+    # Extract text, reusing results for previously seen pages. The cache is keyed
+    # on the page and the preprocessing method, so hits skip the preprocessing.
+    if get_ocr_cache is not None:
+        return get_ocr_cache().image_to_string(
+            image, lang=TESSERACT_LANG, config=TESSERACT_CONFIG, preprocess=preprocess,
+            variant=f"high_accuracy_ocr.{preprocessing_method}.v{PREPROCESSING_VERSION}"
+        )
+    
+    return pytesseract.image_to_string(preprocess(image), lang=TESSERACT_LANG, config=TESSERACT_CONFIG)
 
 def extract_text_with_pdfplumber(pdf_path, page_num):
     """Extract text using pdfplumber."""
@@ -0,0 +1,314 @@
+"""
+Holdings Store - Columnar store of security holdings keyed by security and document date.
+"""
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional, Callable
+
+class HoldingsStore:
+    """
+    Columnar store of holdings, asset allocations and portfolio values per document.
+
+    Rows are normalized once when a document is added, so pairwise and N-way
+    comparisons are computed as joins and pivots over the stored frames instead
+    of re-reading each document.
+    """
+
+    HOLDING_COLUMNS = ["doc_id", "document_date", "security_id", "isin", "description", "nominal",
+                       "price", "valuation", "currency", "maturity_date"]
+    ALLOCATION_COLUMNS = ["doc_id", "document_date", "asset_class", "value", "percentage"]
+
+    def __init__(self, normalize_description: Optional[Callable[[str], str]] = None):
+        """
+        Initialize the holdings store.
+
+        Args:
+            normalize_description: Function used to derive security IDs from descriptions
+                when a holding has no ISIN (default: None, uses the raw description)
+        """
+        self.normalize_description = normalize_description or (lambda description: description)
+
+        self._holdings = {}  # doc_id -> list of holding rows
+        self._allocations = {}  # doc_id -> list of allocation rows
+        self._portfolio_values = {}  # doc_id -> portfolio value
+        self._document_dates = {}  # doc_id -> document date
+
+        self._holdings_frame = None
+        self._allocations_frame = None
+
+    def add_document(self, doc_id: str, doc_date: Optional[str], doc_data: Dict[str, Any]):
+        """
+        Add or replace a document's holdings in the store.
+
+        Args:
+            doc_id: Document ID
+            doc_date: Document date (YYYY-MM-DD)
+            doc_data: Extracted document data
+        """
+        holdings = []
+        for bond in doc_data.get("bonds", []):
+            isin = bond.get("isin")
+            description = bond.get("description")
+
+            # Create a unique identifier
+            if isin:
+                security_id = isin
+            elif description:
+                security_id = f"DESC:{self.normalize_description(description)}"
+            else:
+                continue  # Skip securities without ISIN or description
+
+            holdings.append((
+                doc_id, doc_date, security_id, isin, description, bond.get("nominal"), bond.get("price"),
+                bond.get("valuation"), bond.get("currency"), bond.get("maturity_date")
+            ))
+
+        allocations = []
+        for asset_class, allocation in (doc_data.get("asset_allocation") or {}).items():
+            allocation = allocation or {}
+            allocations.append((
+                doc_id, doc_date, asset_class, allocation.get("value"), allocation.get("percentage")
+            ))
+
+        self._holdings[doc_id] = holdings
+        self._allocations[doc_id] = allocations
+        self._portfolio_values[doc_id] = doc_data.get("portfolio_value")
+        self._document_dates[doc_id] = doc_date
+        self._invalidate()
+
+    def remove_document(self, doc_id: str):
+        """
+        Remove a document from the store.
+
+        Args:
+            doc_id: Document ID
+        """
+        for table in (self._holdings, self._allocations, self._portfolio_values, self._document_dates):
+            table.pop(doc_id, None)
+        self._invalidate()
+
+    def clear(self):
+        """Remove all documents from the store."""
+        self._holdings = {}
+        self._allocations = {}
+        self._portfolio_values = {}
+        self._document_dates = {}
+        self._invalidate()
+
+    def _invalidate(self):
+        self._holdings_frame = None
+        self._allocations_frame = None
+
+    @property
+    def holdings(self) -> pd.DataFrame:
+        """All holdings as a DataFrame, one row per (security_id, doc_id)."""
+        if self._holdings_frame is None:
+            rows = [row for doc_rows in self._holdings.values() for row in doc_rows]
+            frame = pd.DataFrame(rows, columns=self.HOLDING_COLUMNS)
+            for column in ("nominal", "price", "valuation"):
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+            # A security listed twice in one document keeps its last row
+            self._holdings_frame = frame.drop_duplicates(["doc_id", "security_id"], keep="last")
+        return self._holdings_frame
+
+    @property
+    def allocations(self) -> pd.DataFrame:
+        """All asset allocations as a DataFrame, one row per (asset_class, doc_id)."""
+        if self._allocations_frame is None:
+            rows = [row for doc_rows in self._allocations.values() for row in doc_rows]
+            frame = pd.DataFrame(rows, columns=self.ALLOCATION_COLUMNS)
+            for column in ("value", "percentage"):
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+            self._allocations_frame = frame
+        return self._allocations_frame
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._document_dates
+
+    def get_document_ids(self, doc_ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Get document IDs in date order, undated documents last.
+
+        Args:
+            doc_ids: Optional subset of document IDs (default: None, all documents)
+
+        Returns:
+            List of document IDs
+        """
+        doc_ids = [doc_id for doc_id in (doc_ids or self._document_dates) if doc_id in self._document_dates]
+        return sorted(doc_ids, key=lambda doc_id: (self._document_dates[doc_id] is None,
+                                                   self._document_dates[doc_id] or "", doc_id))
+
+    def compare(self, doc_id1: str, doc_id2: str) -> pd.DataFrame:
+        """
+        Compare holdings between two documents with an outer join on security ID.
+
+        Args:
+            doc_id1: First document ID
+            doc_id2: Second document ID
+
+        Returns:
+            DataFrame with one row per security, sorted by absolute valuation change
+        """
+        holdings = self.holdings
+        fields = ["security_id", "isin", "description", "nominal", "price", "valuation", "currency", "maturity_date"]
+        left = holdings.loc[holdings["doc_id"] == doc_id1, fields]
+        right = holdings.loc[holdings["doc_id"] == doc_id2, fields]
+
+        merged = left.merge(right, on="security_id", how="outer", suffixes=("1", "2"), indicator=True)
+
+        result = pd.DataFrame({
+            "security_id": merged["security_id"],
+            "description": merged["description1"].combine_first(merged["description2"]),
+            "isin": merged["isin1"].combine_first(merged["isin2"]),
+            "in_doc1": merged["_merge"] != "right_only",
+            "in_doc2": merged["_merge"] != "left_only",
+            "valuation1": merged["valuation1"],
+            "valuation2": merged["valuation2"],
+            "nominal1": merged["nominal1"],
+            "nominal2": merged["nominal2"],
+            "price1": merged["price1"],
+            "price2": merged["price2"],
+            "currency": merged["currency1"].combine_first(merged["currency2"]),
+            "maturity_date": merged["maturity_date1"].combine_first(merged["maturity_date2"])
+        })
+
+        val1 = result["valuation1"].fillna(0)
+        val2 = result["valuation2"].fillna(0)
+        price1 = result["price1"].fillna(0)
+        price2 = result["price2"].fillna(0)
+
+        result["valuation_change"] = val2 - val1
+        result["percentage_change"] = self._percentage_change(val1, val2)
+        result["nominal_change"] = result["nominal2"].fillna(0) - result["nominal1"].fillna(0)
+        result["price_change"] = price2 - price1
+        result["price_percentage_change"] = self._percentage_change(price1, price2)
+
+        order = result["valuation_change"].abs().sort_values(ascending=False, kind="stable").index
+        return result.loc[order].reset_index(drop=True)
+
+    def get_comparison_matrix(self, doc_ids: Optional[List[str]] = None, field: str = "valuation") -> pd.DataFrame:
+        """
+        Get a security x document matrix of a holding field.
+
+        Args:
+            doc_ids: Optional subset of document IDs (default: None, all documents)
+            field: Holding field to pivot ("valuation", "nominal" or "price")
+
+        Returns:
+            DataFrame indexed by security ID with one column per document, in date order
+        """
+        doc_ids = self.get_document_ids(doc_ids)
+        holdings = self.holdings
+        holdings = holdings[holdings["doc_id"].isin(doc_ids)]
+
+        matrix = holdings.pivot(index="security_id", columns="doc_id", values=field)
+        return matrix.reindex(columns=doc_ids)
+
+    def get_period_changes(self, doc_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get valuation changes between each pair of consecutive documents.
+
+        Args:
+            doc_ids: Optional subset of document IDs (default: None, all documents)
+
+        Returns:
+            Long DataFrame with security_id, doc_id1, doc_id2, valuation1, valuation2,
+            valuation_change and percentage_change columns
+        """
+        doc_ids = self.get_document_ids(doc_ids)
+        columns = ["security_id", "doc_id1", "doc_id2", "valuation1", "valuation2",
+                   "valuation_change", "percentage_change"]
+        if len(doc_ids) < 2:
+            return pd.DataFrame(columns=columns)
+
+        matrix = self.get_comparison_matrix(doc_ids)
+        previous = matrix.iloc[:, :-1].to_numpy()
+        current = matrix.iloc[:, 1:].to_numpy()
+
+        # Only securities held in at least one of the two documents
+        held = ~(np.isnan(previous) & np.isnan(current))
+        rows, periods = np.nonzero(held)
+
+        val1 = np.nan_to_num(previous[rows, periods])
+        val2 = np.nan_to_num(current[rows, periods])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(val1 != 0, (val2 - val1) / np.where(val1 != 0, val1, 1) * 100, np.nan)
+
+        return pd.DataFrame({
+            "security_id": matrix.index.to_numpy()[rows],
+            "doc_id1": np.asarray(doc_ids[:-1], dtype=object)[periods],
+            "doc_id2": np.asarray(doc_ids[1:], dtype=object)[periods],
+            "valuation1": previous[rows, periods],
+            "valuation2": current[rows, periods],
+            "valuation_change": val2 - val1,
+            "percentage_change": percentage
+        }, columns=columns)
+
+    def get_top_movers(self, doc_ids: Optional[List[str]] = None, n: int = 10) -> Dict[str, pd.DataFrame]:
+        """
+        Get the top gainers and losers by percentage change for each consecutive period.
+
+        Only securities held in both documents of a period are considered.
+
+        Args:
+            doc_ids: Optional subset of document IDs (default: None, all documents)
+            n: Number of securities per period and direction
+
+        Returns:
+            Dictionary with "gainers" and "losers" DataFrames
+        """
+        changes = self.get_period_changes(doc_ids)
+        held_both = changes.dropna(subset=["valuation1", "valuation2", "percentage_change"])
+
+        gainers = held_both[held_both["percentage_change"] > 0]
+        gainers = gainers.sort_values("percentage_change", ascending=False, kind="stable")
+        losers = held_both[held_both["percentage_change"] < 0]
+        losers = losers.sort_values("percentage_change", kind="stable")
+
+        return {
+            "gainers": gainers.groupby(["doc_id1", "doc_id2"], sort=False).head(n).reset_index(drop=True),
+            "losers": losers.groupby(["doc_id1", "doc_id2"], sort=False).head(n).reset_index(drop=True)
+        }
+
+    def get_portfolio_series(self, doc_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get portfolio values and period returns in date order.
+
+        Args:
+            doc_ids: Optional subset of document IDs (default: None, all documents)
+
+        Returns:
+            DataFrame indexed by document ID with document_date, portfolio_value and
+            period_return (percent) columns
+        """
+        doc_ids = self.get_document_ids(doc_ids)
+        series = pd.DataFrame({
+            "document_date": [self._document_dates[doc_id] for doc_id in doc_ids],
+            "portfolio_value": pd.to_numeric(pd.Series([self._portfolio_values[doc_id] for doc_id in doc_ids],
+                                                       dtype=object), errors="coerce").to_numpy()
+        }, index=pd.Index(doc_ids, name="doc_id"))
+
+        values = series["portfolio_value"]
+        previous = values.shift(1)
+        series["period_return"] = (values - previous) / previous.where(previous != 0) * 100
+        return series
+
+    @staticmethod
+    def _percentage_change(before: pd.Series, after: pd.Series) -> pd.Series:
+        return ((after - before) / before.where(before != 0) * 100).where(before != 0)
+
+    @staticmethod
+    def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert a DataFrame to JSON-friendly records, with missing values as None.
+
+        Args:
+            frame: DataFrame to convert
+
+        Returns:
+            List of dictionaries
+        """
+        frame = frame.astype(object).where(frame.notna(), None)
+        return frame.to_dict(orient="records")
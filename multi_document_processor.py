@@ -4,11 +4,14 @@ Multi-Document Processor - Processes and compares multiple financial documents.
 import os
 import re
 import json
+import glob
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from simple_pdf_processor import SimplePDFProcessor
+from holdings_store import HoldingsStore
 
 try:
     from report_generator import ReportGenerator
@@ -17,6 +20,22 @@ except ImportError:
     REPORT_GENERATOR_AVAILABLE = False
     print("Report generator not available. Install required dependencies for report generation.")
 
+# Per-process PDF processor used by bulk ingestion workers
+_worker_processor = None
+
+def _init_bulk_worker(use_ocr: bool, ocr_lang: str):
+    """Create the PDF processor once for each bulk ingestion worker process."""
+    global _worker_processor
+    _worker_processor = SimplePDFProcessor(use_ocr=use_ocr, ocr_lang=ocr_lang)
+
+def _extract_document_worker(doc_path: str, doc_output_dir: Optional[str], force_ocr: bool) -> Dict[str, Any]:
+    """Extract a single document in a bulk ingestion worker process."""
+    _worker_processor.process(doc_path, output_dir=doc_output_dir, force_ocr=force_ocr)
+    return {
+        "extracted_data": _worker_processor.extracted_data,
+        "full_text": _worker_processor.full_text
+    }
+
 class MultiDocumentProcessor:
     """
     Processor for multiple financial documents that can compare and analyze changes over time.
@@ -35,6 +54,8 @@ class MultiDocumentProcessor:
         self.documents = {}  # Dictionary to store processed documents
         self.document_dates = {}  # Dictionary to map document IDs to dates
         self.securities_db = {}  # Database of all securities across documents
+        self.merged_documents = set()  # IDs of documents merged into the securities database
+        self.holdings_store = HoldingsStore(normalize_description=self._normalize_description)
 
         # Settings for the document processor
         self.use_ocr = use_ocr
@@ -80,14 +101,39 @@ class MultiDocumentProcessor:
         self.processor.process(doc_path, output_dir=doc_output_dir, force_ocr=force_ocr)
 
         # Store the processed data
-        self.documents[doc_id] = self.processor.extracted_data.copy()
+        parsed_date = self._store_document(
+            doc_id, doc_path, self.processor.extracted_data.copy(), self.processor.full_text, doc_date
+        )
+
+        # Update securities database
+        self._update_securities_db(doc_id)
+
+        print(f"Document added: {doc_id} (Date: {parsed_date})")
+        return doc_id
+
+    def _store_document(self, doc_id: str, doc_path: str, extracted_data: Dict[str, Any],
+                        full_text: Optional[str], doc_date: Optional[str] = None) -> Optional[str]:
+        """
+        Store extracted document data and metadata.
+
+        Args:
+            doc_id: Document ID
+            doc_path: Path to the document
+            extracted_data: Data extracted by the PDF processor
+            full_text: Full text of the document, None for documents restored from a bulk checkpoint
+            doc_date: Optional date for the document (default: None, extracted from document)
+
+        Returns:
+            Parsed document date
+        """
+        self.documents[doc_id] = extracted_data
 
         # Store the full text for later use
-        self.documents[doc_id]["full_text"] = self.processor.full_text
+        self.documents[doc_id]["full_text"] = full_text
 
         # Get document date
         if doc_date is None:
-            doc_date = self.processor.extracted_data.get("document_date")
+            doc_date = extracted_data.get("document_date")
 
         # Try to parse the date into a standard format
         parsed_date = self._parse_document_date(doc_date)
@@ -101,16 +147,192 @@ class MultiDocumentProcessor:
             "file_name": os.path.basename(doc_path),
             "file_size": os.path.getsize(doc_path) if os.path.exists(doc_path) else None,
             "processing_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "client_info": self.processor.extracted_data.get("client_info", {}),
+            "client_info": extracted_data.get("client_info", {}),
             "document_date": parsed_date,
             "original_date_string": doc_date
         }
 
-        # Update securities database
-        self._update_securities_db(doc_id)
+        return parsed_date
 
-        print(f"Document added: {doc_id} (Date: {parsed_date})")
-        return doc_id
+    def add_documents_bulk(self, source, output_dir: Optional[str] = None, checkpoint_path: Optional[str] = None,
+                           max_workers: Optional[int] = None, force_ocr: bool = False) -> List[str]:
+        """
+        Add many documents at once, extracting them in a process pool.
+
+        Extracted documents are appended to a checkpoint file as they complete, so an
+        interrupted run can be resumed by calling this method again with the same
+        checkpoint. The checkpoint holds the extracted data the merge needs, not the
+        full text of the documents. Once every document is extracted, the documents not merged yet are
+        merged into the securities database in document date order, and the merged
+        state is appended to the checkpoint so later runs only merge new documents.
+
+        Args:
+            source: Directory of PDFs, path to a JSON manifest, or a list of manifest entries.
+                Manifest entries are either paths or dicts with "path" and optional
+                "doc_id" and "doc_date" keys. Document IDs default to the path relative
+                to the directory (or to the common directory of the manifest paths).
+            output_dir: Optional directory to save output files (default: None)
+            checkpoint_path: Optional JSON lines file used to checkpoint and resume (default: None)
+            max_workers: Number of worker processes (default: None, uses CPU count)
+            force_ocr: Whether to force OCR even if text extraction is possible (default: False)
+
+        Returns:
+            List of document IDs in the order they were merged by this call
+        """
+        entries = self._read_bulk_manifest(source)
+
+        # Resume from checkpoint
+        completed, merged_state = self._load_bulk_checkpoint(checkpoint_path) if checkpoint_path else ({}, None)
+        for doc_id, record in completed.items():
+            if doc_id not in self.documents:
+                self._store_document(doc_id, record["path"], record["extracted_data"], record.get("full_text"),
+                                     record["doc_date"])
+
+        if merged_state and not self.securities_db:
+            # Restore the securities database merged by a previous run
+            for sec_id, security in merged_state["securities_db"].items():
+                security["alternative_descriptions"] = set(security.get("alternative_descriptions", []))
+                self.securities_db[sec_id] = security
+            for doc_id in merged_state["merged"]:
+                if doc_id in self.documents:
+                    self.holdings_store.add_document(doc_id, self.document_dates.get(doc_id), self.documents[doc_id])
+                    self.merged_documents.add(doc_id)
+
+        pending = [entry for entry in entries if entry["doc_id"] not in completed]
+        print(f"Bulk ingestion: {len(entries)} documents, {len(completed)} already checkpointed, {len(pending)} to process")
+
+        checkpoint_file = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+        try:
+            if pending:
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_bulk_worker,
+                                         initargs=(self.use_ocr, self.ocr_lang)) as executor:
+                    futures = {}
+                    for entry in pending:
+                        doc_output_dir = None
+                        if output_dir:
+                            doc_output_dir = os.path.join(output_dir, f"doc_{entry['doc_id']}")
+                            os.makedirs(doc_output_dir, exist_ok=True)
+                        future = executor.submit(_extract_document_worker, entry["path"], doc_output_dir, force_ocr)
+                        futures[future] = entry
+
+                    for done, future in enumerate(as_completed(futures), 1):
+                        entry = futures[future]
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            print(f"Error processing document {entry['path']}: {str(e)}")
+                            continue
+
+                        if checkpoint_file:
+                            record = {
+                                "doc_id": entry["doc_id"],
+                                "path": entry["path"],
+                                "doc_date": entry.get("doc_date"),
+                                "extracted_data": self._prepare_for_json(result["extracted_data"])
+                            }
+                            checkpoint_file.write(json.dumps(record) + "\n")
+                            checkpoint_file.flush()
+
+                        self._store_document(entry["doc_id"], entry["path"], result["extracted_data"],
+                                             result["full_text"], entry.get("doc_date"))
+                        completed[entry["doc_id"]] = entry
+
+                        print(f"Extracted {done}/{len(pending)}: {entry['doc_id']}")
+        finally:
+            if checkpoint_file:
+                checkpoint_file.close()
+
+        # Merge new documents into the securities database in date order, undated documents last
+        merge_order = sorted(
+            (doc_id for doc_id in completed if doc_id in self.documents and doc_id not in self.merged_documents),
+            key=lambda doc_id: (self.document_dates.get(doc_id) is None, self.document_dates.get(doc_id) or "", doc_id)
+        )
+        for doc_id in merge_order:
+            self._update_securities_db(doc_id)
+
+        if checkpoint_path and merge_order:
+            record = {
+                "merged": sorted(self.merged_documents),
+                "securities_db": self._prepare_for_json(self.securities_db)
+            }
+            with open(checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+        print(f"Bulk ingestion completed: {len(merge_order)} documents merged")
+        return merge_order
+
+    def _read_bulk_manifest(self, source) -> List[Dict[str, Any]]:
+        """
+        Normalize a bulk ingestion source into a list of manifest entries.
+
+        Args:
+            source: Directory, JSON manifest path, or list of paths/entries
+
+        Returns:
+            List of dicts with "path", "doc_id" and "doc_date" keys
+        """
+        root = None
+        if isinstance(source, str) and os.path.isdir(source):
+            root = source
+            raw_entries = sorted(glob.glob(os.path.join(source, "**", "*.pdf"), recursive=True))
+        elif isinstance(source, str):
+            with open(source, "r", encoding="utf-8") as f:
+                raw_entries = json.load(f)
+        else:
+            raw_entries = list(source)
+
+        raw_entries = [{"path": raw} if isinstance(raw, str) else raw for raw in raw_entries]
+        if root is None and raw_entries:
+            root = os.path.commonpath([os.path.dirname(os.path.abspath(raw["path"])) for raw in raw_entries])
+
+        entries = []
+        for raw in raw_entries:
+            # Relative paths keep same-named files in different folders apart
+            doc_id = raw.get("doc_id") or os.path.relpath(os.path.abspath(raw["path"]), os.path.abspath(root))
+            entries.append({
+                "path": raw["path"],
+                "doc_id": doc_id.replace(os.sep, "/"),
+                "doc_date": raw.get("doc_date")
+            })
+
+        return entries
+
+    def _load_bulk_checkpoint(self, checkpoint_path: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Load completed documents from a bulk ingestion checkpoint.
+
+        Args:
+            checkpoint_path: Path to the JSON lines checkpoint file
+
+        Returns:
+            Dictionary mapping document IDs to checkpoint records, and the last
+            merged state (merged document IDs and securities database), if any
+        """
+        completed = {}
+        merged_state = None
+        if not os.path.exists(checkpoint_path):
+            return completed, merged_state
+
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a partially written last line
+                continue
+            if "merged" in record:
+                merged_state = record
+            else:
+                completed[record["doc_id"]] = record
+
+        if lines[-1]:
+            # Start the records appended by this run on a line of their own
+            with open(checkpoint_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+        return completed, merged_state
 
     def _parse_document_date(self, date_str: Optional[str]) -> Optional[str]:
         """
@@ -161,6 +383,10 @@ class MultiDocumentProcessor:
         doc_data = self.documents[doc_id]
         doc_date = self.document_dates.get(doc_id)
 
+        # Keep the columnar holdings store in sync for comparisons
+        self.holdings_store.add_document(doc_id, doc_date, doc_data)
+        self.merged_documents.add(doc_id)
+
         # Process bonds/securities
         for bond in doc_data.get("bonds", []):
             # Get ISIN and description
@@ -221,6 +447,11 @@ class MultiDocumentProcessor:
         """
         # First, try to match by ISIN (most reliable)
         if isin:
+            # Securities with an ISIN are normally keyed by it
+            security = self.securities_db.get(isin)
+            if security is not None and security["isin"] == isin:
+                return isin
+
             for security_id, security in self.securities_db.items():
                 if security["isin"] == isin:
                     return security_id
@@ -440,53 +671,12 @@ class MultiDocumentProcessor:
             }
 
         # Compare securities
-        # Get all securities from both documents
-        securities1 = {bond.get("isin", f"DESC:{bond.get('description')}"): bond for bond in doc1.get("bonds", [])}
-        securities2 = {bond.get("isin", f"DESC:{bond.get('description')}"): bond for bond in doc2.get("bonds", [])}
-
-        all_security_ids = set(securities1.keys()) | set(securities2.keys())
-
-        for security_id in all_security_ids:
-            # Get security data
-            sec1 = securities1.get(security_id)
-            sec2 = securities2.get(security_id)
-
-            # Initialize security change
-            security_change = {
-                "security_id": security_id,
-                "description": None,
-                "isin": None,
-                "in_doc1": sec1 is not None,
-                "in_doc2": sec2 is not None,
-                "valuation1": None,
-                "valuation2": None,
-                "valuation_change": None,
-                "percentage_change": None
-            }
-
-            # Update security information
-            if sec1:
-                security_change["description"] = sec1.get("description")
-                security_change["isin"] = sec1.get("isin")
-                security_change["valuation1"] = sec1.get("valuation")
-
-            if sec2:
-                security_change["description"] = security_change["description"] or sec2.get("description")
-                security_change["isin"] = security_change["isin"] or sec2.get("isin")
-                security_change["valuation2"] = sec2.get("valuation")
-
-            # Calculate valuation change
-            val1 = security_change["valuation1"] or 0
-            val2 = security_change["valuation2"] or 0
-
-            security_change["valuation_change"] = val2 - val1
-            security_change["percentage_change"] = (val2 - val1) / val1 * 100 if val1 != 0 else None
-
-            # Add to comparison results
-            comparison["security_changes"].append(security_change)
-
-        # Sort security changes by absolute valuation change
-        comparison["security_changes"].sort(key=lambda x: abs(x["valuation_change"] or 0), reverse=True)
+        self._ensure_in_holdings_store(doc_id1, doc_id2)
+        security_changes = self.holdings_store.compare(doc_id1, doc_id2)
+        comparison["security_changes"] = HoldingsStore.to_records(security_changes[[
+            "security_id", "description", "isin", "in_doc1", "in_doc2",
+            "valuation1", "valuation2", "valuation_change", "percentage_change"
+        ]])
 
         return comparison
 
@@ -671,126 +861,30 @@ class MultiDocumentProcessor:
 
         return result
 
-    def _compare_securities(self, doc1: Dict[str, Any], doc2: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _compare_securities(self, doc_id1: str, doc_id2: str) -> List[Dict[str, Any]]:
         """
         Compare securities between two documents.
 
         Args:
-            doc1: First document data
-            doc2: Second document data
+            doc_id1: First document ID
+            doc_id2: Second document ID
 
         Returns:
             List of dictionaries with security comparisons
         """
-        # Get securities from both documents
-        bonds1 = doc1.get("bonds", [])
-        bonds2 = doc2.get("bonds", [])
-
-        # Create dictionaries for easier lookup
-        securities1 = {}
-        securities2 = {}
-
-        # Process securities from document 1
-        for bond in bonds1:
-            isin = bond.get("isin")
-            description = bond.get("description")
-
-            # Create a unique identifier
-            if isin:
-                security_id = isin
-            elif description:
-                security_id = f"DESC:{self._normalize_description(description)}"
-            else:
-                continue  # Skip securities without ISIN or description
-
-            securities1[security_id] = bond
-
-        # Process securities from document 2
-        for bond in bonds2:
-            isin = bond.get("isin")
-            description = bond.get("description")
-
-            # Create a unique identifier
-            if isin:
-                security_id = isin
-            elif description:
-                security_id = f"DESC:{self._normalize_description(description)}"
-            else:
-                continue  # Skip securities without ISIN or description
-
-            securities2[security_id] = bond
-
-        # Get all security IDs
-        all_security_ids = set(securities1.keys()) | set(securities2.keys())
-
-        # Compare securities
-        result = []
-
-        for security_id in all_security_ids:
-            sec1 = securities1.get(security_id)
-            sec2 = securities2.get(security_id)
-
-            # Initialize security change
-            security_change = {
-                "security_id": security_id,
-                "description": None,
-                "isin": None,
-                "in_doc1": sec1 is not None,
-                "in_doc2": sec2 is not None,
-                "valuation1": None,
-                "valuation2": None,
-                "nominal1": None,
-                "nominal2": None,
-                "price1": None,
-                "price2": None,
-                "currency": None,
-                "maturity_date": None,
-                "valuation_change": None,
-                "percentage_change": None,
-                "nominal_change": None,
-                "price_change": None
-            }
+        self._ensure_in_holdings_store(doc_id1, doc_id2)
+        return HoldingsStore.to_records(self.holdings_store.compare(doc_id1, doc_id2))
 
-            # Update security information
-            if sec1:
-                security_change["description"] = sec1.get("description")
-                security_change["isin"] = sec1.get("isin")
-                security_change["valuation1"] = sec1.get("valuation")
-                security_change["nominal1"] = sec1.get("nominal")
-                security_change["price1"] = sec1.get("price")
-                security_change["currency"] = sec1.get("currency")
-                security_change["maturity_date"] = sec1.get("maturity_date")
-
-            if sec2:
-                security_change["description"] = security_change["description"] or sec2.get("description")
-                security_change["isin"] = security_change["isin"] or sec2.get("isin")
-                security_change["valuation2"] = sec2.get("valuation")
-                security_change["nominal2"] = sec2.get("nominal")
-                security_change["price2"] = sec2.get("price")
-                security_change["currency"] = security_change["currency"] or sec2.get("currency")
-                security_change["maturity_date"] = security_change["maturity_date"] or sec2.get("maturity_date")
-
-            # Calculate changes
-            val1 = security_change["valuation1"] or 0
-            val2 = security_change["valuation2"] or 0
-            nom1 = security_change["nominal1"] or 0
-            nom2 = security_change["nominal2"] or 0
-            price1 = security_change["price1"] or 0
-            price2 = security_change["price2"] or 0
-
-            security_change["valuation_change"] = val2 - val1
-            security_change["percentage_change"] = (val2 - val1) / val1 * 100 if val1 != 0 else None
-            security_change["nominal_change"] = nom2 - nom1
-            security_change["price_change"] = price2 - price1
-            security_change["price_percentage_change"] = (price2 - price1) / price1 * 100 if price1 != 0 else None
-
-            # Add to result
-            result.append(security_change)
-
-        # Sort by absolute valuation change
-        result.sort(key=lambda x: abs(x["valuation_change"] or 0), reverse=True)
+    def _ensure_in_holdings_store(self, *doc_ids: str):
+        """
+        Add documents to the holdings store if they were stored without being ingested.
 
-        return result
+        Args:
+            doc_ids: Document IDs
+        """
+        for doc_id in doc_ids:
+            if doc_id not in self.holdings_store and doc_id in self.documents:
+                self.holdings_store.add_document(doc_id, self.document_dates.get(doc_id), self.documents[doc_id])
 
     def _calculate_performance_metrics(self, doc1: Dict[str, Any], doc2: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -898,7 +992,7 @@ class MultiDocumentProcessor:
             "time_between_documents": self._calculate_time_between(date1, date2),
             "portfolio_summary": self._compare_portfolio_summary(doc1, doc2),
             "asset_allocation_changes": self._compare_asset_allocation(doc1, doc2),
-            "security_changes": self._compare_securities(doc1, doc2),
+            "security_changes": self._compare_securities(doc_id1, doc_id2),
             "new_securities": [],
             "removed_securities": [],
             "top_gainers": [],
@@ -929,6 +1023,35 @@ class MultiDocumentProcessor:
 
         return comparison
 
+    def compare_document_series(self, doc_ids: Optional[List[str]] = None, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Compare a series of documents in date order in a single pass over the holdings store.
+
+        Args:
+            doc_ids: Optional document IDs to compare (default: None, all documents)
+            top_n: Number of top gainers and losers per period (default: 10)
+
+        Returns:
+            Dictionary containing the valuation matrix, portfolio values, period changes and top movers
+        """
+        doc_ids = self.holdings_store.get_document_ids(doc_ids)
+        if not doc_ids:
+            return {"error": "No documents to compare"}
+
+        matrix = self.holdings_store.get_comparison_matrix(doc_ids)
+        portfolio = self.holdings_store.get_portfolio_series(doc_ids)
+        movers = self.holdings_store.get_top_movers(doc_ids, n=top_n)
+
+        return {
+            "doc_ids": doc_ids,
+            "doc_dates": [self.document_dates.get(doc_id) for doc_id in doc_ids],
+            "portfolio_values": HoldingsStore.to_records(portfolio.reset_index()),
+            "valuation_matrix": HoldingsStore.to_records(matrix.reset_index()),
+            "period_changes": HoldingsStore.to_records(self.holdings_store.get_period_changes(doc_ids)),
+            "top_gainers": HoldingsStore.to_records(movers["gainers"]),
+            "top_losers": HoldingsStore.to_records(movers["losers"])
+        }
+
     def generate_comparison_report(self, doc_id1: str, doc_id2: str, output_dir: str,
                                  format: str = "html") -> Dict[str, str]:
         """
@@ -1049,6 +1172,17 @@ class MultiDocumentProcessor:
         self.document_dates = data.get("document_dates", {})
         self.securities_db = data.get("securities_db", {})
 
+        # Restore sets converted to lists by save_to_json
+        for security in self.securities_db.values():
+            security["alternative_descriptions"] = set(security.get("alternative_descriptions", []))
+
+        self.merged_documents = set(self.documents)
+
+        # Rebuild the holdings store
+        self.holdings_store.clear()
+        for doc_id, doc_data in self.documents.items():
+            self.holdings_store.add_document(doc_id, self.document_dates.get(doc_id), doc_data)
+
         print(f"Data loaded from: {input_path}")
 
 def main():
@@ -1057,6 +1191,9 @@ def main():
 
     parser = argparse.ArgumentParser(description="Process and compare multiple financial documents.")
     parser.add_argument("--documents", nargs="+", help="Paths to financial documents")
+    parser.add_argument("--bulk", help="Directory or JSON manifest of documents to ingest in parallel")
+    parser.add_argument("--checkpoint", help="Checkpoint file used to resume bulk ingestion")
+    parser.add_argument("--workers", type=int, help="Number of worker processes for bulk ingestion")
     parser.add_argument("--output-dir", help="Directory to save output files")
     parser.add_argument("--compare", nargs=2, help="Compare two documents (provide document IDs)")
     parser.add_argument("--save-json", help="Save data to JSON file")
@@ -1094,6 +1231,15 @@ def main():
             else:
                 print(f"Error: Document not found: {doc_path}")
 
+    # Bulk ingest documents if specified
+    if args.bulk:
+        processor.add_documents_bulk(
+            args.bulk,
+            output_dir=args.output_dir,
+            checkpoint_path=args.checkpoint,
+            max_workers=args.workers
+        )
+
     # Save data to JSON if specified
     if args.save_json:
         processor.save_to_json(args.save_json)
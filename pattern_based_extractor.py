@@ -15,6 +15,121 @@ from collections import defaultdict
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+PATTERNS = {
+    "portfolio_value": [
+        r'Portfolio\s+Total\s*[:\s]+(\d[\d,.\']*)',
+        r'Total\s+assets\s*[:\s]+(\d[\d,.\']*)',
+        r'Portfolio\s+Value\s*[:\s]+(\d[\d,.\']*)',
+        r'Total\s+Portfolio\s*[:\s]+(\d[\d,.\']*)',
+        r'Total\s+Value\s*[:\s]+(\d[\d,.\']*)'
+    ],
+    "isin": [
+        r'ISIN[:\s]+([A-Z]{2}[A-Z0-9]{9}[0-9])',
+        r'ISIN\s*[:\s]*\s*([A-Z]{2}[A-Z0-9]{9}[0-9])',
+        r'([A-Z]{2}[A-Z0-9]{9}[0-9])'
+    ],
+    "security_valuation": [
+        r'Valuation\s+in\s+price\s+currency\s*[:\s]+(\d[\d,.\']*)',
+        r'Valuation\s*[:\s]+(\d[\d,.\']*)',
+        r'Value\s*[:\s]+(\d[\d,.\']*)',
+        r'(\d[\d,.\']*)(?:\s*(?:USD|EUR|CHF|GBP))?'
+    ],
+    "security_description": [
+        r'Description[:\s]+(.+?)(?=ISIN|Valuation|$)',
+        r'Security[:\s]+(.+?)(?=ISIN|Valuation|$)',
+        r'Name[:\s]+(.+?)(?=ISIN|Valuation|$)'
+    ],
+    "security_type": [
+        r'Type[:\s]+(\w+)',
+        r'Asset\s+Type[:\s]+(\w+)',
+        r'Security\s+Type[:\s]+(\w+)'
+    ],
+    "asset_allocation": [
+        r'(\w[\w\s]+)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)',
+        r'(\w[\w\s]+)\s+(\d[\d,.\']*)\s+\((\d[\d,.\']*%)\)',
+        r'(\w[\w\s]+)(?:\s*:\s*|\s+)(\d[\d,.\']*)\s+(\d[\d,.\']*%)'
+    ],
+    "key_value_pair": [
+        r'([A-Za-z][\w\s]+)[:\s]+(\d[\d,.\']*)',
+        r'([A-Za-z][\w\s]+)[:\s]+([A-Za-z0-9][\w\s,.\']*)'
+    ],
+    "percentage": [
+        r'(\d[\d,.\']*%)',
+        r'(\d[\d,.\']*)\s*%',
+        r'(\d[\d,.\']*)\s*percent'
+    ],
+    "date": [
+        r'(\d{2}[./-]\d{2}[./-]\d{4})',
+        r'(\d{4}[./-]\d{2}[./-]\d{2})',
+        r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})'
+    ],
+    "currency": [
+        r'Currency[:\s]+([A-Z]{3})',
+        r'([A-Z]{3})\s+\d[\d,.\']*',
+        r'(\d[\d,.\']*)\s+([A-Z]{3})'
+    ],
+    "structured_product": [
+        r'Structured\s+products?\s*[:\s]+(\d[\d,.\']*)',
+        r'Structured\s+products?\s*\(([^)]+)\)\s*[:\s]+(\d[\d,.\']*)',
+        r'Structured\s+products?\s+\(([^)]+)\)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)'
+    ]
+}
+
+FINANCIAL_LINE_PATTERNS = [
+    # Pattern for "Label 123,456.78 12.34%"
+    r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)',
+    
+    # Pattern for "Label: 123,456.78"
+    r'([A-Za-z][\w\s]+):\s+(\d[\d,.\']*)',
+    
+    # Pattern for "Label 123,456.78"
+    r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)',
+    
+    # Pattern for "Label (123,456.78)"
+    r'([A-Za-z][\w\s]+)\s+\((\d[\d,.\']*)\)',
+    
+    # Pattern for "Label: 123,456.78 (12.34%)"
+    r'([A-Za-z][\w\s]+):\s+(\d[\d,.\']*)\s+\((\d[\d,.\']*%)\)',
+    
+    # Pattern for "Label 123,456.78 USD"
+    r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)\s+([A-Z]{3})'
+]
+
+# Every pattern is compiled once, when the module is imported
+PATTERN_BANK = {category: [re.compile(pattern) for pattern in patterns] for category, patterns in PATTERNS.items()}
+FINANCIAL_LINE_BANK = [re.compile(pattern) for pattern in FINANCIAL_LINE_PATTERNS]
+
+ISIN_PATTERN = re.compile(r'[A-Z]{2}[A-Z0-9]{9}[0-9]')
+VALID_ISIN_PATTERN = re.compile(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$')
+CURRENCY_CODE_PATTERN = re.compile(r'^[A-Z]{3}$')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d.-]')
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Categories matched line by line, with the literal anchors a line must contain
+# for their patterns to match
+LINE_CATEGORIES = {
+    "portfolio_value": lambda line, has_digit: "Total" in line or "Portfolio" in line,
+    "date": lambda line, has_digit: has_digit,
+    "structured_product": lambda line, has_digit: "Structured" in line
+}
+
+# Categories whose value may be on a line after their label, in extracted PDF text
+# such as "Total assets\n\n19'510'599"; their matches start on the label's line
+# and may extend this many characters past it
+LABELLED_CATEGORIES = {"portfolio_value", "structured_product"}
+VALUE_LOOKAHEAD = 200
+
+# Categories matched over the whole text, as their matches may span lines: a
+# currency code and its amount are often on different lines ("USD\n\n200'000"),
+# and labels and values of the others run on from line to line. A category may
+# give the characters its matches consist of and the literal they end with; only
+# the runs of those characters up to their last such literal are then searched
+TEXT_CATEGORIES = {
+    "currency": None,
+    "key_value_pair": None,
+    "asset_allocation": (re.compile(r"[\w\s,.'%:()]+"), "%")
+}
+
 class PatternBasedExtractor:
     """
     Extracts financial data from text using pattern matching.
@@ -22,65 +137,8 @@ class PatternBasedExtractor:
     
     def __init__(self):
         """Initialize the pattern-based extractor."""
-        self.patterns = {
-            "portfolio_value": [
-                r'Portfolio\s+Total\s*[:\s]+(\d[\d,.\']*)',
-                r'Total\s+assets\s*[:\s]+(\d[\d,.\']*)',
-                r'Portfolio\s+Value\s*[:\s]+(\d[\d,.\']*)',
-                r'Total\s+Portfolio\s*[:\s]+(\d[\d,.\']*)',
-                r'Total\s+Value\s*[:\s]+(\d[\d,.\']*)'
-            ],
-            "isin": [
-                r'ISIN[:\s]+([A-Z]{2}[A-Z0-9]{9}[0-9])',
-                r'ISIN\s*[:\s]*\s*([A-Z]{2}[A-Z0-9]{9}[0-9])',
-                r'([A-Z]{2}[A-Z0-9]{9}[0-9])'
-            ],
-            "security_valuation": [
-                r'Valuation\s+in\s+price\s+currency\s*[:\s]+(\d[\d,.\']*)',
-                r'Valuation\s*[:\s]+(\d[\d,.\']*)',
-                r'Value\s*[:\s]+(\d[\d,.\']*)',
-                r'(\d[\d,.\']*)(?:\s*(?:USD|EUR|CHF|GBP))?'
-            ],
-            "security_description": [
-                r'Description[:\s]+(.+?)(?=ISIN|Valuation|$)',
-                r'Security[:\s]+(.+?)(?=ISIN|Valuation|$)',
-                r'Name[:\s]+(.+?)(?=ISIN|Valuation|$)'
-            ],
-            "security_type": [
-                r'Type[:\s]+(\w+)',
-                r'Asset\s+Type[:\s]+(\w+)',
-                r'Security\s+Type[:\s]+(\w+)'
-            ],
-            "asset_allocation": [
-                r'(\w[\w\s]+)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)',
-                r'(\w[\w\s]+)\s+(\d[\d,.\']*)\s+\((\d[\d,.\']*%)\)',
-                r'(\w[\w\s]+)(?:\s*:\s*|\s+)(\d[\d,.\']*)\s+(\d[\d,.\']*%)'
-            ],
-            "key_value_pair": [
-                r'([A-Za-z][\w\s]+)[:\s]+(\d[\d,.\']*)',
-                r'([A-Za-z][\w\s]+)[:\s]+([A-Za-z0-9][\w\s,.\']*)'
-            ],
-            "percentage": [
-                r'(\d[\d,.\']*%)',
-                r'(\d[\d,.\']*)\s*%',
-                r'(\d[\d,.\']*)\s*percent'
-            ],
-            "date": [
-                r'(\d{2}[./-]\d{2}[./-]\d{4})',
-                r'(\d{4}[./-]\d{2}[./-]\d{2})',
-                r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})'
-            ],
-            "currency": [
-                r'Currency[:\s]+([A-Z]{3})',
-                r'([A-Z]{3})\s+\d[\d,.\']*',
-                r'(\d[\d,.\']*)\s+([A-Z]{3})'
-            ],
-            "structured_product": [
-                r'Structured\s+products?\s*[:\s]+(\d[\d,.\']*)',
-                r'Structured\s+products?\s*\(([^)]+)\)\s*[:\s]+(\d[\d,.\']*)',
-                r'Structured\s+products?\s+\(([^)]+)\)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)'
-            ]
-        }
+        self.patterns = PATTERNS
+        self.financial_line_patterns = FINANCIAL_LINE_PATTERNS
         
         self.extracted_data = {
             "portfolio_value": [],
@@ -91,26 +149,6 @@ class PatternBasedExtractor:
             "currencies": [],
             "structured_products": []
         }
-        
-        self.financial_line_patterns = [
-            # Pattern for "Label 123,456.78 12.34%"
-            r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)\s+(\d[\d,.\']*%)',
-            
-            # Pattern for "Label: 123,456.78"
-            r'([A-Za-z][\w\s]+):\s+(\d[\d,.\']*)',
-            
-            # Pattern for "Label 123,456.78"
-            r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)',
-            
-            # Pattern for "Label (123,456.78)"
-            r'([A-Za-z][\w\s]+)\s+\((\d[\d,.\']*)\)',
-            
-            # Pattern for "Label: 123,456.78 (12.34%)"
-            r'([A-Za-z][\w\s]+):\s+(\d[\d,.\']*)\s+\((\d[\d,.\']*%)\)',
-            
-            # Pattern for "Label 123,456.78 USD"
-            r'([A-Za-z][\w\s]+)\s+(\d[\d,.\']*)\s+([A-Z]{3})'
-        ]
     
     def extract(self, text: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -141,29 +179,32 @@ class PatternBasedExtractor:
             os.makedirs(output_dir, exist_ok=True)
         
         try:
+            # Match every line once against the patterns that can match it
+            matches, isin_spans, financial_lines = self._scan(text)
+            
             # Extract portfolio value
-            self._extract_portfolio_value(text)
+            self._extract_portfolio_value(matches["portfolio_value"])
             
             # Extract securities
-            self._extract_securities(text)
+            self._extract_securities(text, isin_spans)
             
             # Extract asset allocation
-            self._extract_asset_allocation(text)
+            self._extract_asset_allocation(matches["asset_allocation"])
             
             # Extract key-value pairs
-            self._extract_key_value_pairs(text)
+            self._extract_key_value_pairs(matches["key_value_pair"])
             
             # Extract dates
-            self._extract_dates(text)
+            self._extract_dates(matches["date"])
             
             # Extract currencies
-            self._extract_currencies(text)
+            self._extract_currencies(matches["currency"])
             
             # Extract structured products
-            self._extract_structured_products(text)
+            self._extract_structured_products(matches["structured_product"])
             
             # Extract financial lines
-            self._extract_financial_lines(text)
+            self._extract_financial_lines(financial_lines)
             
             # Save results if output_dir is specified
             if output_dir:
@@ -188,7 +229,7 @@ class PatternBasedExtractor:
         cleaned = cleaned.replace(",", "")
         
         # Remove any non-numeric characters except decimal point and negative sign
-        cleaned = re.sub(r'[^\d.-]', '', cleaned)
+        cleaned = NON_NUMERIC_PATTERN.sub('', cleaned)
         
         try:
             return float(cleaned)
@@ -206,11 +247,10 @@ class PatternBasedExtractor:
         # Clean the number
         return self._clean_number(cleaned)
     
-    def _extract_portfolio_value(self, text: str):
-        """Extract portfolio value from text."""
-        for pattern in self.patterns["portfolio_value"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_portfolio_value(self, matches: List[List[re.Match]]):
+        """Extract portfolio value from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 value_str = match.group(1)
                 value = self._clean_number(value_str)
                 
@@ -218,58 +258,113 @@ class PatternBasedExtractor:
                     self.extracted_data["portfolio_value"].append({
                         "value": value,
                         "source": "text",
-                        "pattern": pattern,
+                        "pattern": match.re.pattern,
                         "match": match.group(0)
                     })
         
         logger.info(f"Extracted {len(self.extracted_data['portfolio_value'])} portfolio values")
     
-    def _extract_securities(self, text: str):
-        """Extract securities from text."""
-        # Find all ISINs
-        isin_matches = []
-        for pattern in self.patterns["isin"]:
-            for match in re.finditer(pattern, text):
-                isin = match.group(1)
-                if self._is_valid_isin(isin):
-                    isin_matches.append({
-                        "isin": isin,
-                        "start": match.start(),
-                        "end": match.end()
-                    })
+    def _scan(self, text: str) -> Tuple[Dict[str, List[List[re.Match]]], Dict[str, Tuple[int, int]], List[Tuple[str, re.Match]]]:
+        """
+        Match the text against all patterns in a single pass over its lines.
+        
+        A line is only matched against the categories whose literal anchors it
+        contains, and apart from labelled values, patterns of these categories do
+        not match across line breaks. Categories in TEXT_CATEGORIES are matched
+        over the whole text, or the runs of it that can hold their matches.
+        
+        Args:
+            text: Text to scan
         
-        # For each ISIN, extract surrounding information
-        for isin_match in isin_matches:
-            isin = isin_match["isin"]
+        Returns:
+            Tuple of the matches of each category (one list per pattern, in pattern
+            order), the span of each ISIN's first match (labelled matches first) and
+            the financial lines with their match
+        """
+        matches = {category: [[] for _ in PATTERN_BANK[category]] for category in LINE_CATEGORIES}
+        for category, runs in TEXT_CATEGORIES.items():
+            matches[category] = self._match_text(text, PATTERN_BANK[category], runs)
+        
+        # ISIN patterns are cheap over the whole text, and a label may be on the line before its ISIN
+        isin_spans = {}
+        for pattern in PATTERN_BANK["isin"]:
+            for match in pattern.finditer(text):
+                isin = match.group(1)
+                if isin not in isin_spans and self._is_valid_isin(isin):
+                    isin_spans[isin] = match.span()
+        
+        financial_lines = []
+        line_start = 0
+        for line in text.split("\n"):
+            line_end = line_start + len(line)
+            has_digit = DIGIT_PATTERN.search(line) is not None
+            for category, has_anchors in LINE_CATEGORIES.items():
+                if not has_anchors(line, has_digit):
+                    continue
+                
+                for pattern, pattern_matches in zip(PATTERN_BANK[category], matches[category]):
+                    if category in LABELLED_CATEGORIES:
+                        window = pattern.finditer(text, line_start, line_end + VALUE_LOOKAHEAD)
+                        pattern_matches.extend(match for match in window if match.start() < line_end)
+                    else:
+                        pattern_matches.extend(pattern.finditer(line))
             
-            # Check if this ISIN is already processed
-            if any(s["isin"] == isin for s in self.extracted_data["securities"]):
-                continue
+            # The values of financial lines contain digits
+            if has_digit:
+                financial_line = self._match_financial_line(line.strip())
+                if financial_line:
+                    financial_lines.append(financial_line)
             
+            line_start = line_end + 1
+        
+        return matches, isin_spans, financial_lines
+    
+    def _match_text(self, text: str, patterns: List[re.Pattern], runs: Optional[Tuple[re.Pattern, str]]) -> List[List[re.Match]]:
+        """Match patterns over the whole text, or only over the runs of it that can hold their matches."""
+        if runs is None:
+            return [list(pattern.finditer(text)) for pattern in patterns]
+        
+        # A match cannot extend past a character outside the run, or end after its last literal,
+        # so searching the spans up to those literals finds the same matches as searching the text
+        run_pattern, literal = runs
+        spans = []
+        for run in run_pattern.finditer(text):
+            end = text.rfind(literal, run.start(), run.end())
+            if end >= 0:
+                spans.append((run.start(), end + len(literal)))
+        
+        return [
+            [match for start, end in spans for match in pattern.finditer(text, start, end)]
+            for pattern in patterns
+        ]
+    
+    def _extract_securities(self, text: str, isin_spans: Dict[str, Tuple[int, int]]):
+        """Extract securities from the text around each ISIN."""
+        for isin, (start, end) in isin_spans.items():
             # Get context around the ISIN
-            context_start = max(0, isin_match["start"] - 200)
-            context_end = min(len(text), isin_match["end"] + 200)
+            context_start = max(0, start - 200)
+            context_end = min(len(text), end + 200)
             context = text[context_start:context_end]
             
             # Extract description
             description = None
-            for pattern in self.patterns["security_description"]:
-                desc_match = re.search(pattern, context)
+            for pattern in PATTERN_BANK["security_description"]:
+                desc_match = pattern.search(context)
                 if desc_match:
                     description = desc_match.group(1).strip()
                     break
             
             # If no description found, use text before ISIN
             if not description:
-                before_isin = text[context_start:isin_match["start"]]
+                before_isin = text[context_start:start]
                 lines = before_isin.strip().split("\n")
                 if lines:
                     description = lines[-1].strip()
             
             # Extract security type
             security_type = "Unknown"
-            for pattern in self.patterns["security_type"]:
-                type_match = re.search(pattern, context)
+            for pattern in PATTERN_BANK["security_type"]:
+                type_match = pattern.search(context)
                 if type_match:
                     security_type = type_match.group(1).strip()
                     break
@@ -290,8 +385,8 @@ class PatternBasedExtractor:
             
             # Extract valuation
             valuation = None
-            for pattern in self.patterns["security_valuation"]:
-                val_match = re.search(pattern, context)
+            for pattern in PATTERN_BANK["security_valuation"]:
+                val_match = pattern.search(context)
                 if val_match:
                     valuation_str = val_match.group(1)
                     valuation = self._clean_number(valuation_str)
@@ -313,22 +408,21 @@ class PatternBasedExtractor:
     def _is_valid_isin(self, isin: str) -> bool:
         """Check if an ISIN is valid."""
         # Basic format check
-        if not re.match(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$', isin):
+        if not VALID_ISIN_PATTERN.match(isin):
             return False
         
         # TODO: Implement checksum validation
         
         return True
     
-    def _extract_asset_allocation(self, text: str):
-        """Extract asset allocation from text."""
-        for pattern in self.patterns["asset_allocation"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_asset_allocation(self, matches: List[List[re.Match]]):
+        """Extract asset allocation from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 asset_class = match.group(1).strip()
                 
                 # Skip if this looks like a security or contains an ISIN
-                if re.search(r'[A-Z]{2}[A-Z0-9]{9}[0-9]', asset_class):
+                if ISIN_PATTERN.search(asset_class):
                     continue
                 
                 # Extract value and percentage
@@ -349,11 +443,10 @@ class PatternBasedExtractor:
         
         logger.info(f"Extracted {len(self.extracted_data['asset_allocation'])} asset allocations")
     
-    def _extract_key_value_pairs(self, text: str):
-        """Extract key-value pairs from text."""
-        for pattern in self.patterns["key_value_pair"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_key_value_pairs(self, matches: List[List[re.Match]]):
+        """Extract key-value pairs from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 key = match.group(1).strip()
                 value_str = match.group(2).strip()
                 
@@ -371,11 +464,10 @@ class PatternBasedExtractor:
         
         logger.info(f"Extracted {len(self.extracted_data['key_value_pairs'])} key-value pairs")
     
-    def _extract_dates(self, text: str):
-        """Extract dates from text."""
-        for pattern in self.patterns["date"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_dates(self, matches: List[List[re.Match]]):
+        """Extract dates from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 date_str = match.group(1)
                 
                 self.extracted_data["dates"].append({
@@ -385,11 +477,10 @@ class PatternBasedExtractor:
         
         logger.info(f"Extracted {len(self.extracted_data['dates'])} dates")
     
-    def _extract_currencies(self, text: str):
-        """Extract currencies from text."""
-        for pattern in self.patterns["currency"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_currencies(self, matches: List[List[re.Match]]):
+        """Extract currencies from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 if len(match.groups()) == 1:
                     currency = match.group(1)
                     
@@ -412,11 +503,10 @@ class PatternBasedExtractor:
         
         logger.info(f"Extracted {len(self.extracted_data['currencies'])} currencies")
     
-    def _extract_structured_products(self, text: str):
-        """Extract structured products from text."""
-        for pattern in self.patterns["structured_product"]:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+    def _extract_structured_products(self, matches: List[List[re.Match]]):
+        """Extract structured products from the matches of their patterns."""
+        for pattern_matches in matches:
+            for match in pattern_matches:
                 if len(match.groups()) == 1:
                     # Simple pattern with just value
                     value_str = match.group(1)
@@ -459,99 +549,98 @@ class PatternBasedExtractor:
         
         logger.info(f"Extracted {len(self.extracted_data['structured_products'])} structured products")
     
-    def _extract_financial_lines(self, text: str):
-        """Extract financial lines from text."""
-        # Split text into lines
-        lines = text.split("\n")
+    def _match_financial_line(self, line: str) -> Optional[Tuple[str, re.Match]]:
+        """Match a line against the financial line patterns, returning the line and the first match."""
+        if not line:
+            return None
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        # Try each pattern
+        for pattern in FINANCIAL_LINE_BANK:
+            match = pattern.search(line)
+            if match:
+                # Skip if this looks like a header
+                if match.group(1).strip().lower() in ["page", "date", "time", "report"]:
+                    continue
+                
+                return line, match
+        
+        return None
+    
+    def _extract_financial_lines(self, financial_lines: List[Tuple[str, re.Match]]):
+        """Extract financial data from the matched financial lines."""
+        for line, match in financial_lines:
+            # Extract components
+            label = match.group(1).strip()
             
-            # Try each pattern
-            for pattern in self.financial_line_patterns:
-                match = re.search(pattern, line)
-                if match:
-                    # Extract components
-                    label = match.group(1).strip()
+            # Process based on the number of groups
+            if len(match.groups()) == 2:
+                # Label and value
+                value_str = match.group(2)
+                value = self._clean_number(value_str)
+                
+                if value is not None:
+                    # Determine the type of financial line
+                    line_type = self._determine_financial_line_type(label, line)
                     
-                    # Skip if this looks like a header
-                    if label.lower() in ["page", "date", "time", "report"]:
-                        continue
+                    if line_type == "asset_allocation":
+                        self.extracted_data["asset_allocation"].append({
+                            "asset_class": label,
+                            "value": value,
+                            "source": "text"
+                        })
+                    elif line_type == "portfolio_value" and "total" in label.lower():
+                        self.extracted_data["portfolio_value"].append({
+                            "value": value,
+                            "source": "text",
+                            "pattern": match.re.pattern,
+                            "match": line
+                        })
+                    else:
+                        self.extracted_data["key_value_pairs"].append({
+                            "key": label,
+                            "value": value,
+                            "source": "text"
+                        })
+            
+            elif len(match.groups()) == 3:
+                # Label, value, and percentage/currency
+                value_str = match.group(2)
+                third_str = match.group(3)
+                
+                value = self._clean_number(value_str)
+                
+                # Check if third group is a percentage
+                if "%" in third_str:
+                    percentage = self._clean_percentage(third_str)
                     
-                    # Process based on the number of groups
-                    if len(match.groups()) == 2:
-                        # Label and value
-                        value_str = match.group(2)
-                        value = self._clean_number(value_str)
-                        
-                        if value is not None:
-                            # Determine the type of financial line
-                            line_type = self._determine_financial_line_type(label, line)
-                            
-                            if line_type == "asset_allocation":
-                                self.extracted_data["asset_allocation"].append({
-                                    "asset_class": label,
-                                    "value": value,
-                                    "source": "text"
-                                })
-                            elif line_type == "portfolio_value" and "total" in label.lower():
-                                self.extracted_data["portfolio_value"].append({
-                                    "value": value,
-                                    "source": "text",
-                                    "pattern": pattern,
-                                    "match": line
-                                })
-                            else:
-                                self.extracted_data["key_value_pairs"].append({
-                                    "key": label,
-                                    "value": value,
-                                    "source": "text"
-                                })
+                    # Determine the type of financial line
+                    line_type = self._determine_financial_line_type(label, line)
                     
-                    elif len(match.groups()) == 3:
-                        # Label, value, and percentage/currency
-                        value_str = match.group(2)
-                        third_str = match.group(3)
-                        
-                        value = self._clean_number(value_str)
-                        
-                        # Check if third group is a percentage
-                        if "%" in third_str:
-                            percentage = self._clean_percentage(third_str)
-                            
-                            # Determine the type of financial line
-                            line_type = self._determine_financial_line_type(label, line)
-                            
-                            if line_type == "asset_allocation":
-                                self.extracted_data["asset_allocation"].append({
-                                    "asset_class": label,
-                                    "value": value,
-                                    "percentage": percentage,
-                                    "source": "text"
-                                })
-                            else:
-                                self.extracted_data["key_value_pairs"].append({
-                                    "key": label,
-                                    "value": value,
-                                    "percentage": percentage,
-                                    "source": "text"
-                                })
-                        
-                        # Check if third group is a currency
-                        elif re.match(r'^[A-Z]{3}$', third_str):
-                            currency = third_str
-                            
-                            self.extracted_data["key_value_pairs"].append({
-                                "key": label,
-                                "value": value,
-                                "currency": currency,
-                                "source": "text"
-                            })
+                    if line_type == "asset_allocation":
+                        self.extracted_data["asset_allocation"].append({
+                            "asset_class": label,
+                            "value": value,
+                            "percentage": percentage,
+                            "source": "text"
+                        })
+                    else:
+                        self.extracted_data["key_value_pairs"].append({
+                            "key": label,
+                            "value": value,
+                            "percentage": percentage,
+                            "source": "text"
+                        })
+                
+                # Check if third group is a currency
+                elif CURRENCY_CODE_PATTERN.match(third_str):
+                    currency = third_str
                     
-                    # Found a match, move to next line
-                    break
+                    self.extracted_data["key_value_pairs"].append({
+                        "key": label,
+                        "value": value,
+                        "currency": currency,
+                        "source": "text"
+                    })
     
     def _determine_financial_line_type(self, label: str, line: str) -> str:
         """Determine the type of financial line based on label and context."""
@@ -16,6 +16,8 @@ from .agents.financial_analyzer_agent import FinancialAnalyzerAgent
 from .agents.rag_agent import RAGAgent
 from .agents.document_merger_agent import DocumentMergerAgent
 
+from DevDocs.backend.tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
 class DocumentProcessor:
@@ -54,6 +56,7 @@ class DocumentProcessor:
             Processed financial data
         """
         start_time = time.time()
+        tracer = get_tracer()
         
         # Set output directory
         if output_dir is None:
@@ -64,29 +67,38 @@ class DocumentProcessor:
         logger.info(f"Processing document: {pdf_path}")
         logger.info(f"Output directory: {output_dir}")
         
-        # Step 1: OCR Processing
-        print("Progress: 10%")
-        ocr_results = self.ocr_agent.process(pdf_path, os.path.join(output_dir, "ocr"))
-        
-        # Step 2: Table Detection
-        print("Progress: 30%")
-        table_results = self.table_detector_agent.process(pdf_path, ocr_results, os.path.join(output_dir, "tables"))
-        
-        # Step 3: ISIN Extraction
-        print("Progress: 50%")
-        isin_results = self.isin_extractor_agent.process(ocr_results, table_results, os.path.join(output_dir, "isins"))
-        
-        # Step 4: Financial Analysis
-        print("Progress: 70%")
-        financial_results = self.financial_analyzer_agent.process(ocr_results, table_results, isin_results, os.path.join(output_dir, "analysis"))
-        
-        # Step 5: RAG Validation
-        print("Progress: 80%")
-        rag_results = self.rag_agent.process(ocr_results, financial_results, pdf_path, os.path.join(output_dir, "rag"))
-        
-        # Step 6: Document Merging
-        print("Progress: 90%")
-        final_results = self.document_merger_agent.process(rag_results, pdf_path, output_dir)
+        with tracer.span("process_document", document=pdf_path) as document_span:
+            # Step 1: OCR Processing
+            print("Progress: 10%")
+            with tracer.span("ocr", document=pdf_path) as span:
+                ocr_results = self.ocr_agent.process(pdf_path, os.path.join(output_dir, "ocr"))
+                span.set_attribute("pages", len(ocr_results.get("pages", [])))
+            document_span.set_attribute("pages", len(ocr_results.get("pages", [])))
+            
+            # Step 2: Table Detection
+            print("Progress: 30%")
+            with tracer.span("table_detection", document=pdf_path):
+                table_results = self.table_detector_agent.process(pdf_path, ocr_results, os.path.join(output_dir, "tables"))
+            
+            # Step 3: ISIN Extraction
+            print("Progress: 50%")
+            with tracer.span("isin_extraction", document=pdf_path):
+                isin_results = self.isin_extractor_agent.process(ocr_results, table_results, os.path.join(output_dir, "isins"))
+            
+            # Step 4: Financial Analysis
+            print("Progress: 70%")
+            with tracer.span("financial_analysis", document=pdf_path):
+                financial_results = self.financial_analyzer_agent.process(ocr_results, table_results, isin_results, os.path.join(output_dir, "analysis"))
+            
+            # Step 5: RAG Validation
+            print("Progress: 80%")
+            with tracer.span("rag_validation", document=pdf_path):
+                rag_results = self.rag_agent.process(ocr_results, financial_results, pdf_path, os.path.join(output_dir, "rag"))
+            
+            # Step 6: Document Merging
+            print("Progress: 90%")
+            with tracer.span("document_merging", document=pdf_path):
+                final_results = self.document_merger_agent.process(rag_results, pdf_path, output_dir)
         
         # Update processing time
         processing_time = time.time() - start_time
@@ -3,11 +3,16 @@ Simple PDF Processor - Extracts text and tables from PDFs using pdfplumber.
 """
 import os
 import re
+import sys
 import json
 import pandas as pd
 import pdfplumber
 from typing import Dict, List, Any, Optional
 
+# The passage index is shared with the DevDocs document service
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "DevDocs", "services"))
+from passage_index import PassageIndex, estimate_tokens
+
 try:
     from ocr_processor import OCRProcessor
     OCR_AVAILABLE = True
@@ -27,7 +32,8 @@ class SimplePDFProcessor:
     Simple processor for PDF documents that extracts text and tables.
     """
 
-    def __init__(self, use_ocr: bool = False, ocr_lang: str = 'en', use_llm: bool = False, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+    def __init__(self, use_ocr: bool = False, ocr_lang: str = 'en', use_llm: bool = False, api_key: Optional[str] = None, model: str = "gpt-4o-mini",
+                 context_tokens: int = 1500):
         """Initialize the PDF processor.
 
         Args:
@@ -36,6 +42,7 @@ class SimplePDFProcessor:
             use_llm: Whether to use LLM for question answering (default: False)
             api_key: API key for LLM service (default: None, uses environment variable)
             model: Model to use for LLM (default: gpt-4o-mini)
+            context_tokens: Token budget of the context passed to the LLM (default: 1500)
         """
         self.extracted_data = {
             "bonds": [],
@@ -46,6 +53,9 @@ class SimplePDFProcessor:
         }
         self.full_text = ""
         self.tables = []
+        self.pages = []
+        self.passage_index = None
+        self.context_tokens = context_tokens
 
         # OCR settings
         self.use_ocr = use_ocr and OCR_AVAILABLE
@@ -82,6 +92,8 @@ class SimplePDFProcessor:
         }
         self.full_text = ""
         self.tables = []
+        self.pages = []
+        self.passage_index = None
 
         # Create output directory if specified
         if output_dir:
@@ -127,6 +139,9 @@ class SimplePDFProcessor:
         self._extract_bonds()
         self._extract_asset_allocation()
 
+        # Index the pages once for question answering
+        self.passage_index = PassageIndex.from_pages(self.pages)
+
         # Save the extracted data if output_dir is specified
         if output_dir:
             self._save_results(output_dir)
@@ -151,6 +166,8 @@ class SimplePDFProcessor:
                 if tables:
                     self.tables.extend(tables)
 
+                self.pages.append({"page": i + 1, "text": text or "", "tables": tables or []})
+
     def _extract_with_ocr(self, pdf_path: str, output_dir: Optional[str] = None):
         """Extract text using OCR."""
         # Process the PDF with OCR
@@ -158,6 +175,7 @@ class SimplePDFProcessor:
 
         # Combine all pages into a single text
         self.full_text = "\n\n".join(results.values())
+        self.pages = [{"page": i + 1, "text": text} for i, text in enumerate(results.values())]
 
         # Extract tables from the OCR text (this is more challenging)
         # For now, we'll rely on pattern matching in the text extraction methods
@@ -696,25 +714,15 @@ class SimplePDFProcessor:
                     context += f"   Maturity Date: {maturity_date}\n"
                 context += "\n"
 
-        # Add relevant sections from the full text
-        if len(context) < 4000:  # Keep context size reasonable
-            # Extract keywords from the question
-            keywords = re.findall(r'\b\w{3,}\b', question_lower)
-
-            # Find relevant paragraphs
-            paragraphs = self.full_text.split("\n\n")
-            relevant_paragraphs = []
-
-            for paragraph in paragraphs:
-                paragraph_lower = paragraph.lower()
-                if any(keyword in paragraph_lower for keyword in keywords):
-                    relevant_paragraphs.append(paragraph)
-
-            # Add relevant paragraphs to context
-            if relevant_paragraphs:
+        # Add the most relevant passages of the document within the remaining token budget
+        if self.passage_index is None:
+            self.passage_index = PassageIndex.from_text(self.full_text)
+        budget = self.context_tokens - estimate_tokens(context)
+        if budget > 0:
+            passages = self.passage_index.build_context(question, max_tokens=budget)
+            if passages:
                 context += "Relevant sections from the document:\n\n"
-                for paragraph in relevant_paragraphs[:3]:  # Limit to 3 paragraphs
-                    context += paragraph + "\n\n"
+                context += passages + "\n\n"
 
         return context
 
@@ -0,0 +1,105 @@
+"""
+Tests for the columnar holdings store.
+"""
+import os
+import sys
+import unittest
+
+# Add this directory to the path so we can import the holdings store
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from holdings_store import HoldingsStore
+
+def make_document(bonds, portfolio_value=None, asset_allocation=None):
+    return {"bonds": bonds, "portfolio_value": portfolio_value, "asset_allocation": asset_allocation or {}}
+
+class TestHoldingsStore(unittest.TestCase):
+    """Tests for the HoldingsStore."""
+
+    def setUp(self):
+        """Set up three documents, added out of date order."""
+        self.store = HoldingsStore(normalize_description=lambda description: description.upper())
+        self.store.add_document("mar", "2024-03-31", make_document([
+            {"isin": "XS0000000001", "description": "Bond A", "valuation": "150", "nominal": 100},
+            {"description": "Fund C", "valuation": 40}
+        ], portfolio_value=190))
+        self.store.add_document("jan", "2024-01-31", make_document([
+            {"isin": "XS0000000001", "description": "Bond A", "valuation": 100, "nominal": 100},
+            {"isin": "XS0000000002", "description": "Bond B", "valuation": 80},
+            {"description": "Fund C", "valuation": 50}
+        ], portfolio_value=230, asset_allocation={"Bonds": {"value": 180, "percentage": "78.3"}}))
+        self.store.add_document("feb", "2024-02-29", make_document([
+            {"isin": "XS0000000001", "description": "Bond A", "valuation": 120, "nominal": 100},
+            {"isin": "XS0000000002", "description": "Bond B", "valuation": 60},
+            {"description": "fund c", "valuation": 50},
+            {"valuation": 999}
+        ], portfolio_value=200))
+
+    def test_documents_are_ordered_by_date(self):
+        """Test that document IDs come back in date order, undated documents last."""
+        self.store.add_document("undated", None, make_document([]))
+        self.assertEqual(self.store.get_document_ids(), ["jan", "feb", "mar", "undated"])
+        self.assertEqual(self.store.get_document_ids(["mar", "jan", "missing"]), ["jan", "mar"])
+
+    def test_compare_joins_on_security_id(self):
+        """Test that a pairwise comparison covers securities of either document."""
+        comparison = self.store.compare("feb", "mar").set_index("security_id")
+
+        self.assertEqual(sorted(comparison.index), ["DESC:FUND C", "XS0000000001", "XS0000000002"])
+        self.assertEqual(comparison.loc["XS0000000001", "valuation_change"], 30)
+        self.assertEqual(comparison.loc["XS0000000001", "percentage_change"], 25)
+        self.assertFalse(comparison.loc["XS0000000002", "in_doc2"])
+        self.assertEqual(comparison.loc["XS0000000002", "valuation_change"], -60)
+        # Securities without an ISIN are matched on the normalized description
+        self.assertEqual(comparison.loc["DESC:FUND C", "valuation_change"], -10)
+        # Sorted by absolute valuation change
+        self.assertEqual(list(comparison.index), ["XS0000000002", "XS0000000001", "DESC:FUND C"])
+
+    def test_comparison_matrix_and_period_changes(self):
+        """Test the N-way matrix and the changes between consecutive documents."""
+        matrix = self.store.get_comparison_matrix()
+        self.assertEqual(list(matrix.columns), ["jan", "feb", "mar"])
+        self.assertEqual(list(matrix.loc["XS0000000001"]), [100, 120, 150])
+
+        changes = self.store.get_period_changes()
+        bond_a = changes[changes["security_id"] == "XS0000000001"]
+        self.assertEqual(list(zip(bond_a["doc_id1"], bond_a["doc_id2"])), [("jan", "feb"), ("feb", "mar")])
+        self.assertEqual(list(bond_a["valuation_change"]), [20, 30])
+
+        # Bond B was sold before March, so it only appears as a sale in that period
+        bond_b = changes[changes["security_id"] == "XS0000000002"].set_index("doc_id2")
+        self.assertEqual(bond_b.loc["mar", "valuation_change"], -60)
+
+        movers = self.store.get_top_movers(n=1)
+        self.assertEqual(list(movers["gainers"]["security_id"]), ["XS0000000001", "XS0000000001"])
+        self.assertEqual(list(movers["losers"]["security_id"]), ["XS0000000002", "DESC:FUND C"])
+
+    def test_portfolio_series_and_allocations(self):
+        """Test portfolio returns and numeric allocation columns."""
+        series = self.store.get_portfolio_series()
+        self.assertEqual(list(series["portfolio_value"]), [230, 200, 190])
+        self.assertAlmostEqual(series.loc["feb", "period_return"], -13.0434782, places=5)
+
+        allocations = self.store.allocations
+        self.assertEqual(allocations.loc[0, "percentage"], 78.3)
+
+    def test_replacing_and_removing_documents(self):
+        """Test that cached frames follow added, replaced and removed documents."""
+        self.assertEqual(len(self.store.holdings), 8)
+
+        self.store.add_document("mar", "2024-03-31", make_document([{"isin": "XS0000000001", "valuation": 10}]))
+        self.assertEqual(len(self.store.holdings), 7)
+
+        self.store.remove_document("feb")
+        self.assertNotIn("feb", self.store)
+        self.assertEqual(self.store.get_document_ids(), ["jan", "mar"])
+        self.assertEqual(len(self.store.holdings), 4)
+
+    def test_to_records_uses_none_for_missing_values(self):
+        """Test that records are JSON friendly."""
+        records = HoldingsStore.to_records(self.store.compare("feb", "mar"))
+        bond_b = next(record for record in records if record["security_id"] == "XS0000000002")
+        self.assertIsNone(bond_b["valuation2"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for resumable bulk ingestion in the multi-document processor.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Add this directory to the path so we can import the processor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import multi_document_processor
+from multi_document_processor import MultiDocumentProcessor
+
+def make_extracted_data(document_date, valuation):
+    """Create the extracted data of a statement holding one bond."""
+    return {
+        "bonds": [{"isin": "XS0000000001", "description": "Bond A", "valuation": valuation}],
+        "asset_allocation": {},
+        "portfolio_value": valuation,
+        "client_info": {},
+        "document_date": document_date
+    }
+
+# Extracted data of the documents, by file name
+EXTRACTED = {
+    "jan.pdf": make_extracted_data("31.01.2024", 100),
+    "feb.pdf": make_extracted_data("29.02.2024", 120),
+    "mar.pdf": make_extracted_data("31.03.2024", 150),
+    "undated.pdf": make_extracted_data(None, 90)
+}
+
+def fake_extract_document(doc_path, doc_output_dir, force_ocr):
+    """Stands in for the PDF extraction of a worker process."""
+    return {"extracted_data": json.loads(json.dumps(EXTRACTED[os.path.basename(doc_path)])), "full_text": "text"}
+
+class TestBulkIngestion(unittest.TestCase):
+    """Tests for MultiDocumentProcessor.add_documents_bulk."""
+
+    def setUp(self):
+        """Create a directory for the checkpoint."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.temp_dir, "checkpoint.jsonl")
+        self.extracted = []
+
+        # Extract in threads of this process, recording the extracted documents
+        def extract(doc_path, doc_output_dir, force_ocr):
+            self.extracted.append(os.path.basename(doc_path))
+            return fake_extract_document(doc_path, doc_output_dir, force_ocr)
+
+        patches = [
+            patch.object(multi_document_processor, "ProcessPoolExecutor", ThreadPoolExecutor),
+            patch.object(multi_document_processor, "_init_bulk_worker", lambda use_ocr, ocr_lang: None),
+            patch.object(multi_document_processor, "_extract_document_worker", extract)
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Remove the checkpoint directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def ingest(self, file_names, processor=None):
+        processor = processor or MultiDocumentProcessor()
+        entries = [{"path": os.path.join(self.temp_dir, name), "doc_id": name} for name in file_names]
+        return processor, processor.add_documents_bulk(entries, checkpoint_path=self.checkpoint_path, max_workers=2)
+
+    def read_checkpoint(self):
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_documents_are_merged_in_date_order(self):
+        """Test that documents are merged by date, undated documents last, whatever order they complete in."""
+        processor, merged = self.ingest(["undated.pdf", "mar.pdf", "jan.pdf", "feb.pdf"])
+
+        self.assertEqual(merged, ["jan.pdf", "feb.pdf", "mar.pdf", "undated.pdf"])
+        security = processor.securities_db["XS0000000001"]
+        self.assertEqual(security["first_seen"], "2024-01-31")
+        self.assertEqual(security["last_seen"], "2024-03-31")
+
+    def test_checkpoint_holds_only_what_the_merge_needs(self):
+        """Test that checkpointed documents carry their extracted data but not their text."""
+        self.ingest(["jan.pdf", "feb.pdf"])
+        records = self.read_checkpoint()
+
+        documents = [record for record in records if "doc_id" in record]
+        self.assertEqual(sorted(record["doc_id"] for record in documents), ["feb.pdf", "jan.pdf"])
+        for record in documents:
+            self.assertNotIn("full_text", record)
+            self.assertEqual(record["extracted_data"], EXTRACTED[record["doc_id"]])
+        self.assertEqual(records[-1]["merged"], ["feb.pdf", "jan.pdf"])
+
+    def test_resume_extracts_and_merges_only_new_documents(self):
+        """Test that a later run restores the merged state and merges new documents after it."""
+        self.ingest(["feb.pdf", "jan.pdf"])
+        self.extracted = []
+
+        processor, merged = self.ingest(["jan.pdf", "feb.pdf", "mar.pdf"])
+
+        self.assertEqual(self.extracted, ["mar.pdf"])
+        self.assertEqual(merged, ["mar.pdf"])
+        self.assertEqual(processor.merged_documents, {"jan.pdf", "feb.pdf", "mar.pdf"})
+        values = processor.securities_db["XS0000000001"]["values"]
+        self.assertEqual({doc_id: value["valuation"] for doc_id, value in values.items()},
+                         {"jan.pdf": 100, "feb.pdf": 120, "mar.pdf": 150})
+        self.assertIsNone(processor.documents["jan.pdf"]["full_text"])
+
+    def test_resume_after_a_truncated_last_line(self):
+        """Test that a partially written record is extracted again and does not swallow the next record."""
+        record = {"doc_id": "jan.pdf", "path": os.path.join(self.temp_dir, "jan.pdf"), "doc_date": None,
+                  "extracted_data": EXTRACTED["jan.pdf"]}
+        with open(self.checkpoint_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.write('{"doc_id": "feb.pdf", "path": "fe')
+
+        processor, merged = self.ingest(["jan.pdf", "feb.pdf"])
+        self.assertEqual(self.extracted, ["feb.pdf"])
+        self.assertEqual(merged, ["jan.pdf", "feb.pdf"])
+
+        # The records appended after the partial line are read back by the next run
+        self.extracted = []
+        processor, merged = self.ingest(["jan.pdf", "feb.pdf"])
+        self.assertEqual(self.extracted, [])
+        self.assertEqual(merged, [])
+        self.assertEqual(processor.merged_documents, {"jan.pdf", "feb.pdf"})
+
+if __name__ == "__main__":
+    unittest.main()
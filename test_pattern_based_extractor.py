@@ -0,0 +1,90 @@
+"""
+Regression tests for the pattern based extractor.
+
+The golden output of messos.txt was written by the extractor before the single
+pass scan, which the scan has to reproduce.
+"""
+import os
+import sys
+import json
+import logging
+import unittest
+
+# Add this directory to the path so we can import the extractor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pattern_based_extractor import PatternBasedExtractor
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def extract(text):
+    """Extract text without logging."""
+    logging.disable(logging.INFO)
+    try:
+        return PatternBasedExtractor().extract(text)
+    finally:
+        logging.disable(logging.NOTSET)
+
+class TestPatternBasedExtractor(unittest.TestCase):
+    """Compares the extraction of messos.txt with its golden output."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Extract messos.txt and load the golden output."""
+        with open(os.path.join(DIRECTORY, "messos.txt"), encoding="utf-8") as f:
+            cls.current = extract(f.read())
+        with open(os.path.join(DIRECTORY, "test_pattern_based_extractor_messos.json"), encoding="utf-8") as f:
+            cls.golden = json.load(f)
+
+    def test_categories_match_the_golden_output(self):
+        """Test that every category is extracted as before, in the same order."""
+        self.assertEqual(list(self.current), list(self.golden))
+        for category in self.golden:
+            self.assertEqual(self.current[category], self.golden[category], category)
+
+    def test_golden_counts(self):
+        """Test the size of each category, so that a regenerated golden file is noticed."""
+        counts = {category: len(values) for category, values in self.golden.items()}
+        self.assertEqual(counts, {
+            "portfolio_value": 1, "securities": 41, "asset_allocation": 151, "key_value_pairs": 1056,
+            "dates": 151, "currencies": 258, "structured_products": 0
+        })
+
+class TestMatchesAcrossLines(unittest.TestCase):
+    """Matches whose label and value are on different lines of extracted PDF text."""
+
+    def test_portfolio_value_below_its_label(self):
+        """Test that a value on a later line than its label is found."""
+        values = extract("Total assets\n\n19'510'599\n")["portfolio_value"]
+        self.assertEqual([(value["value"], value["match"]) for value in values], [(19510599.0, "Total assets\n\n19'510'599")])
+
+    def test_asset_allocation_across_lines(self):
+        """Test that an asset class on the line before its value and percentage is found."""
+        allocations = extract("Bonds\n12'000 40.00%\nEquities 9'000 30.00%\n")["asset_allocation"]
+        self.assertEqual([(allocation["asset_class"], allocation["value"], allocation["percentage"]) for allocation in allocations], [
+            ("Bonds", 12000.0, 40.0), ("Equities", 9000.0, 30.0),
+            ("Bonds", 12000.0, 40.0), ("Equities", 9000.0, 30.0),
+            ("Equities", 9000.0, 30.0)
+        ])
+
+    def test_key_value_pair_across_lines(self):
+        """Test that keys run on over line breaks, as they did in the whole-text match."""
+        pairs = extract("Client name\nMESSOS ENTERPRISES\nValuation date: 31.03.2025\n")["key_value_pairs"]
+        self.assertEqual([pair["key"] for pair in pairs], ["Client name\nMESSOS ENTERPRISES\nValuation date"] * 2)
+
+        pairs = extract("USD\n\n200'000\n")["key_value_pairs"]
+        self.assertEqual([(pair["key"], pair["value"]) for pair in pairs], [("USD", 200000.0)] * 2)
+
+    def test_currency_above_its_amount(self):
+        """Test that a currency code with its amount on a later line is found."""
+        self.assertEqual(extract("USD\n\n200'000\n")["currencies"], [{"currency": "USD", "source": "text"}])
+
+    def test_labelled_isins_come_first(self):
+        """Test that an ISIN below its label is found, and labelled ISINs precede bare ones."""
+        securities = extract("ORACLE CORP NOTES XS0000000017\nSecurity: APPLE INC\nISIN:\nUS0378331005\n")["securities"]
+        self.assertEqual([(security["isin"], security["description"]) for security in securities], [
+            ("US0378331005", "Security: APPLE INC"), ("XS0000000017", "ORACLE CORP NOTES")
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
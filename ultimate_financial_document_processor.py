@@ -13,6 +13,8 @@ import re
 import time
 from pathlib import Path
 
+from DevDocs.backend.tracing import get_tracer
+
 # API keys to try
 API_KEYS = [
     {"key": "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", "model": "meta-llama/llama-3-70b-instruct", "name": "Llama Scout 4"},
@@ -272,11 +274,12 @@ def process_with_financial_agents(pdf_path, api_key, model, output_dir):
     }
     
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data
-        )
+        with get_tracer().span("llm_call", document=pdf_path, model=model):
+            response = requests.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers=headers,
+                json=data
+            )
         
         if response.status_code != 200:
             print(f"Error: {response.status_code} - {response.text}")
@@ -456,23 +459,28 @@ def main():
     
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
+    tracer = get_tracer()
     
-    # Process with MultiDocumentProcessor
-    multi_doc_result = process_with_multi_document_processor(args.pdf, args.output_dir)
-    
-    # Process with financial agents
-    agent_results = []
-    for api_key_info in API_KEYS:
-        agent_result = process_with_financial_agents(
-            args.pdf,
-            api_key_info["key"],
-            api_key_info["model"],
-            args.output_dir
-        )
-        agent_results.append(agent_result)
-    
-    # Combine results
-    combined_result = combine_results(multi_doc_result, agent_results, args.output_dir)
+    with tracer.span("process_document", document=args.pdf):
+        # Process with MultiDocumentProcessor
+        with tracer.span("multi_document_processor", document=args.pdf):
+            multi_doc_result = process_with_multi_document_processor(args.pdf, args.output_dir)
+        
+        # Process with financial agents
+        agent_results = []
+        for api_key_info in API_KEYS:
+            with tracer.span("financial_agents", document=args.pdf, model=api_key_info["model"]):
+                agent_result = process_with_financial_agents(
+                    args.pdf,
+                    api_key_info["key"],
+                    api_key_info["model"],
+                    args.output_dir
+                )
+            agent_results.append(agent_result)
+        
+        # Combine results
+        with tracer.span("combine_results", document=args.pdf):
+            combined_result = combine_results(multi_doc_result, agent_results, args.output_dir)
     
     print("\n=== Processing Complete ===")
     print(f"Results saved to {args.output_dir}")